@@ -0,0 +1,215 @@
+"""
+Scout Change Tracker - incremental scanning support for the Scout Agent
+Keeps a fingerprint of every listing seen so far, so each scan only re-enriches
+and re-scores new or changed listings and reports what changed
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Days-on-market thresholds the lead scores react to; DOM only counts as a change
+# when a listing crosses one of them, not every day it stays listed
+DOM_THRESHOLDS = (7, 61, 91, 121)
+
+TIMESTAMP_FIELDS = ("last_updated", "updated_at", "listed_at")
+
+
+def listing_key(deal: Dict[str, Any]) -> str:
+    """Stable identity of a listing across scans"""
+    if deal.get("id"):
+        return str(deal["id"])
+    address = deal.get("address") or deal.get("property_address") or ""
+    parts = [address, deal.get("city", ""), deal.get("state", ""), deal.get("zip_code", "")]
+    return "|".join(str(p).strip().lower() for p in parts)
+
+
+def dom_band(days_on_market: Optional[float]) -> int:
+    if days_on_market is None:
+        return -1
+    return sum(days_on_market >= threshold for threshold in DOM_THRESHOLDS)
+
+
+def listing_snapshot(deal: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields whose changes matter for scoring and alerts"""
+    return {
+        "listing_price": deal.get("listing_price"),
+        "estimated_value": deal.get("estimated_value"),
+        "estimated_repair_cost": deal.get("estimated_repair_cost"),
+        "status": deal.get("status") or deal.get("listing_status"),
+        "dom_band": dom_band(deal.get("days_on_market")),
+        "motivation_indicators": sorted(str(i).lower() for i in deal.get("motivation_indicators") or [])
+    }
+
+
+def as_utc(value: datetime) -> datetime:
+    """Aware UTC timestamp; naive values are taken to be UTC already"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def listing_fingerprint(snapshot: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(snapshot, sort_keys=True, default=str).encode()).hexdigest()
+
+
+@dataclass
+class ListingChange:
+    """One change detected between scans"""
+    key: str
+    change_type: str  # new, price_drop, price_increase, status_change, motivation_change, updated, removed
+    deal: Dict[str, Any]
+    changed_fields: List[str] = field(default_factory=list)
+    previous: Optional[Dict[str, Any]] = None
+    snapshot: Optional[Dict[str, Any]] = None
+    detected_at: datetime = field(default_factory=datetime.now)
+
+    @property
+    def price_change(self) -> Optional[float]:
+        if not self.previous:
+            return None
+        old, new = self.previous.get("listing_price"), self.deal.get("listing_price")
+        if old is None or new is None:
+            return None
+        return new - old
+
+    def to_alert_data(self) -> Dict[str, Any]:
+        """Flat payload in the shape DealAlertService expects"""
+        lead_score = self.deal.get("lead_score") or {}
+        return {
+            "deal_id": self.deal.get("id"),
+            "property_id": self.deal.get("property_id"),
+            "address": self.deal.get("address") or self.deal.get("property_address"),
+            "price": self.deal.get("listing_price"),
+            "previous_price": (self.previous or {}).get("listing_price"),
+            "price_change": self.price_change,
+            "score": lead_score.get("overall_score", 0) * 10,
+            "change_type": self.change_type,
+            "changed_fields": self.changed_fields,
+            "detected_at": self.detected_at.isoformat()
+        }
+
+
+class IncrementalScanTracker:
+    """Fingerprint store and watermark for incremental listing scans
+
+    diff() compares a scan's records against the stored fingerprints and returns
+    change events only for new or materially changed listings; unchanged records
+    cost one hash. When a scan is a full snapshot (complete=True), listings missing
+    from it are reported removed.
+
+    diff() does not store anything: call commit() with the changes once they have
+    been scored and placed in the pipeline, so a scan that fails halfway reports
+    the same changes again next time. The watermark is the newest record timestamp
+    (UTC) of the last committed scan, which sources can use to return only listings
+    updated since then.
+    """
+
+    def __init__(self):
+        self._listings: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self.watermark: Optional[datetime] = None
+        self._pending_watermark: Optional[datetime] = None
+        self.scans = 0
+        self.records_seen = 0
+        self.records_changed = 0
+
+    def __len__(self) -> int:
+        return len(self._listings)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._listings
+
+    def diff(self, records: Iterable[Dict[str, Any]], complete: bool = False) -> List[ListingChange]:
+        """Record a scan and return the changes it contains"""
+        changes: List[ListingChange] = []
+        seen = set()
+        newest = self.watermark
+
+        for deal in records:
+            key = listing_key(deal)
+            seen.add(key)
+            self.records_seen += 1
+            newest = self._newer(newest, deal)
+
+            snapshot = listing_snapshot(deal)
+            fingerprint = listing_fingerprint(snapshot)
+            stored = self._listings.get(key)
+            if stored is not None and stored[0] == fingerprint:
+                continue
+
+            if stored is None:
+                changes.append(ListingChange(key=key, change_type="new", deal=deal, snapshot=snapshot))
+                continue
+
+            previous = stored[1]
+            changed_fields = [name for name in snapshot if snapshot[name] != previous.get(name)]
+            changes.append(ListingChange(
+                key=key,
+                change_type=self._classify(snapshot, previous, changed_fields),
+                deal=deal,
+                changed_fields=changed_fields,
+                previous=previous,
+                snapshot=snapshot
+            ))
+
+        if complete:
+            for key, (_, previous) in self._listings.items():
+                if key not in seen:
+                    changes.append(ListingChange(key=key, change_type="removed", deal={"id": key}, previous=previous))
+
+        self.scans += 1
+        self.records_changed += len(changes)
+        self._pending_watermark = newest
+        return changes
+
+    def commit(self, changes: Iterable[ListingChange]):
+        """Store the fingerprints of processed changes and advance the watermark"""
+        for change in changes:
+            if change.change_type == "removed":
+                self._listings.pop(change.key, None)
+            else:
+                self._listings[change.key] = (listing_fingerprint(change.snapshot), change.snapshot)
+        if self._pending_watermark is not None:
+            self.watermark = self._pending_watermark
+            self._pending_watermark = None
+
+    @staticmethod
+    def _classify(snapshot: Dict[str, Any], previous: Dict[str, Any], changed_fields: List[str]) -> str:
+        if "listing_price" in changed_fields and snapshot["listing_price"] is not None \
+                and previous.get("listing_price") is not None:
+            return "price_drop" if snapshot["listing_price"] < previous["listing_price"] else "price_increase"
+        if "status" in changed_fields:
+            return "status_change"
+        if "motivation_indicators" in changed_fields:
+            return "motivation_change"
+        return "updated"
+
+    @staticmethod
+    def _newer(current: Optional[datetime], deal: Dict[str, Any]) -> Optional[datetime]:
+        for name in TIMESTAMP_FIELDS:
+            value = deal.get(name)
+            if isinstance(value, str):
+                try:
+                    value = datetime.fromisoformat(value)
+                except ValueError:
+                    continue
+            if isinstance(value, datetime):
+                value = as_utc(value)
+                return value if current is None or value > current else current
+        return current
+
+    def forget(self, key: str):
+        """Drop a listing so its next sighting is treated as new"""
+        self._listings.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "tracked_listings": len(self._listings),
+            "scans": self.scans,
+            "records_seen": self.records_seen,
+            "records_changed": self.records_changed,
+            "change_ratio": self.records_changed / self.records_seen if self.records_seen else 0.0,
+            "watermark": self.watermark.isoformat() if self.watermark else None
+        }
@@ -0,0 +1,171 @@
+"""
+Scout Pipeline - vectorized deal scoring for the Scout workflows
+Builds one columnar frame from a scan's deal dicts and computes every per-deal
+score in a single NumPy pass, replacing per-deal Python loops
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+HIGH_MOTIVATION = frozenset(["foreclosure", "pre_foreclosure", "divorce", "estate_sale", "job_relocation"])
+MEDIUM_MOTIVATION = frozenset(["vacant", "distressed", "tax_lien", "bankruptcy"])
+
+LEAD_SCORE_WEIGHTS = {
+    "profit_weight": 0.35,
+    "feasibility_weight": 0.25,
+    "motivation_weight": 0.25,
+    "market_weight": 0.15
+}
+
+
+def _number(value: Any) -> float:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+
+
+def deal_frame(deals: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Columns needed for scoring, one row per deal (missing values are NaN)"""
+    high, medium = [], []
+    for deal in deals:
+        indicators = [str(i).lower() for i in deal.get("motivation_indicators") or []]
+        high.append(sum(i in HIGH_MOTIVATION for i in indicators))
+        medium.append(sum(i in MEDIUM_MOTIVATION for i in indicators))
+
+    return pd.DataFrame({
+        "listing_price": [_number(d.get("listing_price")) for d in deals],
+        "estimated_value": [_number(d.get("estimated_value")) for d in deals],
+        "estimated_repair_cost": [_number(d.get("estimated_repair_cost")) for d in deals],
+        "days_on_market": [_number(d.get("days_on_market")) for d in deals],
+        "property_type": [str(d.get("property_type") or "").lower() for d in deals],
+        "high_motivation": np.array(high, dtype=float),
+        "medium_motivation": np.array(medium, dtype=float),
+    })
+
+
+def _inputs(frame: pd.DataFrame, repair_default_ratio: float):
+    listing = frame["listing_price"].fillna(0.0).to_numpy()
+    value = frame["estimated_value"].fillna(frame["listing_price"].fillna(0.0) * 1.1).to_numpy()
+    repairs = frame["estimated_repair_cost"].fillna(frame["listing_price"].fillna(0.0) * repair_default_ratio).to_numpy()
+    days = frame["days_on_market"].fillna(30.0).to_numpy()
+    return listing, value, repairs, days
+
+
+def seller_motivation_scores(frame: pd.DataFrame) -> np.ndarray:
+    """Vectorized ScoutAgent._score_seller_motivation"""
+    days = frame["days_on_market"].fillna(30.0).to_numpy()
+    score = 5.0 + 2.0 * frame["high_motivation"].to_numpy() + frame["medium_motivation"].to_numpy()
+    score += np.select([days > 120, days > 90], [2.0, 1.0], 0.0)
+    return np.clip(score, 0.0, 10.0)
+
+
+def lead_score_columns(frame: pd.DataFrame, market_score: float) -> Dict[str, np.ndarray]:
+    """Vectorized ScoutAgent._calculate_lead_score over every row of the frame"""
+    listing, value, repairs, days = _inputs(frame, repair_default_ratio=0.1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        margin = np.where(listing > 0, (value - listing - repairs) / listing, 0.0)
+    profit = np.select(
+        [margin >= 0.30, margin >= 0.20, margin >= 0.15, margin >= 0.10, margin >= 0.05],
+        [10.0, 8.0, 7.0, 6.0, 4.0], 2.0
+    )
+    profit = np.where(listing <= 0, 5.0, profit)
+
+    # Feasibility treats a missing repair estimate as zero
+    feasibility_repairs = frame["estimated_repair_cost"].fillna(0.0).to_numpy()
+    property_type = frame["property_type"].to_numpy()
+    feasibility = 7.0 + np.select(
+        [np.isin(property_type, ["single_family", "condo"]), property_type == "multi_family"], [1.0, 0.5], 0.0
+    )
+    feasibility += np.select([days > 90, days > 60], [1.0, 0.5], 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        repair_ratio = np.where(listing > 0, feasibility_repairs / listing, 0.0)
+    feasibility -= np.select([repair_ratio > 0.25, repair_ratio > 0.15], [2.0, 1.0], 0.0)
+    feasibility = np.clip(feasibility, 0.0, 10.0)
+
+    motivation = seller_motivation_scores(frame)
+    market = np.full(len(frame), float(market_score))
+
+    overall = (
+        profit * LEAD_SCORE_WEIGHTS["profit_weight"] +
+        feasibility * LEAD_SCORE_WEIGHTS["feasibility_weight"] +
+        motivation * LEAD_SCORE_WEIGHTS["motivation_weight"] +
+        market * LEAD_SCORE_WEIGHTS["market_weight"]
+    )
+    confidence = np.minimum(1.0, (profit + feasibility + motivation + market) / 40.0)
+    return {
+        "overall_score": overall,
+        "profit_potential": profit,
+        "deal_feasibility": feasibility,
+        "seller_motivation": motivation,
+        "market_conditions": market,
+        "confidence_level": confidence
+    }
+
+
+def lead_score_dicts(columns: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Per-deal dicts in the shape of LeadScore.dict()"""
+    rounded = {
+        name: [round(x, 2 if name == "confidence_level" else 1) for x in values.tolist()]
+        for name, values in columns.items()
+    }
+    return [
+        {**{name: rounded[name][i] for name in rounded}, "scoring_factors": dict(LEAD_SCORE_WEIGHTS)}
+        for i in range(len(rounded["overall_score"]))
+    ]
+
+
+def evaluation_score_columns(frame: pd.DataFrame, market_score: float) -> Dict[str, np.ndarray]:
+    """Profit, feasibility, motivation and composite scores of the deal evaluation workflow"""
+    listing, value, repairs, days = _inputs(frame, repair_default_ratio=0.1)
+
+    potential_profit = value - listing - repairs
+    with np.errstate(divide="ignore", invalid="ignore"):
+        margin = np.where(listing > 0, potential_profit / listing, 0.0)
+    profit = np.select(
+        [margin >= 0.3, margin >= 0.2, margin >= 0.15, margin >= 0.1], [10.0, 8.0, 6.0, 4.0], 2.0
+    )
+
+    feasibility_repairs = frame["estimated_repair_cost"].fillna(0.0).to_numpy()
+    feasibility = 7.0 - np.select([listing > 500000, listing < 100000], [1.0, 0.5], 0.0)
+    feasibility -= np.select([feasibility_repairs > 50000, feasibility_repairs > 25000], [1.5, 0.5], 0.0)
+    feasibility += np.select([days > 90, days < 7], [1.0, -0.5], 0.0)
+    feasibility = np.clip(feasibility, 0.0, 10.0)
+
+    motivation = seller_motivation_scores(frame)
+    market = np.full(len(frame), float(market_score))
+
+    overall = profit * 0.35 + feasibility * 0.25 + motivation * 0.25 + market * 0.15
+    variance = np.abs(profit - feasibility) + np.abs(motivation - market)
+    confidence = np.maximum(0.5, 1.0 - variance / 20.0)
+    return {
+        "potential_profit": potential_profit,
+        "profit_margin": margin,
+        "profit_potential_score": profit,
+        "feasibility_score": feasibility,
+        "seller_motivation_score": motivation,
+        "market_conditions_score": market,
+        "overall_score": overall,
+        "confidence_level": confidence
+    }
+
+
+def top_n_order(scores: np.ndarray, n: Optional[int] = None) -> np.ndarray:
+    """Indices of the n highest scores, highest first, ties in input order
+
+    Uses a partial sort (argpartition) so only the selected n are fully sorted.
+    Returns the same prefix a stable descending sort would.
+    """
+    scores = np.asarray(scores, dtype=float)
+    size = len(scores)
+    if n is None or n >= size:
+        return np.lexsort((np.arange(size), -scores))
+    if n <= 0:
+        return np.array([], dtype=int)
+
+    candidates = np.argpartition(-scores, n - 1)[:n]
+    threshold = scores[candidates].min()
+    above = np.flatnonzero(scores > threshold)
+    ties = np.flatnonzero(scores == threshold)[:n - len(above)]
+    chosen = np.concatenate([above, ties])
+    return chosen[np.lexsort((chosen, -scores[chosen]))]
@@ -140,10 +140,30 @@ async def startup_event():
     logger.info(f"HTTPS enforced: {security_config.settings.FORCE_HTTPS}")
     logger.info(f"MFA required: {security_config.settings.REQUIRE_MFA}")
 
+    # Optional periodic re-scoring of the whole lead table
+    rescore_hours = os.getenv("LEAD_RESCORE_INTERVAL_HOURS")
+    if rescore_hours and not os.getenv("TESTING"):
+        from ..core.database import SessionLocal
+        from ..services.lead_scoring_engine import ScheduledLeadRescoreJob
+
+        # Incremental mode re-scores only leads changed through application sessions
+        incremental = os.getenv("LEAD_RESCORE_INCREMENTAL", "").lower() in ("1", "true", "yes")
+        if incremental:
+            from ..services.incremental_lead_scoring import lead_change_tracker
+            lead_change_tracker.install(SessionLocal)
+
+        app.state.lead_rescore_job = ScheduledLeadRescoreJob(
+            SessionLocal, interval_seconds=float(rescore_hours) * 3600, incremental=incremental
+        )
+        await app.state.lead_rescore_job.start()
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info("Shutting down Real Estate Empire API")
+    rescore_job = getattr(app.state, "lead_rescore_job", None)
+    if rescore_job:
+        await rescore_job.stop()
 
 # Include authentication router first
 app.include_router(authentication.router)
@@ -3,15 +3,19 @@ Data Export API endpoints
 Implements endpoints for PDF report generation, CSV export, and JSON data export
 """
 
-from fastapi import APIRouter, HTTPException, Depends, status, Response
+from fastapi import APIRouter, HTTPException, Depends, status, Response, Query
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, aliased
+from typing import AsyncIterator, Dict, Any, List, Optional
+from enum import Enum
 import uuid
 import logging
+import asyncio
 import io
 import csv
 import json
+import zlib
 from datetime import datetime
 
 from ...core.database import get_db
@@ -21,6 +25,36 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Properties fetched per page when streaming bulk exports
+EXPORT_BATCH_SIZE = 1000
+
+PROPERTY_EXPORT_COLUMNS = [
+    'property_id', 'address', 'city', 'state', 'zip_code', 'property_type',
+    'bedrooms', 'bathrooms', 'square_feet', 'lot_size', 'year_built',
+    'listing_price', 'current_value', 'assessed_value', 'tax_amount',
+    'condition_score', 'days_on_market', 'created_at', 'updated_at'
+]
+
+ANALYSIS_EXPORT_COLUMNS = [
+    'latest_analysis_type', 'arv_estimate', 'current_value_estimate',
+    'repair_estimate', 'potential_profit', 'roi_estimate',
+    'cash_flow_estimate', 'cap_rate', 'confidence_score', 'analysis_date'
+]
+
+
+class ExportFormat(str, Enum):
+    """Output formats supported by streaming bulk export"""
+    CSV = "csv"
+    NDJSON = "ndjson"
+    PARQUET = "parquet"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet"
+}
+
 @router.get("/{property_id}/pdf", response_class=StreamingResponse)
 async def export_property_pdf_report(
     property_id: uuid.UUID,
@@ -302,7 +336,7 @@ async def export_bulk_properties_csv(
         if len(property_ids) > 100:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Maximum 100 properties allowed for bulk export"
+                detail="Maximum 100 properties allowed for bulk export; use /bulk/stream with filters for larger exports"
             )
         
         # Get properties from database
@@ -337,6 +371,79 @@ async def export_bulk_properties_csv(
             detail=f"Failed to generate bulk CSV export: {str(e)}"
         )
 
+@router.get("/bulk/stream", response_class=StreamingResponse)
+async def export_bulk_properties_stream(
+    format: ExportFormat = ExportFormat.CSV,
+    gzip: bool = False,
+    include_analysis: bool = True,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    zip_code: Optional[str] = None,
+    property_type: Optional[str] = None,
+    property_status: Optional[str] = Query(None, alias="status"),
+    min_listing_price: Optional[float] = None,
+    max_listing_price: Optional[float] = None,
+    updated_since: Optional[datetime] = None,
+    batch_size: int = Query(EXPORT_BATCH_SIZE, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream every property matching the filters in CSV, NDJSON or Parquet
+    
+    - **format**: Output format (csv, ndjson or parquet)
+    - **gzip**: Gzip-compress the response stream
+    - **include_analysis**: Include latest analysis columns
+    - **city**, **state**, **zip_code**, **property_type**, **status**: Exact-match filters
+    - **min_listing_price**, **max_listing_price**: Listing price range
+    - **updated_since**: Only properties updated at or after this time
+    - **batch_size**: Properties fetched per database page
+    - Returns the export as a streaming response with constant server memory
+    """
+    if format == ExportFormat.PARQUET:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Parquet export requires the pyarrow package"
+            )
+    
+    filters = {
+        "city": city,
+        "state": state,
+        "zip_code": zip_code,
+        "property_type": property_type,
+        "status": property_status,
+        "min_listing_price": min_listing_price,
+        "max_listing_price": max_listing_price,
+        "updated_since": updated_since
+    }
+    
+    if format == ExportFormat.CSV:
+        chunks = _stream_csv(db, filters, include_analysis, batch_size)
+    elif format == ExportFormat.NDJSON:
+        chunks = _stream_ndjson(db, filters, include_analysis, batch_size)
+    else:
+        chunks = _stream_parquet(db, filters, include_analysis, batch_size)
+    
+    extension = format.value
+    media_type = EXPORT_MEDIA_TYPES[format]
+    if gzip:
+        chunks = _gzip_stream(chunks)
+        extension += ".gz"
+        media_type = "application/gzip"
+    
+    filename = f"bulk_properties_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    active_filters = {key: value for key, value in filters.items() if value is not None}
+    
+    logger.info(f"Started streaming {format.value} bulk export with filters: {active_filters}")
+    
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
 @router.get("/bulk/json", response_model=Dict[str, Any])
 async def export_bulk_properties_json(
     property_ids: List[uuid.UUID],
@@ -597,71 +704,274 @@ async def _generate_bulk_csv_data(
     """Generate bulk CSV data for multiple properties"""
     output = io.StringIO()
     
-    # Headers
-    headers = [
-        'property_id', 'address', 'city', 'state', 'zip_code', 'property_type',
-        'bedrooms', 'bathrooms', 'square_feet', 'lot_size', 'year_built',
-        'listing_price', 'current_value', 'assessed_value', 'tax_amount',
-        'condition_score', 'days_on_market', 'created_at', 'updated_at'
-    ]
-    
+    headers = list(PROPERTY_EXPORT_COLUMNS)
     if include_analysis:
-        headers.extend([
-            'latest_analysis_type', 'arv_estimate', 'current_value_estimate',
-            'repair_estimate', 'potential_profit', 'roi_estimate',
-            'cash_flow_estimate', 'cap_rate', 'confidence_score', 'analysis_date'
-        ])
+        headers.extend(ANALYSIS_EXPORT_COLUMNS)
     
     writer = csv.writer(output)
     writer.writerow(headers)
     
-    # Process each property
+    latest_analyses = {}
+    if include_analysis:
+        latest_analyses = _get_latest_analyses(db, [p.id for p in properties])
+    
     for property_record in properties:
-        row = [
-            str(property_record.id),
-            property_record.address,
-            property_record.city,
-            property_record.state,
-            property_record.zip_code,
-            property_record.property_type,
-            property_record.bedrooms,
-            property_record.bathrooms,
-            property_record.square_feet,
-            property_record.lot_size,
-            property_record.year_built,
-            property_record.listing_price,
-            property_record.current_value,
-            property_record.assessed_value,
-            property_record.tax_amount,
-            property_record.condition_score,
-            property_record.days_on_market,
-            property_record.created_at.isoformat(),
-            property_record.updated_at.isoformat()
-        ]
+        row = _build_export_row(
+            property_record, latest_analyses.get(property_record.id), include_analysis
+        )
+        writer.writerow([row[column] for column in headers])
+    
+    return output.getvalue()
+
+def _get_latest_analyses(db: Session, property_ids: List[uuid.UUID]) -> Dict[uuid.UUID, PropertyAnalysisDB]:
+    """Fetch the latest analysis of each property with a single window-function query"""
+    if not property_ids:
+        return {}
+    
+    ranked = select(
+        PropertyAnalysisDB,
+        func.row_number().over(
+            partition_by=PropertyAnalysisDB.property_id,
+            order_by=(PropertyAnalysisDB.created_at.desc(), PropertyAnalysisDB.id.desc())
+        ).label("analysis_rank")
+    ).where(PropertyAnalysisDB.property_id.in_(property_ids)).subquery()
+    
+    latest = aliased(PropertyAnalysisDB, ranked)
+    analyses = db.query(latest).filter(ranked.c.analysis_rank == 1).all()
+    
+    return {analysis.property_id: analysis for analysis in analyses}
+
+def _build_export_row(
+    property_record: PropertyDB,
+    analysis: Optional[PropertyAnalysisDB],
+    include_analysis: bool
+) -> Dict[str, Any]:
+    """Build a flat export row for a property and its latest analysis"""
+    row = {
+        'property_id': str(property_record.id),
+        'address': property_record.address,
+        'city': property_record.city,
+        'state': property_record.state,
+        'zip_code': property_record.zip_code,
+        'property_type': property_record.property_type,
+        'bedrooms': property_record.bedrooms,
+        'bathrooms': property_record.bathrooms,
+        'square_feet': property_record.square_feet,
+        'lot_size': property_record.lot_size,
+        'year_built': property_record.year_built,
+        'listing_price': property_record.listing_price,
+        'current_value': property_record.current_value,
+        'assessed_value': property_record.assessed_value,
+        'tax_amount': property_record.tax_amount,
+        'condition_score': property_record.condition_score,
+        'days_on_market': property_record.days_on_market,
+        'created_at': property_record.created_at.isoformat() if property_record.created_at else None,
+        'updated_at': property_record.updated_at.isoformat() if property_record.updated_at else None
+    }
+    
+    if include_analysis:
+        if analysis:
+            row.update({
+                'latest_analysis_type': analysis.analysis_type,
+                'arv_estimate': analysis.arv_estimate,
+                'current_value_estimate': analysis.current_value_estimate,
+                'repair_estimate': analysis.repair_estimate,
+                'potential_profit': analysis.potential_profit,
+                'roi_estimate': analysis.roi_estimate,
+                'cash_flow_estimate': analysis.cash_flow_estimate,
+                'cap_rate': analysis.cap_rate,
+                'confidence_score': analysis.confidence_score,
+                'analysis_date': analysis.created_at.isoformat() if analysis.created_at else None
+            })
+        else:
+            row.update({column: None for column in ANALYSIS_EXPORT_COLUMNS})
+    
+    return row
+
+def _filtered_property_query(db: Session, filters: Dict[str, Any]):
+    """Build the property query for a streaming export from its filters"""
+    query = db.query(PropertyDB)
+    
+    for column in ("city", "state", "zip_code", "property_type", "status"):
+        if filters.get(column) is not None:
+            query = query.filter(getattr(PropertyDB, column) == filters[column])
+    
+    if filters.get("min_listing_price") is not None:
+        query = query.filter(PropertyDB.listing_price >= filters["min_listing_price"])
+    if filters.get("max_listing_price") is not None:
+        query = query.filter(PropertyDB.listing_price <= filters["max_listing_price"])
+    if filters.get("updated_since") is not None:
+        query = query.filter(PropertyDB.updated_at >= filters["updated_since"])
+    
+    return query
+
+def _fetch_export_page(
+    db: Session,
+    base_query,
+    last_id: Optional[uuid.UUID],
+    include_analysis: bool,
+    batch_size: int
+) -> List[Dict[str, Any]]:
+    """Load one keyset page of properties and their latest analyses as export rows"""
+    page_query = base_query
+    if last_id is not None:
+        page_query = page_query.filter(PropertyDB.id > last_id)
+    properties = page_query.order_by(PropertyDB.id).limit(batch_size).all()
+    
+    latest_analyses = {}
+    if include_analysis and properties:
+        latest_analyses = _get_latest_analyses(db, [p.id for p in properties])
+    
+    rows = [_build_export_row(p, latest_analyses.get(p.id), include_analysis) for p in properties]
+    # Release the page before fetching the next one
+    db.expunge_all()
+    return rows
+
+async def _iter_export_batches(
+    db: Session,
+    filters: Dict[str, Any],
+    include_analysis: bool,
+    batch_size: int
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yield export rows page by page using keyset pagination on property id.
+    
+    Each page costs one property query plus one latest-analysis query, so
+    memory stays bounded by the page size however many properties match.
+    The blocking database calls run in a worker thread, one page at a time,
+    so the event loop keeps serving other requests while a page loads.
+    """
+    base_query = _filtered_property_query(db, filters)
+    last_id = None
+    
+    while True:
+        rows = await asyncio.to_thread(_fetch_export_page, db, base_query, last_id, include_analysis, batch_size)
+        if not rows:
+            break
         
-        # Add analysis data if requested
-        if include_analysis:
-            latest_analysis = db.query(PropertyAnalysisDB).filter(
-                PropertyAnalysisDB.property_id == property_record.id
-            ).order_by(PropertyAnalysisDB.created_at.desc()).first()
-            
-            if latest_analysis:
-                row.extend([
-                    latest_analysis.analysis_type,
-                    latest_analysis.arv_estimate,
-                    latest_analysis.current_value_estimate,
-                    latest_analysis.repair_estimate,
-                    latest_analysis.potential_profit,
-                    latest_analysis.roi_estimate,
-                    latest_analysis.cash_flow_estimate,
-                    latest_analysis.cap_rate,
-                    latest_analysis.confidence_score,
-                    latest_analysis.created_at.isoformat()
-                ])
-            else:
-                # Add empty analysis columns
-                row.extend([None] * 10)
-        
-        writer.writerow(row)
-    
-    return output.getvalue()
\ No newline at end of file
+        yield rows
+        
+        last_id = uuid.UUID(rows[-1]['property_id'])
+        if len(rows) < batch_size:
+            break
+
+async def _stream_csv(
+    db: Session,
+    filters: Dict[str, Any],
+    include_analysis: bool,
+    batch_size: int
+) -> AsyncIterator[bytes]:
+    """Stream export rows as CSV"""
+    columns = list(PROPERTY_EXPORT_COLUMNS)
+    if include_analysis:
+        columns.extend(ANALYSIS_EXPORT_COLUMNS)
+    
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(columns)
+    
+    async for rows in _iter_export_batches(db, filters, include_analysis, batch_size):
+        for row in rows:
+            writer.writerow([row[column] for column in columns])
+        yield output.getvalue().encode("utf-8")
+        output.seek(0)
+        output.truncate()
+    
+    if output.tell():
+        yield output.getvalue().encode("utf-8")
+
+async def _stream_ndjson(
+    db: Session,
+    filters: Dict[str, Any],
+    include_analysis: bool,
+    batch_size: int
+) -> AsyncIterator[bytes]:
+    """Stream export rows as newline-delimited JSON"""
+    async for rows in _iter_export_batches(db, filters, include_analysis, batch_size):
+        yield "".join(json.dumps(row, default=str) + "\n" for row in rows).encode("utf-8")
+
+class _ParquetChunkSink(io.RawIOBase):
+    """Write-only sink that hands out buffered Parquet bytes as they are produced"""
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+def _parquet_export_schema(include_analysis: bool):
+    """Arrow schema for Parquet exports, fixed so every row group matches"""
+    import pyarrow as pa
+    
+    integer_columns = {'bedrooms', 'square_feet', 'year_built', 'days_on_market'}
+    string_columns = {
+        'property_id', 'address', 'city', 'state', 'zip_code', 'property_type',
+        'created_at', 'updated_at', 'latest_analysis_type', 'analysis_date'
+    }
+    
+    columns = list(PROPERTY_EXPORT_COLUMNS)
+    if include_analysis:
+        columns.extend(ANALYSIS_EXPORT_COLUMNS)
+    
+    fields = []
+    for column in columns:
+        if column in string_columns:
+            fields.append(pa.field(column, pa.string()))
+        elif column in integer_columns:
+            fields.append(pa.field(column, pa.int64()))
+        else:
+            fields.append(pa.field(column, pa.float64()))
+    return pa.schema(fields)
+
+async def _stream_parquet(
+    db: Session,
+    filters: Dict[str, Any],
+    include_analysis: bool,
+    batch_size: int
+) -> AsyncIterator[bytes]:
+    """Stream export rows as Parquet, one row group per page"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    schema = _parquet_export_schema(include_analysis)
+    sink = _ParquetChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    
+    try:
+        async for rows in _iter_export_batches(db, filters, include_analysis, batch_size):
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    
+    data = sink.drain()
+    if data:
+        yield data
+
+async def _gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Gzip-compress a byte stream incrementally"""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    
+    yield compressor.flush()
@@ -3,18 +3,33 @@ Lead import API router for the Real Estate Empire platform.
 Provides endpoints for CSV import functionality with column mapping and validation.
 """
 
-from typing import Dict, Any, List
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+import json
+import time
+import uuid
+from typing import Dict, Any, List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from app.core.database import get_db
-from app.services.lead_import_service import LeadImportService, ColumnMapping, ImportResult
+from app.core.database import get_db, SessionLocal
+from app.services.lead_import_service import (
+    LeadImportService, ColumnMapping, ImportResult, ImportProgress, ImportStatusEnum,
+    DEFAULT_IMPORT_CHUNK_SIZE
+)
 from app.models.lead import LeadSourceEnum
 
 
 router = APIRouter(prefix="/api/lead-import", tags=["lead-import"])
 
+# Background import jobs keyed by import ID
+import_jobs: Dict[str, Dict[str, Any]] = {}
+
+MAX_IMPORT_CHUNK_SIZE = 50000
+
+# Finished jobs stay queryable for this long, and at most this many are kept
+FINISHED_JOB_TTL_SECONDS = 24 * 3600
+MAX_FINISHED_JOBS = 1000
+
 
 class CSVAnalysisRequest(BaseModel):
     """Request model for CSV analysis."""
@@ -39,6 +54,13 @@ class ImportRequest(BaseModel):
     skip_duplicates: bool = True
 
 
+class ImportJobRequest(ImportRequest):
+    """Request model for a background chunked lead import."""
+    chunk_size: int = Field(DEFAULT_IMPORT_CHUNK_SIZE, ge=1, le=MAX_IMPORT_CHUNK_SIZE)
+    resume_from_row: int = Field(0, ge=0)
+    import_id: Optional[str] = None
+
+
 class ImportResponse(BaseModel):
     """Response model for import results."""
     total_rows: int
@@ -187,7 +209,6 @@ async def import_leads_from_file(
         csv_content = content.decode('utf-8')
         
         # Parse column mapping JSON
-        import json
         try:
             mapping_dict = json.loads(column_mapping)
         except json.JSONDecodeError:
@@ -223,6 +244,207 @@ async def import_leads_from_file(
         raise HTTPException(status_code=400, detail=f"Lead import failed: {str(e)}")
 
 
+def run_import_job(
+    import_id: str,
+    csv_content: str,
+    column_mapping: ColumnMapping,
+    default_source: LeadSourceEnum,
+    skip_duplicates: bool,
+    chunk_size: int,
+    resume_from_row: int
+):
+    """Run a chunked lead import in the background with its own database session."""
+    def record_progress(progress: ImportProgress):
+        import_jobs[import_id]["progress"] = progress.to_dict()
+    
+    db = SessionLocal()
+    try:
+        import_service = LeadImportService(db)
+        result = import_service.import_leads_chunked(
+            csv_source=csv_content,
+            column_mapping=column_mapping,
+            default_source=default_source,
+            skip_duplicates=skip_duplicates,
+            chunk_size=chunk_size,
+            resume_from_row=resume_from_row,
+            import_id=import_id,
+            progress_callback=record_progress
+        )
+        import_jobs[import_id]["result"] = {
+            "total_rows": result.total_rows,
+            "successful_imports": result.successful_imports,
+            "failed_imports": result.failed_imports,
+            "duplicates_found": result.duplicates_found,
+            "errors": result.errors[:100],
+            "status": result.status.value
+        }
+    except Exception as e:
+        import_jobs[import_id]["progress"].update({
+            "status": ImportStatusEnum.FAILED.value,
+            "error": str(e)
+        })
+    finally:
+        import_jobs[import_id]["finished_at"] = time.time()
+        db.close()
+
+
+def _evict_finished_jobs(now: Optional[float] = None):
+    """Drop finished jobs past their TTL, then the oldest beyond MAX_FINISHED_JOBS."""
+    now = time.time() if now is None else now
+    finished = sorted(
+        (job["finished_at"], import_id) for import_id, job in import_jobs.items()
+        if job.get("finished_at") is not None
+    )
+    expired = [import_id for finished_at, import_id in finished if now - finished_at > FINISHED_JOB_TTL_SECONDS]
+    kept = [import_id for finished_at, import_id in finished if now - finished_at <= FINISHED_JOB_TTL_SECONDS]
+    for import_id in expired + kept[:max(len(kept) - MAX_FINISHED_JOBS, 0)]:
+        import_jobs.pop(import_id, None)
+
+
+def _start_import_job(
+    background_tasks: BackgroundTasks,
+    csv_content: str,
+    column_mapping: ColumnMapping,
+    default_source: LeadSourceEnum,
+    skip_duplicates: bool,
+    chunk_size: int,
+    resume_from_row: int,
+    import_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Register a background import job and schedule it."""
+    _evict_finished_jobs()
+    import_id = import_id or str(uuid.uuid4())
+    existing = import_jobs.get(import_id)
+    if existing and existing["progress"]["status"] in (
+        ImportStatusEnum.PENDING.value, ImportStatusEnum.IN_PROGRESS.value
+    ):
+        raise HTTPException(status_code=409, detail=f"Import {import_id} is already running")
+    
+    import_jobs[import_id] = {
+        "progress": ImportProgress(
+            import_id=import_id, last_committed_row=resume_from_row
+        ).to_dict(),
+        "result": None,
+        "finished_at": None
+    }
+    background_tasks.add_task(
+        run_import_job,
+        import_id,
+        csv_content,
+        column_mapping,
+        default_source,
+        skip_duplicates,
+        chunk_size,
+        resume_from_row
+    )
+    return import_jobs[import_id]["progress"]
+
+
+@router.post("/jobs", status_code=202)
+async def start_import_job(
+    request: ImportJobRequest,
+    background_tasks: BackgroundTasks
+):
+    """
+    Start a background chunked import of leads from CSV content.
+    
+    Pass the previous import_id and its last_committed_row as resume_from_row
+    to continue an import that stopped part way through.
+    
+    Args:
+        request: Import job request with CSV content, mapping and chunking options
+        background_tasks: FastAPI background task runner
+        
+    Returns:
+        Initial progress of the queued import job
+    """
+    try:
+        column_mapping = ColumnMapping(**request.column_mapping)
+    except TypeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid column mapping: {str(e)}")
+    
+    return _start_import_job(
+        background_tasks,
+        csv_content=request.csv_content,
+        column_mapping=column_mapping,
+        default_source=request.default_source,
+        skip_duplicates=request.skip_duplicates,
+        chunk_size=request.chunk_size,
+        resume_from_row=request.resume_from_row,
+        import_id=request.import_id
+    )
+
+
+@router.post("/jobs/file", status_code=202)
+async def start_import_job_from_file(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    column_mapping: str = Form(...),
+    default_source: LeadSourceEnum = Form(LeadSourceEnum.OTHER),
+    skip_duplicates: bool = Form(True),
+    chunk_size: int = Form(DEFAULT_IMPORT_CHUNK_SIZE, ge=1, le=MAX_IMPORT_CHUNK_SIZE),
+    resume_from_row: int = Form(0, ge=0),
+    import_id: Optional[str] = Form(None)
+):
+    """
+    Start a background chunked import of leads from an uploaded CSV file.
+    
+    Args:
+        background_tasks: FastAPI background task runner
+        file: Uploaded CSV file
+        column_mapping: JSON string of column mapping
+        default_source: Default source for leads
+        skip_duplicates: Whether to skip duplicate leads
+        chunk_size: Number of rows committed per transaction
+        resume_from_row: Last committed row of a previous run of this import
+        import_id: Import ID to resume under
+        
+    Returns:
+        Initial progress of the queued import job
+    """
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="File must be a CSV file")
+    
+    try:
+        csv_content = (await file.read()).decode('utf-8')
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File encoding not supported. Please use UTF-8 encoded CSV files.")
+    
+    try:
+        column_mapping_obj = ColumnMapping(**json.loads(column_mapping))
+    except (json.JSONDecodeError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid column mapping JSON")
+    
+    return _start_import_job(
+        background_tasks,
+        csv_content=csv_content,
+        column_mapping=column_mapping_obj,
+        default_source=default_source,
+        skip_duplicates=skip_duplicates,
+        chunk_size=chunk_size,
+        resume_from_row=resume_from_row,
+        import_id=import_id
+    )
+
+
+@router.get("/jobs/{import_id}")
+async def get_import_job(import_id: str):
+    """
+    Get progress of a background import job.
+    
+    Args:
+        import_id: Import job ID
+        
+    Returns:
+        Progress (including rows/sec and last committed row) and final result if finished
+    """
+    job = import_jobs.get(import_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    
+    return {**job["progress"], "result": job["result"]}
+
+
 @router.get("/mapping-template")
 async def get_mapping_template():
     """
@@ -18,6 +18,7 @@ from ...models.lead import (
     PropertyLeadDB, CommunicationDB,
     LeadStatusEnum, LeadSourceEnum, ContactMethodEnum
 )
+from ...services.lead_score_history_service import LeadScoreHistoryService, CONVERTED_STATUSES
 
 logger = logging.getLogger(__name__)
 
@@ -244,6 +245,10 @@ async def update_lead_status(
         elif new_status in [LeadStatusEnum.CONTACTED, LeadStatusEnum.INTERESTED]:
             lead.last_contact_date = datetime.utcnow()
         
+        # Count conversions towards scoring analytics
+        if new_status in CONVERTED_STATUSES and old_status not in CONVERTED_STATUSES:
+            LeadScoreHistoryService(db).record_conversion(lead.id)
+        
         db.commit()
         db.refresh(lead)
         
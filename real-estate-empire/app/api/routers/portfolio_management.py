@@ -20,6 +20,7 @@ from app.models.portfolio import (
 )
 from app.services.portfolio_management_service import get_portfolio_management_service
 from app.services.portfolio_performance_service import get_portfolio_performance_service
+from app.services.performance_benchmarking_service import get_performance_benchmarking_service
 
 router = APIRouter(prefix="/portfolio", tags=["Portfolio Management"])
 
@@ -446,4 +447,24 @@ async def refresh_portfolio_metrics(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error refreshing portfolio metrics: {str(e)}"
+        )
+
+
+@router.post("/benchmarks/rebuild-sketches")
+async def rebuild_benchmark_sketches(
+    db: Session = Depends(get_db)
+):
+    """Rebuild the benchmark sketches from every performance record and active portfolio.
+    
+    Meant for a periodic batch job: between rebuilds the sketches still hold
+    removed properties and superseded portfolio metrics.
+    """
+    try:
+        benchmarking_service = get_performance_benchmarking_service(db)
+        written = benchmarking_service.rebuild_benchmark_sketches()
+        return {"message": "Benchmark sketches rebuilt successfully", "sketches_written": written}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error rebuilding benchmark sketches: {str(e)}"
         )
\ No newline at end of file
@@ -120,7 +120,8 @@ class BaseAgent(ABC):
         self.description = description
         self.capabilities = capabilities
         self.tools = tools or []
-        self.llm = llm or llm_manager.get_llm(agent_type.value)
+        # Agent LLM calls share the gateway's rate limits, failover and metrics
+        self.llm = llm or llm_manager.get_gateway_llm(agent_type.value)
         
         # Agent state
         self.status = AgentStatus.IDLE
@@ -0,0 +1,213 @@
+"""
+Context Builder for agent prompts
+Renders a token-budgeted view of AgentState for an agent's next LLM call: a
+rolling summary of older agent messages, the messages and deals that changed
+since that agent's last turn, and cached per-deal prompt fragments
+"""
+
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.services.llm_rate_limiter import estimate_tokens
+
+DEFAULT_CONTEXT_TOKENS = 1200
+MAX_MESSAGE_CHARS = 300
+
+
+def _value(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+
+def render_message(message: Dict[str, Any]) -> str:
+    """One agent message as a single prompt line"""
+    text = str(message.get("message", ""))
+    if len(text) > MAX_MESSAGE_CHARS:
+        text = text[:MAX_MESSAGE_CHARS - 3] + "..."
+    marker = "!" if message.get("priority", 1) >= 4 else "-"
+    return f"{marker} [{_value(message.get('agent', 'system'))}] {text}"
+
+
+@dataclass
+class MessageSummary:
+    """Rolling summary of the messages an agent has already seen"""
+    count: int = 0
+    errors: int = 0
+    by_agent: Counter = field(default_factory=Counter)
+    notable: Deque[str] = field(default_factory=lambda: deque(maxlen=5))
+
+    def add(self, message: Dict[str, Any]):
+        self.count += 1
+        self.by_agent[_value(message.get("agent", "system"))] += 1
+        priority = message.get("priority", 1)
+        if priority >= 4:
+            self.errors += 1
+        if priority >= 3:
+            self.notable.append(render_message(message))
+
+    def render(self) -> str:
+        if not self.count:
+            return ""
+        agents = ", ".join(f"{agent} {n}" for agent, n in self.by_agent.most_common())
+        lines = [f"Earlier activity: {self.count} messages ({agents}); {self.errors} errors."]
+        if self.notable:
+            lines.append("Notable earlier messages:")
+            lines.extend(self.notable)
+        return "\n".join(lines)
+
+
+@dataclass
+class _AgentCursor:
+    """What one agent has already been shown in one workflow"""
+    message_index: int = 0
+    summary: MessageSummary = field(default_factory=MessageSummary)
+    deal_versions: Dict[str, Any] = field(default_factory=dict)
+
+
+class AgentContextBuilder:
+    """Builds bounded prompt context from AgentState
+
+    For each (workflow, agent) the builder remembers how far into agent_messages the
+    agent has read and which deal versions it has seen. A build renders only what is
+    new since then, newest first, within token_budget; everything older lives in a
+    rolling summary of fixed size. Deal fragments are cached by (deal id,
+    last_updated), so unchanged deals are rendered once however many turns use them.
+    Per-turn prompt size therefore stays bounded as the workflow grows.
+    """
+
+    def __init__(self, token_budget: int = DEFAULT_CONTEXT_TOKENS, max_cached_fragments: int = 5000):
+        self.token_budget = token_budget
+        self.max_cached_fragments = max_cached_fragments
+        self._cursors: Dict[Tuple[str, str], _AgentCursor] = {}
+        self._fragments: "OrderedDict[Tuple[str, Any], str]" = OrderedDict()
+
+    def deal_fragment(self, deal: Dict[str, Any]) -> str:
+        """Compact one-line description of a deal, cached per deal version"""
+        key = (deal.get("id"), deal.get("last_updated"))
+        fragment = self._fragments.get(key) if key[0] is not None else None
+        if fragment is not None:
+            self._fragments.move_to_end(key)
+            return fragment
+
+        parts = [
+            f"{deal.get('property_address', 'Unknown')}, {deal.get('city', '')}, "
+            f"{deal.get('state', '')} {deal.get('zip_code', '')}".strip(),
+            f"status {_value(deal.get('status', 'unknown'))}"
+        ]
+        for label, key_name in (("type", "property_type"), ("beds", "bedrooms"),
+                                ("baths", "bathrooms"), ("sqft", "square_feet")):
+            if deal.get(key_name) is not None:
+                parts.append(f"{label} {deal[key_name]}")
+        for label, key_name in (("list", "listing_price"), ("value", "estimated_value"),
+                                ("ARV", "arv_estimate"), ("repairs", "repair_estimate"),
+                                ("profit", "potential_profit")):
+            if deal.get(key_name) is not None:
+                amount = deal[key_name]
+                parts.append(f"{label} ${amount:,.0f}" if isinstance(amount, (int, float)) else f"{label} {amount}")
+        if deal.get("analyst_recommendation"):
+            parts.append(f"recommendation {deal['analyst_recommendation']}")
+        if deal.get("motivation_indicators"):
+            parts.append("motivation " + "/".join(map(str, deal["motivation_indicators"][:3])))
+        fragment = " | ".join(parts)
+
+        if key[0] is not None:
+            self._fragments[key] = fragment
+            if len(self._fragments) > self.max_cached_fragments:
+                self._fragments.popitem(last=False)
+        return fragment
+
+    def build(self, state: Dict[str, Any], agent_name: str, include_deals: bool = True,
+              token_budget: Optional[int] = None) -> str:
+        """Render this agent's context for its current turn and mark it as seen"""
+        budget = token_budget or self.token_budget
+        cursor = self._cursor(state, agent_name)
+        messages = state.get("agent_messages", [])
+        if cursor.message_index > len(messages):
+            # Message history was replaced; start over for this agent
+            cursor.message_index = 0
+            cursor.summary = MessageSummary()
+
+        sections: List[str] = []
+        summary = cursor.summary.render()
+        if summary:
+            sections.append(summary)
+        remaining = budget - estimate_tokens(summary) if summary else budget
+
+        new_messages = messages[cursor.message_index:]
+        message_budget = remaining // 2 if include_deals else remaining
+        lines, used, _ = self._fit(
+            [render_message(m) for m in reversed(new_messages)], message_budget,
+            "more new messages not shown"
+        )
+        if lines:
+            sections.append("New since your last turn:\n" + "\n".join(lines))
+        remaining -= used
+
+        if include_deals:
+            deal_section = self._deal_section(state.get("current_deals", []), cursor, remaining)
+            if deal_section:
+                sections.append(deal_section)
+
+        for message in new_messages:
+            cursor.summary.add(message)
+        cursor.message_index = len(messages)
+        return "\n\n".join(sections)
+
+    def _cursor(self, state: Dict[str, Any], agent_name: str) -> _AgentCursor:
+        key = (state.get("workflow_id", ""), agent_name)
+        if key not in self._cursors:
+            self._cursors[key] = _AgentCursor()
+        return self._cursors[key]
+
+    def _deal_section(self, deals: List[Dict[str, Any]], cursor: _AgentCursor, budget: int) -> str:
+        if not deals:
+            return ""
+        statuses = Counter(_value(deal.get("status", "unknown")) for deal in deals)
+        header = f"Deal pipeline: {len(deals)} deals (" + ", ".join(
+            f"{status} {n}" for status, n in statuses.most_common()
+        ) + ")"
+
+        changed = [
+            deal for deal in deals
+            if deal.get("id") is None or cursor.deal_versions.get(deal["id"]) != deal.get("last_updated")
+        ]
+        if not changed:
+            return header
+
+        changed.reverse()
+        lines, _, shown = self._fit(
+            ["- " + self.deal_fragment(deal) for deal in changed],
+            budget - estimate_tokens(header), "more changed deals not shown"
+        )
+        # Deals cut by the budget stay unseen and are offered again next turn
+        for deal in changed[:shown]:
+            if deal.get("id") is not None:
+                cursor.deal_versions[deal["id"]] = deal.get("last_updated")
+        return header + "\nNew or updated deals:\n" + "\n".join(lines)
+
+    @staticmethod
+    def _fit(lines: List[str], budget: int, overflow_label: str) -> Tuple[List[str], int, int]:
+        """Take lines in order until the token budget runs out
+
+        Returns the rendered lines (plus an overflow note), the tokens used and
+        how many of the input lines were taken.
+        """
+        taken, used = [], 0
+        for line in lines:
+            cost = estimate_tokens(line)
+            if used + cost > budget:
+                break
+            taken.append(line)
+            used += cost
+        shown = len(taken)
+        if shown < len(lines):
+            taken.append(f"({len(lines) - shown} {overflow_label})")
+        return taken, used, shown
+
+    def reset(self, workflow_id: Optional[str] = None):
+        """Forget what agents have seen, for one workflow or all of them"""
+        if workflow_id is None:
+            self._cursors.clear()
+        else:
+            for key in [k for k in self._cursors if k[0] == workflow_id]:
+                del self._cursors[key]
@@ -13,6 +13,7 @@ from langgraph.checkpoint.memory import MemorySaver
 
 from .agent_state import AgentState, StateManager, AgentType, WorkflowStatus
 from .llm_config import llm_manager
+from .context_builder import AgentContextBuilder
 from .agent_communication import AgentCommunicationProtocol
 
 
@@ -33,6 +34,7 @@ class LangGraphOrchestrator:
         self.memory_saver = MemorySaver()
         self.communication_protocol = AgentCommunicationProtocol()
         self.agent_registry: Dict[str, Any] = {}
+        self.context_builder = AgentContextBuilder()
         self._setup_workflow()
     
     def _setup_workflow(self):
@@ -188,9 +190,6 @@ class LangGraphOrchestrator:
         logger.info("Scout agent executing...")
         
         try:
-            # Get LLM for scout
-            scout_llm = llm_manager.get_llm("scout")
-            
             # Create scouting prompt
             scout_prompt = f"""
             Current Context:
@@ -199,6 +198,9 @@ class LangGraphOrchestrator:
             - Investment Strategy: {state.get('investment_strategy', {})}
             - Available Capital: ${state.get('available_capital', 0):,.2f}
             
+            Recent Activity:
+            {self.context_builder.build(state, "scout")}
+            
             Your mission: Find 5-10 high-potential real estate investment opportunities.
             
             Tasks:
@@ -223,7 +225,7 @@ class LangGraphOrchestrator:
             """
             
             # Execute scouting
-            scout_response = await scout_llm.ainvoke(scout_prompt)
+            scout_response = await llm_manager.ainvoke("scout", scout_prompt)
             
             # Parse scout results (this would integrate with real data sources)
             new_deals = self._parse_scout_results(scout_response.content)
@@ -271,27 +273,24 @@ class LangGraphOrchestrator:
         logger.info("Analyst agent executing...")
         
         try:
-            # Get LLM for analyst
-            analyst_llm = llm_manager.get_llm("analyst")
-            
             # Find deals that need analysis
             unanalyzed_deals = [
                 deal for deal in state.get("current_deals", [])
                 if not deal.get("analyzed", False)
             ]
             
+            # Shared across this turn's deals; only messages since the analyst's last turn
+            recent_activity = self.context_builder.build(state, "analyst", include_deals=False)
+            
             for deal in unanalyzed_deals[:3]:  # Analyze up to 3 deals per cycle
                 analysis_prompt = f"""
                 Perform comprehensive financial analysis for this property:
                 
                 Property Details:
-                - Address: {deal.get('property_address')}
-                - City: {deal.get('city')}, {deal.get('state')} {deal.get('zip_code')}
-                - Listing Price: ${deal.get('listing_price', 0):,.2f}
-                - Property Type: {deal.get('property_type', 'Unknown')}
-                - Bedrooms: {deal.get('bedrooms', 'Unknown')}
-                - Bathrooms: {deal.get('bathrooms', 'Unknown')}
-                - Square Feet: {deal.get('square_feet', 'Unknown')}
+                {self.context_builder.deal_fragment(deal)}
+                
+                Recent Activity:
+                {recent_activity}
                 
                 Market Context:
                 - Market Conditions: {state.get('market_conditions', {})}
@@ -314,7 +313,7 @@ class LangGraphOrchestrator:
                 """
                 
                 # Get analysis from LLM
-                analysis_response = await analyst_llm.ainvoke(analysis_prompt)
+                analysis_response = await llm_manager.ainvoke("analyst", analysis_prompt)
                 analysis_data = self._parse_analysis_results(analysis_response.content)
                 
                 # Update deal with analysis
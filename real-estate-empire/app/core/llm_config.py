@@ -9,6 +9,13 @@ from dataclasses import dataclass
 from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
 import google.generativeai as genai
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import get_buffer_string
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import Field
+
+from app.services.llm_response_cache import LLMResponseCache, get_response_cache, response_text
+from .llm_gateway import LLMGateway
 
 
 class LLMProvider(str, Enum):
@@ -33,6 +40,21 @@ class LLMModel(str, Enum):
     # Google Models
     GEMINI_PRO = "gemini-pro"
     GEMINI_PRO_VISION = "gemini-pro-vision"
+    GEMINI_1_5_FLASH = "gemini-1.5-flash"
+
+
+# Per-model rates, used to cost backup-model calls (primary calls use their config's rate)
+MODEL_COST_PER_1K_TOKENS = {
+    LLMModel.GPT_4_TURBO.value: 0.01,
+    LLMModel.GPT_4.value: 0.03,
+    LLMModel.GPT_3_5_TURBO.value: 0.0005,
+    LLMModel.CLAUDE_3_OPUS.value: 0.015,
+    LLMModel.CLAUDE_3_SONNET.value: 0.003,
+    LLMModel.CLAUDE_3_HAIKU.value: 0.00025,
+    LLMModel.GEMINI_PRO.value: 0.0005,
+    LLMModel.GEMINI_PRO_VISION.value: 0.0005,
+    LLMModel.GEMINI_1_5_FLASH.value: 0.0003,
+}
 
 
 @dataclass
@@ -190,14 +212,79 @@ class AgentLLMConfigs:
     )
 
 
+class GatewayChatModel(BaseChatModel):
+    """LangChain chat model that sends an agent's calls through the LLM gateway
+    
+    Agents hand this to LangChain (AgentExecutor and friends) in place of the raw
+    provider model, so tool-calling turns share the gateway's rate limits,
+    failover and usage metrics. Bound kwargs such as functions are passed on to
+    whichever model (primary or backup) serves the call. Sync calls go straight
+    to the agent's primary provider model.
+    """
+    agent_name: str
+    manager: Any = Field(exclude=True)
+    
+    @property
+    def _llm_type(self) -> str:
+        return "llm_gateway"
+    
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        async def call_model(agent_name, model, config, prompt):
+            llm = self.manager._model_llm(agent_name, model, config)
+            return await llm.ainvoke(messages, stop=stop, **kwargs)
+        
+        # Bound tools and stop words shape the reply, so identical transcripts are not coalesced
+        message = await self.manager.gateway.invoke(
+            self.agent_name, self.manager.get_config(self.agent_name), get_buffer_string(messages),
+            coalesce=False, call_model=call_model
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+    
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        """Serve sync callers (llm.invoke, sync chains and tools) from the agent's provider model
+        
+        The gateway's limits and coalescing are asyncio primitives bound to the
+        serving event loop, so only async calls go through it; sync calls behave
+        as they did before agents were routed through the gateway.
+        """
+        config = self.manager.get_config(self.agent_name)
+        llm = self.manager._model_llm(self.agent_name, config.model, config)
+        message = llm.invoke(messages, stop=stop, **kwargs)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
 class LLMManager:
     """Manages LLM instances and provides unified interface"""
     
     def __init__(self):
         self.llm_instances: Dict[str, Any] = {}
         self.api_keys = self._load_api_keys()
+        self._response_cache: Optional[LLMResponseCache] = None
+        self._gateway: Optional[LLMGateway] = None
         self._initialize_llms()
     
+    @property
+    def gateway(self) -> LLMGateway:
+        """Gateway enforcing per-model rate limits, coalescing and failover"""
+        if self._gateway is None:
+            self._gateway = LLMGateway(self._call_model, model_costs=MODEL_COST_PER_1K_TOKENS)
+        return self._gateway
+    
+    @gateway.setter
+    def gateway(self, gateway: LLMGateway):
+        self._gateway = gateway
+    
+    @property
+    def response_cache(self) -> Optional[LLMResponseCache]:
+        """Shared response cache, opened on first use"""
+        if self._response_cache is None:
+            self._response_cache = get_response_cache()
+        return self._response_cache
+    
+    @response_cache.setter
+    def response_cache(self, cache: Optional[LLMResponseCache]):
+        self._response_cache = cache
+    
     def _load_api_keys(self) -> Dict[str, str]:
         """Load API keys from environment variables"""
         return {
@@ -260,6 +347,12 @@ class LLMManager:
             raise ValueError(f"No LLM configured for agent: {agent_name}")
         return self.llm_instances[agent_name]
     
+    def get_gateway_llm(self, agent_name: str) -> GatewayChatModel:
+        """LangChain model for an agent whose calls go through the gateway"""
+        if agent_name not in self.llm_instances:
+            raise ValueError(f"No LLM configured for agent: {agent_name}")
+        return GatewayChatModel(agent_name=agent_name, manager=self)
+    
     def get_config(self, agent_name: str) -> LLMConfig:
         """Get LLM configuration for a specific agent"""
         config_map = {
@@ -275,36 +368,52 @@ class LLMManager:
             raise ValueError(f"No configuration for agent: {agent_name}")
         return config_map[agent_name]
     
-    async def invoke_with_fallback(self, agent_name: str, prompt: str) -> str:
-        """Invoke LLM with automatic fallback to backup model"""
-        config = self.get_config(agent_name)
-        primary_llm = self.get_llm(agent_name)
+    async def invoke_with_fallback(self, agent_name: str, prompt: str, use_cache: bool = True) -> str:
+        """Invoke LLM with automatic fallback to backup model
         
-        try:
-            # Try primary model
-            response = await primary_llm.ainvoke(prompt)
-            return response.content
-        except Exception as e:
-            print(f"Primary LLM failed for {agent_name}: {e}")
-            
-            # Fallback to backup model if configured
-            if config.backup_model:
-                try:
-                    backup_config = LLMConfig(
-                        model=config.backup_model,
-                        provider=LLMProvider.ANTHROPIC if "claude" in config.backup_model.value else LLMProvider.OPENAI,
-                        temperature=config.temperature,
-                        max_tokens=config.max_tokens,
-                        system_prompt=config.system_prompt
-                    )
-                    backup_llm = self._create_llm_instance(backup_config)
-                    response = await backup_llm.ainvoke(prompt)
-                    return response.content
-                except Exception as backup_e:
-                    print(f"Backup LLM also failed for {agent_name}: {backup_e}")
-                    raise backup_e
-            else:
-                raise e
+        Zero-temperature agents are served from the response cache when the same
+        prompt was answered before; use_cache=False always calls the model.
+        """
+        config = self.get_config(agent_name)
+        cache = self.response_cache if use_cache else None
+        if cache and cache.should_cache(config.temperature):
+            return await cache.aget_or_generate(
+                config.model.value, config.temperature, config.system_prompt, prompt,
+                lambda: self.ainvoke(agent_name, prompt),
+                cost_per_1k_tokens=config.cost_per_1k_tokens
+            )
+        return response_text(await self.ainvoke(agent_name, prompt))
+    
+    async def ainvoke(self, agent_name: str, prompt: str, coalesce: bool = True):
+        """Invoke an agent's LLM through the gateway; returns the raw response"""
+        return await self.gateway.invoke(agent_name, self.get_config(agent_name), prompt, coalesce=coalesce)
+    
+    async def _call_model(self, agent_name: str, model: LLMModel, config: LLMConfig, prompt: str):
+        """Provider call used by the gateway for the primary or backup model"""
+        return await self._model_llm(agent_name, model, config).ainvoke(prompt)
+    
+    def _model_llm(self, agent_name: str, model: LLMModel, config: LLMConfig):
+        """Provider model serving an agent's call on its primary or backup model"""
+        if model == config.model:
+            return self.get_llm(agent_name)
+        backup_config = LLMConfig(
+            model=model,
+            provider=LLMProvider.ANTHROPIC if "claude" in model.value else LLMProvider.OPENAI,
+            temperature=config.temperature,
+            max_tokens=config.max_tokens,
+            system_prompt=config.system_prompt,
+            timeout_seconds=config.timeout_seconds
+        )
+        return self._create_llm_instance(backup_config)
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Response cache hit/miss and saved token/cost counters"""
+        cache = self.response_cache
+        return cache.stats.to_dict() if cache else {}
+    
+    def get_usage_metrics(self, agent_name: Optional[str] = None) -> Dict[str, Any]:
+        """Per-agent latency, token and cost metrics from the gateway"""
+        return self.gateway.get_metrics(agent_name)
     
     def estimate_cost(self, agent_name: str, prompt_tokens: int, completion_tokens: int) -> float:
         """Estimate cost for LLM usage"""
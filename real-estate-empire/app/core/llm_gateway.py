@@ -0,0 +1,206 @@
+"""
+LLM Gateway
+Single in-process entry point for agent LLM calls: per-model rate limits and
+concurrency, coalescing of identical in-flight prompts, timeout-triggered
+failover to the backup model and per-agent usage metrics
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+import numpy as np
+
+from app.services.llm_rate_limiter import RequestBudget, estimate_tokens
+from app.services.llm_response_cache import response_cache_key, response_total_tokens
+
+logger = logging.getLogger(__name__)
+
+# (agent_name, model, config, prompt) -> raw provider response
+ModelCaller = Callable[[str, Any, Any, str], Awaitable[Any]]
+
+
+def model_name(model: Any) -> str:
+    """Plain model name for an LLMModel enum member or string"""
+    return getattr(model, "value", model)
+
+
+@dataclass
+class AgentCallMetrics:
+    """Latency, token and cost counters for one agent"""
+    requests: int = 0
+    provider_calls: int = 0
+    coalesced: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    fallbacks: int = 0
+    failures: int = 0
+    total_tokens: int = 0
+    cost: float = 0.0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+
+    def to_dict(self) -> Dict[str, Any]:
+        latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+        return {
+            "requests": self.requests,
+            "provider_calls": self.provider_calls,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "fallbacks": self.fallbacks,
+            "failures": self.failures,
+            "total_tokens": self.total_tokens,
+            "cost": self.cost,
+            "avg_latency": float(latencies.mean()),
+            "p95_latency": float(np.percentile(latencies, 95))
+        }
+
+
+class ModelLimiter:
+    """Requests/tokens per minute budget and concurrency limit for one model"""
+
+    def __init__(self, requests_per_minute: Optional[float], tokens_per_minute: Optional[float],
+                 max_concurrency: int, **clock_kwargs):
+        self.budget = RequestBudget(requests_per_minute, tokens_per_minute, **clock_kwargs)
+        self.semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+
+class LLMGateway:
+    """Routes agent LLM calls through shared per-model limits
+
+    The caller does the actual provider call; the gateway decides when it may run
+    and what happens when it fails. Each model gets a token bucket for its RPM
+    (rate_limit_rpm of the first config that uses it) and optional TPM, plus a
+    concurrency cap. Identical prompts (same model, temperature and system prompt)
+    issued while one is already in flight share that call's result. A primary call
+    that times out after config.timeout_seconds or raises is retried once on
+    config.backup_model. Primary calls are costed at config.cost_per_1k_tokens and
+    backup calls at that model's entry in model_costs (0.0 if it has none).
+    """
+
+    def __init__(self, call_model: ModelCaller, max_concurrency: int = 8,
+                 tokens_per_minute: Optional[Dict[str, float]] = None,
+                 model_costs: Optional[Dict[str, float]] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep):
+        self.call_model = call_model
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute or {}
+        self.model_costs = model_costs or {}
+        self._clock = clock
+        self._sleep = sleep
+        self._limiters: Dict[str, ModelLimiter] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.metrics: Dict[str, AgentCallMetrics] = {}
+
+    def limiter(self, model: Any, config: Any) -> ModelLimiter:
+        name = model_name(model)
+        if name not in self._limiters:
+            self._limiters[name] = ModelLimiter(
+                getattr(config, "rate_limit_rpm", None),
+                self.tokens_per_minute.get(name),
+                self.max_concurrency,
+                clock=self._clock,
+                sleep=self._sleep
+            )
+        return self._limiters[name]
+
+    def _agent_metrics(self, agent_name: str) -> AgentCallMetrics:
+        if agent_name not in self.metrics:
+            self.metrics[agent_name] = AgentCallMetrics()
+        return self.metrics[agent_name]
+
+    async def invoke(self, agent_name: str, config: Any, prompt: Any, coalesce: bool = True,
+                     call_model: Optional[ModelCaller] = None) -> Any:
+        """Run one agent call and return the raw provider response
+
+        call_model replaces the gateway's provider call for this request, e.g. for
+        LangChain message lists with bound tools or a non-agent client; pass
+        coalesce=False when its response depends on more than the prompt.
+        """
+        metrics = self._agent_metrics(agent_name)
+        metrics.requests += 1
+        started = self._clock()
+        try:
+            if not coalesce:
+                return await self._call_with_failover(agent_name, config, prompt, call_model)
+
+            key = response_cache_key(model_name(config.model), config.temperature, config.system_prompt, prompt)
+            task = self._inflight.get(key)
+            if task is not None:
+                metrics.coalesced += 1
+            else:
+                task = asyncio.ensure_future(self._call_with_failover(agent_name, config, prompt, call_model))
+                self._inflight[key] = task
+                task.add_done_callback(lambda done: self._release(key, done))
+            # Shielded so one cancelled caller does not cancel the call others are waiting on
+            return await asyncio.shield(task)
+        finally:
+            metrics.latencies.append(self._clock() - started)
+
+    def _release(self, key: str, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _call_with_failover(self, agent_name: str, config: Any, prompt: Any,
+                                  call_model: Optional[ModelCaller] = None) -> Any:
+        metrics = self._agent_metrics(agent_name)
+        try:
+            return await self._call(agent_name, config.model, config, prompt, call_model)
+        except asyncio.TimeoutError:
+            metrics.timeouts += 1
+            logger.warning(f"Primary LLM timed out for {agent_name} after {config.timeout_seconds}s")
+            error = None
+        except Exception as e:
+            metrics.errors += 1
+            logger.warning(f"Primary LLM failed for {agent_name}: {e}")
+            error = e
+
+        if not getattr(config, "backup_model", None):
+            metrics.failures += 1
+            if error is not None:
+                raise error
+            raise asyncio.TimeoutError(f"LLM call for {agent_name} timed out")
+
+        metrics.fallbacks += 1
+        try:
+            return await self._call(agent_name, config.backup_model, config, prompt, call_model)
+        except Exception as backup_e:
+            metrics.failures += 1
+            logger.error(f"Backup LLM also failed for {agent_name}: {backup_e}")
+            raise
+
+    async def _call(self, agent_name: str, model: Any, config: Any, prompt: Any,
+                    call_model: Optional[ModelCaller] = None) -> Any:
+        limiter = self.limiter(model, config)
+        estimated = estimate_tokens(prompt if isinstance(prompt, str) else str(prompt))
+        async with limiter.semaphore:
+            await limiter.budget.acquire(estimated)
+            metrics = self._agent_metrics(agent_name)
+            metrics.provider_calls += 1
+            response = await asyncio.wait_for(
+                (call_model or self.call_model)(agent_name, model, config, prompt),
+                timeout=getattr(config, "timeout_seconds", None)
+            )
+
+        tokens = response_total_tokens(response)
+        limiter.budget.settle(estimated, tokens)
+        tokens = tokens if tokens is not None else estimated
+        metrics.total_tokens += tokens
+        metrics.cost += tokens / 1000 * self.cost_per_1k_tokens(model, config)
+        return response
+
+    def cost_per_1k_tokens(self, model: Any, config: Any) -> float:
+        """Rate for a call on model: the config's own rate for its primary model"""
+        if model_name(model) == model_name(config.model):
+            return getattr(config, "cost_per_1k_tokens", 0.0)
+        return self.model_costs.get(model_name(model), 0.0)
+
+    def get_metrics(self, agent_name: Optional[str] = None) -> Dict[str, Any]:
+        """Per-agent metrics, or one agent's metrics when agent_name is given"""
+        if agent_name is not None:
+            return self._agent_metrics(agent_name).to_dict()
+        return {name: metrics.to_dict() for name, metrics in self.metrics.items()}
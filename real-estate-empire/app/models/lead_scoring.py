@@ -11,6 +11,11 @@ from enum import Enum
 import uuid
 from datetime import datetime
 
+from sqlalchemy import Boolean, Column, Date, DateTime, Float, Integer, String, JSON, Index, func
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+
 
 class MotivationFactorEnum(str, Enum):
     """Motivation factors for property sellers"""
@@ -278,4 +283,73 @@ class ScoringAnalytics(BaseModel):
     
     generated_at: datetime = Field(default_factory=datetime.now)
     period_start: Optional[datetime] = None
-    period_end: Optional[datetime] = None
\ No newline at end of file
+    period_end: Optional[datetime] = None
+
+
+# Database models for score history and analytics rollups
+
+class LeadScoreHistoryDB(Base):
+    """Append-only record of every persisted lead score"""
+    __tablename__ = "lead_score_history"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    lead_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    scored_at = Column(DateTime, nullable=False, index=True)
+
+    overall_score = Column(Float, nullable=False)
+    deal_potential = Column(String, nullable=False)
+    confidence_score = Column(Float, nullable=True)
+    motivation_score = Column(Float, nullable=True)
+    financial_score = Column(Float, nullable=True)
+    property_score = Column(Float, nullable=True)
+    market_score = Column(Float, nullable=True)
+    owner_score = Column(Float, nullable=True)
+    motivation_factors = Column(JSON, nullable=True)
+    scoring_version = Column(String, nullable=True)
+    # Set on the lead's latest score when it converts, and carried to any newer score
+    converted = Column(Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        Index("ix_lead_score_history_lead_scored_at", "lead_id", "scored_at"),
+    )
+
+
+class LeadScoreDailyRollupDB(Base):
+    """Per-day aggregates of lead score history, maintained as scores are recorded"""
+    __tablename__ = "lead_score_daily_rollup"
+
+    bucket_date = Column(Date, primary_key=True)
+    scored_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+
+    # Scores recorded per deal potential
+    excellent_count = Column(Integer, nullable=False, default=0)
+    good_count = Column(Integer, nullable=False, default=0)
+    fair_count = Column(Integer, nullable=False, default=0)
+    poor_count = Column(Integer, nullable=False, default=0)
+    very_poor_count = Column(Integer, nullable=False, default=0)
+
+    # Distinct leads whose latest score was recorded on this day, per deal potential
+    excellent_leads = Column(Integer, nullable=False, default=0)
+    good_leads = Column(Integer, nullable=False, default=0)
+    fair_leads = Column(Integer, nullable=False, default=0)
+    poor_leads = Column(Integer, nullable=False, default=0)
+    very_poor_leads = Column(Integer, nullable=False, default=0)
+
+    # Converted leads among the distinct leads above (they move buckets together on re-score)
+    excellent_converted = Column(Integer, nullable=False, default=0)
+    good_converted = Column(Integer, nullable=False, default=0)
+    fair_converted = Column(Integer, nullable=False, default=0)
+    poor_converted = Column(Integer, nullable=False, default=0)
+    very_poor_converted = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class LeadScoreFactorRollupDB(Base):
+    """Per-day count of scores citing each motivation factor"""
+    __tablename__ = "lead_score_factor_rollup"
+
+    bucket_date = Column(Date, primary_key=True)
+    factor = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -11,6 +11,8 @@ from enum import Enum
 import uuid
 from datetime import datetime
 from geopy.distance import geodesic
+from sqlalchemy import Column, BigInteger, DateTime, Float, Integer, String, Index
+from app.core.database import Base
 
 
 class TrendDirectionEnum(str, Enum):
@@ -82,20 +84,18 @@ class GeographicBoundary(BaseModel):
     
     def contains_point(self, lat: float, lng: float) -> bool:
         """Check if a point is within this boundary using ray casting algorithm"""
+        # Coordinates are [lat, lng] pairs: x is longitude, y is latitude
         x, y = lng, lat
         n = len(self.coordinates)
         inside = False
         
-        p1x, p1y = self.coordinates[0]
-        for i in range(1, n + 1):
-            p2x, p2y = self.coordinates[i % n]
-            if y > min(p1y, p2y):
-                if y <= max(p1y, p2y):
-                    if x <= max(p1x, p2x):
-                        if p1y != p2y:
-                            xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
-                        if p1x == p2x or x <= xinters:
-                            inside = not inside
+        p1y, p1x = self.coordinates[n - 1]
+        for i in range(n):
+            p2y, p2x = self.coordinates[i]
+            if (p2y > y) != (p1y > y):
+                xinters = (p1x - p2x) * (y - p2y) / (p1y - p2y) + p2x
+                if x < xinters:
+                    inside = not inside
             p1x, p1y = p2x, p2y
         
         return inside
@@ -350,9 +350,41 @@ class NeighborhoodSearchCriteria(BaseModel):
     required_school_types: List[SchoolTypeEnum] = Field(default_factory=list, description="Required school types")
 
 
+class NeighborhoodGridScore(BaseModel):
+    """Precomputed score for one grid cell"""
+    cell_key: int = Field(..., description="Grid cell key")
+    market: str = Field(..., description="Market the cell was computed for")
+    center_lat: float = Field(..., description="Cell center latitude")
+    center_lng: float = Field(..., description="Cell center longitude")
+    radius_miles: float = Field(..., ge=0, description="Scoring radius around the cell center")
+    
+    overall_score: float = Field(..., ge=0, le=100)
+    market_trend_score: float = Field(..., ge=0, le=100)
+    school_score: float = Field(..., ge=0, le=100)
+    amenity_score: float = Field(..., ge=0, le=100)
+    safety_score: float = Field(..., ge=0, le=100)
+    appreciation_potential: float = Field(..., ge=0, le=100)
+    rental_demand: float = Field(..., ge=0, le=100)
+    liquidity_score: float = Field(..., ge=0, le=100)
+    confidence_score: float = Field(..., ge=0, le=1)
+    
+    schools_analyzed: int = Field(default=0, ge=0)
+    amenities_analyzed: int = Field(default=0, ge=0)
+    crime_incidents_analyzed: int = Field(default=0, ge=0)
+    max_school_rating: Optional[float] = Field(None, ge=0, le=10)
+    median_price: Optional[float] = Field(None, ge=0)
+    computed_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
 class NeighborhoodSearchResult(BaseModel):
     """Result from neighborhood search"""
     neighborhoods: List[NeighborhoodAnalysis] = Field(default_factory=list, description="Matching neighborhoods")
+    grid_scores: List[NeighborhoodGridScore] = Field(
+        default_factory=list, description="Matching precomputed grid cells, best overall score first"
+    )
     total_found: int = Field(..., ge=0, description="Total neighborhoods found")
     search_criteria: NeighborhoodSearchCriteria = Field(..., description="Search criteria used")
     search_date: datetime = Field(default_factory=datetime.now)
@@ -361,4 +393,46 @@ class NeighborhoodSearchResult(BaseModel):
     search_time_seconds: float = Field(..., ge=0, description="Search execution time")
     
     class Config:
-        use_enum_values = True
\ No newline at end of file
+        use_enum_values = True
+
+
+# Database models
+
+class NeighborhoodScoreCellDB(Base):
+    """Precomputed neighborhood score for one grid cell, maintained by refresh_neighborhood_grid"""
+    __tablename__ = "neighborhood_score_cells"
+    
+    # Cell keys come from a global lat/lng grid, so two markets with overlapping bounds can share one
+    market = Column(String, primary_key=True)
+    cell_key = Column(BigInteger, primary_key=True)
+    center_lat = Column(Float, nullable=False)
+    center_lng = Column(Float, nullable=False)
+    radius_miles = Column(Float, nullable=False)
+    
+    # Scores
+    overall_score = Column(Float, nullable=False)
+    market_trend_score = Column(Float, nullable=False)
+    school_score = Column(Float, nullable=False)
+    amenity_score = Column(Float, nullable=False)
+    safety_score = Column(Float, nullable=False)
+    appreciation_potential = Column(Float, nullable=False)
+    rental_demand = Column(Float, nullable=False)
+    liquidity_score = Column(Float, nullable=False)
+    confidence_score = Column(Float, nullable=False)
+    
+    # Supporting data for search filters
+    schools_analyzed = Column(Integer, default=0)
+    amenities_analyzed = Column(Integer, default=0)
+    crime_incidents_analyzed = Column(Integer, default=0)
+    amenity_types_mask = Column(Integer, default=0)  # Bit i set when AmenityTypeEnum member i is in range
+    max_school_rating = Column(Float, nullable=True)
+    median_price = Column(Float, nullable=True)
+    
+    # Hash of the stored values; a refresh rewrites the row only when it changes
+    fingerprint = Column(String(40), nullable=False)
+    computed_at = Column(DateTime, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_neighborhood_score_cells_location", "center_lat", "center_lng"),
+        Index("ix_neighborhood_score_cells_market_overall", "market", "overall_score"),
+    )
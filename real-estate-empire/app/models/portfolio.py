@@ -7,7 +7,7 @@ from datetime import datetime
 from typing import Optional, List, Dict, Any
 from enum import Enum
 
-from sqlalchemy import Column, DateTime, Float, Integer, String, Boolean, Text, JSON, func, ForeignKey
+from sqlalchemy import Column, Date, DateTime, Float, Integer, String, Boolean, Text, JSON, func, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from pydantic import BaseModel, Field
@@ -250,6 +250,63 @@ class PortfolioPerformanceDB(Base):
         return f"<PortfolioPerformanceDB(id={self.id}, portfolio_id={self.portfolio_id}, period={self.period_start})>"
 
 
+class PortfolioMonthlySnapshotDB(Base):
+    """Month-end portfolio metrics with rolling risk statistics, maintained by update_portfolio_metrics."""
+    __tablename__ = "portfolio_monthly_snapshots"
+    
+    portfolio_id = Column(UUID(as_uuid=True), ForeignKey("portfolios.id"), primary_key=True)
+    month = Column(Date, primary_key=True)  # First day of the month
+    
+    # Portfolio Metrics
+    total_properties = Column(Integer, default=0)
+    total_value = Column(Float, default=0.0)
+    total_equity = Column(Float, default=0.0)
+    total_debt = Column(Float, default=0.0)
+    
+    # Monthly Income and Cash Flow
+    total_income = Column(Float, default=0.0)
+    total_expenses = Column(Float, default=0.0)
+    net_cash_flow = Column(Float, default=0.0)
+    
+    # Performance Metrics
+    average_cap_rate = Column(Float, nullable=True)
+    average_coc_return = Column(Float, nullable=True)
+    average_roi = Column(Float, nullable=True)
+    portfolio_roi = Column(Float, nullable=True)
+    
+    # Rolling statistics over the trailing window ending this month
+    appreciation = Column(Float, nullable=True)  # Value change since the previous month
+    monthly_return = Column(Float, nullable=True)  # Percent value change since the previous month
+    total_return = Column(Float, nullable=True)  # Percent value change plus cash flow since the previous month
+    volatility = Column(Float, nullable=True)
+    max_drawdown = Column(Float, nullable=True)
+    sharpe_ratio = Column(Float, nullable=True)
+    value_trend = Column(Float, nullable=True)  # Percent of average value per month
+    cash_flow_trend = Column(Float, nullable=True)  # Change in monthly cash flow per month
+    
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<PortfolioMonthlySnapshotDB(portfolio_id={self.portfolio_id}, month={self.month})>"
+
+
+class MetricSketchDB(Base):
+    """Mergeable quantile sketch of one metric over a benchmark group, maintained as performance records land."""
+    __tablename__ = "metric_sketches"
+    
+    group_type = Column(String, primary_key=True)  # "all", "market", "property_type", "strategy"
+    group_key = Column(String, primary_key=True)
+    metric = Column(String, primary_key=True)
+    
+    count = Column(Float, default=0.0)
+    sketch = Column(JSON, nullable=False)  # QuantileSketch.to_dict()
+    
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<MetricSketchDB(group={self.group_type}:{self.group_key}, metric={self.metric}, count={self.count})>"
+
+
 # Pydantic models for API requests and responses
 
 class PortfolioCreate(BaseModel):
@@ -10,7 +10,7 @@ from enum import Enum
 from sqlalchemy import Column, DateTime, Float, Integer, String, Boolean, Text, JSON, func, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 from app.core.database import Base
 
@@ -241,6 +241,10 @@ class PortfolioForecastDB(Base):
     expected_shortfall = Column(Float, nullable=True)
     volatility_estimate = Column(Float, nullable=True)
     
+    # Simulation Details
+    property_contributions = Column(JSON, nullable=True)  # Per-property expected P&L and tail contribution
+    simulation_settings = Column(JSON, nullable=True)  # Paths, seed and market assumptions
+    
     def __repr__(self):
         return f"<PortfolioForecastDB(id={self.id}, portfolio_id={self.portfolio_id}, horizon={self.forecast_horizon_months}m)>"
 
@@ -432,11 +436,25 @@ class DealOutcomePredictionResponse(BaseModel):
         from_attributes = True
 
 
+# Largest simulation a forecast request may ask for, in paths times months
+MAX_FORECAST_PATH_MONTHS = 1_200_000
+
+
 class PortfolioForecastRequest(BaseModel):
     """Pydantic model for portfolio forecast requests."""
     portfolio_id: uuid.UUID
-    forecast_horizon_months: int = 12
+    forecast_horizon_months: int = Field(default=12, ge=1, le=120)
     scenario_analysis: bool = True
+    simulation_paths: int = Field(default=10000, ge=100, le=100000)
+    random_seed: Optional[int] = None
+    
+    @model_validator(mode="after")
+    def check_simulation_size(self):
+        if self.simulation_paths * self.forecast_horizon_months > MAX_FORECAST_PATH_MONTHS:
+            raise ValueError(
+                f"simulation_paths x forecast_horizon_months must not exceed {MAX_FORECAST_PATH_MONTHS}"
+            )
+        return self
     
     class Config:
         from_attributes = True
@@ -462,6 +480,8 @@ class PortfolioForecastResponse(BaseModel):
     value_at_risk: Optional[float] = None
     expected_shortfall: Optional[float] = None
     volatility_estimate: Optional[float] = None
+    property_contributions: Optional[List[Dict[str, Any]]] = None
+    simulation_settings: Optional[Dict[str, Any]] = None
     
     class Config:
         from_attributes = True
@@ -25,6 +25,13 @@ from app.models.deal_alerts import (
 )
 from app.core.database import get_db
 
+# Alert type raised for each kind of change reported by incremental scout scans
+LISTING_CHANGE_ALERT_TYPES = {
+    "price_drop": AlertTypeEnum.PRICE_DROP,
+    "status_change": AlertTypeEnum.CRITERIA_MATCH,
+    "motivation_change": AlertTypeEnum.CRITERIA_MATCH
+}
+
 
 class DealAlertService:
     """Service for managing deal alerts and notifications"""
@@ -530,12 +537,48 @@ class DealAlertService:
                     alert_type=alert_type,
                     title=f"Subscription Alert: {subscription.name}",
                     message=f"New deal matching your subscription: {deal_data.get('address', 'Unknown')}",
+                    priority=AlertPriorityEnum.MEDIUM,
                     channels=subscription.channels,
                     deal_id=deal_data.get("deal_id"),
                     property_id=deal_data.get("property_id"),
                     alert_data=deal_data
                 )
-    
+
+    def process_listing_change(self, change_data: Dict[str, Any]):
+        """Process a listing change event from incremental scout scanning
+
+        New listings go through the normal deal checks. Changes to a listing
+        already alerted on only trigger the rules and subscriptions for that kind
+        of change (a price drop fires PRICE_DROP alerts, not another NEW_DEAL).
+        """
+        change_type = change_data.get("change_type")
+        if change_type == "new":
+            self.process_deal_for_alerts(change_data)
+            return
+
+        alert_type = LISTING_CHANGE_ALERT_TYPES.get(change_type)
+        if alert_type is None:
+            return
+
+        triggered_rules = [rule for rule in self.check_alert_rules(change_data) if rule.alert_type == alert_type]
+        if triggered_rules:
+            self.process_triggered_rules(triggered_rules, change_data)
+
+        for subscription in self.check_subscriptions_for_deal(change_data):
+            if alert_type not in subscription.alert_types:
+                continue
+            self.create_deal_alert(
+                user_id=subscription.user_id,
+                alert_type=alert_type,
+                title=f"Subscription Alert: {subscription.name}",
+                message=f"Listing update ({change_type.replace('_', ' ')}): {change_data.get('address', 'Unknown')}",
+                priority=AlertPriorityEnum.HIGH if alert_type == AlertTypeEnum.PRICE_DROP else AlertPriorityEnum.MEDIUM,
+                channels=subscription.channels,
+                deal_id=change_data.get("deal_id"),
+                property_id=change_data.get("property_id"),
+                alert_data=change_data
+            )
+
     def get_user_alerts(self, user_id: uuid.UUID, limit: int = 50,
                        status: Optional[AlertStatusEnum] = None) -> List[DealAlert]:
         """Get alerts for a user"""
@@ -0,0 +1,344 @@
+"""
+Diversification Engine for the Real Estate Empire platform.
+
+Holdings of one or many portfolios are kept as one columnar frame. For each
+dimension (city, state, property type, price band, income source) the engine
+builds a portfolio x category matrix of weights in one grouped pass. Every
+concentration measure (max share, HHI, Shannon entropy, effective count) is
+then array arithmetic over that matrix. What-if questions, such as adding
+candidate acquisitions or removing holdings, are answered by adjusting the
+cached matrices, with no reload and no regrouping.
+"""
+
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.portfolio import PortfolioPropertyDB
+from app.models.property import PropertyDB
+
+HOLDING_DIMENSIONS = ["city", "state", "property_type", "price_band"]
+# Holdings without a known city, state or property type land here; it is not a category
+UNKNOWN_CATEGORY = "Unknown"
+DIMENSIONS = HOLDING_DIMENSIONS + ["income_source"]
+
+PRICE_BANDS = ["under_100k", "100k_250k", "250k_500k", "500k_1m", "over_1m"]
+PRICE_BAND_EDGES = [100000, 250000, 500000, 1000000]
+INCOME_SOURCES = ["rental_income", "appreciation"]
+
+# Weights of each dimension in the overall diversification score
+SCORE_WEIGHTS = {"geographic": 0.3, "property_type": 0.25, "price_band": 0.25, "income_source": 0.2}
+
+HOLDING_COLUMNS = [
+    "portfolio_id", "property_id", "city", "state", "property_type",
+    "current_value", "total_investment", "monthly_rent"
+]
+
+
+def price_band(values: Any) -> np.ndarray:
+    """Price band label of each value"""
+    return np.asarray(PRICE_BANDS, dtype=object)[np.searchsorted(PRICE_BAND_EDGES, np.asarray(values, float), side="right")]
+
+
+def prepare_holdings(frame: pd.DataFrame) -> pd.DataFrame:
+    """Normalize raw holding columns and derive value, price band and income columns"""
+    frame = frame.reindex(columns=HOLDING_COLUMNS).copy()
+    for column in ("city", "state", "property_type"):
+        frame[column] = frame[column].where(frame[column].notna(), UNKNOWN_CATEGORY).astype(str)
+        frame[column] = frame[column].replace("", UNKNOWN_CATEGORY)
+    for column in ("current_value", "total_investment", "monthly_rent"):
+        frame[column] = pd.to_numeric(frame[column], errors="coerce").fillna(0.0).astype(float)
+
+    # A holding is valued at its current value, or what was invested when unknown
+    frame["value"] = frame["current_value"].where(frame["current_value"] > 0, frame["total_investment"])
+    frame["price_band"] = price_band(frame["value"])
+    frame["rental_income"] = frame["monthly_rent"] * 12
+    frame["appreciation"] = np.where(
+        frame["current_value"] > frame["total_investment"], frame["value"] - frame["total_investment"], 0.0
+    )
+    frame["count"] = 1.0
+    return frame.reset_index(drop=True)
+
+
+def holdings_from_records(portfolio_properties: Sequence[Any], property_dict: Dict[Any, Any],
+                          portfolio_id: Optional[uuid.UUID] = None) -> pd.DataFrame:
+    """Holdings frame from PortfolioPropertyDB rows and a property_id -> PropertyDB map"""
+    rows = []
+    for holding in portfolio_properties:
+        property_obj = property_dict.get(holding.property_id)
+        rows.append({
+            "portfolio_id": portfolio_id if portfolio_id is not None else holding.portfolio_id,
+            "property_id": holding.property_id,
+            "city": getattr(property_obj, "city", None),
+            "state": getattr(property_obj, "state", None),
+            "property_type": getattr(property_obj, "property_type", None),
+            "current_value": holding.current_value,
+            "total_investment": holding.total_investment,
+            "monthly_rent": getattr(holding, "monthly_rent", None)
+        })
+    return prepare_holdings(pd.DataFrame(rows, columns=HOLDING_COLUMNS))
+
+
+def load_holdings(db: Session, portfolio_ids: Optional[Iterable[uuid.UUID]] = None) -> pd.DataFrame:
+    """Holdings frame for the given portfolios (all when None) in a single joined query"""
+    statement = select(
+        PortfolioPropertyDB.portfolio_id,
+        PortfolioPropertyDB.property_id,
+        PropertyDB.city,
+        PropertyDB.state,
+        PropertyDB.property_type,
+        PortfolioPropertyDB.current_value,
+        PortfolioPropertyDB.total_investment,
+        PortfolioPropertyDB.monthly_rent
+    ).outerjoin(PropertyDB, PropertyDB.id == PortfolioPropertyDB.property_id)
+    if portfolio_ids is not None:
+        portfolio_ids = list(portfolio_ids)
+        if not portfolio_ids:
+            return prepare_holdings(pd.DataFrame(columns=HOLDING_COLUMNS))
+        statement = statement.where(PortfolioPropertyDB.portfolio_id.in_(portfolio_ids))
+    return prepare_holdings(pd.DataFrame(db.execute(statement).all(), columns=HOLDING_COLUMNS))
+
+
+def concentration(matrix: np.ndarray, uncategorized: Optional[Sequence[bool]] = None) -> Dict[str, np.ndarray]:
+    """Concentration measures for each row of a (scenario x category) weight matrix.
+
+    Columns flagged in uncategorized count toward each row's total but are not
+    categories, so holdings of unknown category dilute the shares of the known ones.
+    Rows with no categorized weight are treated as fully concentrated, so they score 0.
+    """
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=float))
+    totals = matrix.sum(axis=1)
+    if uncategorized is not None:
+        matrix = matrix[:, ~np.asarray(uncategorized, dtype=bool)]
+    empty = (totals <= 0) | (matrix.sum(axis=1) <= 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares = np.where(empty[:, None], 0.0, matrix / np.where(empty, 1.0, totals)[:, None])
+        logs = np.where(shares > 0, np.log(shares), 0.0)
+    hhi = np.where(empty, 1.0, (shares ** 2).sum(axis=1))
+    max_share = np.where(empty, 1.0, shares.max(axis=1, initial=0.0))
+    entropy = -(shares * logs).sum(axis=1) + 0.0
+    categories = (shares > 0).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        normalized_entropy = np.where(categories > 1, entropy / np.log(np.maximum(categories, 2)), 0.0)
+    return {
+        "total": totals,
+        "max_share": max_share,
+        "hhi": hhi,
+        "entropy": entropy,
+        "normalized_entropy": normalized_entropy,
+        "effective_count": np.where(empty, 0.0, 1.0 / hhi),
+        # Lower concentration = higher score
+        "score": (1.0 - max_share) * 100
+    }
+
+
+class DiversificationEngine:
+    """Columnar concentration analytics for any number of portfolios.
+
+    weight selects what each holding contributes to its category: "value" (dollars)
+    or "count" (one per property). Income source is always measured in dollars.
+    """
+
+    def __init__(self, holdings: pd.DataFrame, weight: str = "value"):
+        if weight not in ("value", "count"):
+            raise ValueError(f"Unknown diversification weight: {weight}")
+        self.holdings = prepare_holdings(holdings)
+        self.weight = weight
+        self.portfolio_ids = list(pd.unique(self.holdings["portfolio_id"]))
+        self._row = {portfolio_id: i for i, portfolio_id in enumerate(self.portfolio_ids)}
+
+        # One grouped pass per dimension: portfolio x category weight matrices
+        self.categories: Dict[str, List[str]] = {}
+        self.matrices: Dict[str, np.ndarray] = {}
+        for dimension in HOLDING_DIMENSIONS:
+            table = self.holdings.pivot_table(index="portfolio_id", columns=dimension, values=self.weight,
+                                              aggfunc="sum", fill_value=0.0, sort=False)
+            table = table.reindex(index=self.portfolio_ids, fill_value=0.0)
+            self.categories[dimension] = [str(c) for c in table.columns]
+            self.matrices[dimension] = table.to_numpy(dtype=float)
+        income = self.holdings.groupby("portfolio_id", sort=False)[INCOME_SOURCES].sum()
+        self.categories["income_source"] = list(INCOME_SOURCES)
+        self.matrices["income_source"] = income.reindex(index=self.portfolio_ids, fill_value=0.0).to_numpy(dtype=float)
+
+    @classmethod
+    def from_db(cls, db: Session, portfolio_ids: Optional[Iterable[uuid.UUID]] = None,
+                weight: str = "value") -> "DiversificationEngine":
+        return cls(load_holdings(db, portfolio_ids), weight=weight)
+
+    @classmethod
+    def from_records(cls, portfolio_properties: Sequence[Any], property_dict: Dict[Any, Any],
+                     portfolio_id: Optional[uuid.UUID] = None, weight: str = "value") -> "DiversificationEngine":
+        return cls(holdings_from_records(portfolio_properties, property_dict, portfolio_id), weight=weight)
+
+    def __contains__(self, portfolio_id: Any) -> bool:
+        return portfolio_id in self._row
+
+    def metrics(self, portfolio_ids: Optional[Sequence[uuid.UUID]] = None) -> pd.DataFrame:
+        """One row per portfolio with {dimension}_{measure} columns and the overall score"""
+        ids = self.portfolio_ids if portfolio_ids is None else list(portfolio_ids)
+        rows = [self._row[portfolio_id] for portfolio_id in ids]
+        frame = self._score_matrices({d: matrix[rows] for d, matrix in self.matrices.items()}, self.categories)
+        frame.index = pd.Index(ids, name="portfolio_id")
+        return frame
+
+    def analysis(self, portfolio_id: uuid.UUID) -> Dict[str, Dict[str, Any]]:
+        """Per-dimension distributions and concentration for one portfolio"""
+        row = self.metrics([portfolio_id]).iloc[0]
+        i = self._row[portfolio_id]
+
+        def distribution(dimension: str) -> Dict[str, float]:
+            return {
+                category: float(weight)
+                for category, weight in zip(self.categories[dimension], self.matrices[dimension][i])
+                if category != UNKNOWN_CATEGORY and (weight > 0 or dimension in ("price_band", "income_source"))
+            }
+
+        def measures(dimension: str) -> Dict[str, float]:
+            return {
+                "hhi": float(row[f"{dimension}_hhi"]),
+                "entropy": float(row[f"{dimension}_entropy"]),
+                "effective_count": float(row[f"{dimension}_effective_count"])
+            }
+
+        price_distribution = distribution("price_band")
+        return {
+            "geographic": {
+                "score": float(row["geographic_score"]),
+                "total": float(row["city_total"]),
+                "city_distribution": distribution("city"),
+                "state_distribution": distribution("state"),
+                "city_concentration": float(row["city_max_share"]),
+                "state_concentration": float(row["state_max_share"]),
+                "city_hhi": float(row["city_hhi"]),
+                "state_hhi": float(row["state_hhi"]),
+                "city_entropy": float(row["city_entropy"]),
+                "state_entropy": float(row["state_entropy"])
+            },
+            "property_type": {
+                "score": float(row["property_type_score"]),
+                "total": float(row["property_type_total"]),
+                "type_distribution": distribution("property_type"),
+                "concentration": float(row["property_type_max_share"]),
+                **measures("property_type")
+            },
+            "price_band": {
+                "score": float(row["price_band_score"]),
+                "range_distribution": {band: price_distribution.get(band, 0.0) for band in PRICE_BANDS},
+                "concentration": float(row["price_band_max_share"]),
+                **measures("price_band")
+            },
+            "income_source": {
+                "score": float(row["income_source_score"]),
+                "source_distribution": distribution("income_source"),
+                "concentration": float(row["income_source_max_share"]),
+                **measures("income_source")
+            },
+            "overall_score": float(row["overall_score"])
+        }
+
+    def what_if(self, portfolio_id: uuid.UUID, add: Optional[pd.DataFrame] = None,
+                remove: Optional[Iterable[uuid.UUID]] = None) -> pd.Series:
+        """Metrics of one portfolio after adding candidate holdings and removing owned properties.
+
+        add uses HOLDING_COLUMNS (portfolio_id may be omitted). Only the cached category
+        matrices are adjusted; nothing is reloaded.
+        """
+        matrices = self._portfolio_matrices(portfolio_id)
+        categories = self.categories
+        if add is not None and len(add):
+            contributions, categories = self._contributions(add)
+            for dimension, delta in contributions.items():
+                matrices[dimension] = self._widen(matrices[dimension], delta.shape[1]) + delta.sum(axis=0)
+        if remove is not None:
+            removed = self.holdings[(self.holdings["portfolio_id"] == portfolio_id) &
+                                    self.holdings["property_id"].isin(list(remove))]
+            contributions, categories = self._contributions(removed, owned=True, categories=categories)
+            for dimension, delta in contributions.items():
+                matrices[dimension] = np.maximum(self._widen(matrices[dimension], delta.shape[1]) - delta.sum(axis=0), 0.0)
+        row = self._score_matrices({d: m[None, :] for d, m in matrices.items()}, categories).iloc[0]
+        row.name = portfolio_id
+        return row
+
+    def evaluate_additions(self, portfolio_id: uuid.UUID, candidates: pd.DataFrame) -> pd.DataFrame:
+        """Metrics after adding each candidate on its own, plus the change in overall score"""
+        return self._evaluate(portfolio_id, *self._contributions(candidates), sign=1.0)
+
+    def evaluate_removals(self, portfolio_id: uuid.UUID,
+                          property_ids: Optional[Sequence[uuid.UUID]] = None) -> pd.DataFrame:
+        """Metrics after removing each owned property on its own, plus the change in overall score"""
+        owned = self.holdings[self.holdings["portfolio_id"] == portfolio_id]
+        if property_ids is not None:
+            owned = owned[owned["property_id"].isin(list(property_ids))]
+        result = self._evaluate(portfolio_id, *self._contributions(owned, owned=True), sign=-1.0)
+        result.index = pd.Index(owned["property_id"].tolist(), name="property_id")
+        return result
+
+    def _evaluate(self, portfolio_id: uuid.UUID, contributions: Dict[str, np.ndarray],
+                  categories: Dict[str, List[str]], sign: float) -> pd.DataFrame:
+        base = self._portfolio_matrices(portfolio_id)
+        scenarios = {}
+        for dimension, delta in contributions.items():
+            current = self._widen(base[dimension], delta.shape[1])
+            scenarios[dimension] = np.maximum(current[None, :] + sign * delta, 0.0)
+        frame = self._score_matrices(scenarios, categories)
+        baseline = self._score_matrices({d: m[None, :] for d, m in base.items()}, self.categories)["overall_score"].iloc[0]
+        frame["overall_score_change"] = frame["overall_score"] - baseline
+        return frame
+
+    def _portfolio_matrices(self, portfolio_id: uuid.UUID) -> Dict[str, np.ndarray]:
+        if portfolio_id in self._row:
+            i = self._row[portfolio_id]
+            return {d: matrix[i].copy() for d, matrix in self.matrices.items()}
+        return {d: np.zeros(len(self.categories[d])) for d in DIMENSIONS}
+
+    def _contributions(self, holdings: pd.DataFrame, owned: bool = False,
+                       categories: Optional[Dict[str, List[str]]] = None
+                       ) -> Tuple[Dict[str, np.ndarray], Dict[str, List[str]]]:
+        """(holding x category) weight matrices and the category vocabulary they index.
+
+        Unseen categories extend a copy of categories (the engine's own by default),
+        so what-if scoring never changes the engine's vocabulary or matrices.
+        """
+        frame = holdings if owned else prepare_holdings(holdings.assign(
+            portfolio_id=holdings["portfolio_id"] if "portfolio_id" in holdings.columns else None
+        ))
+        weights = frame[self.weight].to_numpy(dtype=float)
+        categories = {d: list(vocabulary) for d, vocabulary in (categories or self.categories).items()}
+        contributions = {}
+        for dimension in HOLDING_DIMENSIONS:
+            vocabulary = categories[dimension]
+            index = {category: i for i, category in enumerate(vocabulary)}
+            for category in frame[dimension]:
+                if category not in index:
+                    index[category] = len(vocabulary)
+                    vocabulary.append(category)
+            delta = np.zeros((len(frame), len(vocabulary)))
+            delta[np.arange(len(frame)), frame[dimension].map(index).to_numpy(dtype=int)] = weights
+            contributions[dimension] = delta
+        contributions["income_source"] = frame[INCOME_SOURCES].to_numpy(dtype=float)
+        return contributions, categories
+
+    @staticmethod
+    def _widen(vector: np.ndarray, width: int) -> np.ndarray:
+        return np.pad(vector, (0, width - len(vector))) if len(vector) < width else vector
+
+    @staticmethod
+    def _score_matrices(matrices: Dict[str, np.ndarray], categories: Dict[str, List[str]]) -> pd.DataFrame:
+        columns = {}
+        for dimension in DIMENSIONS:
+            uncategorized = [category == UNKNOWN_CATEGORY for category in categories[dimension]]
+            for measure, values in concentration(matrices[dimension], uncategorized).items():
+                columns[f"{dimension}_{measure}"] = values
+        frame = pd.DataFrame(columns)
+        frame["geographic_score"] = (frame["city_score"] + frame["state_score"]) / 2
+        frame["overall_score"] = (
+            frame["geographic_score"] * SCORE_WEIGHTS["geographic"] +
+            frame["property_type_score"] * SCORE_WEIGHTS["property_type"] +
+            frame["price_band_score"] * SCORE_WEIGHTS["price_band"] +
+            frame["income_source_score"] * SCORE_WEIGHTS["income_source"]
+        )
+        return frame
@@ -3,11 +3,16 @@ Gemini AI Service for Real Estate Empire
 Provides AI-powered analysis and conversation capabilities
 """
 import os
+import asyncio
 import logging
 from typing import Dict, List, Optional, Any
 import google.generativeai as genai
 from dataclasses import dataclass
 
+from app.core.llm_config import LLMConfig, LLMModel, LLMProvider, llm_manager
+from app.core.llm_gateway import LLMGateway
+from app.services.llm_response_cache import LLMResponseCache, get_response_cache, response_text
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -17,13 +22,80 @@ class GeminiResponse:
     metadata: Dict[str, Any]
 
 class GeminiService:
-    def __init__(self):
+    MODEL_NAME = LLMModel.GEMINI_1_5_FLASH.value
+    # Analyses run at zero temperature so a repeated prompt may be served from the cache
+    ANALYSIS_TEMPERATURE = 0.0
+    # Name Gemini calls are recorded under in the LLM gateway's usage metrics
+    GATEWAY_AGENT = "gemini"
+    
+    def __init__(self, response_cache: Optional[LLMResponseCache] = None, use_cache: bool = True,
+                 cost_per_1k_tokens: float = 0.0, model: Any = None, gateway: Optional[LLMGateway] = None):
+        """
+        Args:
+            model: Object with a synchronous generate_content(prompt, **kwargs);
+                defaults to the Gemini model, which needs GEMINI_API_KEY
+            gateway: Gateway async calls go through (defaults to the agents' shared gateway)
+        """
         self.api_key = os.getenv('GEMINI_API_KEY')
-        if not self.api_key:
-            raise ValueError("GEMINI_API_KEY environment variable is required")
+        if model is None:
+            if not self.api_key:
+                raise ValueError("GEMINI_API_KEY environment variable is required")
+            genai.configure(api_key=self.api_key)
+            model = genai.GenerativeModel(self.MODEL_NAME)
+        self.model = model
+        self._gateway = gateway
+        
+        # Analyses are cached by prompt; conversation responses are meant to vary and are not
+        self.response_cache = (response_cache or get_response_cache()) if use_cache else None
+        self.cost_per_1k_tokens = cost_per_1k_tokens
+    
+    @property
+    def gateway(self) -> LLMGateway:
+        """Gateway enforcing the shared Gemini rate limit, coalescing and usage metrics"""
+        return self._gateway or llm_manager.gateway
+    
+    def _gateway_config(self, temperature: Optional[float]) -> LLMConfig:
+        return LLMConfig(
+            model=LLMModel.GEMINI_1_5_FLASH,
+            provider=LLMProvider.GOOGLE,
+            temperature=temperature,
+            max_tokens=2048,
+            system_prompt="",
+            cost_per_1k_tokens=self.cost_per_1k_tokens
+        )
+    
+    async def agenerate(self, prompt: str, cacheable: bool = True) -> str:
+        """Generate text for a prompt, serving repeated analysis prompts from the response cache
+        
+        Cacheable prompts are generated at ANALYSIS_TEMPERATURE; others use the
+        model's default sampling and always reach the model. The SDK call runs in
+        a worker thread once the LLM gateway grants a Gemini request slot, and
+        identical analysis prompts in flight share one call. Cache lookups and
+        writes also run off the event loop.
+        """
+        temperature = self.ANALYSIS_TEMPERATURE if cacheable else None
+        generation_kwargs = {"generation_config": {"temperature": temperature}} if cacheable else {}
+        
+        async def call_model(agent_name, model, config, prompt):
+            return await asyncio.to_thread(self.model.generate_content, prompt, **generation_kwargs)
         
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        def generate():
+            # Sampled (non-cacheable) prompts are meant to vary, so they are not coalesced either
+            return self.gateway.invoke(
+                self.GATEWAY_AGENT, self._gateway_config(temperature), prompt,
+                coalesce=cacheable, call_model=call_model
+            )
+        
+        if not cacheable or not self.response_cache:
+            return response_text(await generate())
+        return await self.response_cache.aget_or_generate(
+            self.MODEL_NAME, self.ANALYSIS_TEMPERATURE, None, prompt, generate,
+            cost_per_1k_tokens=self.cost_per_1k_tokens
+        )
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Response cache hit/miss and savings counters"""
+        return self.response_cache.stats.to_dict() if self.response_cache else {}
         
     async def analyze_property(self, property_data: Dict[str, Any]) -> GeminiResponse:
         """Analyze property data and provide insights"""
@@ -48,9 +120,9 @@ class GeminiService:
         """
         
         try:
-            response = self.model.generate_content(prompt)
+            content = await self.agenerate(prompt)
             return GeminiResponse(
-                content=response.text,
+                content=content,
                 confidence=0.85,
                 metadata={'analysis_type': 'property_analysis'}
             )
@@ -80,9 +152,9 @@ class GeminiService:
         """
         
         try:
-            response = self.model.generate_content(prompt)
+            content = await self.agenerate(prompt, cacheable=False)
             return GeminiResponse(
-                content=response.text,
+                content=content,
                 confidence=0.90,
                 metadata={'response_type': 'homeowner_conversation'}
             )
@@ -112,9 +184,9 @@ class GeminiService:
         """
         
         try:
-            response = self.model.generate_content(prompt)
+            content = await self.agenerate(prompt)
             return GeminiResponse(
-                content=response.text,
+                content=content,
                 confidence=0.80,
                 metadata={'analysis_type': 'market_trends'}
             )
@@ -142,9 +214,9 @@ class GeminiService:
         """
         
         try:
-            response = self.model.generate_content(prompt)
+            content = await self.agenerate(prompt)
             return GeminiResponse(
-                content=response.text,
+                content=content,
                 confidence=0.85,
                 metadata={'analysis_type': 'agent_training'}
             )
@@ -0,0 +1,457 @@
+"""
+Geocoding Service
+Address to coordinate resolution that avoids the network wherever it can.
+
+Lookups go through three tiers: a persistent SQLite cache keyed by the
+normalized address, an offline gazetteer of ZIP and city centroids, and only
+then a remote geocoder (Nominatim by default). Remote results are cached, so a
+repeat analysis never leaves the process; addresses the geocoder could not
+resolve are remembered for a while too, so they are not re-queried on every
+run. Gazetteer hits resolve to a ZIP or city centroid, which is precise enough
+for mile-radius neighborhood boundaries.
+
+The built-in gazetteer covers large US cities. Point GEOCODER_GAZETTEER_PATH at
+a Census ZCTA gazetteer file (GEOID/INTPTLAT/INTPTLONG) or a CSV with
+zip_code or city/state plus latitude/longitude columns to extend it.
+"""
+import csv
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from geopy.exc import GeopyError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 2
+
+# How long a remote miss is remembered: no match is unlikely to change soon,
+# a geocoder error (outage, rate limit) is retried much sooner
+NOT_FOUND_TTL_SECONDS = 7 * 24 * 3600
+FAILURE_TTL_SECONDS = 15 * 60
+
+STATE_ABBREVIATIONS = {
+    "alabama": "al", "alaska": "ak", "arizona": "az", "arkansas": "ar", "california": "ca",
+    "colorado": "co", "connecticut": "ct", "delaware": "de", "district of columbia": "dc",
+    "florida": "fl", "georgia": "ga", "hawaii": "hi", "idaho": "id", "illinois": "il",
+    "indiana": "in", "iowa": "ia", "kansas": "ks", "kentucky": "ky", "louisiana": "la",
+    "maine": "me", "maryland": "md", "massachusetts": "ma", "michigan": "mi", "minnesota": "mn",
+    "mississippi": "ms", "missouri": "mo", "montana": "mt", "nebraska": "ne", "nevada": "nv",
+    "new hampshire": "nh", "new jersey": "nj", "new mexico": "nm", "new york": "ny",
+    "north carolina": "nc", "north dakota": "nd", "ohio": "oh", "oklahoma": "ok", "oregon": "or",
+    "pennsylvania": "pa", "rhode island": "ri", "south carolina": "sc", "south dakota": "sd",
+    "tennessee": "tn", "texas": "tx", "utah": "ut", "vermont": "vt", "virginia": "va",
+    "washington": "wa", "west virginia": "wv", "wisconsin": "wi", "wyoming": "wy"
+}
+STATE_CODES = set(STATE_ABBREVIATIONS.values())
+
+STREET_ABBREVIATIONS = {
+    "street": "st", "avenue": "ave", "road": "rd", "boulevard": "blvd", "drive": "dr",
+    "lane": "ln", "court": "ct", "place": "pl", "terrace": "ter", "highway": "hwy",
+    "parkway": "pkwy", "circle": "cir", "square": "sq", "trail": "trl", "apartment": "apt",
+    "suite": "ste", "north": "n", "south": "s", "east": "e", "west": "w",
+    "northeast": "ne", "northwest": "nw", "southeast": "se", "southwest": "sw"
+}
+
+# Downtown centroids of large US cities, keyed by (normalized city, state code)
+CITY_CENTROIDS: Dict[Tuple[str, str], Tuple[float, float]] = {
+    ("new york", "ny"): (40.7128, -74.0060), ("los angeles", "ca"): (34.0522, -118.2437),
+    ("chicago", "il"): (41.8781, -87.6298), ("houston", "tx"): (29.7604, -95.3698),
+    ("phoenix", "az"): (33.4484, -112.0740), ("philadelphia", "pa"): (39.9526, -75.1652),
+    ("san antonio", "tx"): (29.4241, -98.4936), ("san diego", "ca"): (32.7157, -117.1611),
+    ("dallas", "tx"): (32.7767, -96.7970), ("san jose", "ca"): (37.3382, -121.8863),
+    ("austin", "tx"): (30.2672, -97.7431), ("jacksonville", "fl"): (30.3322, -81.6557),
+    ("fort worth", "tx"): (32.7555, -97.3308), ("columbus", "oh"): (39.9612, -82.9988),
+    ("charlotte", "nc"): (35.2271, -80.8431), ("san francisco", "ca"): (37.7749, -122.4194),
+    ("indianapolis", "in"): (39.7684, -86.1581), ("seattle", "wa"): (47.6062, -122.3321),
+    ("denver", "co"): (39.7392, -104.9903), ("washington", "dc"): (38.9072, -77.0369),
+    ("boston", "ma"): (42.3601, -71.0589), ("el paso", "tx"): (31.7619, -106.4850),
+    ("nashville", "tn"): (36.1627, -86.7816), ("detroit", "mi"): (42.3314, -83.0458),
+    ("oklahoma city", "ok"): (35.4676, -97.5164), ("portland", "or"): (45.5152, -122.6784),
+    ("las vegas", "nv"): (36.1699, -115.1398), ("memphis", "tn"): (35.1495, -90.0490),
+    ("louisville", "ky"): (38.2527, -85.7585), ("baltimore", "md"): (39.2904, -76.6122),
+    ("milwaukee", "wi"): (43.0389, -87.9065), ("albuquerque", "nm"): (35.0844, -106.6504),
+    ("tucson", "az"): (32.2226, -110.9747), ("fresno", "ca"): (36.7378, -119.7871),
+    ("sacramento", "ca"): (38.5816, -121.4944), ("kansas city", "mo"): (39.0997, -94.5786),
+    ("mesa", "az"): (33.4152, -111.8315), ("atlanta", "ga"): (33.7490, -84.3880),
+    ("omaha", "ne"): (41.2565, -95.9345), ("colorado springs", "co"): (38.8339, -104.8214),
+    ("raleigh", "nc"): (35.7796, -78.6382), ("miami", "fl"): (25.7617, -80.1918),
+    ("long beach", "ca"): (33.7701, -118.1937), ("virginia beach", "va"): (36.8529, -75.9780),
+    ("oakland", "ca"): (37.8044, -122.2712), ("minneapolis", "mn"): (44.9778, -93.2650),
+    ("tulsa", "ok"): (36.1540, -95.9928), ("tampa", "fl"): (27.9506, -82.4572),
+    ("arlington", "tx"): (32.7357, -97.1081), ("new orleans", "la"): (29.9511, -90.0715),
+    ("cleveland", "oh"): (41.4993, -81.6944), ("orlando", "fl"): (28.5383, -81.3792),
+    ("pittsburgh", "pa"): (40.4406, -79.9959), ("st louis", "mo"): (38.6270, -90.1994),
+    ("cincinnati", "oh"): (39.1031, -84.5120), ("salt lake city", "ut"): (40.7608, -111.8910),
+    ("birmingham", "al"): (33.5186, -86.8104), ("richmond", "va"): (37.5407, -77.4360),
+    ("buffalo", "ny"): (42.8864, -78.8784)
+}
+
+_ZIP_PATTERN = re.compile(r"\b(\d{5})(?:-\d{4})?$")
+
+
+@dataclass
+class GeocodeResult:
+    """Coordinates for one address; source is cache, zip, city or remote"""
+    latitude: float
+    longitude: float
+    source: str
+    address_key: str
+
+
+@dataclass
+class GeocodeStats:
+    """Lookup counters since the service was created"""
+    cache_hits: int = 0
+    offline_hits: int = 0
+    remote_lookups: int = 0
+    remote_failures: int = 0
+    negative_hits: int = 0
+    not_found: int = 0
+
+
+def default_cache_path() -> str:
+    """Cache file under the system temp directory, never the working directory"""
+    return os.path.join(tempfile.gettempdir(), "real-estate-empire", "geocode_cache.db")
+
+
+def _normalize_tokens(text: str) -> str:
+    text = re.sub(r"[^\w\s#-]", " ", text.lower())
+    return " ".join(text.split())
+
+
+def _state_code(text: str) -> Optional[str]:
+    if text in STATE_CODES:
+        return text
+    return STATE_ABBREVIATIONS.get(text)
+
+
+def normalize_address(address: str) -> str:
+    """Canonical cache key: lowercase, no punctuation, abbreviated street line.
+
+    Commas are kept as component separators so city, state and ZIP can be
+    parsed back out. Street suffixes and directionals are abbreviated in the
+    street line only, so "North Las Vegas" stays intact.
+    """
+    components = [_normalize_tokens(part) for part in (address or "").split(",")]
+    components = [part for part in components if part]
+    if len(components) > 2 or (components and re.match(r"^\d", components[0])):
+        components[0] = " ".join(STREET_ABBREVIATIONS.get(token, token) for token in components[0].split())
+    return ", ".join(components)
+
+
+def parse_locality(address_key: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """(city, state code, ZIP) parsed from a normalized address; missing parts are None"""
+    components = address_key.split(", ") if address_key else []
+    zip_code = None
+    if components:
+        match = _ZIP_PATTERN.search(components[-1])
+        if match:
+            zip_code = match.group(1)
+            remainder = components[-1][:match.start()].strip()
+            components = components[:-1] + ([remainder] if remainder else [])
+
+    state = _state_code(components[-1]) if components else None
+    if state:
+        components = components[:-1]
+
+    city = None
+    if state and components:
+        city = re.sub(r"^saint ", "st ", components[-1])
+    return city, state, zip_code
+
+
+class Gazetteer:
+    """In-memory ZIP and city centroid lookup"""
+
+    def __init__(self, zip_centroids: Optional[Dict[str, Tuple[float, float]]] = None,
+                 city_centroids: Optional[Dict[Tuple[str, str], Tuple[float, float]]] = None):
+        self.zip_centroids: Dict[str, Tuple[float, float]] = dict(zip_centroids or {})
+        self.city_centroids: Dict[Tuple[str, str], Tuple[float, float]] = dict(
+            CITY_CENTROIDS if city_centroids is None else city_centroids
+        )
+
+    def lookup(self, address_key: str) -> Optional[GeocodeResult]:
+        """ZIP centroid if the ZIP is known, else city centroid, else None"""
+        city, state, zip_code = parse_locality(address_key)
+        if zip_code and zip_code in self.zip_centroids:
+            lat, lng = self.zip_centroids[zip_code]
+            return GeocodeResult(lat, lng, "zip", address_key)
+        if city and state and (city, state) in self.city_centroids:
+            lat, lng = self.city_centroids[(city, state)]
+            return GeocodeResult(lat, lng, "city", address_key)
+        return None
+
+    def load_file(self, path: str) -> int:
+        """Merge centroids from a Census gazetteer or CSV file; returns rows loaded"""
+        with open(path, newline="", encoding="utf-8") as handle:
+            sample = handle.read(4096)
+            handle.seek(0)
+            delimiter = "\t" if "\t" in sample.splitlines()[0] else ","
+            reader = csv.DictReader(handle, delimiter=delimiter)
+            reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+
+            loaded = 0
+            for row in reader:
+                lat = row.get("intptlat") or row.get("latitude") or row.get("lat")
+                lng = row.get("intptlong") or row.get("longitude") or row.get("lng")
+                if not lat or not lng:
+                    continue
+                coords = (float(lat), float(lng))
+                zip_code = row.get("geoid") or row.get("zip_code") or row.get("zip")
+                if zip_code:
+                    self.zip_centroids[zip_code.strip().zfill(5)] = coords
+                    loaded += 1
+                elif row.get("city") and row.get("state"):
+                    state = _state_code(_normalize_tokens(row["state"]))
+                    if state:
+                        self.city_centroids[(_normalize_tokens(row["city"]), state)] = coords
+                        loaded += 1
+        return loaded
+
+
+class GeocodeCache:
+    """SQLite-backed cache of resolved coordinates keyed by normalized address
+
+    Addresses the remote geocoder could not resolve are kept in a separate
+    table with the reason, and count as cached only for that reason's TTL.
+    Pass ":memory:" for a cache that lives only as long as the object.
+    """
+
+    def __init__(self, path: Optional[str] = None, clock: Callable[[], float] = time.time,
+                 not_found_ttl: float = NOT_FOUND_TTL_SECONDS, failure_ttl: float = FAILURE_TTL_SECONDS):
+        self.path = path or default_cache_path()
+        self.ttls = {"not_found": not_found_ttl, "failure": failure_ttl}
+        self._clock = clock
+        self._lock = threading.Lock()
+        if self.path != ":memory:" and os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocodes (
+                address_key TEXT PRIMARY KEY,
+                latitude REAL NOT NULL,
+                longitude REAL NOT NULL,
+                source TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocode_misses (
+                address_key TEXT PRIMARY KEY,
+                reason TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Tuple[float, float]]:
+        """Cached coordinates for whichever keys are present"""
+        keys = list(keys)
+        found: Dict[str, Tuple[float, float]] = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT address_key, latitude, longitude FROM geocodes "
+                    f"WHERE address_key IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                found.update({key: (lat, lng) for key, lat, lng in rows})
+        return found
+
+    def get_misses(self, keys: Iterable[str]) -> List[str]:
+        """Keys recorded as remote misses whose TTL has not run out"""
+        keys = list(keys)
+        now = self._clock()
+        fresh: List[str] = []
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT address_key, reason, created_at FROM geocode_misses "
+                    f"WHERE address_key IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                fresh.extend(key for key, reason, created_at in rows
+                             if now - created_at < self.ttls.get(reason, 0))
+        return fresh
+
+    def set_many(self, results: Iterable[GeocodeResult]):
+        now = self._clock()
+        rows = [(r.address_key, r.latitude, r.longitude, r.source, now) for r in results]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO geocodes (address_key, latitude, longitude, source, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.executemany("DELETE FROM geocode_misses WHERE address_key = ?", [row[:1] for row in rows])
+            self._conn.commit()
+
+    def set_misses(self, misses: Dict[str, str]):
+        """Record remote misses as {address_key: reason}, reason being not_found or failure"""
+        now = self._clock()
+        rows = [(key, reason, now) for key, reason in misses.items()]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO geocode_misses (address_key, reason, created_at) VALUES (?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM geocodes").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM geocodes")
+            self._conn.execute("DELETE FROM geocode_misses")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class GeocodingService:
+    """Cache, then gazetteer, then remote geocoder; remote results are cached"""
+
+    def __init__(self, cache: Optional[GeocodeCache] = None, gazetteer: Optional[Gazetteer] = None,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        self.cache = cache
+        self.gazetteer = gazetteer or Gazetteer()
+        self.max_concurrency = max(1, max_concurrency)
+        self.stats = GeocodeStats()
+        self._stats_lock = threading.Lock()
+
+    def geocode(self, address: str, remote: Any = None) -> Optional[GeocodeResult]:
+        """Coordinates for one address, or None when no tier can resolve it.
+
+        remote is any object with a geopy-style geocode(query) method.
+        """
+        return self.geocode_batch([address], remote=remote)[0]
+
+    def geocode_batch(self, addresses: List[str], remote: Any = None,
+                      max_concurrency: Optional[int] = None) -> List[Optional[GeocodeResult]]:
+        """Geocode many addresses; results line up with the input.
+
+        Duplicates are resolved once, cached keys are read in one query, and
+        only the remaining misses reach the remote geocoder, at most
+        max_concurrency at a time. Addresses the remote geocoder recently
+        failed to resolve are not re-queried until their miss expires.
+        """
+        keys = [normalize_address(address) for address in addresses]
+        resolved: Dict[str, Optional[GeocodeResult]] = {}
+
+        pending = [key for key in dict.fromkeys(keys) if key]
+        if self.cache is not None and pending:
+            for key, (lat, lng) in self.cache.get_many(pending).items():
+                resolved[key] = GeocodeResult(lat, lng, "cache", key)
+            self._count("cache_hits", len(resolved))
+
+        misses = []
+        for key in pending:
+            if key in resolved:
+                continue
+            offline = self.gazetteer.lookup(key)
+            if offline is not None:
+                resolved[key] = offline
+                self._count("offline_hits")
+            else:
+                misses.append(key)
+
+        if misses and remote is not None and self.cache is not None:
+            known_misses = set(self.cache.get_misses(misses))
+            if known_misses:
+                misses = [key for key in misses if key not in known_misses]
+                self._count("negative_hits", len(known_misses))
+
+        if misses and remote is not None:
+            originals = {}
+            for address, key in zip(addresses, keys):
+                originals.setdefault(key, address)
+            workers = min(max_concurrency or self.max_concurrency, len(misses))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                found = list(executor.map(lambda key: self._geocode_remote(remote, originals[key], key), misses))
+            fetched = [result for result, _ in found if result is not None]
+            resolved.update({result.address_key: result for result in fetched})
+            if self.cache is not None:
+                self.cache.set_many(fetched)
+                self.cache.set_misses({key: reason for key, (result, reason) in zip(misses, found) if result is None})
+
+        results = [resolved.get(key) for key in keys]
+        self._count("not_found", sum(1 for result in results if result is None))
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = asdict(self.stats)
+        stats["cached_addresses"] = self.cache.size() if self.cache is not None else 0
+        return stats
+
+    def _geocode_remote(self, remote: Any, address: str, key: str) -> Tuple[Optional[GeocodeResult], Optional[str]]:
+        """(result, None) on a match, else (None, reason) with reason not_found or failure"""
+        self._count("remote_lookups")
+        try:
+            location = remote.geocode(address)
+        except GeopyError as e:
+            self._count("remote_failures")
+            logger.warning(f"Remote geocoding failed for {address}: {e}")
+            return None, "failure"
+        if not location:
+            return None, "not_found"
+        return GeocodeResult(location.latitude, location.longitude, "remote", key), None
+
+    def _count(self, field: str, amount: int = 1):
+        with self._stats_lock:
+            setattr(self.stats, field, getattr(self.stats, field) + amount)
+
+
+_shared_service: Optional[GeocodingService] = None
+_shared_service_lock = threading.Lock()
+
+
+def get_geocoding_service() -> GeocodingService:
+    """Process-wide geocoding service configured from the environment.
+
+    GEOCODER_CACHE_PATH (default under the system temp directory),
+    GEOCODER_GAZETTEER_PATH and GEOCODER_MAX_CONCURRENCY control it. The service still works without the
+    cache if SQLite cannot open it.
+    """
+    global _shared_service
+    with _shared_service_lock:
+        if _shared_service is None:
+            cache = None
+            try:
+                cache = GeocodeCache(path=os.getenv("GEOCODER_CACHE_PATH") or default_cache_path())
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Geocode cache unavailable: {e}")
+
+            gazetteer = Gazetteer()
+            gazetteer_path = os.getenv("GEOCODER_GAZETTEER_PATH")
+            if gazetteer_path:
+                try:
+                    loaded = gazetteer.load_file(gazetteer_path)
+                    logger.info(f"Loaded {loaded} gazetteer centroids from {gazetteer_path}")
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Gazetteer file {gazetteer_path} could not be loaded: {e}")
+
+            _shared_service = GeocodingService(
+                cache=cache,
+                gazetteer=gazetteer,
+                max_concurrency=int(os.getenv("GEOCODER_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY))
+            )
+        return _shared_service
@@ -0,0 +1,409 @@
+"""
+Incremental Lead Scoring
+
+Tracks which scoring inputs changed on PropertyLeadDB / PropertyDB through
+SQLAlchemy session events and re-scores only the affected leads. Component
+scores are memoized per lead, so a change to e.g. contact_attempts only
+recomputes the owner component and re-derives the overall score.
+
+Change tracking is in-process: pending changes are lost on restart, in which
+case a full LeadScoringEngine.rescore_all_leads run brings scores back in sync.
+"""
+
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+import logging
+import threading
+import time
+import uuid
+
+import pandas as pd
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.models.lead_scoring import ScoringConfig
+from app.models.lead import PropertyLeadDB
+from app.models.property import PropertyDB
+from app.services.lead_scoring_engine import LeadScoringEngine, COMPONENT_COLUMNS, COMPONENTS
+
+logger = logging.getLogger(__name__)
+
+# Scoring components affected by each tracked column. An empty set still marks
+# the lead dirty so derived values (validation, profit potential) are refreshed.
+LEAD_FIELD_COMPONENTS: Dict[str, FrozenSet[str]] = {
+    "motivation_factors": frozenset({"motivation"}),
+    "behind_on_payments": frozenset({"motivation"}),
+    "repair_needed": frozenset({"motivation", "property"}),
+    "estimated_repair_cost": frozenset({"property"}),
+    "asking_price": frozenset({"financial"}),
+    "mortgage_balance": frozenset({"financial"}),
+    "monthly_payment": frozenset(),
+    "contact_attempts": frozenset({"owner"}),
+    "property_id": frozenset({"property"}),
+    "property": frozenset({"property"})
+}
+PROPERTY_FIELD_COMPONENTS: Dict[str, FrozenSet[str]] = {
+    "year_built": frozenset({"property"})
+}
+
+# Market score depends only on the calendar, so it is recomputed on every run
+MEMOIZED_COMPONENTS: List[str] = [component for component in COMPONENTS if component != "market"]
+
+PENDING_CHANGES_KEY = "lead_score_changes"
+
+# Leads whose component scores stay memoized; the least recently scored are evicted first
+DEFAULT_COMPONENT_CACHE_SIZE = 100_000
+
+
+class LeadChanges:
+    """Scoring-relevant changes collected from one or more flushes"""
+
+    def __init__(self):
+        self.leads: Dict[uuid.UUID, Set[str]] = defaultdict(set)
+        self.properties: Dict[uuid.UUID, Set[str]] = defaultdict(set)
+        self.deleted_leads: Set[uuid.UUID] = set()
+        self.full_rescore = False
+
+    def mark_lead(self, lead_id: uuid.UUID, components: Iterable[str]):
+        self.leads[lead_id].update(components)
+
+    def mark_property(self, property_id: uuid.UUID, components: Iterable[str]):
+        self.properties[property_id].update(components)
+
+    def merge(self, other: "LeadChanges"):
+        for lead_id, components in other.leads.items():
+            self.mark_lead(lead_id, components)
+        for property_id, components in other.properties.items():
+            self.mark_property(property_id, components)
+        self.deleted_leads |= other.deleted_leads
+        for lead_id in other.deleted_leads:
+            self.leads.pop(lead_id, None)
+        self.full_rescore = self.full_rescore or other.full_rescore
+
+    def is_empty(self) -> bool:
+        return not (self.leads or self.properties or self.deleted_leads or self.full_rescore)
+
+
+class LeadChangeTracker:
+    """Records scoring-relevant lead/property changes committed through tracked sessions"""
+
+    def __init__(self):
+        self._changes = LeadChanges()
+        self._lock = threading.Lock()
+        self._targets: List[Any] = []
+
+    def install(self, target: Any = Session):
+        """
+        Listen for changes on a Session class, sessionmaker or session.
+
+        Args:
+            target: Anything accepted by sqlalchemy.event.listen for session events
+        """
+        if any(existing is target for existing in self._targets):
+            return
+        event.listen(target, "after_flush", self._after_flush)
+        event.listen(target, "do_orm_execute", self._on_orm_execute)
+        event.listen(target, "after_commit", self._after_commit)
+        event.listen(target, "after_transaction_end", self._after_transaction_end)
+        self._targets.append(target)
+
+    def uninstall(self, target: Any = Session):
+        """Stop listening on a previously installed target"""
+        for existing in list(self._targets):
+            if existing is target:
+                event.remove(target, "after_flush", self._after_flush)
+                event.remove(target, "do_orm_execute", self._on_orm_execute)
+                event.remove(target, "after_commit", self._after_commit)
+                event.remove(target, "after_transaction_end", self._after_transaction_end)
+                self._targets.remove(existing)
+
+    def drain(self) -> LeadChanges:
+        """Take all committed changes, leaving the tracker empty"""
+        with self._lock:
+            changes, self._changes = self._changes, LeadChanges()
+        return changes
+
+    def restore(self, changes: LeadChanges):
+        """Put changes back, e.g. after a failed re-score run"""
+        with self._lock:
+            changes.merge(self._changes)
+            self._changes = changes
+
+    def has_pending(self) -> bool:
+        with self._lock:
+            return not self._changes.is_empty()
+
+    def mark_all_dirty(self):
+        """Request a full re-score on the next run"""
+        with self._lock:
+            self._changes.full_rescore = True
+
+    # Session event handlers
+
+    def _pending(self, session: Session) -> LeadChanges:
+        return session.info.setdefault(PENDING_CHANGES_KEY, LeadChanges())
+
+    def _after_flush(self, session: Session, flush_context):
+        """Collect attribute-level changes (history is still available at this point)"""
+        pending = None
+
+        for instance in session.new:
+            if isinstance(instance, PropertyLeadDB):
+                pending = pending or self._pending(session)
+                pending.mark_lead(instance.id, COMPONENTS)
+
+        for instance in session.dirty:
+            if isinstance(instance, PropertyLeadDB):
+                components = self._changed_components(instance, LEAD_FIELD_COMPONENTS)
+                if components is not None:
+                    pending = pending or self._pending(session)
+                    pending.mark_lead(instance.id, components)
+            elif isinstance(instance, PropertyDB):
+                components = self._changed_components(instance, PROPERTY_FIELD_COMPONENTS)
+                if components:
+                    pending = pending or self._pending(session)
+                    pending.mark_property(instance.id, components)
+
+        for instance in session.deleted:
+            if isinstance(instance, PropertyLeadDB):
+                pending = pending or self._pending(session)
+                pending.deleted_leads.add(instance.id)
+
+    def _changed_components(self, instance: Any, field_components: Dict[str, FrozenSet[str]]) -> Optional[Set[str]]:
+        """Components affected by changed attributes, None if no tracked attribute changed"""
+        state = inspect(instance)
+        components = None
+        for field, affected in field_components.items():
+            if field in state.attrs and state.attrs[field].history.has_changes():
+                components = (components or set()) | affected
+        return components
+
+    def _on_orm_execute(self, orm_execute_state):
+        """Track bulk INSERT/UPDATE statements, which bypass flush events"""
+        if not (orm_execute_state.is_insert or orm_execute_state.is_update):
+            return
+        table_name = getattr(getattr(orm_execute_state.statement, "table", None), "name", None)
+        is_lead_table = table_name == PropertyLeadDB.__tablename__
+        if is_lead_table:
+            field_components = LEAD_FIELD_COMPONENTS
+        elif table_name == PropertyDB.__tablename__:
+            field_components = PROPERTY_FIELD_COMPONENTS
+        else:
+            return
+
+        parameters = orm_execute_state.parameters
+        if isinstance(parameters, dict):
+            parameters = [parameters]
+        pending = self._pending(orm_execute_state.session)
+
+        if not parameters or any("id" not in params for params in parameters):
+            # Criteria-based statement: affected rows are unknown, so unless it
+            # provably leaves scoring inputs alone, fall back to a full re-score
+            values = getattr(orm_execute_state.statement, "_values", None)
+            value_keys = {getattr(key, "key", key) for key in values} if values else None
+            if orm_execute_state.is_insert or value_keys is None or value_keys & set(field_components):
+                pending.full_rescore = True
+            return
+
+        for params in parameters:
+            if orm_execute_state.is_insert and is_lead_table:
+                pending.mark_lead(params["id"], COMPONENTS)
+                continue
+            touched = [field_components[key] for key in params if key in field_components]
+            if not touched:
+                continue
+            components = set().union(*touched)
+            if is_lead_table:
+                pending.mark_lead(params["id"], components)
+            else:
+                pending.mark_property(params["id"], components)
+
+    def _after_commit(self, session: Session):
+        pending = session.info.pop(PENDING_CHANGES_KEY, None)
+        if pending is not None and not pending.is_empty():
+            with self._lock:
+                self._changes.merge(pending)
+
+    def _after_transaction_end(self, session: Session, transaction):
+        # Anything still pending when the outermost transaction ends was rolled back
+        if transaction.parent is None:
+            session.info.pop(PENDING_CHANGES_KEY, None)
+
+
+class LeadComponentCache:
+    """Per-lead LRU memo of component score columns, bounded to max_entries leads"""
+
+    def __init__(self, max_entries: int = DEFAULT_COMPONENT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[uuid.UUID, Dict[str, float]]" = OrderedDict()
+        self._key: Optional[Tuple[Any, ...]] = None
+        self._lock = threading.Lock()
+
+    def validate(self, config: ScoringConfig):
+        """Drop memoized values if they were computed under different inputs"""
+        key = (
+            datetime.now().year,  # property age
+            tuple(sorted((str(factor), weight) for factor, weight in config.motivation_factor_weights.items()))
+        )
+        with self._lock:
+            if key != self._key:
+                self._entries.clear()
+                self._key = key
+
+    def get(self, lead_id: uuid.UUID) -> Optional[Dict[str, float]]:
+        with self._lock:
+            entry = self._entries.get(lead_id)
+            if entry is not None:
+                self._entries.move_to_end(lead_id)
+            return entry
+
+    def update(self, values: Dict[uuid.UUID, Dict[str, float]]):
+        with self._lock:
+            for lead_id, entry in values.items():
+                self._entries[lead_id] = entry
+                self._entries.move_to_end(lead_id)
+            # An evicted lead simply has all its components recomputed next time
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, lead_ids: Iterable[uuid.UUID]):
+        with self._lock:
+            for lead_id in lead_ids:
+                self._entries.pop(lead_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+lead_change_tracker = LeadChangeTracker()
+lead_component_cache = LeadComponentCache()
+
+
+class IncrementalLeadScorer:
+    """Re-scores only leads with tracked changes, recomputing only changed components"""
+
+    def __init__(
+        self,
+        db: Session,
+        tracker: LeadChangeTracker = lead_change_tracker,
+        cache: LeadComponentCache = lead_component_cache,
+        engine: Optional[LeadScoringEngine] = None
+    ):
+        self.db = db
+        self.tracker = tracker
+        self.cache = cache
+        self.engine = engine or LeadScoringEngine(db)
+
+    def rescore_pending(self, config: Optional[ScoringConfig] = None, batch_size: int = 5000) -> Dict[str, Any]:
+        """
+        Re-score leads changed since the last run.
+
+        Returns:
+            Summary with the number of leads re-scored and components recomputed/reused
+        """
+        if config is None:
+            config = self.engine.default_config
+
+        started = time.monotonic()
+        changes = self.tracker.drain()
+        summary = {
+            "mode": "incremental",
+            "leads_scored": 0,
+            "leads_failed": 0,
+            "components_recomputed": 0,
+            "components_reused": 0
+        }
+
+        try:
+            self.cache.validate(config)
+            self.cache.discard(changes.deleted_leads)
+
+            if changes.full_rescore:
+                self.cache.clear()
+                summary.update(self.engine.rescore_all_leads(config, batch_size=batch_size))
+                summary["mode"] = "full"
+                return summary
+
+            dirty = self._resolve_dirty_leads(changes)
+            lead_ids = list(dirty)
+            for offset in range(0, len(lead_ids), batch_size):
+                chunk = {lead_id: dirty[lead_id] for lead_id in lead_ids[offset:offset + batch_size]}
+                self._rescore_chunk(chunk, config, summary)
+                self.db.commit()
+        except Exception:
+            self.db.rollback()
+            self.tracker.restore(changes)
+            raise
+
+        elapsed = time.monotonic() - started
+        summary["elapsed_seconds"] = elapsed
+        summary["leads_per_second"] = summary["leads_scored"] / elapsed if elapsed > 0 else 0.0
+        return summary
+
+    def _resolve_dirty_leads(self, changes: LeadChanges) -> Dict[uuid.UUID, Set[str]]:
+        """Map property-level changes onto their leads"""
+        dirty = {
+            lead_id: set(components)
+            for lead_id, components in changes.leads.items()
+            if lead_id not in changes.deleted_leads
+        }
+        property_ids = list(changes.properties)
+        for offset in range(0, len(property_ids), 1000):
+            chunk = property_ids[offset:offset + 1000]
+            rows = self.db.query(PropertyLeadDB.id, PropertyLeadDB.property_id).filter(
+                PropertyLeadDB.property_id.in_(chunk)
+            ).all()
+            for lead_id, property_id in rows:
+                dirty.setdefault(lead_id, set()).update(changes.properties[property_id])
+        return dirty
+
+    def _rescore_chunk(self, dirty: Dict[uuid.UUID, Set[str]], config: ScoringConfig, summary: Dict[str, Any]):
+        features = self.engine.load_feature_frame([PropertyLeadDB.id.in_(list(dirty))])
+        if features.empty:
+            return
+
+        # Group leads by the set of components that must be recomputed
+        cached_rows = {}
+        groups: Dict[FrozenSet[str], List[Any]] = defaultdict(list)
+        for position, lead_id in zip(features.index, features["lead_id"]):
+            cached = self.cache.get(lead_id)
+            if cached is None:
+                needed = frozenset(MEMOIZED_COMPONENTS)
+            else:
+                needed = frozenset(dirty.get(lead_id, ())) & frozenset(MEMOIZED_COMPONENTS)
+                cached_rows[position] = cached
+            groups[needed].append(position)
+
+        columns = [column for component in COMPONENTS for column in COMPONENT_COLUMNS[component]]
+        components = pd.DataFrame(index=features.index, columns=columns, dtype=float)
+
+        for needed, positions in groups.items():
+            if needed:
+                computed = self.engine.score_components(features.loc[positions], config, sorted(needed))
+                components.loc[positions, computed.columns] = computed.to_numpy()
+                summary["components_recomputed"] += len(positions) * len(needed)
+
+            reused = [c for c in MEMOIZED_COMPONENTS if c not in needed]
+            reused_columns = [column for c in reused for column in COMPONENT_COLUMNS[c]]
+            if reused_columns:
+                components.loc[positions, reused_columns] = [
+                    [cached_rows[position][column] for column in reused_columns] for position in positions
+                ]
+                summary["components_reused"] += len(positions) * len(reused)
+
+        components["market_score"] = self.engine.score_components(features.iloc[:1], config, ["market"])["market_score"].iloc[0]
+
+        scores = self.engine.combine_scores(features, components, config)
+        summary["leads_scored"] += self.engine.persist_scores(features, scores)
+        summary["leads_failed"] += int(scores["error"].notna().sum())
+
+        memo_columns = [column for c in MEMOIZED_COMPONENTS for column in COMPONENT_COLUMNS[c]]
+        self.cache.update({
+            lead_id: dict(zip(memo_columns, values))
+            for lead_id, values in zip(features["lead_id"], components[memo_columns].to_numpy().tolist())
+        })
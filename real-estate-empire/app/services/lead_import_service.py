@@ -5,14 +5,16 @@ Handles CSV import functionality with column mapping, validation, and duplicate
 
 import csv
 import io
+import re
+import time
 import uuid
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any, Union
-from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Any, Union
+from dataclasses import dataclass, field
 from enum import Enum
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, insert
 
 from app.models.lead import (
     PropertyLeadDB, PropertyLeadCreate, LeadStatusEnum, LeadSourceEnum, ContactMethodEnum
@@ -44,6 +46,48 @@ class ImportResult:
     created_properties: List[uuid.UUID]
 
 
+@dataclass
+class ImportProgress:
+    """Progress of a chunked lead import, updated after every committed chunk."""
+    import_id: str
+    status: ImportStatusEnum = ImportStatusEnum.PENDING
+    rows_processed: int = 0
+    last_committed_row: int = 0
+    chunks_committed: int = 0
+    successful_imports: int = 0
+    failed_imports: int = 0
+    duplicates_found: int = 0
+    started_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    error: Optional[str] = None
+    _started_monotonic: float = field(default_factory=time.monotonic, init=False, repr=False)
+    _elapsed_seconds: float = field(default=0.0, init=False, repr=False)
+
+    @property
+    def rows_per_second(self) -> float:
+        """Throughput over the rows processed so far."""
+        if self._elapsed_seconds <= 0:
+            return 0.0
+        return self.rows_processed / self._elapsed_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize progress for API responses."""
+        return {
+            "import_id": self.import_id,
+            "status": self.status.value,
+            "rows_processed": self.rows_processed,
+            "last_committed_row": self.last_committed_row,
+            "chunks_committed": self.chunks_committed,
+            "successful_imports": self.successful_imports,
+            "failed_imports": self.failed_imports,
+            "duplicates_found": self.duplicates_found,
+            "rows_per_second": round(self.rows_per_second, 2),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "error": self.error
+        }
+
+
 @dataclass
 class ValidationError:
     """Validation error for a specific row."""
@@ -85,6 +129,9 @@ class ColumnMapping:
     tags: Optional[str] = None
 
 
+DEFAULT_IMPORT_CHUNK_SIZE = 1000
+
+
 class LeadImportService:
     """Service for importing leads from CSV files."""
     
@@ -262,6 +309,324 @@ class LeadImportService:
                 created_properties=[]
             )
     
+    def import_leads_chunked(
+        self,
+        csv_source: Union[str, TextIO],
+        column_mapping: ColumnMapping,
+        default_source: LeadSourceEnum = LeadSourceEnum.OTHER,
+        skip_duplicates: bool = True,
+        chunk_size: int = DEFAULT_IMPORT_CHUNK_SIZE,
+        resume_from_row: int = 0,
+        import_id: Optional[str] = None,
+        progress_callback: Optional[Callable[[ImportProgress], None]] = None
+    ) -> ImportResult:
+        """
+        Stream leads from CSV in chunks using set-based duplicate checks and bulk inserts.
+        
+        Each chunk resolves duplicate properties and leads with one query each,
+        inserts new rows with a single executemany per table and is committed on
+        its own, so a failed import can be resumed from the last committed row.
+        
+        Args:
+            csv_source: Raw CSV content or an open text stream
+            column_mapping: Column mapping configuration
+            default_source: Default source for leads if not specified
+            skip_duplicates: Whether to skip duplicate leads
+            chunk_size: Number of CSV rows processed per transaction
+            resume_from_row: Last committed row of a previous run; earlier rows are skipped
+            import_id: Identifier to report progress under (generated if omitted)
+            progress_callback: Called with an ImportProgress after every chunk
+            
+        Returns:
+            ImportResult with details of the import operation
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        
+        import_id = import_id or str(uuid.uuid4())
+        progress = ImportProgress(
+            import_id=import_id,
+            status=ImportStatusEnum.IN_PROGRESS,
+            last_committed_row=resume_from_row,
+            started_at=datetime.now()
+        )
+        errors = []
+        created_leads = []
+        created_properties = []
+        total_rows = 0
+        
+        stream = io.StringIO(csv_source) if isinstance(csv_source, str) else csv_source
+        csv_reader = csv.DictReader(stream)
+        
+        # Properties and contact keys created earlier in this import, so rows
+        # repeated across chunks are matched without another query
+        known_properties: Dict[str, uuid.UUID] = {}
+        known_contacts = set()
+        
+        try:
+            for chunk in self._iter_row_chunks(csv_reader, chunk_size, resume_from_row):
+                total_rows += len(chunk)
+                chunk_result = self._import_chunk(
+                    chunk, column_mapping, default_source, skip_duplicates,
+                    known_properties, known_contacts
+                )
+                
+                try:
+                    self.db.commit()
+                except Exception:
+                    self.db.rollback()
+                    raise
+                
+                errors.extend(chunk_result["errors"])
+                created_leads.extend(chunk_result["created_leads"])
+                created_properties.extend(chunk_result["created_properties"])
+                
+                progress.rows_processed += len(chunk)
+                progress.last_committed_row = chunk[-1][0]
+                progress.chunks_committed += 1
+                progress.successful_imports += len(chunk_result["created_leads"])
+                progress.failed_imports += len(chunk_result["errors"])
+                progress.duplicates_found += chunk_result["duplicates_found"]
+                self._touch_progress(progress, progress_callback)
+        
+        except Exception as e:
+            self.db.rollback()
+            errors.append({
+                "row": progress.last_committed_row + 1,
+                "error": f"Import stopped: {str(e)}"
+            })
+            progress.error = str(e)
+            progress.status = ImportStatusEnum.PARTIAL if created_leads else ImportStatusEnum.FAILED
+            self._touch_progress(progress, progress_callback)
+            return self._build_chunked_result(progress, total_rows, errors, created_leads, created_properties)
+        
+        if total_rows == 0:
+            errors.append({"error": "No data rows found in CSV"})
+            progress.status = ImportStatusEnum.FAILED
+        elif not created_leads:
+            progress.status = ImportStatusEnum.FAILED
+        elif progress.failed_imports == 0:
+            progress.status = ImportStatusEnum.COMPLETED
+        else:
+            progress.status = ImportStatusEnum.PARTIAL
+        
+        self._touch_progress(progress, progress_callback)
+        return self._build_chunked_result(progress, total_rows, errors, created_leads, created_properties)
+    
+    def _iter_row_chunks(
+        self,
+        csv_reader: Iterable[Dict[str, str]],
+        chunk_size: int,
+        resume_from_row: int
+    ) -> Iterator[List[Tuple[int, Dict[str, str]]]]:
+        """Yield (row_number, row) chunks, skipping rows already committed."""
+        chunk = []
+        for row_index, row in enumerate(csv_reader, start=2):  # Start at 2 (header is row 1)
+            if row_index <= resume_from_row:
+                continue
+            chunk.append((row_index, row))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    
+    def _import_chunk(
+        self,
+        chunk: List[Tuple[int, Dict[str, str]]],
+        column_mapping: ColumnMapping,
+        default_source: LeadSourceEnum,
+        skip_duplicates: bool,
+        known_properties: Dict[str, uuid.UUID],
+        known_contacts: set
+    ) -> Dict[str, Any]:
+        """
+        Validate, de-duplicate and bulk insert one chunk of CSV rows.
+        
+        Args:
+            chunk: List of (row_number, row) tuples
+            column_mapping: Column mapping configuration
+            default_source: Default source for leads if not specified
+            skip_duplicates: Whether to skip duplicate leads
+            known_properties: Address key -> property ID cache shared across chunks
+            known_contacts: Lead contact keys already present, shared across chunks
+            
+        Returns:
+            Dictionary with created IDs, errors and duplicate count for the chunk
+        """
+        errors = []
+        parsed_rows = []
+        
+        for row_index, row in chunk:
+            try:
+                property_data = self._extract_property_data(row, column_mapping, row_index)
+                if not property_data:
+                    continue
+                property_row = PropertyCreate(**property_data).dict()
+                lead_data = self._extract_lead_data(row, column_mapping, None, default_source, row_index)
+                if not lead_data:
+                    continue
+                parsed_rows.append((row_index, row, property_row, lead_data))
+            except Exception as e:
+                errors.append({"row": row_index, "error": str(e), "data": row})
+        
+        # One query resolves every address in the chunk that is not already known
+        unresolved = [
+            property_row for _, _, property_row, _ in parsed_rows
+            if self._address_key(property_row) not in known_properties
+        ]
+        existing_properties = self._find_duplicate_properties(unresolved)
+        known_properties.update(existing_properties)
+        
+        if skip_duplicates and existing_properties:
+            known_contacts.update(self._find_existing_contact_keys(list(existing_properties.values())))
+        
+        new_properties = []
+        new_leads = []
+        duplicates_found = 0
+        
+        for row_index, row, property_row, lead_data in parsed_rows:
+            try:
+                address_key = self._address_key(property_row)
+                property_id = known_properties.get(address_key)
+                is_new_property = property_id is None
+                if is_new_property:
+                    property_id = uuid.uuid4()
+                
+                lead_data["property_id"] = property_id
+                contact_keys = self._lead_contact_keys(property_id, lead_data)
+                if skip_duplicates and not is_new_property and contact_keys & known_contacts:
+                    duplicates_found += 1
+                    continue
+                
+                lead_row = PropertyLeadCreate(**lead_data).dict()
+                lead_row["id"] = uuid.uuid4()
+                
+                if is_new_property:
+                    property_row["id"] = property_id
+                    new_properties.append(property_row)
+                    known_properties[address_key] = property_id
+                new_leads.append(lead_row)
+                known_contacts.update(contact_keys)
+                
+            except Exception as e:
+                errors.append({"row": row_index, "error": str(e), "data": row})
+        
+        # IDs are generated client-side, so each table needs a single executemany
+        if new_properties:
+            self.db.execute(insert(PropertyDB), new_properties)
+        if new_leads:
+            self.db.execute(insert(PropertyLeadDB), new_leads)
+        
+        return {
+            "errors": errors,
+            "duplicates_found": duplicates_found,
+            "created_properties": [row["id"] for row in new_properties],
+            "created_leads": [row["id"] for row in new_leads]
+        }
+    
+    def _find_duplicate_properties(self, property_rows: List[Dict[str, Any]]) -> Dict[str, uuid.UUID]:
+        """
+        Find existing properties for a batch of addresses with a single query.
+        
+        Candidates are narrowed with an IN over ZIP codes and matched on the
+        normalized address key, so formatting differences still de-duplicate.
+        
+        Args:
+            property_rows: Property data dictionaries
+            
+        Returns:
+            Mapping of address key to existing property ID
+        """
+        wanted = {self._address_key(row) for row in property_rows}
+        zip_codes = {row["zip_code"] for row in property_rows}
+        if not wanted:
+            return {}
+        
+        candidates = self.db.query(
+            PropertyDB.id, PropertyDB.address, PropertyDB.city, PropertyDB.state, PropertyDB.zip_code
+        ).filter(PropertyDB.zip_code.in_(zip_codes)).all()
+        
+        matches = {}
+        for candidate in candidates:
+            key = self._address_key({
+                "address": candidate.address,
+                "city": candidate.city,
+                "state": candidate.state,
+                "zip_code": candidate.zip_code
+            })
+            if key in wanted and key not in matches:
+                matches[key] = candidate.id
+        return matches
+    
+    def _find_existing_contact_keys(self, property_ids: List[uuid.UUID]) -> set:
+        """Load contact keys of existing leads on the given properties in one query."""
+        if not property_ids:
+            return set()
+        
+        leads = self.db.query(
+            PropertyLeadDB.property_id, PropertyLeadDB.owner_email, PropertyLeadDB.owner_phone
+        ).filter(PropertyLeadDB.property_id.in_(property_ids)).all()
+        
+        keys = set()
+        for lead in leads:
+            keys |= self._lead_contact_keys(lead.property_id, {
+                "owner_email": lead.owner_email,
+                "owner_phone": lead.owner_phone
+            })
+        return keys
+    
+    def _lead_contact_keys(self, property_id: uuid.UUID, lead_data: Dict[str, Any]) -> set:
+        """Contact keys used to detect duplicate leads on a property."""
+        keys = set()
+        if lead_data.get("owner_email"):
+            keys.add((property_id, "email", lead_data["owner_email"].lower()))
+        if lead_data.get("owner_phone"):
+            keys.add((property_id, "phone", lead_data["owner_phone"]))
+        return keys
+    
+    def _address_key(self, property_data: Dict[str, Any]) -> str:
+        """Normalized address key used for duplicate property detection."""
+        parts = [
+            property_data.get("address") or "",
+            property_data.get("city") or "",
+            property_data.get("state") or "",
+            property_data.get("zip_code") or ""
+        ]
+        return "|".join(re.sub(r"[^a-z0-9]+", " ", part.lower()).strip() for part in parts)
+    
+    def _touch_progress(
+        self,
+        progress: ImportProgress,
+        progress_callback: Optional[Callable[[ImportProgress], None]]
+    ) -> None:
+        """Refresh progress timing and notify the callback."""
+        progress.updated_at = datetime.now()
+        progress._elapsed_seconds = time.monotonic() - progress._started_monotonic
+        if progress_callback:
+            progress_callback(progress)
+    
+    def _build_chunked_result(
+        self,
+        progress: ImportProgress,
+        total_rows: int,
+        errors: List[Dict[str, Any]],
+        created_leads: List[uuid.UUID],
+        created_properties: List[uuid.UUID]
+    ) -> ImportResult:
+        """Build an ImportResult from the final progress of a chunked import."""
+        return ImportResult(
+            total_rows=total_rows,
+            successful_imports=len(created_leads),
+            failed_imports=len(errors) if progress.error else progress.failed_imports,
+            duplicates_found=progress.duplicates_found,
+            errors=errors,
+            status=progress.status,
+            import_id=progress.import_id,
+            created_leads=created_leads,
+            created_properties=created_properties
+        )
+    
     def _suggest_column_mapping(self, headers: List[str]) -> Dict[str, str]:
         """
         Suggest column mappings based on header names.
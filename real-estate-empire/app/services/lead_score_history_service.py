@@ -0,0 +1,342 @@
+"""
+Lead Score History Service
+
+Appends every persisted lead score to an append-only history table and keeps
+per-day rollups (counts per deal potential, score sums, motivation factor
+counts, distinct leads and conversions) up to date in the same transaction.
+Scoring analytics for any period are then read from a handful of
+pre-aggregated rows. Rollup rows are written with an atomic upsert, so
+concurrent writers creating the same day's bucket do not collide.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+from datetime import date, datetime
+import logging
+import uuid
+
+import pandas as pd
+from sqlalchemy import insert, select, update, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.lead_scoring import (
+    LeadScore, DealPotentialEnum, MotivationFactorEnum, ScoringAnalytics,
+    LeadScoreHistoryDB, LeadScoreDailyRollupDB, LeadScoreFactorRollupDB
+)
+from app.models.lead import LeadStatusEnum
+
+logger = logging.getLogger(__name__)
+
+# Lead statuses counted as a conversion
+CONVERTED_STATUSES = {LeadStatusEnum.UNDER_CONTRACT.value, LeadStatusEnum.CLOSED.value}
+
+# Dialects whose INSERT supports ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# Lead ids per query when looking up the previous latest scores
+LEAD_LOOKUP_CHUNK = 1000
+
+HISTORY_SCORE_COLUMNS = [
+    "overall_score", "confidence_score", "motivation_score", "financial_score",
+    "property_score", "market_score", "owner_score"
+]
+
+
+def _potential_prefix(deal_potential: str) -> str:
+    """Column prefix used for a deal potential in the daily rollup"""
+    return DealPotentialEnum(deal_potential).name.lower()
+
+
+class LeadScoreHistoryService:
+    """Service for recording lead score history and reading scoring analytics"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_scores(self, lead_scores: Sequence[LeadScore]) -> int:
+        """
+        Append LeadScore objects to the score history.
+
+        Args:
+            lead_scores: Scores to record; each is bucketed by its scored_at
+
+        Returns:
+            Number of history rows written
+        """
+        rows = []
+        for lead_score in lead_scores:
+            row = {column: getattr(lead_score, column) for column in HISTORY_SCORE_COLUMNS}
+            row.update({
+                "id": uuid.uuid4(),
+                "lead_id": lead_score.lead_id,
+                "scored_at": lead_score.scored_at,
+                "deal_potential": DealPotentialEnum(lead_score.deal_potential).value,
+                "motivation_factors": sorted({
+                    MotivationFactorEnum(indicator.factor).value
+                    for indicator in lead_score.motivation_indicators
+                }),
+                "scoring_version": lead_score.scoring_version
+            })
+            rows.append(row)
+        return self._append(rows)
+
+    def record_score_frame(
+        self,
+        features: pd.DataFrame,
+        scores: pd.DataFrame,
+        scored_at: Optional[datetime] = None,
+        scoring_version: str = "1.0"
+    ) -> int:
+        """
+        Append the valid rows of a LeadScoringEngine score frame to the score history.
+
+        Returns:
+            Number of history rows written
+        """
+        if scored_at is None:
+            scored_at = datetime.now()
+
+        valid = scores["error"].isna()
+        if not valid.any():
+            return 0
+
+        history = scores.loc[valid, HISTORY_SCORE_COLUMNS + ["deal_potential"]].astype(object)
+        history["lead_id"] = features.loc[valid, "lead_id"]
+        history["scored_at"] = scored_at
+        history["scoring_version"] = scoring_version
+        history["motivation_factors"] = [
+            self._frame_factors(explicit, behind, repair)
+            for explicit, behind, repair in zip(
+                features.loc[valid, "motivation_factors"],
+                features.loc[valid, "behind_on_payments"],
+                features.loc[valid, "repair_needed"]
+            )
+        ]
+        history["id"] = [uuid.uuid4() for _ in range(len(history))]
+        return self._append(history.to_dict("records"))
+
+    def _frame_factors(self, explicit: List[str], behind_on_payments: bool, repair_needed: bool) -> List[str]:
+        """Motivation factors behind a score (mirrors the scoring service's indicator detection)"""
+        factors = {MotivationFactorEnum(factor.lower().replace(' ', '_')).value for factor in explicit}
+        if behind_on_payments:
+            factors.add(MotivationFactorEnum.FINANCIAL_DISTRESS.value)
+        if repair_needed:
+            factors.add(MotivationFactorEnum.PROPERTY_CONDITION.value)
+        return sorted(factors)
+
+    def _append(self, rows: List[Dict[str, Any]]) -> int:
+        """Insert history rows and fold them into the daily rollups"""
+        if not rows:
+            return 0
+
+        for row in rows:
+            row["converted"] = False
+
+        # Read each lead's previous latest score before the new rows land
+        lead_moves = self._latest_score_moves(rows)
+        self.db.execute(insert(LeadScoreHistoryDB), rows)
+
+        frame = pd.DataFrame(rows, columns=["scored_at", "overall_score", "deal_potential", "motivation_factors"])
+        frame["bucket_date"] = pd.to_datetime(frame["scored_at"]).dt.date
+
+        daily = {}
+        potential_counts = pd.crosstab(frame["bucket_date"], frame["deal_potential"])
+        totals = frame.groupby("bucket_date")["overall_score"].agg(["count", "sum"])
+        for bucket_date, total in totals.iterrows():
+            increments = {"scored_count": int(total["count"]), "score_sum": float(total["sum"])}
+            for deal_potential, count in potential_counts.loc[bucket_date].items():
+                if count:
+                    increments[f"{_potential_prefix(deal_potential)}_count"] = int(count)
+            daily[bucket_date] = increments
+        for (bucket_date, column), change in lead_moves.items():
+            increments = daily.setdefault(bucket_date, {})
+            increments[column] = increments.get(column, 0) + change
+
+        for bucket_date, increments in daily.items():
+            increments = {name: value for name, value in increments.items() if value}
+            if increments:
+                self._increment_daily(bucket_date, increments)
+
+        factors = frame[["bucket_date", "motivation_factors"]].explode("motivation_factors").dropna()
+        for (bucket_date, factor), count in factors.groupby(["bucket_date", "motivation_factors"]).size().items():
+            self._increment_factor(bucket_date, factor, int(count))
+
+        return len(rows)
+
+    def _latest_score_moves(self, rows: List[Dict[str, Any]]) -> Dict[Any, int]:
+        """
+        Changes to the distinct-lead counts when these rows are recorded.
+
+        Each lead is counted once, in the day and deal potential of its latest
+        score. A newer score moves the lead out of its previous bucket and into
+        the new one; an older (backfilled) score leaves it where it is. A
+        converted lead takes its conversion along, and its new latest row is
+        flagged converted, so each bucket's conversions are a subset of its leads.
+        """
+        batch = pd.DataFrame(rows, columns=["lead_id", "scored_at", "deal_potential"])
+        batch["scored_at"] = pd.to_datetime(batch["scored_at"])
+        batch = batch.sort_values("scored_at", kind="stable").drop_duplicates("lead_id", keep="last")
+
+        lead_ids = batch["lead_id"].tolist()
+        previous = {}
+        for start in range(0, len(lead_ids), LEAD_LOOKUP_CHUNK):
+            ranked = select(
+                LeadScoreHistoryDB.lead_id, LeadScoreHistoryDB.scored_at, LeadScoreHistoryDB.deal_potential,
+                LeadScoreHistoryDB.converted,
+                func.row_number().over(
+                    partition_by=LeadScoreHistoryDB.lead_id,
+                    order_by=(LeadScoreHistoryDB.scored_at.desc(), LeadScoreHistoryDB.id.desc())
+                ).label("score_rank")
+            ).where(LeadScoreHistoryDB.lead_id.in_(lead_ids[start:start + LEAD_LOOKUP_CHUNK])).subquery()
+            for row in self.db.execute(select(ranked).where(ranked.c.score_rank == 1)):
+                previous[row.lead_id] = row
+
+        moves = {}
+        for position, lead_id, scored_at, deal_potential in batch.itertuples():
+            latest = previous.get(lead_id)
+            if latest is not None and pd.Timestamp(latest.scored_at) > scored_at:
+                continue
+            columns = ["leads"]
+            if latest is not None:
+                if latest.converted:
+                    columns.append("converted")
+                    rows[position]["converted"] = True
+                for column in columns:
+                    key = (latest.scored_at.date(), f"{_potential_prefix(latest.deal_potential)}_{column}")
+                    moves[key] = moves.get(key, 0) - 1
+            for column in columns:
+                key = (scored_at.date(), f"{_potential_prefix(deal_potential)}_{column}")
+                moves[key] = moves.get(key, 0) + 1
+        return moves
+
+    def _increment_daily(self, bucket_date: date, increments: Dict[str, Any]):
+        """Add to a daily rollup row, creating it on first use"""
+        self._upsert(LeadScoreDailyRollupDB, {"bucket_date": bucket_date}, increments, self._zero_daily())
+
+    def _zero_daily(self) -> Dict[str, Any]:
+        values = {"scored_count": 0, "score_sum": 0.0}
+        for potential in DealPotentialEnum:
+            prefix = _potential_prefix(potential.value)
+            values[f"{prefix}_count"] = 0
+            values[f"{prefix}_leads"] = 0
+            values[f"{prefix}_converted"] = 0
+        return values
+
+    def _increment_factor(self, bucket_date: date, factor: str, count: int):
+        """Add to a motivation factor rollup row, creating it on first use"""
+        self._upsert(LeadScoreFactorRollupDB, {"bucket_date": bucket_date, "factor": factor}, {"count": count}, {})
+
+    def _upsert(self, model, key: Dict[str, Any], increments: Dict[str, Any], defaults: Dict[str, Any]):
+        """
+        Add increments to the rollup row identified by key, creating it if missing.
+
+        PostgreSQL and SQLite use a single INSERT ... ON CONFLICT DO UPDATE. Other
+        databases update first, insert on a miss inside a savepoint, and retry
+        the update if a concurrent writer created the row in between.
+        """
+        columns = model.__table__.c
+        values = {**defaults, **increments, **key}
+        additions = {name: columns[name] + value for name, value in increments.items()}
+
+        dialect_insert = UPSERT_INSERTS.get(self.db.get_bind().dialect.name)
+        if dialect_insert is not None:
+            statement = dialect_insert(model).values(values)
+            self.db.execute(statement.on_conflict_do_update(index_elements=list(key), set_=additions))
+            return
+
+        matches = [columns[name] == value for name, value in key.items()]
+        for _ in range(2):
+            if self.db.execute(update(model).where(*matches).values(additions)).rowcount:
+                return
+            try:
+                with self.db.begin_nested():
+                    self.db.execute(insert(model).values(values))
+                return
+            except IntegrityError:
+                logger.info(f"Rollup row {key} was created concurrently; retrying the update")
+        raise RuntimeError(f"Could not update rollup row {key}")
+
+    def record_conversion(self, lead_id: uuid.UUID) -> bool:
+        """
+        Attribute a lead conversion to the day and deal potential of its latest score.
+
+        The latest score is flagged converted, so later re-scores move the
+        conversion with the lead and a repeated conversion is counted once.
+
+        Returns:
+            False if the lead has never been scored
+        """
+        latest = self.db.query(LeadScoreHistoryDB).filter(
+            LeadScoreHistoryDB.lead_id == lead_id
+        ).order_by(LeadScoreHistoryDB.scored_at.desc(), LeadScoreHistoryDB.id.desc()).first()
+
+        if latest is None:
+            return False
+        if latest.converted:
+            return True
+
+        latest.converted = True
+        self._increment_daily(latest.scored_at.date(), {f"{_potential_prefix(latest.deal_potential)}_converted": 1})
+        return True
+
+    def get_analytics(
+        self,
+        period_start: datetime,
+        period_end: datetime,
+        top_factor_count: int = 10
+    ) -> ScoringAnalytics:
+        """Aggregate daily rollups covering [period_start, period_end] into ScoringAnalytics"""
+        start_date, end_date = period_start.date(), period_end.date()
+        columns = LeadScoreDailyRollupDB.__table__.c
+        summed = [
+            column.name for column in columns
+            if column.name not in ("bucket_date", "updated_at")
+        ]
+
+        totals = self.db.query(*[
+            func.coalesce(func.sum(columns[name]), 0).label(name) for name in summed
+        ]).filter(
+            LeadScoreDailyRollupDB.bucket_date >= start_date,
+            LeadScoreDailyRollupDB.bucket_date <= end_date
+        ).one()._asdict()
+
+        scored_count = int(totals["scored_count"])
+        score_distribution = {}
+        conversion_rates = {}
+        for potential in DealPotentialEnum:
+            prefix = _potential_prefix(potential.value)
+            count = int(totals[f"{prefix}_count"])
+            score_distribution[potential] = count
+            leads = int(totals[f"{prefix}_leads"])
+            if leads:
+                conversion_rates[potential] = int(totals[f"{prefix}_converted"]) / leads
+
+        factor_rows = self.db.query(
+            LeadScoreFactorRollupDB.factor,
+            func.sum(LeadScoreFactorRollupDB.count).label("count")
+        ).filter(
+            LeadScoreFactorRollupDB.bucket_date >= start_date,
+            LeadScoreFactorRollupDB.bucket_date <= end_date
+        ).group_by(LeadScoreFactorRollupDB.factor).order_by(
+            func.sum(LeadScoreFactorRollupDB.count).desc()
+        ).limit(top_factor_count).all()
+
+        top_motivation_factors = [
+            {
+                "factor": row.factor,
+                "count": int(row.count),
+                "percentage": (int(row.count) / scored_count * 100) if scored_count else 0.0
+            }
+            for row in factor_rows
+        ]
+
+        return ScoringAnalytics(
+            total_leads_scored=scored_count,
+            average_score=float(totals["score_sum"]) / scored_count if scored_count else 0.0,
+            score_distribution=score_distribution,
+            top_motivation_factors=top_motivation_factors,
+            conversion_rates=conversion_rates,
+            period_start=period_start,
+            period_end=period_end
+        )
@@ -0,0 +1,753 @@
+"""
+Lead Scoring Engine
+
+Columnar counterpart of LeadScoringService.score_lead. Leads are turned into a
+feature frame once and every component score, the overall score, deal
+potential, confidence and priority are computed as NumPy array operations.
+Pydantic LeadScore objects are only built for the rows a caller returns.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from types import SimpleNamespace
+from datetime import datetime
+import asyncio
+import logging
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.lead_scoring import (
+    LeadScore, ScoringConfig, MotivationFactorEnum, DealPotentialEnum,
+    LeadScoringBatchResult
+)
+from app.models.lead import PropertyLeadDB
+from app.models.property import PropertyDB
+from app.services.lead_scoring_service import LeadScoringService
+from app.services.lead_score_history_service import LeadScoreHistoryService
+
+logger = logging.getLogger(__name__)
+
+MOTIVATION_FACTORS: List[MotivationFactorEnum] = list(MotivationFactorEnum)
+FACTOR_COLUMNS: List[str] = [f"factor_{factor.value}" for factor in MOTIVATION_FACTORS]
+
+# Confidence and weight given to each detected motivation indicator
+# (mirrors LeadScoringService._analyze_motivation_indicators)
+EXPLICIT_FACTOR_CONFIDENCE, EXPLICIT_FACTOR_WEIGHT = 0.8, 8.0
+PAYMENT_DISTRESS_CONFIDENCE, PAYMENT_DISTRESS_WEIGHT = 0.9, 10.0
+REPAIR_CONDITION_CONFIDENCE, REPAIR_CONDITION_WEIGHT = 0.7, 6.0
+
+PROPERTY_CONDITION_CONFIDENCE = 0.6
+
+# Component scores and the columns each one produces
+COMPONENT_COLUMNS: Dict[str, List[str]] = {
+    "motivation": ["motivation_score", "indicator_count", "indicator_confidence"],
+    "property": ["property_score"],
+    "market": ["market_score"],
+    "financial": ["financial_score"],
+    "owner": ["owner_score"]
+}
+COMPONENTS: List[str] = list(COMPONENT_COLUMNS)
+COMPONENT_SCORE_COLUMNS: List[str] = [f"{component}_score" for component in COMPONENTS]
+
+SCORE_COLUMNS = [
+    "motivation_score", "property_score", "market_score", "financial_score",
+    "owner_score", "overall_score", "deal_potential", "confidence_score",
+    "priority_level", "estimated_close_probability", "estimated_profit_potential"
+]
+
+
+class LeadScoringEngine:
+    """Vectorized batch scoring of leads"""
+
+    def __init__(
+        self,
+        db: Session = None,
+        scoring_service: Optional[LeadScoringService] = None,
+        record_history: bool = True
+    ):
+        self.db = db
+        self.record_history = record_history
+        self.scoring_service = scoring_service or LeadScoringService(db)
+        self.default_config = self.scoring_service.default_config
+
+    # Feature extraction
+
+    def build_feature_frame(self, leads: Sequence[PropertyLeadDB]) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+        """
+        Build a feature frame from lead objects.
+
+        Returns:
+            Tuple of (feature frame, per-lead extraction errors)
+        """
+        rows = []
+        errors = []
+
+        for lead in leads:
+            try:
+                property_record = getattr(lead, 'property', None)
+                rows.append(self._feature_row(
+                    lead_id=lead.id or uuid.uuid4(),
+                    property_id=getattr(property_record, 'id', None),
+                    motivation_factors=getattr(lead, 'motivation_factors', None),
+                    behind_on_payments=getattr(lead, 'behind_on_payments', False),
+                    repair_needed=getattr(lead, 'repair_needed', False),
+                    estimated_repair_cost=getattr(lead, 'estimated_repair_cost', None),
+                    year_built=getattr(property_record, 'year_built', None) if property_record else None,
+                    asking_price=getattr(lead, 'asking_price', None),
+                    mortgage_balance=getattr(lead, 'mortgage_balance', None),
+                    monthly_payment=getattr(lead, 'monthly_payment', None),
+                    contact_attempts=getattr(lead, 'contact_attempts', 0)
+                ))
+            except Exception as e:
+                errors.append({
+                    "lead_id": str(lead.id) if getattr(lead, 'id', None) else "unknown",
+                    "error": str(e),
+                    "timestamp": datetime.now()
+                })
+
+        return self._to_frame(rows), errors
+
+    def load_feature_frame(
+        self,
+        criteria: Optional[Sequence[Any]] = None,
+        after_id: Optional[uuid.UUID] = None,
+        limit: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Load a feature frame straight from the database without building ORM objects.
+
+        Args:
+            criteria: Optional filter expressions on PropertyLeadDB
+            after_id: Only load leads with an id greater than this (keyset pagination)
+            limit: Maximum number of leads to load, ordered by id
+        """
+        query = self.db.query(*self._feature_query_columns()).outerjoin(
+            PropertyDB, PropertyDB.id == PropertyLeadDB.property_id
+        )
+        if criteria:
+            query = query.filter(*criteria)
+        if after_id is not None:
+            query = query.filter(PropertyLeadDB.id > after_id)
+        query = query.order_by(PropertyLeadDB.id)
+        if limit is not None:
+            query = query.limit(limit)
+
+        rows = [self._feature_row(**record._asdict()) for record in query.all()]
+        return self._to_frame(rows)
+
+    def _feature_query_columns(self) -> List[Any]:
+        """Columns selected when loading features from the database"""
+        return [
+            PropertyLeadDB.id.label("lead_id"),
+            PropertyLeadDB.property_id,
+            PropertyLeadDB.motivation_factors,
+            PropertyLeadDB.behind_on_payments,
+            PropertyLeadDB.repair_needed,
+            PropertyLeadDB.estimated_repair_cost,
+            PropertyDB.year_built,
+            PropertyLeadDB.asking_price,
+            PropertyLeadDB.mortgage_balance,
+            PropertyLeadDB.monthly_payment,
+            PropertyLeadDB.contact_attempts
+        ]
+
+    def _feature_row(
+        self,
+        lead_id: uuid.UUID,
+        property_id: Optional[uuid.UUID],
+        motivation_factors: Optional[List[str]],
+        behind_on_payments: Optional[bool],
+        repair_needed: Optional[bool],
+        estimated_repair_cost: Optional[float],
+        year_built: Optional[int],
+        asking_price: Optional[float],
+        mortgage_balance: Optional[float],
+        monthly_payment: Optional[float],
+        contact_attempts: Optional[int]
+    ) -> Dict[str, Any]:
+        """Flatten one lead into feature values, applying score_lead's truthiness rules"""
+        factor_counts = dict.fromkeys(FACTOR_COLUMNS, 0)
+        explicit_factors = []
+        for indicator_str in motivation_factors or []:
+            try:
+                factor = MotivationFactorEnum(indicator_str.lower().replace(' ', '_'))
+            except ValueError:
+                continue
+            factor_counts[f"factor_{factor.value}"] += 1
+            explicit_factors.append(indicator_str)
+
+        return {
+            "lead_id": lead_id,
+            "property_id": property_id,
+            "motivation_factors": explicit_factors,
+            "behind_on_payments": bool(behind_on_payments),
+            "repair_needed": bool(repair_needed),
+            "estimated_repair_cost": float(estimated_repair_cost) if estimated_repair_cost else np.nan,
+            "year_built": float(year_built) if year_built else np.nan,
+            "asking_price": float(asking_price) if asking_price else np.nan,
+            "mortgage_balance": float(mortgage_balance) if mortgage_balance else np.nan,
+            "monthly_payment": float(monthly_payment) if monthly_payment else np.nan,
+            "contact_attempts": int(contact_attempts) if contact_attempts else 0,
+            **factor_counts
+        }
+
+    def _to_frame(self, rows: List[Dict[str, Any]]) -> pd.DataFrame:
+        """Create a feature frame with a stable column layout"""
+        columns = [
+            "lead_id", "property_id", "motivation_factors", "behind_on_payments",
+            "repair_needed", "estimated_repair_cost", "year_built", "asking_price",
+            "mortgage_balance", "monthly_payment", "contact_attempts"
+        ] + FACTOR_COLUMNS
+        return pd.DataFrame(rows, columns=columns)
+
+    # Scoring
+
+    def score_frame(self, features: pd.DataFrame, config: Optional[ScoringConfig] = None) -> pd.DataFrame:
+        """
+        Score every lead in a feature frame.
+
+        Returns:
+            Frame indexed like the input with component scores, overall score,
+            deal potential, confidence, priority, close probability, profit
+            potential and a validation error column (None for valid rows)
+        """
+        if config is None:
+            config = self.default_config
+
+        components = self.score_components(features, config)
+        return self.combine_scores(features, components, config)
+
+    def score_components(
+        self,
+        features: pd.DataFrame,
+        config: Optional[ScoringConfig] = None,
+        components: Optional[Sequence[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Compute component scores for a feature frame.
+
+        Args:
+            features: Feature frame
+            config: Scoring configuration (default config if omitted)
+            components: Components to compute (all of COMPONENTS if omitted)
+
+        Returns:
+            Frame with the columns of the requested components (see COMPONENT_COLUMNS)
+        """
+        if config is None:
+            config = self.default_config
+        if components is None:
+            components = COMPONENTS
+
+        result = pd.DataFrame(index=features.index)
+        if "motivation" in components:
+            motivation_score, indicator_count, indicator_confidence = self._motivation_scores(features, config)
+            result["motivation_score"] = motivation_score
+            result["indicator_count"] = indicator_count
+            result["indicator_confidence"] = indicator_confidence
+        if "property" in components:
+            result["property_score"] = self._property_scores(features, self._property_condition(features))
+        if "market" in components:
+            result["market_score"] = self._market_scores(len(features))
+        if "financial" in components:
+            result["financial_score"] = self._financial_scores(features)
+        if "owner" in components:
+            result["owner_score"] = self._owner_scores(features)
+        return result
+
+    def combine_scores(
+        self,
+        features: pd.DataFrame,
+        components: pd.DataFrame,
+        config: Optional[ScoringConfig] = None
+    ) -> pd.DataFrame:
+        """
+        Derive overall score, deal potential, confidence, priority and estimates
+        from a full set of component columns.
+        """
+        if config is None:
+            config = self.default_config
+
+        scores = components[COMPONENT_SCORE_COLUMNS].copy()
+        indicator_count = components["indicator_count"].to_numpy(dtype=float)
+        indicator_confidence = components["indicator_confidence"].to_numpy(dtype=float)
+
+        weights = config.weights
+        overall = (
+            scores["motivation_score"].to_numpy() * (weights.motivation_weight / 100) +
+            scores["financial_score"].to_numpy() * (weights.financial_weight / 100) +
+            scores["property_score"].to_numpy() * (weights.property_weight / 100) +
+            scores["market_score"].to_numpy() * (weights.market_weight / 100) +
+            scores["owner_score"].to_numpy() * (weights.owner_weight / 100)
+        )
+        overall = np.clip(overall, 0.0, 100.0)
+        scores["overall_score"] = overall
+
+        scores["deal_potential"] = np.select(
+            [
+                overall >= config.excellent_threshold,
+                overall >= config.good_threshold,
+                overall >= config.fair_threshold,
+                overall >= config.poor_threshold
+            ],
+            [
+                DealPotentialEnum.EXCELLENT.value,
+                DealPotentialEnum.GOOD.value,
+                DealPotentialEnum.FAIR.value,
+                DealPotentialEnum.POOR.value
+            ],
+            default=DealPotentialEnum.VERY_POOR.value
+        )
+
+        # Property condition, market, financial and owner sub-analyses are always present
+        has_indicators = indicator_count > 0
+        avg_indicator_confidence = np.divide(
+            indicator_confidence, indicator_count,
+            out=np.zeros_like(indicator_confidence), where=has_indicators
+        )
+        completeness = np.where(has_indicators, 5.0, 4.0) / 5.0
+        scores["confidence_score"] = np.where(
+            has_indicators,
+            (avg_indicator_confidence + PROPERTY_CONDITION_CONFIDENCE + completeness) / 3,
+            (PROPERTY_CONDITION_CONFIDENCE + completeness) / 2
+        )
+
+        scores["priority_level"] = np.select(
+            [overall >= 80, overall >= 60, overall >= 40],
+            ["urgent", "high", "medium"],
+            default="low"
+        )
+
+        close_probability = (
+            overall / 100.0 +
+            np.where(scores["motivation_score"].to_numpy() > 70, 0.1, 0.0) +
+            np.where(scores["market_score"].to_numpy() > 60, 0.05, 0.0)
+        )
+        scores["estimated_close_probability"] = np.clip(close_probability, 0.0, 1.0)
+        scores["estimated_profit_potential"] = self._profit_potential(features)
+        scores["error"] = self._validation_errors(features)
+
+        return scores
+
+    def _motivation_scores(self, features: pd.DataFrame, config: ScoringConfig) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Motivation score plus indicator count and summed confidence per lead"""
+        factor_weights = np.array([
+            config.motivation_factor_weights.get(factor, 5.0) for factor in MOTIVATION_FACTORS
+        ])
+        counts = features[FACTOR_COLUMNS].to_numpy(dtype=float)
+        behind = features["behind_on_payments"].to_numpy(dtype=bool)
+        repair = features["repair_needed"].to_numpy(dtype=bool)
+
+        distress_weight = config.motivation_factor_weights.get(MotivationFactorEnum.FINANCIAL_DISTRESS, 5.0)
+        condition_weight = config.motivation_factor_weights.get(MotivationFactorEnum.PROPERTY_CONDITION, 5.0)
+
+        weighted = counts @ (factor_weights * EXPLICIT_FACTOR_CONFIDENCE * EXPLICIT_FACTOR_WEIGHT)
+        weighted += behind * distress_weight * PAYMENT_DISTRESS_CONFIDENCE * PAYMENT_DISTRESS_WEIGHT
+        weighted += repair * condition_weight * REPAIR_CONDITION_CONFIDENCE * REPAIR_CONDITION_WEIGHT
+
+        total_weight = counts @ factor_weights + behind * distress_weight + repair * condition_weight
+
+        raw_score = np.divide(
+            weighted, total_weight,
+            out=np.zeros_like(weighted), where=total_weight != 0
+        ) * 10
+
+        indicator_count = counts.sum(axis=1) + behind + repair
+        indicator_confidence = (
+            counts.sum(axis=1) * EXPLICIT_FACTOR_CONFIDENCE +
+            behind * PAYMENT_DISTRESS_CONFIDENCE +
+            repair * REPAIR_CONDITION_CONFIDENCE
+        )
+        return np.clip(raw_score, 0.0, 100.0), indicator_count, indicator_confidence
+
+    def _property_condition(self, features: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Condition sub-scores (mirrors LeadScoringService._analyze_property_condition)"""
+        n = len(features)
+        age = datetime.now().year - features["year_built"].to_numpy(dtype=float)
+        repair = features["repair_needed"].to_numpy(dtype=bool)
+        cost = np.where(repair, features["estimated_repair_cost"].to_numpy(dtype=float), np.nan)
+
+        overall = np.full(n, 75.0)
+        structural = np.full(n, 75.0)
+        cosmetic = np.full(n, 75.0)
+        systems = np.full(n, 75.0)
+
+        very_old = age > 50
+        old = ~very_old & (age > 30)
+        aging = ~very_old & ~old & (age > 15)
+        overall -= np.where(very_old, 20, 0) + np.where(old, 10, 0)
+        structural -= np.where(very_old, 25, 0)
+        systems -= np.where(very_old, 30, 0) + np.where(old, 15, 0) + np.where(aging, 5, 0)
+
+        major_repairs = cost > 50000
+        moderate_repairs = ~major_repairs & (cost > 20000)
+        overall -= np.where(repair, 25, 0) + np.where(major_repairs, 30, 0) + np.where(moderate_repairs, 15, 0)
+        cosmetic -= np.where(repair, 30, 0) + np.where(moderate_repairs, 20, 0)
+        structural -= np.where(major_repairs, 40, 0)
+
+        return {
+            "overall": np.maximum(overall, 0),
+            "structural": np.maximum(structural, 0),
+            "cosmetic": np.maximum(cosmetic, 0),
+            "systems": np.maximum(systems, 0),
+            "repair_needed": repair,
+            "repair_cost": cost,
+            "high_urgency": major_repairs
+        }
+
+    def _property_scores(self, features: pd.DataFrame, condition: Dict[str, np.ndarray]) -> np.ndarray:
+        """Property score (mirrors LeadScoringService._calculate_property_score)"""
+        score = (
+            condition["overall"] * 0.4 +
+            condition["structural"] * 0.3 +
+            condition["cosmetic"] * 0.2 +
+            condition["systems"] * 0.1
+        )
+        # A lead needing repairs always has at least medium urgency
+        urgency_factor = np.where(condition["high_urgency"], 0.7, 0.85)
+        score = np.where(condition["repair_needed"], score * urgency_factor, score)
+        return np.clip(score, 0.0, 100.0)
+
+    def _market_scores(self, n: int) -> np.ndarray:
+        """Market score (mirrors LeadScoringService._calculate_market_score)"""
+        metrics = self.scoring_service._analyze_market_metrics(SimpleNamespace())
+        score = self.scoring_service._calculate_market_score(metrics)
+        return np.full(n, score)
+
+    def _financial_scores(self, features: pd.DataFrame) -> np.ndarray:
+        """Financial score (mirrors LeadScoringService._calculate_financial_score)"""
+        equity_percentage, loan_to_value = self._equity_ratios(features)
+        score = np.full(len(features), 50.0)
+
+        score += np.select(
+            [equity_percentage > 50, equity_percentage > 30, equity_percentage < 10],
+            [20.0, 10.0, -15.0],
+            default=0.0
+        )
+        score += np.select(
+            [loan_to_value > 90, loan_to_value < 50],
+            [15.0, 5.0],
+            default=0.0
+        )
+        return np.clip(score, 0.0, 100.0)
+
+    def _equity_ratios(self, features: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Equity percentage and loan-to-value, NaN where not computable"""
+        asking = features["asking_price"].to_numpy(dtype=float)
+        mortgage = features["mortgage_balance"].to_numpy(dtype=float)
+        known = ~np.isnan(asking) & ~np.isnan(mortgage)
+        positive = known & (asking > 0)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            equity_percentage = np.where(positive, (asking - mortgage) / asking * 100, np.where(known, 0.0, np.nan))
+            loan_to_value = np.where(positive, mortgage / asking * 100, np.where(known, 0.0, np.nan))
+        return equity_percentage, loan_to_value
+
+    def _owner_scores(self, features: pd.DataFrame) -> np.ndarray:
+        """Owner score (mirrors LeadScoringService._calculate_owner_score)"""
+        contact_attempts = features["contact_attempts"].to_numpy(dtype=float)
+        return np.where(contact_attempts > 5, 40.0, 50.0)
+
+    def _profit_potential(self, features: pd.DataFrame) -> np.ndarray:
+        """Profit potential (mirrors LeadScoringService._estimate_profit_potential)"""
+        asking = features["asking_price"].to_numpy(dtype=float)
+        repair_cost = np.where(
+            features["repair_needed"].to_numpy(dtype=bool),
+            features["estimated_repair_cost"].to_numpy(dtype=float),
+            np.nan
+        )
+
+        max_offer = asking * 1.2 * 0.7 - repair_cost
+        flip_profit = np.where(
+            ~np.isnan(repair_cost) & (max_offer > asking),
+            max_offer - asking - repair_cost,
+            0.0
+        )
+        wholesale_profit = asking * 0.05
+        return np.where(flip_profit > 0, np.maximum(flip_profit, wholesale_profit), wholesale_profit)
+
+    def _validation_errors(self, features: pd.DataFrame) -> np.ndarray:
+        """Flag rows that LeadScore/sub-model validation would reject"""
+        equity_percentage, loan_to_value = self._equity_ratios(features)
+        checks = [
+            ((equity_percentage < 0) | (equity_percentage > 100), "equity_percentage out of range"),
+            ((loan_to_value < 0) | (loan_to_value > 200), "loan_to_value out of range"),
+            (features["monthly_payment"].to_numpy(dtype=float) < 0, "monthly_payment must be >= 0"),
+            (
+                features["repair_needed"].to_numpy(dtype=bool) &
+                (features["estimated_repair_cost"].to_numpy(dtype=float) < 0),
+                "estimated_repair_cost must be >= 0"
+            ),
+            (features["contact_attempts"].to_numpy(dtype=float) < 0, "contact_attempts must be >= 0"),
+            (features["asking_price"].to_numpy(dtype=float) < 0, "asking_price must be >= 0")
+        ]
+
+        errors = np.full(len(features), None, dtype=object)
+        for mask, message in reversed(checks):
+            errors[mask] = f"Invalid lead data: {message}"
+        return errors
+
+    # Result materialization
+
+    def to_lead_scores(
+        self,
+        features: pd.DataFrame,
+        scores: pd.DataFrame,
+        index: Optional[Sequence[Any]] = None
+    ) -> List[LeadScore]:
+        """Build LeadScore objects for the given rows only (all rows by default)"""
+        if index is None:
+            index = scores.index[scores["error"].isna()]
+
+        service = self.scoring_service
+        lead_scores = []
+        for position in index:
+            feature_row = features.loc[position]
+            score_row = scores.loc[position]
+            lead_view = self._lead_view(feature_row)
+
+            lead_score = LeadScore(
+                lead_id=feature_row["lead_id"],
+                property_id=feature_row["property_id"],
+                overall_score=float(score_row["overall_score"]),
+                deal_potential=score_row["deal_potential"],
+                confidence_score=float(score_row["confidence_score"]),
+                motivation_score=float(score_row["motivation_score"]),
+                financial_score=float(score_row["financial_score"]),
+                property_score=float(score_row["property_score"]),
+                market_score=float(score_row["market_score"]),
+                owner_score=float(score_row["owner_score"]),
+                motivation_indicators=service._analyze_motivation_indicators(lead_view),
+                property_condition=service._analyze_property_condition(lead_view),
+                market_metrics=service._analyze_market_metrics(lead_view),
+                financial_indicators=service._analyze_financial_indicators(lead_view),
+                owner_profile=service._analyze_owner_profile(lead_view),
+                priority_level=score_row["priority_level"],
+                estimated_close_probability=float(score_row["estimated_close_probability"]),
+                estimated_profit_potential=(
+                    None if pd.isna(score_row["estimated_profit_potential"])
+                    else float(score_row["estimated_profit_potential"])
+                )
+            )
+            lead_score.recommended_actions = service._generate_recommendations(lead_score)
+            lead_scores.append(lead_score)
+
+        return lead_scores
+
+    def _lead_view(self, feature_row: pd.Series) -> SimpleNamespace:
+        """Lightweight lead stand-in so the service's sub-model builders can be reused"""
+        def value(column):
+            raw = feature_row[column]
+            return None if pd.isna(raw) else raw
+
+        return SimpleNamespace(
+            id=feature_row["lead_id"],
+            motivation_factors=feature_row["motivation_factors"],
+            behind_on_payments=bool(feature_row["behind_on_payments"]),
+            repair_needed=bool(feature_row["repair_needed"]),
+            estimated_repair_cost=value("estimated_repair_cost"),
+            asking_price=value("asking_price"),
+            mortgage_balance=value("mortgage_balance"),
+            monthly_payment=value("monthly_payment"),
+            contact_attempts=int(feature_row["contact_attempts"]),
+            property=SimpleNamespace(
+                id=feature_row["property_id"],
+                year_built=int(feature_row["year_built"]) if value("year_built") else None
+            )
+        )
+
+    def score_leads_batch(
+        self,
+        leads: Sequence[PropertyLeadDB],
+        config: Optional[ScoringConfig] = None,
+        top_n: Optional[int] = None,
+        min_score: Optional[float] = None
+    ) -> LeadScoringBatchResult:
+        """
+        Score leads in one vectorized pass.
+
+        Args:
+            leads: Leads to score
+            config: Scoring configuration (default config if omitted)
+            top_n: Only return the N highest scoring leads
+            min_score: Only return leads with at least this overall score
+        """
+        start_time = datetime.now()
+        features, errors = self.build_feature_frame(leads)
+        scores = self.score_frame(features, config)
+
+        invalid = scores["error"].notna()
+        for position in scores.index[invalid]:
+            errors.append({
+                "lead_id": str(features.at[position, "lead_id"]),
+                "error": scores.at[position, "error"],
+                "timestamp": datetime.now()
+            })
+
+        index = self.select_index(scores, top_n=top_n, min_score=min_score)
+        end_time = datetime.now()
+
+        return LeadScoringBatchResult(
+            total_leads=len(leads),
+            successful_scores=int((~invalid).sum()),
+            failed_scores=len(errors),
+            scores=self.to_lead_scores(features, scores, index),
+            errors=errors,
+            processing_time=(end_time - start_time).total_seconds(),
+            started_at=start_time,
+            completed_at=end_time
+        )
+
+    def select_index(
+        self,
+        scores: pd.DataFrame,
+        top_n: Optional[int] = None,
+        min_score: Optional[float] = None
+    ) -> pd.Index:
+        """Index of valid rows to return, best first when top_n is given"""
+        valid = scores[scores["error"].isna()]
+        if min_score is not None:
+            valid = valid[valid["overall_score"] >= min_score]
+        if top_n is not None:
+            valid = valid.nlargest(top_n, "overall_score")
+        return valid.index
+
+    # Persistence and scheduled re-scoring
+
+    def persist_scores(self, features: pd.DataFrame, scores: pd.DataFrame) -> int:
+        """
+        Write overall scores back to PropertyLeadDB.lead_score with one bulk UPDATE
+        and, unless disabled, append them to the score history.
+        """
+        valid = scores["error"].isna()
+        updates = [
+            {"id": lead_id, "lead_score": round(float(score), 2)}
+            for lead_id, score in zip(features.loc[valid, "lead_id"], scores.loc[valid, "overall_score"])
+        ]
+        if updates:
+            self.db.execute(update(PropertyLeadDB), updates)
+            if self.record_history:
+                LeadScoreHistoryService(self.db).record_score_frame(features, scores)
+        return len(updates)
+
+    def rescore_all_leads(
+        self,
+        config: Optional[ScoringConfig] = None,
+        batch_size: int = 5000,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Re-score the whole lead table in keyset-paginated batches, committing per batch.
+
+        Returns:
+            Summary with counts and throughput
+        """
+        started = time.monotonic()
+        summary = {"leads_scored": 0, "leads_failed": 0, "batches": 0}
+        last_id = None
+
+        while True:
+            features = self.load_feature_frame(after_id=last_id, limit=batch_size)
+            if features.empty:
+                break
+
+            scores = self.score_frame(features, config)
+            summary["leads_scored"] += self.persist_scores(features, scores)
+            summary["leads_failed"] += int(scores["error"].notna().sum())
+            summary["batches"] += 1
+            self.db.commit()
+
+            last_id = features["lead_id"].iloc[-1]
+            if progress_callback:
+                progress_callback(dict(summary))
+            if len(features) < batch_size:
+                break
+
+        elapsed = time.monotonic() - started
+        summary["elapsed_seconds"] = elapsed
+        summary["leads_per_second"] = summary["leads_scored"] / elapsed if elapsed > 0 else 0.0
+        return summary
+
+
+class ScheduledLeadRescoreJob:
+    """
+    Periodically re-scores leads in a background thread.
+
+    By default the whole lead table is re-scored; with incremental=True only
+    leads with changes recorded by the lead change tracker are re-scored.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        interval_seconds: float = 24 * 3600,
+        batch_size: int = 5000,
+        config: Optional[ScoringConfig] = None,
+        incremental: bool = False
+    ):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.config = config
+        self.incremental = incremental
+        self.is_running = False
+        self.last_run: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def run_once(self) -> Dict[str, Any]:
+        """Run one re-score with a dedicated session"""
+        db = self.session_factory()
+        try:
+            if self.incremental:
+                from app.services.incremental_lead_scoring import IncrementalLeadScorer
+
+                summary = IncrementalLeadScorer(db).rescore_pending(self.config, batch_size=self.batch_size)
+            else:
+                summary = LeadScoringEngine(db).rescore_all_leads(self.config, batch_size=self.batch_size)
+            summary["completed_at"] = datetime.now()
+            self.last_run = summary
+            logger.info(
+                f"Re-scored {summary['leads_scored']} leads in {summary['elapsed_seconds']:.1f}s "
+                f"({summary['leads_per_second']:.0f} leads/sec)"
+            )
+            return summary
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def start(self):
+        """Start the periodic re-score loop"""
+        if self.is_running:
+            logger.warning("Lead re-score job is already running")
+            return
+        self.is_running = True
+        self._task = asyncio.create_task(self._run_loop())
+        logger.info(f"Lead re-score job started (every {self.interval_seconds}s)")
+
+    async def stop(self):
+        """Stop the periodic re-score loop"""
+        if not self.is_running:
+            return
+        self.is_running = False
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        logger.info("Lead re-score job stopped")
+
+    async def _run_loop(self):
+        """Run a re-score, then sleep until the next interval"""
+        while self.is_running:
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                logger.error(f"Scheduled lead re-score failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
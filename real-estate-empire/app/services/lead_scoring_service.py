@@ -549,35 +549,10 @@ class LeadScoringService:
         )    
     
     def score_leads_batch(self, leads: List[PropertyLeadDB], config: Optional[ScoringConfig] = None) -> LeadScoringBatchResult:
-        """Score multiple leads in batch"""
-        start_time = datetime.now()
-        
-        result = LeadScoringBatchResult(
-            total_leads=len(leads),
-            successful_scores=0,
-            failed_scores=0,
-            processing_time=0.0,
-            started_at=start_time
-        )
-        
-        for lead in leads:
-            try:
-                score = self.score_lead(lead, config)
-                result.scores.append(score)
-                result.successful_scores += 1
-            except Exception as e:
-                result.errors.append({
-                    "lead_id": str(lead.id) if hasattr(lead, 'id') and lead.id else "unknown",
-                    "error": str(e),
-                    "timestamp": datetime.now()
-                })
-                result.failed_scores += 1
-        
-        end_time = datetime.now()
-        result.completed_at = end_time
-        result.processing_time = (end_time - start_time).total_seconds()
-        
-        return result
+        """Score multiple leads in batch using the vectorized scoring engine"""
+        from app.services.lead_scoring_engine import LeadScoringEngine
+
+        return LeadScoringEngine(self.db, scoring_service=self).score_leads_batch(leads, config)
     
     def get_scoring_analytics(self, period_start: Optional[datetime] = None, 
                             period_end: Optional[datetime] = None) -> ScoringAnalytics:
@@ -587,6 +562,11 @@ class LeadScoringService:
         if period_start is None:
             period_start = period_end - timedelta(days=30)
         
+        if self.db is not None:
+            from app.services.lead_score_history_service import LeadScoreHistoryService
+
+            return LeadScoreHistoryService(self.db).get_analytics(period_start, period_end)
+        
         return ScoringAnalytics(
             total_leads_scored=0,
             average_score=0.0,
@@ -0,0 +1,94 @@
+"""
+LLM Rate Limiter
+Async token buckets for keeping LLM calls within requests-per-minute and
+tokens-per-minute quotas
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at a fixed rate
+
+    The balance may go negative when actual usage turns out higher than what was
+    acquired up front; later callers then wait until the debt is refilled.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._updated_at = clock()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def per_minute(cls, limit: float, **kwargs) -> "TokenBucket":
+        """Bucket allowing `limit` units per minute, with a burst of one minute's quota"""
+        return cls(capacity=limit, refill_per_second=limit / 60.0, **kwargs)
+
+    def _refill(self):
+        now = self._clock()
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_per_second)
+            self._updated_at = now
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._tokens
+
+    async def acquire(self, amount: float = 1.0):
+        """Wait until `amount` units are available, then take them"""
+        # Requests larger than the bucket can never fit; let them through once the bucket is full
+        amount = min(float(amount), self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await self._sleep((amount - self._tokens) / self.refill_per_second)
+
+    def consume(self, amount: float):
+        """Take units without waiting (used to settle actual usage after a call)"""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens - float(amount))
+
+
+class RequestBudget:
+    """Combined requests-per-minute and tokens-per-minute budget
+
+    Either limit may be None (unlimited).
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep):
+        self.requests = TokenBucket.per_minute(requests_per_minute, clock=clock, sleep=sleep) \
+            if requests_per_minute else None
+        self.tokens = TokenBucket.per_minute(tokens_per_minute, clock=clock, sleep=sleep) \
+            if tokens_per_minute else None
+
+    async def acquire(self, estimated_tokens: int = 0):
+        """Wait for one request slot and the estimated number of tokens"""
+        if self.requests:
+            await self.requests.acquire(1)
+        if self.tokens and estimated_tokens:
+            await self.tokens.acquire(estimated_tokens)
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Charge the difference between actual and estimated token usage"""
+        if self.tokens and actual_tokens is not None and actual_tokens != estimated_tokens:
+            self.tokens.consume(actual_tokens - estimated_tokens)
@@ -0,0 +1,251 @@
+"""
+LLM Response Cache
+Content-addressed, disk-backed cache for LLM completions.
+
+Responses are keyed by a SHA-256 hash of (model, temperature, system prompt,
+prompt), stored in SQLite with a TTL, and counted as hits/misses together with
+the tokens and cost a hit avoided. Only zero-temperature requests are cached;
+sampled completions are meant to vary between calls.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Optional
+
+from app.services.llm_rate_limiter import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+def default_cache_path() -> str:
+    """Cache file under the system temp directory, never the working directory"""
+    return os.path.join(tempfile.gettempdir(), "real-estate-empire", "llm_response_cache.db")
+
+
+def response_cache_key(model: str, temperature: Optional[float], system_prompt: Optional[str], prompt: str) -> str:
+    """Stable hash identifying one LLM request"""
+    payload = json.dumps(
+        [model, None if temperature is None else round(float(temperature), 4), system_prompt or "", prompt],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedResponse:
+    """A cached completion"""
+    key: str
+    model: str
+    content: str
+    total_tokens: int
+    created_at: float
+    expires_at: float
+
+
+@dataclass
+class CacheStats:
+    """Cache counters since the cache was opened"""
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    saved_tokens: int = 0
+    saved_cost: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        stats = asdict(self)
+        stats["hit_rate"] = self.hit_rate
+        return stats
+
+
+class LLMResponseCache:
+    """SQLite-backed LLM response cache with TTL and hit/miss accounting"""
+
+    def __init__(self, path: Optional[str] = None,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 clock: Callable[[], float] = time.time):
+        path = path or default_cache_path()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                content TEXT NOT NULL,
+                total_tokens INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_expires ON llm_responses (expires_at)")
+        self._conn.commit()
+
+    def should_cache(self, temperature: Optional[float]) -> bool:
+        """Whether a request at this temperature is deterministic enough to cache"""
+        return temperature is not None and float(temperature) == 0.0
+
+    def get(self, key: str, cost_per_1k_tokens: float = 0.0) -> Optional[CachedResponse]:
+        """Look up a live entry, counting a hit (with saved tokens/cost) or a miss"""
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, model, content, total_tokens, created_at, expires_at "
+                "FROM llm_responses WHERE key = ? AND expires_at > ?",
+                (key, now)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_responses SET hit_count = hit_count + 1 WHERE key = ?", (key,))
+            self._conn.commit()
+
+            cached = CachedResponse(*row)
+            self.stats.hits += 1
+            self.stats.saved_tokens += cached.total_tokens
+            self.stats.saved_cost += cached.total_tokens / 1000 * cost_per_1k_tokens
+        return cached
+
+    def set(self, key: str, model: str, content: str, total_tokens: int, ttl_seconds: Optional[float] = None):
+        """Store a completion"""
+        now = self._clock()
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses "
+                "(key, model, content, total_tokens, created_at, expires_at, hit_count) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                (key, model, content, int(total_tokens), now, now + ttl)
+            )
+            self._conn.commit()
+            self.stats.stores += 1
+
+    def purge_expired(self) -> int:
+        """Delete expired entries; returns the number removed"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (self._clock(),))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get_or_generate(self, model: str, temperature: Optional[float], system_prompt: Optional[str],
+                        prompt: str, generate: Callable[[], Any], cost_per_1k_tokens: float = 0.0) -> str:
+        """Return the cached completion or call generate() and cache its result.
+
+        generate() may return a string or an object with .text/.content and optional
+        usage metadata. Requests are only cached when should_cache(temperature).
+        """
+        if not self.should_cache(temperature):
+            return response_text(generate())
+
+        key = response_cache_key(model, temperature, system_prompt, prompt)
+        cached = self.get(key, cost_per_1k_tokens)
+        if cached is not None:
+            return cached.content
+
+        return self._store(key, model, system_prompt, prompt, generate())
+
+    async def aget_or_generate(self, model: str, temperature: Optional[float], system_prompt: Optional[str],
+                               prompt: str, generate: Callable[[], Any], cost_per_1k_tokens: float = 0.0) -> str:
+        """Async variant of get_or_generate for awaitable generate() callables
+
+        SQLite reads and writes run in a worker thread so the event loop is not blocked.
+        """
+        if not self.should_cache(temperature):
+            return response_text(await generate())
+
+        key = response_cache_key(model, temperature, system_prompt, prompt)
+        cached = await asyncio.to_thread(self.get, key, cost_per_1k_tokens)
+        if cached is not None:
+            return cached.content
+
+        response = await generate()
+        return await asyncio.to_thread(self._store, key, model, system_prompt, prompt, response)
+
+    def _store(self, key: str, model: str, system_prompt: Optional[str], prompt: str, response: Any) -> str:
+        content = response_text(response)
+        tokens = response_total_tokens(response)
+        if tokens is None:
+            tokens = estimate_tokens((system_prompt or "") + prompt) + estimate_tokens(content)
+        self.set(key, model, content, tokens)
+        return content
+
+
+def response_text(response: Any) -> str:
+    """Text of a provider response (Gemini .text, LangChain .content, or a plain string)"""
+    if isinstance(response, str):
+        return response
+    content = getattr(response, "content", None)
+    if isinstance(content, str):
+        return content
+    return response.text
+
+
+def response_total_tokens(response: Any) -> Optional[int]:
+    """Total tokens reported by the provider, if any"""
+    # Gemini: usage_metadata.total_token_count; LangChain AIMessage: usage_metadata["total_tokens"]
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return None
+    if isinstance(usage, dict):
+        tokens = usage.get("total_tokens")
+    else:
+        tokens = getattr(usage, "total_token_count", None)
+    return tokens if isinstance(tokens, int) else None
+
+
+_shared_cache: Optional[LLMResponseCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[LLMResponseCache]:
+    """Process-wide cache configured from the environment.
+
+    LLM_CACHE_ENABLED (default true), LLM_CACHE_PATH (default under the system
+    temp directory) and LLM_CACHE_TTL_SECONDS control it. Returns None when disabled.
+    """
+    global _shared_cache
+    if os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            try:
+                _shared_cache = LLMResponseCache(
+                    path=os.getenv("LLM_CACHE_PATH") or default_cache_path(),
+                    ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+                )
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"LLM response cache unavailable: {e}")
+                return None
+        return _shared_cache
@@ -0,0 +1,165 @@
+"""
+Model Registry
+Process-wide warm cache of trained predictive models.
+
+Loaded estimators stay resident between predictions, keyed by model id, and
+are evicted least-recently-used once their combined size passes a byte
+budget. An entry is reloaded when the model's version, artifact path or file
+modification time changes, so retraining is picked up without a restart.
+Artifacts are opened with memory-mapped numpy arrays where joblib allows it.
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+@dataclass
+class LoadedModel:
+    """A deserialized model artifact"""
+    model: Any
+    scaler: Any
+    features: List[str]
+    stamp: Tuple[Any, ...]
+    size_bytes: int
+
+
+@dataclass
+class RegistryStats:
+    """Registry counters since the registry was created"""
+    hits: int = 0
+    misses: int = 0
+    reloads: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def model_stamp(model: Any) -> Optional[Tuple[Any, ...]]:
+    """Identity of a model's current artifact, or None when it has none on disk"""
+    path = getattr(model, "model_path", None)
+    if not path:
+        return None
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    return (getattr(model, "version", None), str(path), mtime)
+
+
+class ModelRegistry:
+    """LRU cache of loaded model artifacts bounded by total size"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, mmap_mode: Optional[str] = "r"):
+        self.max_bytes = max_bytes
+        self.mmap_mode = mmap_mode
+        self._entries: "OrderedDict[str, LoadedModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = RegistryStats()
+
+    def get(self, model: Any) -> Optional[LoadedModel]:
+        """Loaded artifact for a PredictiveModelDB row, or None if it has no artifact.
+
+        Raises whatever joblib raises for an unreadable artifact.
+        """
+        stamp = model_stamp(model)
+        if stamp is None:
+            return None
+        key = str(model.id)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.stamp == stamp:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return entry
+            self.stats.misses += 1
+            if entry is not None:
+                self.stats.reloads += 1
+                logger.info(f"Reloading model {model.name} ({key}): artifact changed")
+
+        # Deserialize outside the lock so other models stay available meanwhile
+        loaded = self._load(stamp)
+
+        with self._lock:
+            self._entries[key] = loaded
+            self._entries.move_to_end(key)
+            self._evict(keep=key)
+        return loaded
+
+    def invalidate(self, model_id: Any) -> bool:
+        """Drop one model so its next use reloads it"""
+        with self._lock:
+            return self._entries.pop(str(model_id), None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(entry.size_bytes for entry in self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, model_id: Any) -> bool:
+        return str(model_id) in self._entries
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **asdict(self.stats),
+                "hit_rate": self.stats.hit_rate,
+                "models": len(self._entries),
+                "total_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes
+            }
+
+    def _load(self, stamp: Tuple[Any, ...]) -> LoadedModel:
+        path = stamp[1]
+        data = joblib.load(path, mmap_mode=self.mmap_mode)
+        return LoadedModel(
+            model=data["model"],
+            scaler=data["scaler"],
+            features=list(data["features"]),
+            stamp=stamp,
+            size_bytes=Path(path).stat().st_size
+        )
+
+    def _evict(self, keep: str):
+        """Evict least recently used entries until within budget, never the one just loaded"""
+        total = self.total_bytes
+        while total > self.max_bytes and len(self._entries) > 1:
+            key, entry = next(iter(self._entries.items()))
+            if key == keep:
+                break
+            del self._entries[key]
+            total -= entry.size_bytes
+            self.stats.evictions += 1
+
+
+_shared_registry: Optional[ModelRegistry] = None
+_shared_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Process-wide registry; PREDICTIVE_MODEL_CACHE_MB sets its budget (default 512)"""
+    global _shared_registry
+    with _shared_registry_lock:
+        if _shared_registry is None:
+            max_mb = float(os.getenv("PREDICTIVE_MODEL_CACHE_MB", DEFAULT_MAX_BYTES / (1024 * 1024)))
+            _shared_registry = ModelRegistry(max_bytes=int(max_mb * 1024 * 1024))
+        return _shared_registry
@@ -6,22 +6,37 @@ school and amenity scoring, and crime data integration.
 """
 
 from typing import List, Dict, Optional, Any, Tuple
+import hashlib
 import uuid
 import math
 from datetime import datetime, timedelta
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 import requests
 import json
 from geopy.distance import geodesic
 from geopy.geocoders import Nominatim
+import numpy as np
 
 from app.models.neighborhood_analysis import (
     GeographicBoundary, PropertySale, MarketTrend, School, Amenity, CrimeIncident,
     NeighborhoodScore, NeighborhoodAnalysis, NeighborhoodComparison,
     NeighborhoodAlert, NeighborhoodSearchCriteria, NeighborhoodSearchResult,
+    NeighborhoodGridScore, NeighborhoodScoreCellDB,
     TrendDirectionEnum, AmenityTypeEnum, SchoolTypeEnum, CrimeTypeEnum
 )
 from app.core.database import get_db
+from app.services.geocoding_service import GeocodeResult, get_geocoding_service
+from app.services.spatial_index import (
+    PointLayer, SpatialIndex, DEFAULT_CELL_DEGREES, cell_centers, cells_in_bbox, haversine_miles
+)
+
+# Weights shared by list-based and index-based scoring
+SCHOOL_TYPE_WEIGHTS = {SchoolTypeEnum.HIGH: 1.5, SchoolTypeEnum.MIDDLE: 1.2}
+CRIME_TYPE_WEIGHTS = {CrimeTypeEnum.VIOLENT: 3.0, CrimeTypeEnum.PROPERTY: 2.0, CrimeTypeEnum.DRUG: 1.5}
+SCORE_WEIGHTS = {'market': 0.3, 'schools': 0.25, 'amenities': 0.2, 'safety': 0.25}
+AMENITY_TYPES = list(AmenityTypeEnum)
+GRID_CELL_DEGREES = DEFAULT_CELL_DEGREES
 
 
 class NeighborhoodAnalysisService:
@@ -29,16 +44,33 @@ class NeighborhoodAnalysisService:
     
     def __init__(self, db: Session = None):
         self.db = db
-        self.geocoder = Nominatim(user_agent="real_estate_empire")
+        self.geocoding = get_geocoding_service()
+        self._remote_geocoder = None
+        self.spatial_index: Optional[SpatialIndex] = None
         
         # API keys would be loaded from environment variables
         self.google_maps_api_key = None  # os.getenv('GOOGLE_MAPS_API_KEY')
         self.crime_data_api_key = None   # os.getenv('CRIME_DATA_API_KEY')
     
+    @property
+    def geocoder(self):
+        """Remote fallback geocoder, created on first use"""
+        if self._remote_geocoder is None:
+            self._remote_geocoder = Nominatim(user_agent="real_estate_empire")
+        return self._remote_geocoder
+    
+    @geocoder.setter
+    def geocoder(self, geocoder):
+        self._remote_geocoder = geocoder
+    
+    def geocode_addresses(self, addresses: List[str], max_concurrency: Optional[int] = None) -> List[Optional[GeocodeResult]]:
+        """Geocode many addresses; only cache and gazetteer misses reach the remote geocoder"""
+        return self.geocoding.geocode_batch(addresses, remote=self.geocoder, max_concurrency=max_concurrency)
+    
     def detect_neighborhood_boundary(self, address: str, radius_miles: float = 1.0) -> GeographicBoundary:
         """Detect neighborhood boundary around a given address"""
         # Geocode the address to get coordinates
-        location = self.geocoder.geocode(address)
+        location = self.geocoding.geocode(address, remote=self.geocoder)
         if not location:
             raise ValueError(f"Could not geocode address: {address}")
         
@@ -124,6 +156,9 @@ class NeighborhoodAnalysisService:
     
     def find_schools_in_area(self, boundary: GeographicBoundary, max_distance_miles: float = 2.0) -> List[School]:
         """Find schools within or near the neighborhood boundary"""
+        if self.spatial_index is not None and "schools" in self.spatial_index:
+            return self._nearest_items("schools", boundary, max_distance_miles)
+        
         # In a real implementation, this would query school district APIs or databases
         # For now, we'll create mock school data
         
@@ -166,6 +201,9 @@ class NeighborhoodAnalysisService:
     
     def find_amenities_in_area(self, boundary: GeographicBoundary, max_distance_miles: float = 1.0) -> List[Amenity]:
         """Find amenities within the neighborhood"""
+        if self.spatial_index is not None and "amenities" in self.spatial_index:
+            return self._nearest_items("amenities", boundary, max_distance_miles)
+        
         # In a real implementation, this would query Google Places API or similar
         # For now, we'll create mock amenity data
         
@@ -205,6 +243,14 @@ class NeighborhoodAnalysisService:
     
     def get_crime_data(self, boundary: GeographicBoundary, months_back: int = 12) -> List[CrimeIncident]:
         """Get crime data for the neighborhood"""
+        if self.spatial_index is not None and "crime" in self.spatial_index:
+            layer = self.spatial_index.get("crime")
+            cutoff = datetime.now() - timedelta(days=30 * months_back)
+            return [
+                incident for incident in layer.get_items(layer.within_polygon(boundary.coordinates))
+                if incident.incident_date > cutoff
+            ]
+        
         # In a real implementation, this would query crime data APIs
         # For now, we'll create mock crime data
         
@@ -249,11 +295,7 @@ class NeighborhoodAnalysisService:
         for school in schools:
             if school.rating is not None:
                 # Weight schools by type (high schools weighted more)
-                weight = 1.0
-                if school.school_type == SchoolTypeEnum.HIGH:
-                    weight = 1.5
-                elif school.school_type == SchoolTypeEnum.MIDDLE:
-                    weight = 1.2
+                weight = SCHOOL_TYPE_WEIGHTS.get(school.school_type, 1.0)
                 
                 # Convert 0-10 rating to 0-100 score
                 school_score = (school.rating / 10.0) * 100
@@ -272,18 +314,18 @@ class NeighborhoodAnalysisService:
         
         # Score based on variety and proximity of amenities
         amenity_types_present = set(amenity.amenity_type for amenity in amenities)
-        variety_score = (len(amenity_types_present) / len(AmenityTypeEnum)) * 100
-        
-        # Calculate average distance to amenities
-        total_distance = 0.0
-        for amenity in amenities:
-            distance = amenity.distance_to(center_lat, center_lng)
-            total_distance += distance
-        
-        avg_distance = total_distance / len(amenities)
+        distances = haversine_miles(
+            [amenity.latitude for amenity in amenities], [amenity.longitude for amenity in amenities],
+            center_lat, center_lng
+        )
+        return float(self._amenity_score(len(amenity_types_present), float(distances.mean())))
+    
+    def _amenity_score(self, types_present: Any, avg_distance: Any) -> Any:
+        """Amenity score from type variety and mean distance; accepts scalars or arrays"""
+        variety_score = (types_present / len(AmenityTypeEnum)) * 100
         
         # Closer amenities score higher (max distance of 2 miles for scoring)
-        proximity_score = max(0, (2.0 - avg_distance) / 2.0) * 100
+        proximity_score = np.maximum(0, (2.0 - avg_distance) / 2.0) * 100
         
         # Combine variety and proximity (60% variety, 40% proximity)
         return (variety_score * 0.6) + (proximity_score * 0.4)
@@ -293,36 +335,27 @@ class NeighborhoodAnalysisService:
         if not crime_incidents:
             return 100.0  # Perfect score if no crime data
         
-        # Calculate crime rate per square mile per year
-        recent_incidents = [
-            incident for incident in crime_incidents
-            if incident.incident_date > datetime.now() - timedelta(days=365)
-        ]
-        
-        crime_rate = len(recent_incidents) / area_sq_miles if area_sq_miles > 0 else len(recent_incidents)
-        
-        # Weight crimes by severity and type
-        weighted_crime_score = 0.0
-        for incident in recent_incidents:
-            weight = 1.0
-            
-            # Violent crimes weighted more heavily
-            if incident.crime_type == CrimeTypeEnum.VIOLENT:
-                weight = 3.0
-            elif incident.crime_type == CrimeTypeEnum.PROPERTY:
-                weight = 2.0
-            elif incident.crime_type == CrimeTypeEnum.DRUG:
-                weight = 1.5
-            
-            # Severity multiplier
-            severity_multiplier = incident.severity if incident.severity else 1
-            weighted_crime_score += weight * severity_multiplier
-        
+        weighted_crime_score = float(self._crime_weights(crime_incidents).sum())
+        return float(self._safety_score(weighted_crime_score, area_sq_miles))
+    
+    def _crime_weights(self, crime_incidents: List[CrimeIncident], as_of: Optional[datetime] = None) -> np.ndarray:
+        """Type and severity weight of each incident from the past year; older incidents weigh 0"""
+        cutoff = (as_of or datetime.now()) - timedelta(days=365)
+        return np.array([
+            # Violent crimes weighted more heavily, scaled by severity
+            CRIME_TYPE_WEIGHTS.get(incident.crime_type, 1.0) * (incident.severity or 1)
+            if incident.incident_date > cutoff else 0.0
+            for incident in crime_incidents
+        ], dtype=float)
+    
+    def _safety_score(self, weighted_crime_score: Any, area_sq_miles: float) -> Any:
+        """Safety score from weighted past-year crime; accepts a scalar or an array of totals"""
         # Normalize to 0-100 scale (lower crime = higher score)
         # Assume 50 weighted incidents per sq mile per year is average (score = 50)
-        normalized_score = max(0, 100 - (weighted_crime_score / area_sq_miles) * 2)
+        area_sq_miles = area_sq_miles if area_sq_miles > 0 else 1.0
+        normalized_score = np.maximum(0, 100 - (weighted_crime_score / area_sq_miles) * 2)
         
-        return min(100.0, normalized_score)
+        return np.minimum(100.0, normalized_score)
     
     def calculate_market_trend_score(self, trends: List[MarketTrend]) -> float:
         """Calculate market trend score"""
@@ -369,20 +402,16 @@ class NeighborhoodAnalysisService:
         amenity_score = self.calculate_amenity_score(amenities, boundary.center_lat, boundary.center_lng)
         safety_score = self.calculate_safety_score(crime_incidents, boundary.area_sq_miles or 1.0)
         
-        # Calculate overall score (weighted average)
-        weights = {
-            'market': 0.3,
-            'schools': 0.25,
-            'amenities': 0.2,
-            'safety': 0.25
-        }
-        
-        overall_score = (
-            market_trend_score * weights['market'] +
-            school_score * weights['schools'] +
-            amenity_score * weights['amenities'] +
-            safety_score * weights['safety']
+        return self._compose_score(
+            boundary.id, market_trend_score, school_score, amenity_score, safety_score,
+            len(trends), len(schools), len(amenities), len(crime_incidents)
         )
+    
+    def _compose_score(self, neighborhood_id: uuid.UUID, market_trend_score: float, school_score: float,
+                       amenity_score: float, safety_score: float, sales_data_points: int, schools_analyzed: int,
+                       amenities_analyzed: int, crime_incidents_analyzed: int) -> NeighborhoodScore:
+        """Combine component scores into a NeighborhoodScore"""
+        overall_score = self._overall_score(market_trend_score, school_score, amenity_score, safety_score)
         
         # Calculate investment-specific metrics
         appreciation_potential = market_trend_score  # Simplified
@@ -390,11 +419,11 @@ class NeighborhoodAnalysisService:
         liquidity_score = market_trend_score  # Active markets are more liquid
         
         # Calculate confidence based on data availability
-        data_points = len(trends) + len(schools) + len(amenities) + len(crime_incidents)
+        data_points = sales_data_points + schools_analyzed + amenities_analyzed + crime_incidents_analyzed
         confidence_score = min(1.0, data_points / 50.0)  # Assume 50 data points for full confidence
         
         return NeighborhoodScore(
-            neighborhood_id=boundary.id,
+            neighborhood_id=neighborhood_id,
             overall_score=overall_score,
             market_trend_score=market_trend_score,
             school_score=school_score,
@@ -404,11 +433,143 @@ class NeighborhoodAnalysisService:
             rental_demand=rental_demand,
             liquidity_score=liquidity_score,
             confidence_score=confidence_score,
-            sales_data_points=len(trends),
-            schools_analyzed=len(schools),
-            amenities_analyzed=len(amenities),
-            crime_incidents_analyzed=len(crime_incidents)
+            sales_data_points=sales_data_points,
+            schools_analyzed=schools_analyzed,
+            amenities_analyzed=amenities_analyzed,
+            crime_incidents_analyzed=crime_incidents_analyzed
+        )
+    
+    def _overall_score(self, market_trend_score: Any, school_score: Any, amenity_score: Any, safety_score: Any) -> Any:
+        """Weighted average of the component scores; accepts scalars or arrays"""
+        return (
+            market_trend_score * SCORE_WEIGHTS['market'] +
+            school_score * SCORE_WEIGHTS['schools'] +
+            amenity_score * SCORE_WEIGHTS['amenities'] +
+            safety_score * SCORE_WEIGHTS['safety']
+        )
+    
+    def build_spatial_index(self, schools: List[School], amenities: List[Amenity],
+                            crime_incidents: List[CrimeIncident], cell_degrees: float = DEFAULT_CELL_DEGREES,
+                            as_of: Optional[datetime] = None) -> SpatialIndex:
+        """Index school, amenity and crime datasets once; area lookups and scoring then query it.
+        
+        Crime recency is fixed at as_of (default now), so rebuild the index as incidents age.
+        """
+        index = SpatialIndex(cell_degrees)
+        index.add_layer(
+            "schools",
+            [school.latitude for school in schools], [school.longitude for school in schools],
+            values={
+                "weight": [SCHOOL_TYPE_WEIGHTS.get(school.school_type, 1.0) if school.rating is not None else 0.0
+                           for school in schools],
+                "weighted_score": [SCHOOL_TYPE_WEIGHTS.get(school.school_type, 1.0) * school.rating * 10
+                                   if school.rating is not None else 0.0 for school in schools],
+                "rating": [school.rating or 0.0 for school in schools]
+            },
+            items=schools
+        )
+        index.add_layer(
+            "amenities",
+            [amenity.latitude for amenity in amenities], [amenity.longitude for amenity in amenities],
+            categories=[AMENITY_TYPES.index(amenity.amenity_type) for amenity in amenities],
+            n_categories=len(AMENITY_TYPES),
+            items=amenities
         )
+        index.add_layer(
+            "crime",
+            [incident.latitude for incident in crime_incidents], [incident.longitude for incident in crime_incidents],
+            values={"weighted": self._crime_weights(crime_incidents, as_of)},
+            items=crime_incidents
+        )
+        self.spatial_index = index
+        return index
+    
+    def score_locations(self, centers: List[Tuple[float, float]], radius_miles: float = 1.0,
+                        school_radius_miles: float = 2.0,
+                        trends: Optional[List[MarketTrend]] = None) -> List[NeighborhoodScore]:
+        """Score many neighborhood centers against the spatial index in one vectorized pass.
+        
+        Uses the same formulas as calculate_neighborhood_score over the schools within
+        school_radius_miles and the amenities and crime within radius_miles of each center.
+        """
+        if not centers:
+            return []
+        
+        components = self._score_components(
+            [center[0] for center in centers], [center[1] for center in centers], radius_miles, school_radius_miles
+        )
+        trends = trends or []
+        market_trend_score = self.calculate_market_trend_score(trends)
+        
+        return [
+            self._compose_score(
+                uuid.uuid4(), market_trend_score, float(components["school_score"][i]),
+                float(components["amenity_score"][i]), float(components["safety_score"][i]), len(trends),
+                int(components["schools_analyzed"][i]), int(components["amenities_analyzed"][i]),
+                int(components["crime_incidents_analyzed"][i])
+            )
+            for i in range(len(centers))
+        ]
+    
+    def _score_components(self, lats: Any, lngs: Any, radius_miles: float,
+                          school_radius_miles: float) -> Dict[str, np.ndarray]:
+        """Per-center school, amenity and safety scores plus supporting counts, as arrays"""
+        if self.spatial_index is None:
+            raise ValueError("Spatial index not built; call build_spatial_index first")
+        lats = np.asarray(lats, dtype=float)
+        lngs = np.asarray(lngs, dtype=float)
+        n = len(lats)
+        
+        schools = self.spatial_index.get("schools")
+        school_idx, positions, _ = schools.within_radius(lats, lngs, school_radius_miles)
+        school_weight = np.bincount(school_idx, weights=schools.values["weight"][positions], minlength=n)
+        school_total = np.bincount(school_idx, weights=schools.values["weighted_score"][positions], minlength=n)
+        max_school_rating = np.zeros(n)
+        np.maximum.at(max_school_rating, school_idx, schools.values["rating"][positions])
+        
+        amenities = self.spatial_index.get("amenities")
+        amenity_idx, positions, distances = amenities.within_radius(lats, lngs, radius_miles)
+        amenity_counts = np.bincount(amenity_idx, minlength=n)
+        amenity_distance = np.bincount(amenity_idx, weights=distances, minlength=n)
+        type_pairs = np.unique(amenity_idx * amenities.n_categories + amenities.categories[positions])
+        types_present = np.bincount(type_pairs // amenities.n_categories, minlength=n)
+        amenity_types_mask = np.zeros(n, dtype=np.int64)
+        np.bitwise_or.at(amenity_types_mask, type_pairs // amenities.n_categories,
+                         np.left_shift(1, type_pairs % amenities.n_categories))
+        
+        crime = self.spatial_index.get("crime")
+        crime_idx, positions, _ = crime.within_radius(lats, lngs, radius_miles)
+        crime_counts = np.bincount(crime_idx, minlength=n)
+        crime_weighted = np.bincount(crime_idx, weights=crime.values["weighted"][positions], minlength=n)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            school_score = np.where(school_weight > 0, school_total / school_weight, 0.0)
+            amenity_score = np.where(
+                amenity_counts > 0, self._amenity_score(types_present, amenity_distance / amenity_counts), 0.0
+            )
+        safety_score = np.where(crime_counts > 0, self._safety_score(crime_weighted, math.pi * radius_miles ** 2), 100.0)
+        
+        return {
+            "school_score": school_score,
+            "amenity_score": amenity_score,
+            "safety_score": safety_score,
+            "schools_analyzed": np.bincount(school_idx, minlength=n),
+            "amenities_analyzed": amenity_counts,
+            "crime_incidents_analyzed": crime_counts,
+            "amenity_types_mask": amenity_types_mask,
+            "max_school_rating": max_school_rating
+        }
+    
+    def score_location(self, lat: float, lng: float, radius_miles: float = 1.0,
+                       trends: Optional[List[MarketTrend]] = None) -> NeighborhoodScore:
+        """Score one neighborhood center against the spatial index"""
+        return self.score_locations([(lat, lng)], radius_miles, trends=trends)[0]
+    
+    def _nearest_items(self, layer_name: str, boundary: GeographicBoundary, max_distance_miles: float) -> List[Any]:
+        """Indexed items within max_distance_miles of the boundary center, nearest first"""
+        layer = self.spatial_index.get(layer_name)
+        _, positions, distances = layer.within_radius(boundary.center_lat, boundary.center_lng, max_distance_miles)
+        return layer.get_items(positions[np.argsort(distances, kind="stable")])
     
     def analyze_neighborhood(self, address: str, radius_miles: float = 1.0) -> NeighborhoodAnalysis:
         """Perform complete neighborhood analysis"""
@@ -513,10 +674,114 @@ class NeighborhoodAnalysisService:
         
         return risk_factors
     
-    def search_neighborhoods(self, criteria: NeighborhoodSearchCriteria) -> NeighborhoodSearchResult:
+    def refresh_neighborhood_grid(self, market: str, bounds: Tuple[float, float, float, float],
+                                  trends: Optional[List[MarketTrend]] = None, radius_miles: float = 1.0,
+                                  school_radius_miles: float = 2.0,
+                                  changed_locations: Optional[List[Tuple[float, float]]] = None) -> Dict[str, int]:
+        """Precompute and store neighborhood scores for every grid cell of a market.
+        
+        bounds is (south, north, west, east). Scores come from the spatial index, so build it
+        first. With changed_locations, the points whose schools, amenities or crime records
+        were added, edited or removed, only cells within scoring reach of them are recomputed.
+        Rows whose values are unchanged are not rewritten.
+        """
+        if self.db is None:
+            raise ValueError("Database session required to store the neighborhood grid")
+        
+        keys = cells_in_bbox(*bounds, GRID_CELL_DEGREES)
+        lats, lngs = cell_centers(keys, GRID_CELL_DEGREES)
+        if changed_locations is not None:
+            changed = PointLayer([point[0] for point in changed_locations], [point[1] for point in changed_locations],
+                                 cell_degrees=GRID_CELL_DEGREES)
+            center_idx, _, _ = changed.within_radius(lats, lngs, max(radius_miles, school_radius_miles))
+            affected = np.unique(center_idx)
+            keys, lats, lngs = keys[affected], lats[affected], lngs[affected]
+        
+        stats = {"cells_evaluated": len(keys), "cells_written": 0, "cells_unchanged": 0}
+        if not len(keys):
+            return stats
+        
+        components = self._score_components(lats, lngs, radius_miles, school_radius_miles)
+        trends = trends or []
+        market_trend_score = self.calculate_market_trend_score(trends)
+        median_price = trends[0].median_price if trends else None
+        school_score = components["school_score"]
+        amenity_score = components["amenity_score"]
+        overall_score = self._overall_score(market_trend_score, school_score, amenity_score,
+                                            components["safety_score"])
+        data_points = (len(trends) + components["schools_analyzed"] + components["amenities_analyzed"] +
+                       components["crime_incidents_analyzed"])
+        confidence_score = np.minimum(1.0, data_points / 50.0)
+        
+        try:
+            existing = {}
+            key_list = keys.tolist()
+            for start in range(0, len(key_list), 500):
+                rows = self.db.query(NeighborhoodScoreCellDB).filter(
+                    NeighborhoodScoreCellDB.market == market,
+                    NeighborhoodScoreCellDB.cell_key.in_(key_list[start:start + 500])
+                ).all()
+                existing.update({row.cell_key: row for row in rows})
+            
+            now = datetime.utcnow()
+            for i, key in enumerate(key_list):
+                values = {
+                    "market": market,
+                    "center_lat": round(float(lats[i]), 6),
+                    "center_lng": round(float(lngs[i]), 6),
+                    "radius_miles": radius_miles,
+                    "overall_score": round(float(overall_score[i]), 4),
+                    "market_trend_score": market_trend_score,
+                    "school_score": round(float(school_score[i]), 4),
+                    "amenity_score": round(float(amenity_score[i]), 4),
+                    "safety_score": round(float(components["safety_score"][i]), 4),
+                    "appreciation_potential": market_trend_score,
+                    "rental_demand": round(float(school_score[i] + amenity_score[i]) / 2, 4),
+                    "liquidity_score": market_trend_score,
+                    "confidence_score": round(float(confidence_score[i]), 4),
+                    "schools_analyzed": int(components["schools_analyzed"][i]),
+                    "amenities_analyzed": int(components["amenities_analyzed"][i]),
+                    "crime_incidents_analyzed": int(components["crime_incidents_analyzed"][i]),
+                    "amenity_types_mask": int(components["amenity_types_mask"][i]),
+                    "max_school_rating": float(components["max_school_rating"][i]) or None,
+                    "median_price": median_price
+                }
+                fingerprint = hashlib.sha1(repr(sorted(values.items())).encode()).hexdigest()
+                
+                row = existing.get(key)
+                if row is not None and row.fingerprint == fingerprint:
+                    stats["cells_unchanged"] += 1
+                    continue
+                if row is None:
+                    row = NeighborhoodScoreCellDB(market=market, cell_key=key)
+                    self.db.add(row)
+                for field, value in values.items():
+                    setattr(row, field, value)
+                row.fingerprint = fingerprint
+                row.computed_at = now
+                stats["cells_written"] += 1
+            
+            self.db.commit()
+            return stats
+        except Exception:
+            self.db.rollback()
+            raise
+    
+    def search_neighborhoods(self, criteria: NeighborhoodSearchCriteria,
+                             limit: Optional[int] = None) -> NeighborhoodSearchResult:
         """Search for neighborhoods matching criteria"""
         start_time = datetime.now()
         
+        # With a database, search is a range query over the precomputed score grid
+        if self.db is not None:
+            grid_scores = self._search_score_grid(criteria, limit)
+            return NeighborhoodSearchResult(
+                grid_scores=grid_scores,
+                total_found=len(grid_scores),
+                search_criteria=criteria,
+                search_time_seconds=(datetime.now() - start_time).total_seconds()
+            )
+        
         # In a real implementation, this would query a database of analyzed neighborhoods
         # For now, we'll return a mock result
         
@@ -549,6 +814,54 @@ class NeighborhoodAnalysisService:
             search_time_seconds=search_time
         )
     
+    def _search_score_grid(self, criteria: NeighborhoodSearchCriteria,
+                           limit: Optional[int] = None) -> List[NeighborhoodGridScore]:
+        """Grid cells within the search radius that pass the score filters, best overall first.
+        
+        Price trend, amenity distance and school type criteria need per-neighborhood detail
+        and are not applied here.
+        """
+        cell = NeighborhoodScoreCellDB
+        query = self.db.query(cell)
+        
+        has_radius = criteria.center_lat is not None and criteria.center_lng is not None and criteria.radius_miles
+        if has_radius:
+            lat_span = criteria.radius_miles / 69.0
+            lng_span = criteria.radius_miles / (69.0 * max(math.cos(math.radians(criteria.center_lat)), 0.01))
+            query = query.filter(
+                cell.center_lat.between(criteria.center_lat - lat_span, criteria.center_lat + lat_span),
+                cell.center_lng.between(criteria.center_lng - lng_span, criteria.center_lng + lng_span)
+            )
+        
+        thresholds = [
+            (cell.overall_score, criteria.min_overall_score),
+            (cell.school_score, criteria.min_school_score),
+            (cell.safety_score, criteria.min_safety_score),
+            (cell.appreciation_potential, criteria.min_appreciation_potential),
+            (cell.max_school_rating, criteria.min_school_rating)
+        ]
+        for column, minimum in thresholds:
+            if minimum is not None:
+                query = query.filter(column >= minimum)
+        if criteria.max_median_price is not None:
+            # Cells without price data are kept, as in _meets_criteria
+            query = query.filter(or_(cell.median_price.is_(None), cell.median_price <= criteria.max_median_price))
+        if criteria.required_amenities:
+            mask = 0
+            for amenity_type in criteria.required_amenities:
+                mask |= 1 << AMENITY_TYPES.index(AmenityTypeEnum(amenity_type))
+            query = query.filter(cell.amenity_types_mask.op("&")(mask) == mask)
+        
+        rows = query.order_by(cell.overall_score.desc(), cell.market, cell.cell_key).all()
+        if has_radius and rows:
+            distances = haversine_miles([row.center_lat for row in rows], [row.center_lng for row in rows],
+                                        criteria.center_lat, criteria.center_lng)
+            rows = [row for row, distance in zip(rows, distances) if distance <= criteria.radius_miles]
+        if limit is not None:
+            rows = rows[:limit]
+        
+        return [NeighborhoodGridScore.model_validate(row) for row in rows]
+    
     def _meets_criteria(self, analysis: NeighborhoodAnalysis, criteria: NeighborhoodSearchCriteria) -> bool:
         """Check if a neighborhood analysis meets the search criteria"""
         score = analysis.neighborhood_score
@@ -14,12 +14,38 @@ import logging
 from statistics import mean, median, stdev
 from enum import Enum
 
-from app.models.portfolio import PortfolioDB, PortfolioPropertyDB, PerformanceBenchmark
+import pandas as pd
+
+from app.models.portfolio import (
+    MetricSketchDB, PortfolioDB, PortfolioPropertyDB, PropertyPerformanceDB, PerformanceBenchmark
+)
+from app.models.property import PropertyDB
 from app.services.portfolio_performance_service import PortfolioPerformanceService
+from app.services.quantile_sketch import QuantileSketch
 from app.core.database import get_db
 
 logger = logging.getLogger(__name__)
 
+# Sketch groups: every property record, one market (city), one property type, one peer strategy
+SKETCH_GROUP_ALL = "all"
+SKETCH_GROUP_MARKET = "market"
+SKETCH_GROUP_PROPERTY_TYPE = "property_type"
+SKETCH_GROUP_PEER = "peer"
+
+# Records a market or property type sketch needs before it replaces the static benchmark table
+MIN_BENCHMARK_SKETCH_COUNT = 30
+
+# Property-level metrics sketched from performance records
+RECORD_SKETCH_METRICS = ["cap_rate", "occupancy_rate", "expense_ratio", "annual_cash_flow"]
+
+# Portfolio-level metrics sketched per peer group, and the PortfolioDB column each comes from
+PEER_SKETCH_METRICS = {
+    "cap_rate": "average_cap_rate",
+    "coc_return": "average_coc_return",
+    "roi": "average_roi",
+    "total_roi": "total_return_ytd"
+}
+
 
 class BenchmarkType(str, Enum):
     """Enum for benchmark types."""
@@ -230,8 +256,17 @@ class PerformanceBenchmarkingService:
     
     def _benchmark_against_peers(self, portfolio_performance: Dict[str, Any], 
                                portfolio_id: uuid.UUID) -> Dict[str, Any]:
-        """Benchmark against peer portfolios."""
+        """Benchmark against peer portfolios.
+        
+        Uses the peer group's quantile sketches when they have been built, so the
+        comparison covers every portfolio with the same strategy; otherwise falls
+        back to up to 20 similar portfolios loaded directly.
+        """
         try:
+            sketch_benchmark = self._benchmark_against_peer_sketches(portfolio_performance, portfolio_id)
+            if sketch_benchmark is not None:
+                return sketch_benchmark
+            
             # Get peer portfolios (similar size and strategy)
             peer_portfolios = self._find_peer_portfolios(portfolio_id)
             
@@ -280,6 +315,56 @@ class PerformanceBenchmarkingService:
             logger.error(f"Error benchmarking against peers: {str(e)}")
             return {"benchmark_type": "peer_portfolio", "error": str(e)}
     
+    def _benchmark_against_peer_sketches(self, portfolio_performance: Dict[str, Any],
+                                         portfolio_id: uuid.UUID) -> Optional[Dict[str, Any]]:
+        """Benchmark against the sketches of the portfolio's strategy, or of the whole book."""
+        portfolio = self.db.query(PortfolioDB).filter(PortfolioDB.id == portfolio_id).first()
+        strategy = getattr(portfolio, "investment_strategy", None)
+        peer_groups = [strategy, SKETCH_GROUP_ALL] if isinstance(strategy, str) and strategy else [SKETCH_GROUP_ALL]
+        
+        sketches = self._load_sketches(SKETCH_GROUP_PEER, peer_groups, list(PEER_SKETCH_METRICS))
+        peer_group = next((group for group in peer_groups if (group, "cap_rate") in sketches), None)
+        if peer_group is None:
+            return None
+        
+        metrics_to_compare = [
+            ("average_cap_rate", "cap_rate"),
+            ("average_coc_return", "coc_return"),
+            ("average_roi", "roi"),
+            ("portfolio_roi", "total_roi")
+        ]
+        
+        benchmarks = []
+        peer_metrics = {}
+        for portfolio_key, benchmark_key in metrics_to_compare:
+            sketch = sketches.get((peer_group, benchmark_key))
+            if sketch is None:
+                continue
+            portfolio_value = portfolio_performance.get(portfolio_key, 0)
+            peer_median = sketch.percentile(50)
+            peer_metrics[f"median_{benchmark_key}"] = peer_median
+            peer_metrics[f"mean_{benchmark_key}"] = sketch.mean
+            peer_metrics[f"p25_{benchmark_key}"] = sketch.percentile(25)
+            peer_metrics[f"p75_{benchmark_key}"] = sketch.percentile(75)
+            
+            benchmarks.append(PerformanceBenchmark(
+                metric_name=benchmark_key,
+                portfolio_value=portfolio_value,
+                benchmark_value=peer_median,
+                percentile_rank=sketch.percentile_rank(portfolio_value),
+                comparison_result="above" if portfolio_value >= peer_median else "below"
+            ))
+        
+        return {
+            "benchmark_type": "peer_portfolio",
+            "benchmarks": [b.dict() for b in benchmarks],
+            "peer_group": peer_group,
+            # Portfolio metric observations since the last rebuild, one per portfolio right after it
+            "peer_count": int(sketches[(peer_group, "cap_rate")].count),
+            "peer_metrics": peer_metrics,
+            "overall_score": self._calculate_benchmark_score(benchmarks)
+        }
+    
     def _benchmark_against_history(self, portfolio_performance: Dict[str, Any], 
                                  portfolio_id: uuid.UUID) -> Dict[str, Any]:
         """Benchmark against historical performance."""
@@ -334,10 +419,18 @@ class PerformanceBenchmarkingService:
             # Get geographic distribution of portfolio
             geographic_distribution = self._get_geographic_distribution(portfolio_id)
             
+            market_sketches = self._load_sketches(SKETCH_GROUP_MARKET, list(geographic_distribution), ["cap_rate"])
+            
             benchmarks = []
             
             for market, percentage in geographic_distribution.items():
-                if market in self.geographic_benchmarks:
+                sketch = market_sketches.get((market, "cap_rate"))
+                if sketch is not None and sketch.count >= MIN_BENCHMARK_SKETCH_COUNT:
+                    # Measured distribution of this market's property cap rates
+                    benchmarks.append(self._sketch_benchmark(
+                        f"{market}_cap_rate", portfolio_performance.get("average_cap_rate", 0), sketch
+                    ))
+                elif market in self.geographic_benchmarks:
                     market_benchmarks = self.geographic_benchmarks[market]
                     
                     for metric, benchmark_value in market_benchmarks.items():
@@ -369,10 +462,19 @@ class PerformanceBenchmarkingService:
             # Get property type distribution
             property_type_distribution = self._get_property_type_distribution(portfolio_id)
             
+            type_sketches = self._load_sketches(
+                SKETCH_GROUP_PROPERTY_TYPE, list(property_type_distribution), ["cap_rate"]
+            )
+            
             benchmarks = []
             
             for prop_type, percentage in property_type_distribution.items():
-                if prop_type in self.industry_benchmarks[PerformanceMetric.CAP_RATE]:
+                sketch = type_sketches.get((prop_type, "cap_rate"))
+                if sketch is not None and sketch.count >= MIN_BENCHMARK_SKETCH_COUNT:
+                    benchmarks.append(self._sketch_benchmark(
+                        f"{prop_type}_cap_rate", portfolio_performance.get("average_cap_rate", 0), sketch
+                    ))
+                elif prop_type in self.industry_benchmarks[PerformanceMetric.CAP_RATE]:
                     # Benchmark cap rate for this property type
                     portfolio_cap_rate = portfolio_performance.get("average_cap_rate", 0)
                     type_benchmark = self.industry_benchmarks[PerformanceMetric.CAP_RATE][prop_type]
@@ -396,6 +498,284 @@ class PerformanceBenchmarkingService:
             logger.error(f"Error benchmarking against property type: {str(e)}")
             return {"benchmark_type": "property_type", "error": str(e)}
     
+    def _sketch_benchmark(self, metric_name: str, portfolio_value: float,
+                          sketch: QuantileSketch) -> PerformanceBenchmark:
+        """Compare a value with the median and rank of a sketched distribution."""
+        benchmark_value = sketch.percentile(50)
+        return PerformanceBenchmark(
+            metric_name=metric_name,
+            portfolio_value=portfolio_value,
+            benchmark_value=benchmark_value,
+            percentile_rank=sketch.percentile_rank(portfolio_value),
+            comparison_result="above" if portfolio_value >= benchmark_value else "below"
+        )
+    
+    # Streaming benchmark sketches
+    
+    def update_benchmark_sketches(self, records: List[PropertyPerformanceDB]) -> int:
+        """Fold newly recorded property performance into the benchmark sketches.
+        
+        The records are sketched on their own and merged into the stored book-wide,
+        market and property type sketches, so only the groups they touch are read
+        and rewritten. Before any sketch exists the first update rebuilds them
+        all, seeding every group from the records already on file. Returns the
+        number of sketches written.
+        """
+        try:
+            record_ids = [record.id for record in records if record.id is not None]
+            if not record_ids:
+                return 0
+            
+            seeded = self.db.query(MetricSketchDB.metric).filter(
+                MetricSketchDB.group_type == SKETCH_GROUP_ALL
+            ).first()
+            if seeded is None:
+                return self.rebuild_benchmark_sketches()
+            
+            frame = self._record_metric_frame(
+                self._record_sketch_query().filter(PropertyPerformanceDB.id.in_(record_ids)).all()
+            )
+            written = self._store_sketches(self._record_sketches(frame))
+            self.db.commit()
+            return written
+            
+        except Exception as e:
+            logger.error(f"Error updating benchmark sketches: {str(e)}")
+            self.db.rollback()
+            return 0
+    
+    def rebuild_benchmark_sketches(self, chunk_size: int = 10000) -> int:
+        """Rebuild every benchmark sketch from scratch.
+        
+        Performance records are streamed in chunks; each chunk is sketched
+        separately and merged, as separate workers' partial sketches would be.
+        Peer sketches are built from the cached portfolio metrics. Sketches cannot
+        forget values, so this batch job is what drops removed properties, deleted
+        portfolios and superseded portfolio metrics from the distributions.
+        """
+        try:
+            sketches = {}
+            result = self.db.execute(self._record_sketch_query().statement,
+                                     execution_options={"yield_per": chunk_size})
+            for chunk in result.partitions():
+                for key, sketch in self._record_sketches(self._record_metric_frame(chunk)).items():
+                    sketches[key] = sketches[key].merge(sketch) if key in sketches else sketch
+            sketches.update(self._peer_sketches())
+            
+            self.db.query(MetricSketchDB).delete(synchronize_session=False)
+            written = self._store_sketches(sketches)
+            self.db.commit()
+            
+            logger.info(f"Rebuilt {written} benchmark sketches")
+            return written
+            
+        except Exception as e:
+            logger.error(f"Error rebuilding benchmark sketches: {str(e)}")
+            self.db.rollback()
+            return 0
+    
+    def update_peer_sketches(self, portfolios: List[PortfolioDB]) -> int:
+        """Merge the cached metrics of freshly updated portfolios into the peer sketches.
+        
+        Only the updated portfolios are sketched, and only their strategies' and the
+        book-wide peer sketches are rewritten. Their earlier metrics stay in the
+        distributions until the next rebuild_benchmark_sketches. Before any peer
+        sketch exists the first update builds them all from the active portfolios.
+        Returns the number of sketches written.
+        """
+        try:
+            portfolios = [portfolio for portfolio in portfolios if portfolio.status == "active"]
+            if not portfolios:
+                return 0
+            
+            seeded = self.db.query(MetricSketchDB.metric).filter(
+                and_(MetricSketchDB.group_type == SKETCH_GROUP_PEER, MetricSketchDB.group_key == SKETCH_GROUP_ALL)
+            ).first()
+            if seeded is None:
+                return self.refresh_peer_sketches()
+            
+            frame = pd.DataFrame([
+                [portfolio.investment_strategy] + [getattr(portfolio, column) for column in PEER_SKETCH_METRICS.values()]
+                for portfolio in portfolios
+            ], columns=["strategy"] + list(PEER_SKETCH_METRICS))
+            written = self._store_sketches(self._portfolio_sketches(frame))
+            self.db.commit()
+            return written
+            
+        except Exception as e:
+            logger.error(f"Error updating peer sketches: {str(e)}")
+            self.db.rollback()
+            return 0
+    
+    def refresh_peer_sketches(self) -> int:
+        """Rebuild the peer group sketches from the cached metrics of every active portfolio."""
+        try:
+            self.db.query(MetricSketchDB).filter(
+                MetricSketchDB.group_type == SKETCH_GROUP_PEER
+            ).delete(synchronize_session=False)
+            written = self._store_sketches(self._peer_sketches())
+            self.db.commit()
+            return written
+            
+        except Exception as e:
+            logger.error(f"Error refreshing peer sketches: {str(e)}")
+            self.db.rollback()
+            return 0
+    
+    def get_benchmark_sketch(self, metric: str, group_type: str = SKETCH_GROUP_ALL,
+                             group_key: str = SKETCH_GROUP_ALL) -> Optional[QuantileSketch]:
+        """The stored sketch of a metric for one group, read by primary key."""
+        row = self.db.get(MetricSketchDB, (group_type, group_key, metric))
+        return QuantileSketch.from_dict(row.sketch) if row is not None else None
+    
+    def get_benchmark_distribution(self, metric: str, group_type: str = SKETCH_GROUP_ALL,
+                                   group_key: str = SKETCH_GROUP_ALL,
+                                   percentiles: Tuple[float, ...] = (10, 25, 50, 75, 90)) -> Dict[str, Any]:
+        """Count, extremes, mean and percentiles of a metric within a group."""
+        sketch = self.get_benchmark_sketch(metric, group_type, group_key)
+        distribution = {"metric": metric, "group_type": group_type, "group_key": group_key}
+        if sketch is None:
+            distribution["count"] = 0
+            return distribution
+        
+        distribution.update(sketch.summary(percentiles))
+        distribution["mean"] = sketch.mean
+        return distribution
+    
+    def get_benchmark_percentile_rank(self, metric: str, value: float, group_type: str = SKETCH_GROUP_ALL,
+                                      group_key: str = SKETCH_GROUP_ALL) -> Optional[float]:
+        """Percent of the group at or below value, or None when the group has no sketch."""
+        sketch = self.get_benchmark_sketch(metric, group_type, group_key)
+        return sketch.percentile_rank(value) if sketch is not None else None
+    
+    def _load_sketches(self, group_type: str, group_keys: List[str],
+                       metrics: List[str]) -> Dict[Tuple[str, str], QuantileSketch]:
+        """Stored sketches of one group type, keyed by (group_key, metric), in one query."""
+        try:
+            if not group_keys:
+                return {}
+            
+            rows = self.db.query(MetricSketchDB).filter(
+                and_(
+                    MetricSketchDB.group_type == group_type,
+                    MetricSketchDB.group_key.in_(group_keys),
+                    MetricSketchDB.metric.in_(metrics)
+                )
+            ).all()
+            
+            return {(row.group_key, row.metric): QuantileSketch.from_dict(row.sketch) for row in rows}
+            
+        except Exception as e:
+            logger.error(f"Error loading benchmark sketches: {str(e)}")
+            return {}
+    
+    def _record_sketch_query(self):
+        """Performance record metrics with the market and type of their property."""
+        return self.db.query(
+            PropertyPerformanceDB.period_start,
+            PropertyPerformanceDB.period_end,
+            PropertyPerformanceDB.cap_rate,
+            PropertyPerformanceDB.occupancy_rate,
+            PropertyPerformanceDB.total_income,
+            PropertyPerformanceDB.total_expenses,
+            PropertyPerformanceDB.net_cash_flow,
+            PropertyDB.city,
+            PropertyDB.property_type
+        ).join(
+            PortfolioPropertyDB, PortfolioPropertyDB.id == PropertyPerformanceDB.portfolio_property_id
+        ).outerjoin(
+            PropertyDB, PropertyDB.id == PortfolioPropertyDB.property_id
+        )
+    
+    @staticmethod
+    def _record_metric_frame(rows: List[Any]) -> pd.DataFrame:
+        """One row per performance record with the sketched metrics."""
+        frame = pd.DataFrame([tuple(row) for row in rows], columns=[
+            "period_start", "period_end", "cap_rate", "occupancy_rate", "total_income",
+            "total_expenses", "net_cash_flow", "city", "property_type"
+        ])
+        for column in ["cap_rate", "occupancy_rate", "total_income", "total_expenses", "net_cash_flow"]:
+            frame[column] = pd.to_numeric(frame[column], errors="coerce")
+        
+        days = (pd.to_datetime(frame["period_end"]) - pd.to_datetime(frame["period_start"])).dt.days
+        frame["annual_cash_flow"] = (frame["net_cash_flow"] * 365 / days).where(days > 0)
+        frame["expense_ratio"] = (frame["total_expenses"] / frame["total_income"] * 100).where(frame["total_income"] > 0)
+        frame["city"] = frame["city"].fillna("unknown")
+        frame["property_type"] = frame["property_type"].fillna("unknown")
+        return frame
+    
+    @staticmethod
+    def _record_sketches(frame: pd.DataFrame) -> Dict[Tuple[str, str, str], QuantileSketch]:
+        """Sketch each record metric book-wide, per market and per property type."""
+        sketches = {}
+        if frame.empty:
+            return sketches
+        
+        groupings = [
+            (SKETCH_GROUP_ALL, pd.Series(SKETCH_GROUP_ALL, index=frame.index)),
+            (SKETCH_GROUP_MARKET, frame["city"]),
+            (SKETCH_GROUP_PROPERTY_TYPE, frame["property_type"])
+        ]
+        for group_type, keys in groupings:
+            for group_key, group in frame[RECORD_SKETCH_METRICS].groupby(keys):
+                for metric in RECORD_SKETCH_METRICS:
+                    sketch = QuantileSketch.from_values(group[metric].to_numpy(dtype=float))
+                    if sketch.count:
+                        sketches[(group_type, str(group_key), metric)] = sketch
+        return sketches
+    
+    def _peer_sketches(self) -> Dict[Tuple[str, str, str], QuantileSketch]:
+        """Sketch the cached metrics of every active portfolio."""
+        columns = [getattr(PortfolioDB, column) for column in PEER_SKETCH_METRICS.values()]
+        rows = self.db.query(PortfolioDB.investment_strategy, *columns).filter(
+            PortfolioDB.status == "active"
+        ).all()
+        return self._portfolio_sketches(
+            pd.DataFrame([tuple(row) for row in rows], columns=["strategy"] + list(PEER_SKETCH_METRICS))
+        )
+    
+    @staticmethod
+    def _portfolio_sketches(frame: pd.DataFrame) -> Dict[Tuple[str, str, str], QuantileSketch]:
+        """Sketch portfolio metrics per investment strategy and book-wide."""
+        sketches = {}
+        groups = [(SKETCH_GROUP_ALL, frame)]
+        groups += [(str(strategy), group) for strategy, group in frame.dropna(subset=["strategy"]).groupby("strategy")]
+        for group_key, group in groups:
+            for metric in PEER_SKETCH_METRICS:
+                sketch = QuantileSketch.from_values(pd.to_numeric(group[metric], errors="coerce").fillna(0.0))
+                if sketch.count:
+                    sketches[(SKETCH_GROUP_PEER, group_key, metric)] = sketch
+        return sketches
+    
+    def _store_sketches(self, sketches: Dict[Tuple[str, str, str], QuantileSketch]) -> int:
+        """Merge sketches into their stored rows, creating missing rows."""
+        if not sketches:
+            return 0
+        
+        group_types = {group_type for group_type, _, _ in sketches}
+        group_keys = {group_key for _, group_key, _ in sketches}
+        metrics = {metric for _, _, metric in sketches}
+        rows = self.db.query(MetricSketchDB).filter(
+            and_(
+                MetricSketchDB.group_type.in_(group_types),
+                MetricSketchDB.group_key.in_(group_keys),
+                MetricSketchDB.metric.in_(metrics)
+            )
+        ).all()
+        existing = {(row.group_type, row.group_key, row.metric): row for row in rows}
+        
+        for key, sketch in sketches.items():
+            row = existing.get(key)
+            if row is None:
+                group_type, group_key, metric = key
+                row = MetricSketchDB(group_type=group_type, group_key=group_key, metric=metric)
+                self.db.add(row)
+            else:
+                sketch = QuantileSketch.from_dict(row.sketch).merge(sketch)
+            row.sketch = sketch.to_dict()
+            row.count = sketch.count
+        return len(sketches)
+    
     def _get_property_type_distribution(self, portfolio_id: uuid.UUID) -> Dict[str, float]:
         """Get the distribution of property types in a portfolio."""
         try:
@@ -573,19 +953,16 @@ class PerformanceBenchmarkingService:
     def _get_historical_performance_data(self, portfolio_id: uuid.UUID) -> List[Dict[str, Any]]:
         """Get historical performance data for a portfolio."""
         try:
-            from app.models.portfolio import PortfolioPerformanceDB
+            from app.models.portfolio import PortfolioMonthlySnapshotDB
             
-            # Get historical performance records
-            historical_records = self.db.query(PortfolioPerformanceDB).filter(
-                and_(
-                    PortfolioPerformanceDB.portfolio_id == portfolio_id,
-                    PortfolioPerformanceDB.period_type == "monthly"
-                )
-            ).order_by(PortfolioPerformanceDB.period_start.desc()).limit(24).all()
+            # Get the materialized monthly series
+            historical_records = self.db.query(PortfolioMonthlySnapshotDB).filter(
+                PortfolioMonthlySnapshotDB.portfolio_id == portfolio_id
+            ).order_by(PortfolioMonthlySnapshotDB.month.desc()).limit(24).all()
             
             return [
                 {
-                    "period": record.period_start.strftime("%Y-%m"),
+                    "period": record.month.strftime("%Y-%m"),
                     "cap_rate": record.average_cap_rate or 0,
                     "coc_return": record.average_coc_return or 0,
                     "roi": record.average_roi or 0,
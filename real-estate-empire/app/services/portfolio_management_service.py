@@ -13,7 +13,7 @@ from sqlalchemy import func, and_, or_
 import logging
 
 from app.models.portfolio import (
-    PortfolioDB, PortfolioPropertyDB, PropertyPerformanceDB, PortfolioPerformanceDB,
+    PortfolioDB, PortfolioPropertyDB, PropertyPerformanceDB, PortfolioPerformanceDB, PortfolioMonthlySnapshotDB,
     PortfolioCreate, PortfolioUpdate, PortfolioResponse,
     PortfolioPropertyCreate, PortfolioPropertyUpdate, PortfolioPropertyResponse,
     PropertyPerformanceCreate, PropertyPerformanceResponse,
@@ -22,6 +22,7 @@ from app.models.portfolio import (
 from app.models.property import PropertyDB
 from app.core.database import get_db
 from app.services.portfolio_performance_service import PortfolioPerformanceService
+from app.services.performance_benchmarking_service import PerformanceBenchmarkingService
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +33,7 @@ class PortfolioManagementService:
     def __init__(self, db: Session):
         self.db = db
         self.performance_service = PortfolioPerformanceService(db)
+        self.benchmarking_service = PerformanceBenchmarkingService(db)
     
     # Portfolio CRUD Operations
     
@@ -117,6 +119,9 @@ class PortfolioManagementService:
             self.db.query(PortfolioPerformanceDB).filter(
                 PortfolioPerformanceDB.portfolio_id == portfolio_id
             ).delete()
+            self.db.query(PortfolioMonthlySnapshotDB).filter(
+                PortfolioMonthlySnapshotDB.portfolio_id == portfolio_id
+            ).delete()
             
             # Delete the portfolio
             portfolio = self.db.query(PortfolioDB).filter(PortfolioDB.id == portfolio_id).first()
@@ -124,6 +129,9 @@ class PortfolioManagementService:
                 self.db.delete(portfolio)
                 self.db.commit()
                 logger.info(f"Deleted portfolio: {portfolio.name} (ID: {portfolio.id})")
+                
+                # Sketches cannot subtract values, so rebuild them without the portfolio
+                self.benchmarking_service.rebuild_benchmark_sketches()
                 return True
             
             return False
@@ -295,7 +303,7 @@ class PortfolioManagementService:
             
             portfolio_id = portfolio_property.portfolio_id
             
-            # Delete performance records
+            # Delete performance records; they leave the benchmark sketches at the next rebuild
             self.db.query(PropertyPerformanceDB).filter(
                 PropertyPerformanceDB.portfolio_property_id == portfolio_property_id
             ).delete()
@@ -411,6 +419,9 @@ class PortfolioManagementService:
             
             self.db.commit()
             
+            # Stream the new record into the market and property type benchmark sketches
+            self.benchmarking_service.update_benchmark_sketches([performance])
+            
             logger.info(f"Recorded performance for portfolio property {performance_data.portfolio_property_id}")
             return PropertyPerformanceResponse.from_orm(performance)
             
@@ -15,12 +15,18 @@ from statistics import mean, median, stdev
 from dataclasses import dataclass
 from enum import Enum
 
+import pandas as pd
+
 from app.models.portfolio import (
     PortfolioDB, PortfolioPropertyDB, PropertyPerformanceDB,
     PortfolioResponse, PortfolioPropertyResponse
 )
 from app.models.property import PropertyDB
 from app.services.portfolio_performance_service import PortfolioPerformanceService
+from app.services.diversification_engine import DiversificationEngine, HOLDING_COLUMNS, SCORE_WEIGHTS
+from app.services.rebalancing_optimizer import (
+    ACTION_REFINANCE, ACTION_SELL, RebalancingAssumptions, RebalancingOptimizer, RebalancingPlan
+)
 from app.services.market_data_service import MarketDataService
 from app.core.database import get_db
 
@@ -112,32 +118,20 @@ class PortfolioOptimizationService:
         self.market_service = MarketDataService(db)
     
     def detect_underperforming_assets(self, portfolio_id: uuid.UUID, 
-                                    benchmark_percentile: float = 25.0) -> List[UnderperformingAsset]:
-        """Detect underperforming assets in a portfolio."""
+                                    benchmark_percentile: float = 25.0,
+                                    metrics: Optional[pd.DataFrame] = None) -> List[UnderperformingAsset]:
+        """Detect underperforming assets in a portfolio.
+        
+        metrics is the portfolio's trailing-year performance frame, loaded when not given.
+        """
         try:
-            # Get portfolio properties
-            portfolio_properties = self.db.query(PortfolioPropertyDB).filter(
-                PortfolioPropertyDB.portfolio_id == portfolio_id
-            ).all()
-            
-            if not portfolio_properties:
-                return []
-            
-            # Calculate performance metrics for each property
+            # Calculate performance metrics for every property in one pass
             end_date = datetime.now()
             start_date = end_date - timedelta(days=365)
             
-            property_performances = []
-            for prop in portfolio_properties:
-                try:
-                    perf = self.performance_service.calculate_property_performance(
-                        prop.id, start_date, end_date
-                    )
-                    perf['portfolio_property'] = prop
-                    property_performances.append(perf)
-                except Exception as e:
-                    logger.error(f"Error calculating performance for property {prop.id}: {str(e)}")
-                    continue
+            property_performances = self.performance_service.calculate_property_performances(
+                portfolio_id, start_date, end_date, metrics=metrics
+            )
             
             if not property_performances:
                 return []
@@ -201,9 +195,6 @@ class PortfolioOptimizationService:
                 
                 # Only include if there are issues
                 if issues:
-                    prop = perf['portfolio_property']
-                    property_obj = self.db.query(PropertyDB).filter(PropertyDB.id == prop.property_id).first()
-                    
                     # Determine priority
                     if underperformance_score >= 75:
                         priority = OptimizationPriorityEnum.CRITICAL
@@ -218,9 +209,9 @@ class PortfolioOptimizationService:
                     estimated_impact = self._estimate_improvement_impact(perf)
                     
                     underperforming_assets.append(UnderperformingAsset(
-                        portfolio_property_id=prop.id,
-                        property_id=prop.property_id,
-                        property_address=property_obj.address if property_obj else "Unknown",
+                        portfolio_property_id=perf['portfolio_property_id'],
+                        property_id=perf['property_id'],
+                        property_address=perf.get('property_address') or "Unknown",
                         underperformance_score=underperformance_score,
                         issues=issues,
                         potential_actions=potential_actions,
@@ -269,21 +260,36 @@ class PortfolioOptimizationService:
         
         return estimated_impact
     
-    def generate_optimization_recommendations(self, portfolio_id: uuid.UUID) -> List[OptimizationRecommendation]:
-        """Generate comprehensive optimization recommendations for a portfolio."""
+    def generate_optimization_recommendations(self, portfolio_id: uuid.UUID,
+                                              candidate_deals: Optional[List[Dict[str, Any]]] = None,
+                                              cash_available: float = 0.0) -> List[OptimizationRecommendation]:
+        """Generate comprehensive optimization recommendations for a portfolio.
+        
+        Sell, refinance and acquire recommendations come from the rebalancing optimizer;
+        candidate_deals and cash_available feed its acquisition choices.
+        """
         try:
             recommendations = []
             
+            # Load the per-property metrics once for the asset, rebalancing and portfolio checks
+            metrics = self._load_performance_frame(portfolio_id)
+            
             # Get underperforming assets
-            underperforming_assets = self.detect_underperforming_assets(portfolio_id)
+            underperforming_assets = self.detect_underperforming_assets(portfolio_id, metrics=metrics)
             
-            # Generate recommendations for underperforming assets
+            # Generate operating improvements for underperforming assets
             for asset in underperforming_assets:
                 asset_recommendations = self._generate_asset_recommendations(asset)
                 recommendations.extend(asset_recommendations)
             
+            # Generate sell / refinance / acquire actions from the rebalancing optimizer
+            rebalancing_recommendations = self._generate_rebalancing_recommendations(
+                portfolio_id, candidate_deals, cash_available, metrics=metrics
+            )
+            recommendations.extend(rebalancing_recommendations)
+            
             # Generate portfolio-level recommendations
-            portfolio_recommendations = self._generate_portfolio_level_recommendations(portfolio_id)
+            portfolio_recommendations = self._generate_portfolio_level_recommendations(portfolio_id, metrics)
             recommendations.extend(portfolio_recommendations)
             
             # Generate diversification recommendations
@@ -308,7 +314,11 @@ class PortfolioOptimizationService:
             raise
     
     def _generate_asset_recommendations(self, asset: UnderperformingAsset) -> List[OptimizationRecommendation]:
-        """Generate recommendations for a specific underperforming asset."""
+        """Generate operating improvement recommendations for an underperforming asset.
+        
+        Dispositions are left to the rebalancing optimizer, which weighs them against
+        the rest of the portfolio.
+        """
         recommendations = []
         
         # Rent optimization recommendation
@@ -366,36 +376,124 @@ class PortfolioOptimizationService:
                 created_at=datetime.now()
             ))
         
-        # Disposition recommendation for critical underperformers
-        if asset.priority == OptimizationPriorityEnum.CRITICAL:
-            recommendations.append(OptimizationRecommendation(
-                id=uuid.uuid4(),
-                portfolio_id=asset.portfolio_property_id,  # This should be portfolio_id, will fix
-                recommendation_type=OptimizationActionEnum.SELL,
-                title=f"Consider Disposition - {asset.property_address}",
-                description="Evaluate selling this underperforming asset to redeploy capital",
-                rationale="Property is significantly underperforming and may not be recoverable",
-                priority=OptimizationPriorityEnum.HIGH,
-                estimated_impact={
-                    'capital_freed': asset.estimated_impact.get('value_improvement_10pct', 0),
-                    'cash_flow_elimination': -abs(asset.estimated_impact.get('rent_increase_5pct', 0))
-                },
-                implementation_steps=[
-                    "Obtain current market valuation",
-                    "Calculate net proceeds after sale costs",
-                    "Identify replacement investment opportunities",
-                    "Execute disposition if favorable"
-                ],
-                timeline_days=120,
-                cost_estimate=None,
-                risk_level="Medium",
-                affected_properties=[asset.property_id],
-                created_at=datetime.now()
-            ))
+        return recommendations
+    
+    def _load_performance_frame(self, portfolio_id: uuid.UUID) -> pd.DataFrame:
+        """Per-property metrics of the portfolio over the trailing year."""
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=365)
+        return self.performance_service.load_performance_frame([portfolio_id], start_date, end_date)
+    
+    def build_rebalancing_optimizer(self, portfolio_id: uuid.UUID,
+                                    candidate_deals: Optional[List[Dict[str, Any]]] = None,
+                                    assumptions: Optional[RebalancingAssumptions] = None,
+                                    metrics: Optional[pd.DataFrame] = None) -> RebalancingOptimizer:
+        """Rebalancing optimizer over the portfolio's per-asset metrics and candidate deals.
+        
+        The option metrics are cached on the optimizer, so it can be solved repeatedly
+        with other budgets and concentration caps. metrics is the portfolio's
+        trailing-year performance frame, loaded when not given.
+        """
+        if metrics is None:
+            metrics = self._load_performance_frame(portfolio_id)
+        return RebalancingOptimizer(metrics, candidate_deals, assumptions)
+    
+    def optimize_rebalancing(self, portfolio_id: uuid.UUID,
+                             candidate_deals: Optional[List[Dict[str, Any]]] = None,
+                             cash_available: float = 0.0, max_concentration: Optional[float] = 0.4,
+                             assumptions: Optional[RebalancingAssumptions] = None,
+                             metrics: Optional[pd.DataFrame] = None) -> RebalancingPlan:
+        """Pick the sell / refinance / hold / acquire actions that maximize annual return.
+        
+        Plans stay within cash_available plus any capital the plan releases, and keep
+        each city, state and property type at or below max_concentration of portfolio value.
+        """
+        try:
+            optimizer = self.build_rebalancing_optimizer(portfolio_id, candidate_deals, assumptions, metrics)
+            plan = optimizer.solve(cash_available=cash_available, max_concentration=max_concentration)
+            logger.info(f"Rebalancing plan for portfolio {portfolio_id}: {len(plan.actions)} actions, "
+                        f"{plan.annual_return_change:,.0f} annual return change in {plan.solve_seconds:.2f}s")
+            return plan
+            
+        except Exception as e:
+            logger.error(f"Error optimizing portfolio rebalancing: {str(e)}")
+            raise
+    
+    def _generate_rebalancing_recommendations(self, portfolio_id: uuid.UUID,
+                                              candidate_deals: Optional[List[Dict[str, Any]]] = None,
+                                              cash_available: float = 0.0,
+                                              metrics: Optional[pd.DataFrame] = None) -> List[OptimizationRecommendation]:
+        """Turn the optimal rebalancing plan into recommendations."""
+        recommendations = []
+        
+        try:
+            plan = self.optimize_rebalancing(portfolio_id, candidate_deals, cash_available, metrics=metrics)
+            
+            for action in plan.actions:
+                name = action.address or str(action.asset_id)
+                impact = {
+                    'annual_return_increase': action.annual_return_change,
+                    'capital_released': -action.capital_change,
+                    'portfolio_value_change': action.value_change
+                }
+                if action.action == ACTION_SELL:
+                    recommendation_type = OptimizationActionEnum.SELL
+                    title = f"Sell - {name}"
+                    description = "Sell this asset and redeploy the net proceeds"
+                    steps = [
+                        "Obtain current market valuation",
+                        "Confirm net proceeds after sale costs and debt payoff",
+                        "List and execute disposition",
+                        "Redeploy proceeds per the rebalancing plan"
+                    ]
+                    priority, timeline_days, risk_level = OptimizationPriorityEnum.HIGH, 120, "Medium"
+                elif action.action == ACTION_REFINANCE:
+                    recommendation_type = OptimizationActionEnum.REFINANCE
+                    title = f"Refinance - {name}"
+                    description = "Refinance this asset to lower debt service or release equity"
+                    steps = [
+                        "Obtain refinancing quotes from multiple lenders",
+                        "Confirm appraisal supports the target loan-to-value",
+                        "Close the new loan",
+                        "Redeploy any cash out per the rebalancing plan"
+                    ]
+                    priority, timeline_days, risk_level = OptimizationPriorityEnum.MEDIUM, 60, "Low"
+                else:
+                    recommendation_type = OptimizationActionEnum.ACQUIRE_SIMILAR
+                    title = f"Acquire - {name}"
+                    description = "Acquire this candidate deal within the capital and concentration limits"
+                    steps = [
+                        "Complete due diligence",
+                        "Secure financing",
+                        "Negotiate and close the acquisition"
+                    ]
+                    priority, timeline_days, risk_level = OptimizationPriorityEnum.MEDIUM, 90, "Medium"
+                
+                recommendations.append(OptimizationRecommendation(
+                    id=uuid.uuid4(),
+                    portfolio_id=portfolio_id,
+                    recommendation_type=recommendation_type,
+                    title=title,
+                    description=description,
+                    rationale=f"Part of the best rebalancing plan found "
+                              f"({plan.annual_return_change:,.0f} total annual return change)",
+                    priority=priority,
+                    estimated_impact=impact,
+                    implementation_steps=steps,
+                    timeline_days=timeline_days,
+                    cost_estimate=None,
+                    risk_level=risk_level,
+                    affected_properties=[action.property_id] if action.property_id is not None else [],
+                    created_at=datetime.now()
+                ))
+        
+        except Exception as e:
+            logger.error(f"Error generating rebalancing recommendations: {str(e)}")
         
         return recommendations
     
-    def _generate_portfolio_level_recommendations(self, portfolio_id: uuid.UUID) -> List[OptimizationRecommendation]:
+    def _generate_portfolio_level_recommendations(self, portfolio_id: uuid.UUID,
+                                                  metrics: Optional[pd.DataFrame] = None) -> List[OptimizationRecommendation]:
         """Generate portfolio-level optimization recommendations."""
         recommendations = []
         
@@ -404,7 +502,7 @@ class PortfolioOptimizationService:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=365)
             portfolio_performance = self.performance_service.calculate_portfolio_performance(
-                portfolio_id, start_date, end_date
+                portfolio_id, start_date, end_date, metrics=metrics
             )
             
             # Refinancing recommendation if rates are favorable
@@ -547,199 +645,151 @@ class PortfolioOptimizationService:
             ).all()
             
             if not portfolio_properties:
-                return DiversificationAnalysis(
-                    portfolio_id=portfolio_id,
-                    overall_score=0.0,
-                    geographic_diversity={},
-                    property_type_diversity={},
-                    price_range_diversity={},
-                    income_source_diversity={},
-                    recommendations=[],
-                    target_allocations={}
-                )
+                return self._empty_diversification_analysis(portfolio_id)
             
             # Get property details
             property_ids = [prop.property_id for prop in portfolio_properties]
             properties = self.db.query(PropertyDB).filter(PropertyDB.id.in_(property_ids)).all()
             property_dict = {prop.id: prop for prop in properties}
             
-            # Analyze geographic diversity
-            geographic_diversity = self._analyze_geographic_diversity(portfolio_properties, property_dict)
+            engine = DiversificationEngine.from_records(portfolio_properties, property_dict, portfolio_id)
+            return self._build_diversification_analysis(portfolio_id, engine.analysis(portfolio_id))
             
-            # Analyze property type diversity
-            property_type_diversity = self._analyze_property_type_diversity(portfolio_properties, property_dict)
-            
-            # Analyze price range diversity
-            price_range_diversity = self._analyze_price_range_diversity(portfolio_properties)
-            
-            # Analyze income source diversity
-            income_source_diversity = self._analyze_income_source_diversity(portfolio_properties)
-            
-            # Calculate overall diversification score
-            overall_score = (
-                geographic_diversity.get('score', 0) * 0.3 +
-                property_type_diversity.get('score', 0) * 0.25 +
-                price_range_diversity.get('score', 0) * 0.25 +
-                income_source_diversity.get('score', 0) * 0.2
-            )
-            
-            # Generate recommendations
-            recommendations = []
-            if geographic_diversity.get('score', 0) < 60:
-                recommendations.append("Consider acquiring properties in different geographic markets")
-            if property_type_diversity.get('score', 0) < 60:
-                recommendations.append("Diversify across different property types (residential, commercial, etc.)")
-            if price_range_diversity.get('score', 0) < 60:
-                recommendations.append("Balance portfolio across different price ranges")
-            if income_source_diversity.get('score', 0) < 60:
-                recommendations.append("Diversify income sources (rental, appreciation, development)")
-            
-            # Generate target allocations
-            target_allocations = {
-                'geographic_spread': 0.3,
-                'property_type_mix': 0.25,
-                'price_range_balance': 0.25,
-                'income_source_variety': 0.2
+        except Exception as e:
+            logger.error(f"Error analyzing diversification: {str(e)}")
+            raise
+    
+    def analyze_diversification_batch(self, portfolio_ids: Optional[List[uuid.UUID]] = None
+                                      ) -> Dict[uuid.UUID, DiversificationAnalysis]:
+        """Analyze diversification for many portfolios (all when None) from one holdings load."""
+        try:
+            engine = self.get_diversification_engine(portfolio_ids)
+            ids = engine.portfolio_ids if portfolio_ids is None else portfolio_ids
+            return {
+                portfolio_id: self._build_diversification_analysis(portfolio_id, engine.analysis(portfolio_id))
+                if portfolio_id in engine else self._empty_diversification_analysis(portfolio_id)
+                for portfolio_id in ids
             }
             
-            return DiversificationAnalysis(
-                portfolio_id=portfolio_id,
-                overall_score=overall_score,
-                geographic_diversity=geographic_diversity,
-                property_type_diversity=property_type_diversity,
-                price_range_diversity=price_range_diversity,
-                income_source_diversity=income_source_diversity,
-                recommendations=recommendations,
-                target_allocations=target_allocations
-            )
+        except Exception as e:
+            logger.error(f"Error analyzing diversification batch: {str(e)}")
+            raise
+    
+    def get_diversification_engine(self, portfolio_ids: Optional[List[uuid.UUID]] = None) -> DiversificationEngine:
+        """Value-weighted diversification engine over the holdings of the given portfolios."""
+        return DiversificationEngine.from_db(self.db, portfolio_ids)
+    
+    def evaluate_diversification_changes(self, portfolio_id: uuid.UUID,
+                                         candidates: Optional[List[Dict[str, Any]]] = None,
+                                         remove_property_ids: Optional[List[uuid.UUID]] = None,
+                                         engine: Optional[DiversificationEngine] = None) -> Dict[str, Any]:
+        """What-if diversification: score each candidate and each removal on its own, and all together.
+        
+        Candidates are dicts with city, state, property_type, current_value, total_investment
+        and monthly_rent. Pass a prebuilt engine to evaluate many scenarios without reloading.
+        """
+        try:
+            engine = engine or self.get_diversification_engine([portfolio_id])
+            baseline = engine.metrics([portfolio_id]).iloc[0] if portfolio_id in engine else None
+            candidate_frame = pd.DataFrame(candidates or [], columns=HOLDING_COLUMNS)
+            
+            result = {
+                "portfolio_id": portfolio_id,
+                "current_score": float(baseline["overall_score"]) if baseline is not None else 0.0,
+                "candidate_scores": [],
+                "removal_scores": [],
+                "combined_score": None
+            }
+            if len(candidate_frame):
+                additions = engine.evaluate_additions(portfolio_id, candidate_frame)
+                result["candidate_scores"] = additions[["overall_score", "overall_score_change"]].to_dict("records")
+            if remove_property_ids:
+                removals = engine.evaluate_removals(portfolio_id, remove_property_ids)
+                result["removal_scores"] = [
+                    {"property_id": property_id, **row}
+                    for property_id, row in removals[["overall_score", "overall_score_change"]].iterrows()
+                ]
+            if len(candidate_frame) or remove_property_ids:
+                combined = engine.what_if(portfolio_id, add=candidate_frame, remove=remove_property_ids)
+                result["combined_score"] = float(combined["overall_score"])
+            return result
             
         except Exception as e:
-            logger.error(f"Error analyzing diversification: {str(e)}")
+            logger.error(f"Error evaluating diversification changes: {str(e)}")
             raise
     
+    def _empty_diversification_analysis(self, portfolio_id: uuid.UUID) -> DiversificationAnalysis:
+        return DiversificationAnalysis(
+            portfolio_id=portfolio_id,
+            overall_score=0.0,
+            geographic_diversity={},
+            property_type_diversity={},
+            price_range_diversity={},
+            income_source_diversity={},
+            recommendations=[],
+            target_allocations={}
+        )
+    
+    def _build_diversification_analysis(self, portfolio_id: uuid.UUID,
+                                        analysis: Dict[str, Any]) -> DiversificationAnalysis:
+        """Wrap engine output with recommendations and target allocations."""
+        geographic_diversity = analysis['geographic']
+        property_type_diversity = analysis['property_type']
+        price_range_diversity = analysis['price_band']
+        income_source_diversity = analysis['income_source']
+        
+        # Generate recommendations
+        recommendations = []
+        if geographic_diversity['score'] < 60:
+            recommendations.append("Consider acquiring properties in different geographic markets")
+        if property_type_diversity['score'] < 60:
+            recommendations.append("Diversify across different property types (residential, commercial, etc.)")
+        if price_range_diversity['score'] < 60:
+            recommendations.append("Balance portfolio across different price ranges")
+        if income_source_diversity['score'] < 60:
+            recommendations.append("Diversify income sources (rental, appreciation, development)")
+        
+        # Generate target allocations
+        target_allocations = {
+            'geographic_spread': SCORE_WEIGHTS['geographic'],
+            'property_type_mix': SCORE_WEIGHTS['property_type'],
+            'price_range_balance': SCORE_WEIGHTS['price_band'],
+            'income_source_variety': SCORE_WEIGHTS['income_source']
+        }
+        
+        return DiversificationAnalysis(
+            portfolio_id=portfolio_id,
+            overall_score=analysis['overall_score'],
+            geographic_diversity=geographic_diversity,
+            property_type_diversity=property_type_diversity,
+            price_range_diversity=price_range_diversity,
+            income_source_diversity=income_source_diversity,
+            recommendations=recommendations,
+            target_allocations=target_allocations
+        )
+    
     def _analyze_geographic_diversity(self, portfolio_properties: List[PortfolioPropertyDB], 
                                     property_dict: Dict[uuid.UUID, PropertyDB]) -> Dict[str, Any]:
         """Analyze geographic diversity of portfolio."""
-        cities = {}
-        states = {}
-        total_value = sum(prop.current_value or prop.total_investment for prop in portfolio_properties)
-        
-        for prop in portfolio_properties:
-            property_obj = property_dict.get(prop.property_id)
-            if not property_obj:
-                continue
-            
-            prop_value = prop.current_value or prop.total_investment
-            
-            # City analysis
-            city = getattr(property_obj, 'city', 'Unknown')
-            cities[city] = cities.get(city, 0) + prop_value
-            
-            # State analysis
-            state = getattr(property_obj, 'state', 'Unknown')
-            states[state] = states.get(state, 0) + prop_value
-        
-        # Calculate diversity scores
-        city_concentration = max(cities.values()) / total_value if total_value > 0 else 1
-        state_concentration = max(states.values()) / total_value if total_value > 0 else 1
-        
-        # Score based on concentration (lower concentration = higher score)
-        city_score = (1 - city_concentration) * 100
-        state_score = (1 - state_concentration) * 100
-        overall_score = (city_score + state_score) / 2
-        
-        return {
-            'score': overall_score,
-            'city_distribution': cities,
-            'state_distribution': states,
-            'city_concentration': city_concentration,
-            'state_concentration': state_concentration
-        }
+        return self._analyze_dimension(portfolio_properties, property_dict, 'geographic')
     
     def _analyze_property_type_diversity(self, portfolio_properties: List[PortfolioPropertyDB], 
                                        property_dict: Dict[uuid.UUID, PropertyDB]) -> Dict[str, Any]:
         """Analyze property type diversity."""
-        property_types = {}
-        total_value = sum(prop.current_value or prop.total_investment for prop in portfolio_properties)
-        
-        for prop in portfolio_properties:
-            property_obj = property_dict.get(prop.property_id)
-            if not property_obj:
-                continue
-            
-            prop_value = prop.current_value or prop.total_investment
-            prop_type = getattr(property_obj, 'property_type', 'Unknown')
-            property_types[prop_type] = property_types.get(prop_type, 0) + prop_value
-        
-        # Calculate concentration
-        max_concentration = max(property_types.values()) / total_value if total_value > 0 else 1
-        score = (1 - max_concentration) * 100
-        
-        return {
-            'score': score,
-            'type_distribution': property_types,
-            'concentration': max_concentration
-        }
+        return self._analyze_dimension(portfolio_properties, property_dict, 'property_type')
     
     def _analyze_price_range_diversity(self, portfolio_properties: List[PortfolioPropertyDB]) -> Dict[str, Any]:
         """Analyze price range diversity."""
-        price_ranges = {
-            'under_100k': 0,
-            '100k_250k': 0,
-            '250k_500k': 0,
-            '500k_1m': 0,
-            'over_1m': 0
-        }
-        
-        total_value = 0
-        
-        for prop in portfolio_properties:
-            prop_value = prop.current_value or prop.total_investment
-            total_value += prop_value
-            
-            if prop_value < 100000:
-                price_ranges['under_100k'] += prop_value
-            elif prop_value < 250000:
-                price_ranges['100k_250k'] += prop_value
-            elif prop_value < 500000:
-                price_ranges['250k_500k'] += prop_value
-            elif prop_value < 1000000:
-                price_ranges['500k_1m'] += prop_value
-            else:
-                price_ranges['over_1m'] += prop_value
-        
-        # Calculate concentration
-        max_concentration = max(price_ranges.values()) / total_value if total_value > 0 else 1
-        score = (1 - max_concentration) * 100
-        
-        return {
-            'score': score,
-            'range_distribution': price_ranges,
-            'concentration': max_concentration
-        }
+        return self._analyze_dimension(portfolio_properties, {}, 'price_band')
     
     def _analyze_income_source_diversity(self, portfolio_properties: List[PortfolioPropertyDB]) -> Dict[str, Any]:
-        """Analyze income source diversity."""
-        # This is a simplified analysis - in practice, you'd have more detailed income source data
-        income_sources = {
-            'rental_income': sum(prop.monthly_rent * 12 for prop in portfolio_properties),
-            'appreciation': sum((prop.current_value or prop.total_investment) - prop.total_investment 
-                              for prop in portfolio_properties if (prop.current_value or 0) > prop.total_investment)
-        }
-        
-        total_income = sum(income_sources.values())
-        
-        if total_income == 0:
-            return {'score': 0, 'source_distribution': income_sources, 'concentration': 1}
-        
-        max_concentration = max(income_sources.values()) / total_income
-        score = (1 - max_concentration) * 100
-        
-        return {
-            'score': score,
-            'source_distribution': income_sources,
-            'concentration': max_concentration
-        }
+        """Analyze income source diversity (rental income vs. appreciation)."""
+        return self._analyze_dimension(portfolio_properties, {}, 'income_source')
+    
+    def _analyze_dimension(self, portfolio_properties: List[PortfolioPropertyDB],
+                           property_dict: Dict[uuid.UUID, PropertyDB], dimension: str) -> Dict[str, Any]:
+        engine = DiversificationEngine.from_records(portfolio_properties, property_dict, portfolio_id=0)
+        return engine.analysis(0)[dimension]
     
     def analyze_market_timing(self, portfolio_id: uuid.UUID) -> MarketTimingRecommendation:
         """Analyze market timing for portfolio optimization."""
@@ -0,0 +1,296 @@
+"""
+Portfolio Performance Engine for the Real Estate Empire platform.
+
+Loads the properties of one or many portfolios, together with their aggregated
+performance records, in a single grouped query. Property metrics (cap rate, CoC,
+ROI, appreciation, occupancy) and portfolio aggregates are then computed as
+column operations over the resulting frame, so the cost no longer grows by two
+queries per property.
+"""
+
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+
+from app.models.portfolio import PortfolioPropertyDB, PropertyPerformanceDB
+from app.models.property import PropertyDB
+
+DAYS_PER_MONTH = 30.44
+
+FRAME_COLUMNS = [
+    "portfolio_property_id", "portfolio_id", "property_id", "acquisition_date", "acquisition_price",
+    "total_investment", "current_value", "current_debt", "monthly_cash_flow",
+    "total_income", "total_expenses", "occupancy_rate", "record_count",
+    "matched_property_id", "address", "city", "state", "property_type", "neighborhood"
+]
+
+# Keys of a property performance dict with and without performance records in the period
+RECORD_METRIC_KEYS = [
+    "property_id", "portfolio_property_id", "period_start", "period_end", "total_income", "total_expenses",
+    "net_cash_flow", "annual_income", "annual_expenses", "annual_cash_flow", "current_value",
+    "total_investment", "current_equity", "cap_rate", "coc_return", "roi", "appreciation_rate",
+    "occupancy_rate"
+]
+BASIC_METRIC_KEYS = [
+    "property_id", "portfolio_property_id", "current_value", "total_investment", "current_equity",
+    "annual_cash_flow", "cap_rate", "coc_return", "roi", "monthly_cash_flow"
+]
+
+
+def load_property_frame(db: Session, portfolio_ids: Iterable[uuid.UUID],
+                        period_start: datetime, period_end: datetime) -> pd.DataFrame:
+    """One row per portfolio property with its period totals, in a single query."""
+    portfolio_ids = list(portfolio_ids)
+    if not portfolio_ids:
+        return pd.DataFrame(columns=FRAME_COLUMNS)
+
+    performance = select(
+        PropertyPerformanceDB.portfolio_property_id.label("portfolio_property_id"),
+        func.sum(PropertyPerformanceDB.total_income).label("total_income"),
+        func.sum(PropertyPerformanceDB.total_expenses).label("total_expenses"),
+        func.avg(PropertyPerformanceDB.occupancy_rate).label("occupancy_rate"),
+        func.count(PropertyPerformanceDB.id).label("record_count")
+    ).where(
+        and_(
+            PropertyPerformanceDB.period_start >= period_start,
+            PropertyPerformanceDB.period_end <= period_end
+        )
+    ).group_by(PropertyPerformanceDB.portfolio_property_id).subquery()
+
+    statement = select(
+        PortfolioPropertyDB.id.label("portfolio_property_id"),
+        PortfolioPropertyDB.portfolio_id,
+        PortfolioPropertyDB.property_id,
+        PortfolioPropertyDB.acquisition_date,
+        PortfolioPropertyDB.acquisition_price,
+        PortfolioPropertyDB.total_investment,
+        PortfolioPropertyDB.current_value,
+        PortfolioPropertyDB.current_debt,
+        PortfolioPropertyDB.monthly_cash_flow,
+        performance.c.total_income,
+        performance.c.total_expenses,
+        performance.c.occupancy_rate,
+        performance.c.record_count,
+        PropertyDB.id.label("matched_property_id"),
+        PropertyDB.address,
+        PropertyDB.city,
+        PropertyDB.state,
+        PropertyDB.property_type,
+        PropertyDB.neighborhood
+    ).outerjoin(
+        performance, performance.c.portfolio_property_id == PortfolioPropertyDB.id
+    ).outerjoin(
+        PropertyDB, PropertyDB.id == PortfolioPropertyDB.property_id
+    ).where(PortfolioPropertyDB.portfolio_id.in_(portfolio_ids))
+
+    rows = db.execute(statement).all()
+    return pd.DataFrame([tuple(row) for row in rows], columns=FRAME_COLUMNS)
+
+
+def _numeric(frame: pd.DataFrame, column: str, fill: float = 0.0) -> np.ndarray:
+    return pd.to_numeric(frame[column], errors="coerce").fillna(fill).to_numpy(dtype=float)
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """numerator / denominator * 100 where the denominator is positive, else 0."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / denominator * 100, 0.0)
+
+
+def property_metrics(frame: pd.DataFrame, period_start: datetime, period_end: datetime,
+                     now: Optional[datetime] = None) -> pd.DataFrame:
+    """Vectorized PortfolioPerformanceService.calculate_property_performance over every row.
+
+    Rows with performance records in the period use the period totals, annualized;
+    rows without fall back to the property's monthly cash flow, as the per-property
+    calculation does.
+    """
+    now = now or datetime.now()
+    metrics = frame.copy()
+    has_records = _numeric(frame, "record_count") > 0
+
+    total_investment = _numeric(frame, "total_investment")
+    recorded_value = _numeric(frame, "current_value")
+    current_value = np.where(recorded_value != 0, recorded_value, total_investment)
+    current_debt = _numeric(frame, "current_debt")
+
+    total_income = np.where(has_records, _numeric(frame, "total_income"), 0.0)
+    total_expenses = np.where(has_records, _numeric(frame, "total_expenses"), 0.0)
+    period_months = (period_end - period_start).days / DAYS_PER_MONTH
+    annualize = 12 / period_months if period_months > 0 else 0.0
+
+    annual_cash_flow = np.where(
+        has_records, (total_income - total_expenses) * annualize, _numeric(frame, "monthly_cash_flow") * 12
+    )
+
+    acquisition_price = _numeric(frame, "acquisition_price")
+    held_days = (pd.Timestamp(now) - pd.to_datetime(frame["acquisition_date"])).dt.days
+    acquisition_years = held_days.fillna(0).to_numpy(dtype=float) / 365.25
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        appreciation = (np.power(current_value / acquisition_price, 1 / acquisition_years) - 1) * 100
+    appreciation = np.where((acquisition_years > 0) & (acquisition_price > 0), appreciation, 0.0)
+
+    metrics["current_value"] = current_value
+    metrics["total_investment"] = total_investment
+    metrics["current_equity"] = current_value - current_debt
+    metrics["total_income"] = total_income
+    metrics["total_expenses"] = total_expenses
+    metrics["net_cash_flow"] = total_income - total_expenses
+    metrics["annual_income"] = total_income * annualize
+    metrics["annual_expenses"] = total_expenses * annualize
+    metrics["annual_cash_flow"] = annual_cash_flow
+    metrics["monthly_cash_flow"] = _numeric(frame, "monthly_cash_flow")
+    metrics["cap_rate"] = _ratio(annual_cash_flow, current_value)
+    metrics["coc_return"] = _ratio(annual_cash_flow, total_investment - current_debt)
+    metrics["roi"] = _ratio(current_value - total_investment, total_investment)
+    metrics["appreciation_rate"] = appreciation
+    metrics["occupancy_rate"] = pd.to_numeric(frame["occupancy_rate"], errors="coerce")
+    metrics["has_records"] = has_records
+    return metrics
+
+
+def property_performance_dicts(metrics: pd.DataFrame, period_start: datetime,
+                               period_end: datetime) -> List[Dict[str, Any]]:
+    """Per-property dicts in the shape calculate_property_performance returns."""
+    records = metrics.astype(object).where(metrics.notna(), None).to_dict("records")
+    performances = []
+    for record in records:
+        record.update(period_start=period_start, period_end=period_end)
+        keys = RECORD_METRIC_KEYS if record["has_records"] else BASIC_METRIC_KEYS
+        performances.append({key: record[key] for key in keys})
+    return performances
+
+
+def _nonzero_mean(values: pd.Series, groups: pd.Series) -> pd.Series:
+    return values.where(values != 0).groupby(groups).mean().fillna(0.0)
+
+
+def diversification_scores(frame: pd.DataFrame) -> pd.Series:
+    """City, type and neighborhood diversity (0-100) per portfolio."""
+    matched = frame[frame["matched_property_id"].notna()].drop_duplicates(["portfolio_id", "matched_property_id"])
+    if matched.empty:
+        return pd.Series(dtype=float)
+    grouped = matched.groupby("portfolio_id")
+    count = grouped.size()
+    score = pd.Series(0.0, index=count.index)
+    for column, weight in (("city", 40), ("property_type", 30), ("neighborhood", 30)):
+        distinct = grouped[column].nunique()
+        score += np.minimum(distinct / count, 1.0) * weight
+    return score
+
+
+def risk_scores(metrics: pd.DataFrame) -> pd.Series:
+    """Cash flow coefficient of variation (0-100) per portfolio."""
+    grouped = metrics.groupby("portfolio_id")["annual_cash_flow"]
+    count, mean, std = grouped.size(), grouped.mean(), grouped.std(ddof=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = np.minimum(std / mean.abs() * 100, 100.0)
+    score = score.where(mean != 0, 100.0)
+    return score.where(count >= 2, 50.0).astype(float)
+
+
+def portfolio_metrics(metrics: pd.DataFrame) -> pd.DataFrame:
+    """Aggregated portfolio metrics, one row per portfolio."""
+    groups = metrics["portfolio_id"]
+    grouped = metrics.groupby(groups)
+    summary = pd.DataFrame({
+        "total_properties": grouped.size(),
+        "total_value": grouped["current_value"].sum(),
+        "total_investment": grouped["total_investment"].sum(),
+        "total_equity": grouped["current_equity"].sum(),
+        "total_income": grouped["total_income"].sum(),
+        "total_expenses": grouped["total_expenses"].sum(),
+        "annual_cash_flow": grouped["annual_cash_flow"].sum(),
+        "average_cap_rate": _nonzero_mean(metrics["cap_rate"], groups),
+        "average_coc_return": _nonzero_mean(metrics["coc_return"], groups),
+        "average_roi": _nonzero_mean(metrics["roi"], groups)
+    })
+    summary["total_debt"] = summary["total_value"] - summary["total_equity"]
+    summary["net_cash_flow"] = summary["total_income"] - summary["total_expenses"]
+    summary["portfolio_roi"] = _ratio(
+        (summary["total_value"] - summary["total_investment"]).to_numpy(), summary["total_investment"].to_numpy()
+    )
+    summary["diversification_score"] = diversification_scores(metrics).reindex(summary.index).fillna(0.0)
+    summary["risk_score"] = risk_scores(metrics)
+    return summary
+
+
+ROLLING_WINDOW_MONTHS = 12
+
+ROLLING_COLUMNS = [
+    "appreciation", "monthly_return", "total_return", "volatility", "max_drawdown", "sharpe_ratio", "value_trend", "cash_flow_trend"
+]
+
+
+def _rolling_slope(values: pd.Series, window: int) -> pd.Series:
+    """Least-squares slope per step of values over each trailing window."""
+    t = pd.Series(np.arange(len(values), dtype=float), index=values.index).where(values.notna())
+    mean = lambda series: series.rolling(window, min_periods=2).mean()
+    variance = mean(t * t) - mean(t) ** 2
+    return ((mean(t * values) - mean(t) * mean(values)) / variance.where(variance > 0)).fillna(0.0)
+
+
+def rolling_portfolio_metrics(series: pd.DataFrame, window: int = ROLLING_WINDOW_MONTHS,
+                              risk_free_rate: float = 0.0) -> pd.DataFrame:
+    """Rolling risk and trend statistics for a monthly portfolio series, in one pass.
+
+    series holds one row per month in date order with total_value and
+    net_cash_flow columns. Each output row covers the trailing `window` months
+    ending at that row: volatility is the sample stdev of monthly value returns
+    (percent), max_drawdown the largest peak-to-trough value decline (percent),
+    and sharpe_ratio the annualized mean over stdev of monthly total returns
+    (value change plus cash flow, also reported per month as total_return) in
+    excess of risk_free_rate.
+
+    With a month column, windows span calendar months: a missing month is a gap
+    that no return is measured across, not a neighbour of the months around it.
+    """
+    if series.empty:
+        return pd.DataFrame(columns=ROLLING_COLUMNS, dtype=float)
+    positions, length = np.arange(len(series)), len(series)
+    if "month" in series:
+        months = pd.PeriodIndex(pd.to_datetime(series["month"]), freq="M")
+        calendar = pd.period_range(months.min(), months.max(), freq="M")
+        positions, length = calendar.get_indexer(months), len(calendar)
+    values = pd.Series(np.nan, index=range(length))
+    values.iloc[positions] = pd.to_numeric(series["total_value"], errors="coerce").astype(float).to_numpy()
+    cash_flow = pd.Series(np.nan, index=range(length))
+    cash_flow.iloc[positions] = pd.to_numeric(series["net_cash_flow"], errors="coerce").fillna(0.0).to_numpy()
+    previous = values.shift(1).where(lambda v: v > 0)
+
+    value_return = (values - previous) / previous
+    total_return = (values - previous + cash_flow) / previous
+    returns_window = max(window - 1, 1)
+    volatility = value_return.rolling(returns_window, min_periods=2).std()
+
+    mean_total = total_return.rolling(returns_window, min_periods=2).mean()
+    std_total = total_return.rolling(returns_window, min_periods=2).std()
+    sharpe = (mean_total * 12 - risk_free_rate) / (std_total * np.sqrt(12)).where(std_total > 0)
+
+    # Max drawdown from a running peak inside each trailing window
+    padded = np.concatenate([np.full(window - 1, np.nan), values.to_numpy()])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window)
+    peaks = np.fmax.accumulate(windows, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdowns = np.where(peaks > 0, (peaks - windows) / peaks, 0.0)
+    max_drawdown = np.nanmax(drawdowns, axis=1)
+
+    average_value = values.rolling(window, min_periods=1).mean()
+    value_trend = _rolling_slope(values, window) / average_value.where(average_value > 0) * 100
+
+    metrics = pd.DataFrame({
+        "appreciation": (values - values.shift(1)).fillna(0.0),
+        "monthly_return": (value_return * 100).fillna(0.0),
+        "total_return": (total_return * 100).fillna(0.0),
+        "volatility": (volatility * 100).fillna(0.0),
+        "max_drawdown": max_drawdown * 100,
+        "sharpe_ratio": sharpe.fillna(0.0),
+        "value_trend": value_trend.fillna(0.0),
+        "cash_flow_trend": _rolling_slope(cash_flow, window)
+    })
+    return metrics.iloc[positions].reset_index(drop=True)
@@ -13,13 +13,20 @@ from sqlalchemy import func, and_, or_
 import logging
 from statistics import mean, median, stdev
 
+import pandas as pd
+
 from app.models.portfolio import (
-    PortfolioDB, PortfolioPropertyDB, PropertyPerformanceDB, PortfolioPerformanceDB,
+    PortfolioDB, PortfolioPropertyDB, PropertyPerformanceDB, PortfolioPerformanceDB, PortfolioMonthlySnapshotDB,
     PortfolioResponse, PortfolioPropertyResponse, PropertyPerformanceResponse,
     PortfolioAnalytics, PerformanceBenchmark, PortfolioSummary
 )
 from app.models.property import PropertyDB
 from app.core.database import get_db
+from app.services.diversification_engine import DiversificationEngine
+from app.services.portfolio_performance_engine import (
+    ROLLING_WINDOW_MONTHS, load_property_frame, property_metrics, property_performance_dicts, portfolio_metrics,
+    rolling_portfolio_metrics
+)
 
 logger = logging.getLogger(__name__)
 
@@ -141,8 +148,55 @@ class PortfolioPerformanceService:
             "monthly_cash_flow": portfolio_property.monthly_cash_flow
         }
     
+    def load_performance_frame(self, portfolio_ids: List[uuid.UUID],
+                               period_start: datetime, period_end: datetime) -> pd.DataFrame:
+        """Property metrics for every property of the given portfolios, from one query."""
+        frame = load_property_frame(self.db, portfolio_ids, period_start, period_end)
+        return property_metrics(frame, period_start, period_end)
+    
+    def calculate_property_performances(self, portfolio_id: uuid.UUID,
+                                        period_start: datetime, period_end: datetime,
+                                        metrics: Optional[pd.DataFrame] = None) -> List[Dict[str, Any]]:
+        """Performance of every property in a portfolio, computed in one pass.
+        
+        Each dict has the shape calculate_property_performance returns, plus the
+        property address. Pass metrics when the period's performance frame is
+        already loaded.
+        """
+        if metrics is None:
+            metrics = self.load_performance_frame([portfolio_id], period_start, period_end)
+        performances = property_performance_dicts(metrics, period_start, period_end)
+        for performance, address in zip(performances, metrics["address"].tolist()):
+            performance["property_address"] = address
+        return performances
+    
+    def calculate_portfolios_performance(self, portfolio_ids: List[uuid.UUID],
+                                         period_start: datetime, period_end: datetime,
+                                         metrics: Optional[pd.DataFrame] = None) -> Dict[uuid.UUID, Dict[str, Any]]:
+        """Aggregated performance metrics for many portfolios from a single grouped query."""
+        if metrics is None:
+            metrics = self.load_performance_frame(portfolio_ids, period_start, period_end)
+        results = {portfolio_id: self._empty_portfolio_metrics(portfolio_id) for portfolio_id in portfolio_ids}
+        if metrics.empty:
+            return results
+        
+        summaries = portfolio_metrics(metrics)
+        for portfolio_id, group in metrics.groupby("portfolio_id", sort=False):
+            summary = {key: value.item() if hasattr(value, "item") else value
+                       for key, value in summaries.loc[portfolio_id].items()}
+            summary["total_properties"] = int(summary["total_properties"])
+            results[portfolio_id] = {
+                "portfolio_id": portfolio_id,
+                "period_start": period_start,
+                "period_end": period_end,
+                **summary,
+                "property_performances": property_performance_dicts(group, period_start, period_end)
+            }
+        return results
+    
     def calculate_portfolio_performance(self, portfolio_id: uuid.UUID, 
-                                      period_start: datetime, period_end: datetime) -> Dict[str, Any]:
+                                      period_start: datetime, period_end: datetime,
+                                      metrics: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
         """Calculate aggregated performance metrics for an entire portfolio."""
         try:
             # Get portfolio
@@ -150,79 +204,12 @@ class PortfolioPerformanceService:
             if not portfolio:
                 raise ValueError(f"Portfolio {portfolio_id} not found")
             
-            # Get all properties in portfolio
-            portfolio_properties = self.db.query(PortfolioPropertyDB).filter(
-                PortfolioPropertyDB.portfolio_id == portfolio_id
-            ).all()
-            
-            if not portfolio_properties:
+            performance = self.calculate_portfolios_performance(
+                [portfolio_id], period_start, period_end, metrics
+            )[portfolio_id]
+            if not performance["total_properties"]:
                 logger.warning(f"No properties found in portfolio {portfolio_id}")
-                return self._empty_portfolio_metrics(portfolio_id)
-            
-            # Calculate performance for each property
-            property_performances = []
-            for prop in portfolio_properties:
-                try:
-                    perf = self.calculate_property_performance(prop.id, period_start, period_end)
-                    property_performances.append(perf)
-                except Exception as e:
-                    logger.error(f"Error calculating performance for property {prop.id}: {str(e)}")
-                    continue
-            
-            if not property_performances:
-                return self._empty_portfolio_metrics(portfolio_id)
-            
-            # Aggregate portfolio metrics
-            total_value = sum(perf.get("current_value", 0) for perf in property_performances)
-            total_investment = sum(perf.get("total_investment", 0) for perf in property_performances)
-            total_equity = sum(perf.get("current_equity", 0) for perf in property_performances)
-            total_debt = total_value - total_equity
-            
-            total_income = sum(perf.get("total_income", 0) for perf in property_performances)
-            total_expenses = sum(perf.get("total_expenses", 0) for perf in property_performances)
-            net_cash_flow = total_income - total_expenses
-            
-            annual_cash_flow = sum(perf.get("annual_cash_flow", 0) for perf in property_performances)
-            
-            # Calculate weighted averages for rates
-            cap_rates = [perf.get("cap_rate", 0) for perf in property_performances if perf.get("cap_rate")]
-            coc_returns = [perf.get("coc_return", 0) for perf in property_performances if perf.get("coc_return")]
-            rois = [perf.get("roi", 0) for perf in property_performances if perf.get("roi")]
-            
-            average_cap_rate = mean(cap_rates) if cap_rates else 0
-            average_coc_return = mean(coc_returns) if coc_returns else 0
-            average_roi = mean(rois) if rois else 0
-            
-            # Calculate portfolio-level ROI
-            portfolio_roi = ((total_value - total_investment) / total_investment * 100) if total_investment > 0 else 0
-            
-            # Calculate diversification score (simplified)
-            diversification_score = self._calculate_diversification_score(portfolio_properties)
-            
-            # Calculate risk score (simplified)
-            risk_score = self._calculate_risk_score(property_performances)
-            
-            return {
-                "portfolio_id": portfolio_id,
-                "period_start": period_start,
-                "period_end": period_end,
-                "total_properties": len(portfolio_properties),
-                "total_value": total_value,
-                "total_investment": total_investment,
-                "total_equity": total_equity,
-                "total_debt": total_debt,
-                "total_income": total_income,
-                "total_expenses": total_expenses,
-                "net_cash_flow": net_cash_flow,
-                "annual_cash_flow": annual_cash_flow,
-                "average_cap_rate": average_cap_rate,
-                "average_coc_return": average_coc_return,
-                "average_roi": average_roi,
-                "portfolio_roi": portfolio_roi,
-                "diversification_score": diversification_score,
-                "risk_score": risk_score,
-                "property_performances": property_performances
-            }
+            return performance
             
         except Exception as e:
             logger.error(f"Error calculating portfolio performance: {str(e)}")
@@ -313,21 +300,11 @@ class PortfolioPerformanceService:
             if not portfolio:
                 return False
             
-            portfolio.total_properties = performance["total_properties"]
-            portfolio.total_value = performance["total_value"]
-            portfolio.total_equity = performance["total_equity"]
-            portfolio.total_debt = performance["total_debt"]
-            portfolio.monthly_income = performance["annual_cash_flow"] / 12
-            portfolio.monthly_expenses = performance["total_expenses"] / 12
-            portfolio.monthly_cash_flow = performance["net_cash_flow"] / 12
-            portfolio.average_cap_rate = performance["average_cap_rate"]
-            portfolio.average_coc_return = performance["average_coc_return"]
-            portfolio.average_roi = performance["average_roi"]
-            portfolio.diversification_score = performance["diversification_score"]
-            portfolio.risk_score = performance["risk_score"]
-            portfolio.last_performance_update = datetime.now()
+            self._apply_portfolio_metrics(portfolio, performance)
+            self._record_monthly_snapshot(portfolio_id, performance)
             
             self.db.commit()
+            self._benchmarking_service().update_peer_sketches([portfolio])
             return True
             
         except Exception as e:
@@ -335,6 +312,137 @@ class PortfolioPerformanceService:
             self.db.rollback()
             return False
     
+    def refresh_portfolio_metrics(self, portfolio_ids: Optional[List[uuid.UUID]] = None) -> int:
+        """Update cached metrics for many portfolios (all by default) from one grouped query."""
+        try:
+            query = self.db.query(PortfolioDB)
+            if portfolio_ids is not None:
+                query = query.filter(PortfolioDB.id.in_(portfolio_ids))
+            portfolios = query.all()
+            if not portfolios:
+                return 0
+            
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=365)  # Last year
+            performances = self.calculate_portfolios_performance(
+                [portfolio.id for portfolio in portfolios], start_date, end_date
+            )
+            
+            for portfolio in portfolios:
+                self._apply_portfolio_metrics(portfolio, performances[portfolio.id])
+                self._record_monthly_snapshot(portfolio.id, performances[portfolio.id])
+            
+            self.db.commit()
+            # A refresh of the whole book rebuilds the peer sketches; a subset is merged into them
+            if portfolio_ids is None:
+                self._benchmarking_service().refresh_peer_sketches()
+            else:
+                self._benchmarking_service().update_peer_sketches(portfolios)
+            return len(portfolios)
+            
+        except Exception as e:
+            logger.error(f"Error refreshing portfolio metrics: {str(e)}")
+            self.db.rollback()
+            return 0
+    
+    def _benchmarking_service(self):
+        """Benchmarking service sharing this session, which keeps the peer sketches."""
+        from app.services.performance_benchmarking_service import PerformanceBenchmarkingService
+        return PerformanceBenchmarkingService(self.db)
+    
+    def _apply_portfolio_metrics(self, portfolio: PortfolioDB, performance: Dict[str, Any]):
+        """Copy calculated performance onto the cached portfolio columns."""
+        portfolio.total_properties = performance["total_properties"]
+        portfolio.total_value = performance["total_value"]
+        portfolio.total_equity = performance["total_equity"]
+        portfolio.total_debt = performance["total_debt"]
+        portfolio.monthly_income = performance["annual_cash_flow"] / 12
+        portfolio.monthly_expenses = performance["total_expenses"] / 12
+        portfolio.monthly_cash_flow = performance["net_cash_flow"] / 12
+        portfolio.average_cap_rate = performance["average_cap_rate"]
+        portfolio.average_coc_return = performance["average_coc_return"]
+        portfolio.average_roi = performance["average_roi"]
+        portfolio.diversification_score = performance["diversification_score"]
+        portfolio.risk_score = performance["risk_score"]
+        portfolio.last_performance_update = datetime.now()
+    
+    def _record_monthly_snapshot(self, portfolio_id: uuid.UUID, performance: Dict[str, Any],
+                                 as_of: Optional[datetime] = None) -> PortfolioMonthlySnapshotDB:
+        """Upsert this month's snapshot and its rolling statistics.
+        
+        Only the current month changes, so only its rolling window (the trailing
+        ROLLING_WINDOW_MONTHS snapshots) is loaded and recomputed.
+        """
+        month = (as_of or datetime.now()).date().replace(day=1)
+        window_start = (pd.Timestamp(month) - pd.DateOffset(months=ROLLING_WINDOW_MONTHS - 1)).date()
+        history = self.db.query(PortfolioMonthlySnapshotDB).filter(
+            and_(
+                PortfolioMonthlySnapshotDB.portfolio_id == portfolio_id,
+                PortfolioMonthlySnapshotDB.month >= window_start,
+                PortfolioMonthlySnapshotDB.month <= month
+            )
+        ).order_by(PortfolioMonthlySnapshotDB.month).all()
+        
+        snapshot = history[-1] if history and history[-1].month == month else None
+        if snapshot is None:
+            snapshot = PortfolioMonthlySnapshotDB(portfolio_id=portfolio_id, month=month)
+            self.db.add(snapshot)
+            history.append(snapshot)
+        
+        # Monthly figures from the trailing-year performance
+        snapshot.total_properties = performance["total_properties"]
+        snapshot.total_value = performance["total_value"]
+        snapshot.total_equity = performance["total_equity"]
+        snapshot.total_debt = performance["total_debt"]
+        snapshot.total_income = performance["total_income"] / 12
+        snapshot.total_expenses = performance["total_expenses"] / 12
+        snapshot.net_cash_flow = performance["net_cash_flow"] / 12
+        snapshot.average_cap_rate = performance["average_cap_rate"]
+        snapshot.average_coc_return = performance["average_coc_return"]
+        snapshot.average_roi = performance["average_roi"]
+        snapshot.portfolio_roi = performance["portfolio_roi"]
+        
+        rolling = rolling_portfolio_metrics(self._snapshot_frame(history))
+        for column, value in rolling.iloc[-1].items():
+            setattr(snapshot, column, float(value))
+        return snapshot
+    
+    def rebuild_monthly_snapshots(self, portfolio_id: uuid.UUID) -> int:
+        """Recompute rolling statistics for every stored month of a portfolio in one pass."""
+        try:
+            snapshots = self.db.query(PortfolioMonthlySnapshotDB).filter(
+                PortfolioMonthlySnapshotDB.portfolio_id == portfolio_id
+            ).order_by(PortfolioMonthlySnapshotDB.month).all()
+            
+            rolling = rolling_portfolio_metrics(self._snapshot_frame(snapshots))
+            for snapshot, row in zip(snapshots, rolling.to_dict("records")):
+                for column, value in row.items():
+                    setattr(snapshot, column, float(value))
+            
+            self.db.commit()
+            return len(snapshots)
+            
+        except Exception as e:
+            logger.error(f"Error rebuilding monthly snapshots: {str(e)}")
+            self.db.rollback()
+            return 0
+    
+    @staticmethod
+    def _snapshot_frame(snapshots: List[PortfolioMonthlySnapshotDB]) -> pd.DataFrame:
+        return pd.DataFrame({
+            "month": [snapshot.month for snapshot in snapshots],
+            "total_value": [snapshot.total_value for snapshot in snapshots],
+            "net_cash_flow": [snapshot.net_cash_flow for snapshot in snapshots]
+        })
+    
+    def get_monthly_series(self, portfolio_id: uuid.UUID,
+                           months: int = ROLLING_WINDOW_MONTHS) -> List[PortfolioMonthlySnapshotDB]:
+        """The latest monthly snapshots of a portfolio, oldest first."""
+        snapshots = self.db.query(PortfolioMonthlySnapshotDB).filter(
+            PortfolioMonthlySnapshotDB.portfolio_id == portfolio_id
+        ).order_by(PortfolioMonthlySnapshotDB.month.desc()).limit(months).all()
+        return list(reversed(snapshots))
+    
     def generate_performance_report(self, portfolio_id: uuid.UUID, 
                                   period_start: datetime, period_end: datetime) -> Dict[str, Any]:
         """Generate a comprehensive performance report for a portfolio."""
@@ -391,19 +499,18 @@ class PortfolioPerformanceService:
                                   period_start: datetime, period_end: datetime) -> List[Dict[str, Any]]:
         """Get historical performance data for trend analysis."""
         try:
-            # Get monthly performance records
-            historical_records = self.db.query(PortfolioPerformanceDB).filter(
+            # Get monthly snapshots
+            historical_records = self.db.query(PortfolioMonthlySnapshotDB).filter(
                 and_(
-                    PortfolioPerformanceDB.portfolio_id == portfolio_id,
-                    PortfolioPerformanceDB.period_start >= period_start - timedelta(days=365),
-                    PortfolioPerformanceDB.period_end <= period_end,
-                    PortfolioPerformanceDB.period_type == "monthly"
+                    PortfolioMonthlySnapshotDB.portfolio_id == portfolio_id,
+                    PortfolioMonthlySnapshotDB.month >= (period_start - timedelta(days=365)).date(),
+                    PortfolioMonthlySnapshotDB.month <= period_end.date()
                 )
-            ).order_by(PortfolioPerformanceDB.period_start).all()
+            ).order_by(PortfolioMonthlySnapshotDB.month).all()
             
             return [
                 {
-                    "period": record.period_start.strftime("%Y-%m"),
+                    "period": record.month.strftime("%Y-%m"),
                     "total_value": record.total_value,
                     "net_cash_flow": record.net_cash_flow,
                     "average_cap_rate": record.average_cap_rate,
@@ -462,9 +569,11 @@ class PortfolioPerformanceService:
             # Get inception-to-date performance
             inception_performance = self.calculate_portfolio_performance(portfolio_id, inception_start, end_date)
             
-            # Get trends
-            cash_flow_trend = self._get_cash_flow_trend(portfolio_id)
-            value_trend = self._get_value_trend(portfolio_id)
+            # Trends and risk statistics come from one read of the monthly snapshots
+            series = self.get_monthly_series(portfolio_id)
+            cash_flow_trend = self._get_cash_flow_trend(portfolio_id, series)
+            value_trend = self._get_value_trend(portfolio_id, series)
+            latest = series[-1] if series else None
             
             # Get property performance breakdown
             property_performance = ytd_performance["property_performances"]
@@ -475,14 +584,16 @@ class PortfolioPerformanceService:
             # Risk and diversification analysis
             risk_metrics = {
                 "risk_score": ytd_performance["risk_score"],
-                "volatility": self._calculate_volatility(portfolio_id),
-                "max_drawdown": self._calculate_max_drawdown(portfolio_id)
+                "volatility": self._calculate_volatility(portfolio_id, series),
+                "max_drawdown": self._calculate_max_drawdown(portfolio_id, series),
+                "sharpe_ratio": (latest.sharpe_ratio or 0.0) if latest else 0.0
             }
             
+            diversification_engine = self._diversification_engine(portfolio_id)
             diversification_analysis = {
                 "score": ytd_performance["diversification_score"],
-                "geographic_diversity": self._analyze_geographic_diversity(portfolio_id),
-                "property_type_diversity": self._analyze_property_type_diversity(portfolio_id)
+                "geographic_diversity": self._analyze_geographic_diversity(portfolio_id, diversification_engine),
+                "property_type_diversity": self._analyze_property_type_diversity(portfolio_id, diversification_engine)
             }
             
             return PortfolioAnalytics(
@@ -514,157 +625,99 @@ class PortfolioPerformanceService:
             portfolio = self.db.query(PortfolioDB).filter(PortfolioDB.id == portfolio_id).first()
             return portfolio.created_at if portfolio else datetime.now()
     
-    def _get_cash_flow_trend(self, portfolio_id: uuid.UUID) -> List[Dict[str, Any]]:
+    def _get_cash_flow_trend(self, portfolio_id: uuid.UUID,
+                             series: Optional[List[PortfolioMonthlySnapshotDB]] = None) -> List[Dict[str, Any]]:
         """Get cash flow trend data for the last 12 months."""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=365)
-        
-        monthly_records = self.db.query(PortfolioPerformanceDB).filter(
-            and_(
-                PortfolioPerformanceDB.portfolio_id == portfolio_id,
-                PortfolioPerformanceDB.period_start >= start_date,
-                PortfolioPerformanceDB.period_type == "monthly"
-            )
-        ).order_by(PortfolioPerformanceDB.period_start).all()
+        if series is None:
+            series = self.get_monthly_series(portfolio_id)
         
         return [
             {
-                "month": record.period_start.strftime("%Y-%m"),
-                "cash_flow": record.net_cash_flow,
-                "income": record.total_income,
-                "expenses": record.total_expenses
+                "month": snapshot.month.strftime("%Y-%m"),
+                "cash_flow": snapshot.net_cash_flow,
+                "income": snapshot.total_income,
+                "expenses": snapshot.total_expenses
             }
-            for record in monthly_records
+            for snapshot in series
         ]
     
-    def _get_value_trend(self, portfolio_id: uuid.UUID) -> List[Dict[str, Any]]:
+    def _get_value_trend(self, portfolio_id: uuid.UUID,
+                         series: Optional[List[PortfolioMonthlySnapshotDB]] = None) -> List[Dict[str, Any]]:
         """Get portfolio value trend data for the last 12 months."""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=365)
-        
-        monthly_records = self.db.query(PortfolioPerformanceDB).filter(
-            and_(
-                PortfolioPerformanceDB.portfolio_id == portfolio_id,
-                PortfolioPerformanceDB.period_start >= start_date,
-                PortfolioPerformanceDB.period_type == "monthly"
-            )
-        ).order_by(PortfolioPerformanceDB.period_start).all()
+        if series is None:
+            series = self.get_monthly_series(portfolio_id)
         
         return [
             {
-                "month": record.period_start.strftime("%Y-%m"),
-                "total_value": record.total_value,
-                "total_equity": record.total_equity,
-                "appreciation": record.appreciation
+                "month": snapshot.month.strftime("%Y-%m"),
+                "total_value": snapshot.total_value,
+                "total_equity": snapshot.total_equity,
+                "appreciation": snapshot.appreciation
             }
-            for record in monthly_records
+            for snapshot in series
         ]
     
-    def _calculate_volatility(self, portfolio_id: uuid.UUID) -> float:
-        """Calculate portfolio volatility based on monthly returns."""
-        # This is a simplified volatility calculation
-        # In practice, you'd want more sophisticated risk metrics
-        monthly_records = self.db.query(PortfolioPerformanceDB).filter(
-            and_(
-                PortfolioPerformanceDB.portfolio_id == portfolio_id,
-                PortfolioPerformanceDB.period_type == "monthly"
-            )
-        ).order_by(PortfolioPerformanceDB.period_start).limit(12).all()
-        
-        if len(monthly_records) < 2:
-            return 0.0
-        
-        returns = []
-        for i in range(1, len(monthly_records)):
-            prev_value = monthly_records[i-1].total_value
-            curr_value = monthly_records[i].total_value
-            if prev_value > 0:
-                monthly_return = (curr_value - prev_value) / prev_value
-                returns.append(monthly_return)
-        
-        return stdev(returns) * 100 if len(returns) > 1 else 0.0
+    def _calculate_volatility(self, portfolio_id: uuid.UUID,
+                              series: Optional[List[PortfolioMonthlySnapshotDB]] = None) -> float:
+        """Portfolio volatility (stdev of monthly returns, %) over the last 12 months."""
+        if series is None:
+            series = self.get_monthly_series(portfolio_id)
+        return (series[-1].volatility or 0.0) if series else 0.0
     
-    def _calculate_max_drawdown(self, portfolio_id: uuid.UUID) -> float:
-        """Calculate maximum drawdown over the last 12 months."""
-        monthly_records = self.db.query(PortfolioPerformanceDB).filter(
-            and_(
-                PortfolioPerformanceDB.portfolio_id == portfolio_id,
-                PortfolioPerformanceDB.period_type == "monthly"
-            )
-        ).order_by(PortfolioPerformanceDB.period_start).limit(12).all()
-        
-        if not monthly_records:
-            return 0.0
-        
-        values = [record.total_value for record in monthly_records]
-        max_drawdown = 0.0
-        peak = values[0]
-        
-        for value in values:
-            if value > peak:
-                peak = value
-            drawdown = (peak - value) / peak if peak > 0 else 0
-            max_drawdown = max(max_drawdown, drawdown)
-        
-        return max_drawdown * 100
+    def _calculate_max_drawdown(self, portfolio_id: uuid.UUID,
+                                series: Optional[List[PortfolioMonthlySnapshotDB]] = None) -> float:
+        """Maximum drawdown (%) over the last 12 months."""
+        if series is None:
+            series = self.get_monthly_series(portfolio_id)
+        return (series[-1].max_drawdown or 0.0) if series else 0.0
     
-    def _analyze_geographic_diversity(self, portfolio_id: uuid.UUID) -> Dict[str, Any]:
-        """Analyze geographic diversity of portfolio properties."""
-        portfolio_properties = self.db.query(PortfolioPropertyDB).filter(
-            PortfolioPropertyDB.portfolio_id == portfolio_id
-        ).all()
-        
-        if not portfolio_properties:
+    def _diversification_engine(self, portfolio_id: uuid.UUID) -> DiversificationEngine:
+        """Count-weighted diversification engine over one portfolio's holdings."""
+        return DiversificationEngine.from_db(self.db, [portfolio_id], weight="count")
+    
+    def _analyze_geographic_diversity(self, portfolio_id: uuid.UUID,
+                                      engine: Optional[DiversificationEngine] = None) -> Dict[str, Any]:
+        """Analyze geographic diversity of portfolio properties.
+        
+        diversity_score is distinct cities and states per property (0-100);
+        concentration_score is the engine's (1 - largest city share) * 100.
+        """
+        engine = engine or self._diversification_engine(portfolio_id)
+        if portfolio_id not in engine:
             return {"cities": [], "states": [], "diversity_score": 0.0}
         
-        property_ids = [prop.property_id for prop in portfolio_properties]
-        properties = self.db.query(PropertyDB).filter(PropertyDB.id.in_(property_ids)).all()
-        
-        cities = {}
-        states = {}
-        
-        for prop in properties:
-            if hasattr(prop, 'city') and prop.city:
-                cities[prop.city] = cities.get(prop.city, 0) + 1
-            if hasattr(prop, 'state') and prop.state:
-                states[prop.state] = states.get(prop.state, 0) + 1
-        
-        diversity_score = 0.0
-        if properties:
-            city_diversity = min(len(cities) / len(properties), 1.0) * 50 if cities else 0
-            state_diversity = min(len(states) / len(properties), 1.0) * 50 if states else 0
-            diversity_score = city_diversity + state_diversity
-        
+        geographic = engine.analysis(portfolio_id)["geographic"]
+        total = geographic["total"]
+        cities = geographic["city_distribution"]
+        states = geographic["state_distribution"]
+        diversity_score = min(len(cities) / total, 1.0) * 50 + min(len(states) / total, 1.0) * 50
         return {
-            "cities": [{"name": city, "count": count} for city, count in cities.items()],
-            "states": [{"name": state, "count": count} for state, count in states.items()],
-            "diversity_score": diversity_score
+            "cities": [{"name": city, "count": int(count)} for city, count in cities.items()],
+            "states": [{"name": state, "count": int(count)} for state, count in states.items()],
+            "diversity_score": diversity_score,
+            "concentration_score": geographic["score"],
+            "city_hhi": geographic["city_hhi"],
+            "state_hhi": geographic["state_hhi"]
         }
     
-    def _analyze_property_type_diversity(self, portfolio_id: uuid.UUID) -> Dict[str, Any]:
-        """Analyze property type diversity of portfolio properties."""
-        portfolio_properties = self.db.query(PortfolioPropertyDB).filter(
-            PortfolioPropertyDB.portfolio_id == portfolio_id
-        ).all()
-        
-        if not portfolio_properties:
+    def _analyze_property_type_diversity(self, portfolio_id: uuid.UUID,
+                                         engine: Optional[DiversificationEngine] = None) -> Dict[str, Any]:
+        """Analyze property type diversity of portfolio properties.
+        
+        diversity_score is distinct property types per property (0-100);
+        concentration_score is the engine's (1 - largest type share) * 100.
+        """
+        engine = engine or self._diversification_engine(portfolio_id)
+        if portfolio_id not in engine:
             return {"types": [], "diversity_score": 0.0}
         
-        property_ids = [prop.property_id for prop in portfolio_properties]
-        properties = self.db.query(PropertyDB).filter(PropertyDB.id.in_(property_ids)).all()
-        
-        property_types = {}
-        for prop in properties:
-            if hasattr(prop, 'property_type') and prop.property_type:
-                property_types[prop.property_type] = property_types.get(prop.property_type, 0) + 1
-        
-        diversity_score = 0.0
-        if properties and property_types:
-            diversity_score = min(len(property_types) / len(properties), 1.0) * 100
-        
+        property_type = engine.analysis(portfolio_id)["property_type"]
+        types = property_type["type_distribution"]
         return {
-            "types": [{"name": ptype, "count": count} for ptype, count in property_types.items()],
-            "diversity_score": diversity_score
+            "types": [{"name": ptype, "count": int(count)} for ptype, count in types.items()],
+            "diversity_score": min(len(types) / property_type["total"], 1.0) * 100,
+            "concentration_score": property_type["score"],
+            "hhi": property_type["hhi"]
         }
 
 
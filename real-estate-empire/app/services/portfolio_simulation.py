@@ -0,0 +1,351 @@
+"""
+Portfolio Simulation Engine
+Vectorized Monte Carlo forecasting and stress testing for rental portfolios.
+
+Every property is simulated on every path at once as NumPy arrays. Four
+correlated market factors (appreciation, rent growth, vacancy, interest
+rates) drive all properties; each property adds its own idiosyncratic value
+shock. Results are reproducible for a given seed.
+
+Idiosyncratic shocks are drawn once at the horizon. Intermediate months use
+their Brownian-bridge conditional mean with a variance correction, which keeps
+each month's expected value exact without drawing paths x properties x months
+normals. Market factors are simulated month by month.
+"""
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PATHS = 10000
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+DEFAULT_CONFIDENCE = 0.95
+
+FACTORS = ("appreciation", "rent_growth", "vacancy", "rates")
+
+# Monthly shock correlations between FACTORS
+DEFAULT_CORRELATION = (
+    (1.0, 0.5, -0.4, -0.3),
+    (0.5, 1.0, -0.3, 0.1),
+    (-0.4, -0.3, 1.0, 0.2),
+    (-0.3, 0.1, 0.2, 1.0),
+)
+
+HOLDING_COLUMNS = ["property_id", "value", "debt", "monthly_rent", "monthly_expenses", "appreciation_rate"]
+
+STRESS_SCENARIOS = {
+    "market_crash_scenario": {"value_shock": -0.30, "rent_shock": -0.10, "vacancy_shock": 0.10, "rate_shock": 0.0},
+    "interest_rate_shock": {"value_shock": 0.0, "rent_shock": 0.0, "vacancy_shock": 0.0, "rate_shock": 0.03},
+    "rent_decline": {"value_shock": 0.0, "rent_shock": -0.15, "vacancy_shock": 0.05, "rate_shock": 0.0},
+    "vacancy_spike": {"value_shock": 0.0, "rent_shock": 0.0, "vacancy_shock": 0.15, "rate_shock": 0.0},
+}
+
+# 12-month value declines used to estimate how likely each downturn is
+DOWNTURN_THRESHOLDS = {
+    "economic_recession": -0.10,
+    "local_market_downturn": -0.05,
+}
+
+
+@dataclass
+class SimulationAssumptions:
+    """Annualized market assumptions for the simulation"""
+    appreciation_mean: float = 0.035
+    appreciation_volatility: float = 0.08
+    idiosyncratic_volatility: float = 0.06
+    rent_growth_mean: float = 0.03
+    rent_growth_volatility: float = 0.04
+    vacancy_mean: float = 0.06
+    vacancy_volatility: float = 0.03
+    vacancy_reversion: float = 0.15  # Monthly pull back toward vacancy_mean
+    rate_volatility: float = 0.01
+    rate_sensitivity: float = 4.0  # Log value change per unit rate change
+    expense_inflation: float = 0.03
+    correlation: Sequence[Sequence[float]] = field(default_factory=lambda: DEFAULT_CORRELATION)
+
+
+@dataclass
+class PortfolioSimulation:
+    """Simulated portfolio paths and their risk summary"""
+    months: int
+    paths: int
+    seed: Optional[int]
+    property_ids: List[Any]
+    initial_value: float
+    portfolio_values: np.ndarray  # (paths, months + 1), month 0 is today
+    cumulative_cash_flow: np.ndarray  # (paths, months + 1)
+    property_pnl: np.ndarray  # (paths, properties) value change plus cash flow
+
+    @property
+    def pnl(self) -> np.ndarray:
+        """Total profit and loss per path at the horizon"""
+        return self.portfolio_values[:, -1] - self.initial_value + self.cumulative_cash_flow[:, -1]
+
+    def percentile_bands(self, percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[str, Dict[int, List[float]]]:
+        percentiles = list(percentiles)
+        return {
+            "portfolio_value": _bands(self.portfolio_values, percentiles),
+            "cumulative_cash_flow": _bands(self.cumulative_cash_flow, percentiles)
+        }
+
+    def value_at_risk(self, confidence: float = DEFAULT_CONFIDENCE) -> Dict[str, float]:
+        """VaR and CVaR (expected shortfall) of horizon P&L, as positive losses"""
+        pnl = self.pnl
+        cutoff = np.quantile(pnl, 1 - confidence)
+        tail = pnl <= cutoff
+        return {
+            "confidence": confidence,
+            "value_at_risk": float(-cutoff),
+            "conditional_value_at_risk": float(-pnl[tail].mean())
+        }
+
+    def volatility(self) -> float:
+        """Annualized volatility of monthly portfolio value returns"""
+        if self.months < 1:
+            return 0.0
+        values = self.portfolio_values
+        returns = np.diff(np.log(np.where(values > 0, values, np.nan)), axis=1)
+        return float(np.nanstd(returns) * np.sqrt(12))
+
+    def property_contributions(self, confidence: float = DEFAULT_CONFIDENCE) -> List[Dict[str, Any]]:
+        """Each property's expected P&L and its share of the CVaR tail.
+
+        tail_contribution sums to the portfolio CVaR across properties.
+        """
+        pnl = self.pnl
+        tail = pnl <= np.quantile(pnl, 1 - confidence)
+        expected = self.property_pnl.mean(axis=0)
+        tail_loss = -self.property_pnl[tail].mean(axis=0)
+        total_tail = tail_loss.sum()
+        return [
+            {
+                "property_id": str(property_id) if property_id is not None else None,
+                "expected_pnl": float(expected[i]),
+                "tail_contribution": float(tail_loss[i]),
+                "tail_share": float(tail_loss[i] / total_tail) if total_tail else 0.0
+            }
+            for i, property_id in enumerate(self.property_ids)
+        ]
+
+    def probability_of_value_change(self, threshold: float, month: int = 12) -> float:
+        """Share of paths whose value change by `month` is at or below threshold (a fraction)"""
+        month = min(month, self.months)
+        if not self.initial_value:
+            return 0.0
+        change = self.portfolio_values[:, month] / self.initial_value - 1
+        return float((change <= threshold).mean())
+
+    def summary(self, percentiles: Iterable[float] = DEFAULT_PERCENTILES,
+                confidence: float = DEFAULT_CONFIDENCE) -> Dict[str, Any]:
+        terminal = self.portfolio_values[:, -1]
+        pnl = self.pnl
+        return {
+            "paths": self.paths,
+            "months": self.months,
+            "seed": self.seed,
+            "initial_value": self.initial_value,
+            "expected_value": float(terminal.mean()),
+            "median_value": float(np.median(terminal)),
+            "expected_cash_flow": float(self.cumulative_cash_flow[:, -1].mean()),
+            "expected_pnl": float(pnl.mean()),
+            "probability_of_loss": float((pnl < 0).mean()),
+            "volatility": self.volatility(),
+            **self.value_at_risk(confidence),
+            "percentile_bands": self.percentile_bands(percentiles)
+        }
+
+
+def _bands(values: np.ndarray, percentiles: List[float]) -> Dict[int, List[float]]:
+    quantiles = np.percentile(values, percentiles, axis=0)
+    return {int(p): quantiles[i].tolist() for i, p in enumerate(percentiles)}
+
+
+def holdings_frame(holdings: Iterable[Any]) -> pd.DataFrame:
+    """Simulation inputs from PortfolioPropertyDB rows (or dicts with the same fields)"""
+    rows = []
+    for holding in holdings:
+        get = holding.get if isinstance(holding, dict) else lambda key, h=holding: getattr(h, key, None)
+        rows.append({
+            "property_id": get("property_id"),
+            "value": get("current_value") or get("acquisition_price") or 0.0,
+            "debt": get("current_debt") or 0.0,
+            "monthly_rent": get("monthly_rent") or 0.0,
+            "monthly_expenses": get("monthly_expenses") or 0.0,
+            "appreciation_rate": get("appreciation_rate")
+        })
+    return pd.DataFrame(rows, columns=HOLDING_COLUMNS)
+
+
+def _annual_appreciation(holdings: pd.DataFrame, assumptions: SimulationAssumptions) -> np.ndarray:
+    """Per-property expected appreciation; appreciation_rate is stored as a percent"""
+    rates = pd.to_numeric(holdings["appreciation_rate"], errors="coerce").to_numpy(dtype=float) / 100
+    return np.where(np.isnan(rates), assumptions.appreciation_mean, rates)
+
+
+def _factor_shocks(rng: np.random.Generator, paths: int, months: int,
+                   assumptions: SimulationAssumptions) -> np.ndarray:
+    """Correlated standard normal shocks, shaped (factors, paths, months)"""
+    cholesky = np.linalg.cholesky(np.asarray(assumptions.correlation, dtype=float))
+    shocks = rng.standard_normal((paths, months, len(FACTORS))) @ cholesky.T
+    return np.moveaxis(shocks, -1, 0)
+
+
+def simulate_portfolio(holdings: pd.DataFrame, months: int, paths: int = DEFAULT_PATHS,
+                       seed: Optional[int] = None,
+                       assumptions: Optional[SimulationAssumptions] = None) -> PortfolioSimulation:
+    """Simulate `paths` correlated market paths over `months` for every holding"""
+    assumptions = assumptions or SimulationAssumptions()
+    rng = np.random.default_rng(seed)
+    values = holdings["value"].to_numpy(dtype=float)
+    rents = holdings["monthly_rent"].to_numpy(dtype=float)
+    expenses = holdings["monthly_expenses"].to_numpy(dtype=float)
+    n_properties = len(values)
+
+    appreciation_shock, rent_shock, vacancy_shock, rate_shock = _factor_shocks(rng, paths, months, assumptions)
+    steps = np.arange(1, months + 1)
+
+    # Common value factor: market moves plus rate-driven repricing, corrected to unit mean
+    market_sigma = assumptions.appreciation_volatility / np.sqrt(12)
+    rate_sigma = assumptions.rate_volatility / np.sqrt(12)
+    idio_sigma = assumptions.idiosyncratic_volatility / np.sqrt(12)
+    repricing_sigma = assumptions.rate_sensitivity * rate_sigma
+    correlation = np.asarray(assumptions.correlation, dtype=float)[0, FACTORS.index("rates")]
+    common_variance = market_sigma ** 2 + repricing_sigma ** 2 - 2 * correlation * market_sigma * repricing_sigma
+    common_log = np.cumsum(
+        market_sigma * appreciation_shock - repricing_sigma * rate_shock - 0.5 * common_variance, axis=1
+    )
+    bridge_correction = 0.5 * idio_sigma ** 2 * steps * (months - steps) / max(months, 1)
+    common = np.exp(common_log + bridge_correction)
+
+    # Per-property monthly growth multiplier including the horizon idiosyncratic draw
+    drift = np.log1p(_annual_appreciation(holdings, assumptions)) / 12 - 0.5 * idio_sigma ** 2
+    idiosyncratic = idio_sigma * np.sqrt(months) * rng.standard_normal((paths, n_properties))
+    growth = np.exp(drift + idiosyncratic / max(months, 1))
+
+    portfolio_values = np.empty((paths, months + 1))
+    portfolio_values[:, 0] = values.sum()
+    property_values = np.broadcast_to(values, (paths, n_properties)).copy()
+    for month in range(months):
+        property_values *= growth
+        portfolio_values[:, month + 1] = property_values.sum(axis=1) * common[:, month]
+    if months:
+        property_values *= common[:, -1:]
+
+    # Rents follow the rent growth factor; collections scale with vacancy relative to its mean
+    rent_sigma = assumptions.rent_growth_volatility / np.sqrt(12)
+    rent_index = np.exp(np.cumsum(
+        np.log1p(assumptions.rent_growth_mean) / 12 - 0.5 * rent_sigma ** 2 + rent_sigma * rent_shock, axis=1
+    ))
+    vacancy = np.empty((paths, months))
+    level = np.full(paths, assumptions.vacancy_mean)
+    vacancy_sigma = assumptions.vacancy_volatility / np.sqrt(12)
+    for month in range(months):
+        level = level + assumptions.vacancy_reversion * (assumptions.vacancy_mean - level) \
+            + vacancy_sigma * vacancy_shock[:, month]
+        level = np.clip(level, 0.0, 0.95)
+        vacancy[:, month] = level
+    collection = rent_index * (1 - vacancy) / (1 - assumptions.vacancy_mean)
+    expense_index = (1 + assumptions.expense_inflation) ** (steps / 12)
+
+    monthly_cash_flow = collection * rents.sum() - expense_index * expenses.sum()
+    cumulative_cash_flow = np.zeros((paths, months + 1))
+    cumulative_cash_flow[:, 1:] = np.cumsum(monthly_cash_flow, axis=1)
+
+    property_cash_flow = np.outer(collection.sum(axis=1), rents) - expense_index.sum() * expenses
+    property_pnl = property_values - values + property_cash_flow
+
+    return PortfolioSimulation(
+        months=months,
+        paths=paths,
+        seed=seed,
+        property_ids=holdings["property_id"].tolist(),
+        initial_value=float(values.sum()),
+        portfolio_values=portfolio_values,
+        cumulative_cash_flow=cumulative_cash_flow,
+        property_pnl=property_pnl
+    )
+
+
+def stress_test(holdings: pd.DataFrame, scenarios: Optional[Dict[str, Dict[str, float]]] = None,
+                assumptions: Optional[SimulationAssumptions] = None,
+                simulation: Optional[PortfolioSimulation] = None) -> Dict[str, Dict[str, Any]]:
+    """Apply instantaneous shocks to every holding at once.
+
+    Each scenario may shock value, rent (fractions), vacancy (added points) and
+    rates (added points). With a simulation, probability is the share of its
+    paths whose 12-month value change is at least as bad as the scenario's.
+    """
+    scenarios = scenarios or STRESS_SCENARIOS
+    assumptions = assumptions or SimulationAssumptions()
+    names = list(scenarios)
+    shock = {key: np.array([scenarios[name].get(key, 0.0) for name in names])[:, None]
+             for key in ("value_shock", "rent_shock", "vacancy_shock", "rate_shock")}
+
+    values = holdings["value"].to_numpy(dtype=float)
+    debts = holdings["debt"].to_numpy(dtype=float)
+    rents = holdings["monthly_rent"].to_numpy(dtype=float)
+    expenses = holdings["monthly_expenses"].to_numpy(dtype=float)
+
+    # (scenarios, properties)
+    stressed_values = values * (1 + shock["value_shock"]) * np.exp(-assumptions.rate_sensitivity * shock["rate_shock"])
+    vacancy = np.clip(assumptions.vacancy_mean + shock["vacancy_shock"], 0.0, 1.0)
+    stressed_rents = rents * (1 + shock["rent_shock"]) * (1 - vacancy) / (1 - assumptions.vacancy_mean)
+    stressed_cash_flow = stressed_rents - expenses
+
+    total_value = values.sum()
+    base_cash_flow = (rents - expenses).sum() * 12
+    results = {}
+    for i, name in enumerate(names):
+        value_change = stressed_values[i].sum() - total_value
+        value_decline = value_change / total_value * 100 if total_value else 0.0
+        result = {
+            "value_change": float(value_change),
+            "value_decline": float(value_decline),
+            "annual_cash_flow_change": float(stressed_cash_flow[i].sum() * 12 - base_cash_flow),
+            "equity_after": float((stressed_values[i] - debts).sum()),
+            "properties_underwater": int((stressed_values[i] < debts).sum()),
+            "negative_cash_flow_properties": int((stressed_cash_flow[i] < 0).sum()),
+            "impact": _severity(value_decline)
+        }
+        if simulation is not None:
+            result["probability"] = simulation.probability_of_value_change(value_decline / 100)
+        results[name] = result
+    return results
+
+
+def downturn_scenarios(simulation: PortfolioSimulation,
+                       thresholds: Optional[Dict[str, float]] = None) -> Dict[str, Dict[str, Any]]:
+    """Probability and conditional 12-month value impact of each downturn"""
+    thresholds = thresholds or DOWNTURN_THRESHOLDS
+    month = min(12, simulation.months)
+    if not simulation.initial_value:
+        return {}
+    change = simulation.portfolio_values[:, month] / simulation.initial_value - 1
+    scenarios = {}
+    for name, threshold in thresholds.items():
+        hit = change <= threshold
+        value_impact = float(change[hit].mean() * 100) if hit.any() else float(threshold * 100)
+        scenarios[name] = {
+            "probability": float(hit.mean()),
+            "value_impact": value_impact,
+            "impact_severity": _severity(value_impact),
+            "horizon_months": month
+        }
+    return scenarios
+
+
+def _severity(value_change_percent: float) -> str:
+    if value_change_percent <= -25:
+        return "Severe"
+    if value_change_percent <= -10:
+        return "High"
+    if value_change_percent < 0:
+        return "Medium"
+    return "Low"
+
+
+def assumptions_dict(assumptions: SimulationAssumptions) -> Dict[str, Any]:
+    settings = asdict(assumptions)
+    settings["correlation"] = [list(row) for row in assumptions.correlation]
+    return settings
@@ -36,9 +36,19 @@ from app.models.portfolio import PortfolioDB, PortfolioPropertyDB, PropertyPerfo
 from app.models.property import PropertyDB
 from app.services.market_data_service import MarketDataService
 from app.services.portfolio_performance_service import PortfolioPerformanceService
+from app.services.model_registry import get_model_registry
+from app.services.portfolio_simulation import (
+    SimulationAssumptions, PortfolioSimulation, holdings_frame, simulate_portfolio, stress_test,
+    downturn_scenarios, assumptions_dict
+)
 
 logger = logging.getLogger(__name__)
 
+# Paths simulated for the 12-month outlook behind risk assessments, and their seed so
+# repeated assessments of the same holdings agree
+RISK_SIMULATION_PATHS = 2000
+RISK_SIMULATION_SEED = 0
+
 
 class PredictiveAnalyticsService:
     """Service for predictive analytics and machine learning predictions."""
@@ -54,8 +64,9 @@ class PredictiveAnalyticsService:
         self.scalers = {}
         self.encoders = {}
         
-        # Model cache
+        # Model cache (DB rows) and the process-wide registry of loaded estimators
         self._model_cache = {}
+        self.model_registry = get_model_registry()
     
     def predict_market_trend(self, request: MarketTrendPredictionRequest) -> MarketTrendPredictionResponse:
         """Predict market trends for a specific area."""
@@ -137,70 +148,86 @@ class PredictiveAnalyticsService:
             # Make prediction
             prediction_data = self._make_prediction(model, features, PredictionTypeEnum.DEAL_OUTCOME)
             
-            # Calculate deal metrics
-            success_probability = prediction_data["confidence_score"]
-            expected_profit = self._calculate_expected_profit(request, features)
-            expected_roi = self._calculate_expected_roi(request, expected_profit)
-            time_to_completion = self._estimate_completion_time(request.deal_type, features)
-            risk_level = self._assess_deal_risk_level(features, success_probability)
-            
-            # Create prediction record
-            prediction_db = PredictionDB(
-                model_id=model.id,
-                prediction_type=PredictionTypeEnum.DEAL_OUTCOME,
-                target_entity_type="deal",
-                target_entity_id=request.property_id,
-                input_features=features,
-                predicted_value=success_probability,
-                confidence_score=prediction_data["confidence_score"],
-                prediction_date=datetime.utcnow()
-            )
-            self.db.add(prediction_db)
+            deal_outcome_db = self._stage_deal_outcome(model, request, features, prediction_data)
             self.db.flush()
-            
-            # Create deal outcome prediction record
-            deal_outcome_db = DealOutcomePredictionDB(
-                prediction_id=prediction_db.id,
-                property_id=request.property_id,
-                deal_type=request.deal_type,
-                offer_amount=request.offer_amount,
-                estimated_repair_cost=request.estimated_repair_cost,
-                success_probability=success_probability,
-                expected_profit=expected_profit,
-                expected_roi=expected_roi,
-                time_to_completion=time_to_completion,
-                risk_level=risk_level,
-                risk_factors=self._identify_deal_risk_factors(features),
-                mitigation_strategies=self._suggest_mitigation_strategies(risk_level, features),
-                market_conditions=self._get_market_conditions(request.market_context),
-                comparable_deals=self._find_comparable_deals(request)
-            )
-            self.db.add(deal_outcome_db)
+            response = DealOutcomePredictionResponse.model_validate(deal_outcome_db)
             self.db.commit()
-            
-            return DealOutcomePredictionResponse(
-                id=deal_outcome_db.id,
-                prediction_id=prediction_db.id,
-                property_id=request.property_id,
-                created_at=deal_outcome_db.created_at,
-                deal_type=request.deal_type,
-                offer_amount=request.offer_amount,
-                estimated_repair_cost=request.estimated_repair_cost,
-                success_probability=success_probability,
-                expected_profit=expected_profit,
-                expected_roi=expected_roi,
-                time_to_completion=time_to_completion,
-                risk_level=risk_level,
-                risk_factors=deal_outcome_db.risk_factors,
-                mitigation_strategies=deal_outcome_db.mitigation_strategies,
-                market_conditions=deal_outcome_db.market_conditions,
-                comparable_deals=deal_outcome_db.comparable_deals
-            )
+            return response
             
         except Exception as e:
             logger.error(f"Error predicting deal outcome: {str(e)}")
             raise
     
+    def predict_deal_outcomes_batch(self, requests: List[DealOutcomePredictionRequest]) -> List[DealOutcomePredictionResponse]:
+        """Predict many deal outcomes with one model lookup and one predict call."""
+        try:
+            if not requests:
+                return []
+            
+            model = self._get_or_create_model("deal_outcome", "random_forest_classifier")
+            features_list = [self._prepare_deal_outcome_features(request) for request in requests]
+            predictions = self._make_predictions(model, features_list, PredictionTypeEnum.DEAL_OUTCOME)
+            
+            records = [
+                self._stage_deal_outcome(model, request, features, prediction_data)
+                for request, features, prediction_data in zip(requests, features_list, predictions)
+            ]
+            self.db.flush()
+            responses = [DealOutcomePredictionResponse.model_validate(record) for record in records]
+            self.db.commit()
+            return responses
+            
+        except Exception as e:
+            logger.error(f"Error predicting deal outcomes batch: {str(e)}")
+            self.db.rollback()
+            raise
+    
+    def _stage_deal_outcome(self, model: PredictiveModelDB, request: DealOutcomePredictionRequest,
+                            features: Dict[str, Any], prediction_data: Dict[str, Any]) -> DealOutcomePredictionDB:
+        """Add the prediction records for one deal to the session without flushing."""
+        # Calculate deal metrics
+        success_probability = prediction_data["confidence_score"]
+        expected_profit = self._calculate_expected_profit(request, features)
+        expected_roi = self._calculate_expected_roi(request, expected_profit)
+        time_to_completion = self._estimate_completion_time(request.deal_type, features)
+        risk_level = self._assess_deal_risk_level(features, success_probability)
+        
+        # Create prediction record
+        prediction_db = PredictionDB(
+            id=uuid.uuid4(),
+            model_id=model.id,
+            prediction_type=PredictionTypeEnum.DEAL_OUTCOME,
+            target_entity_type="deal",
+            target_entity_id=request.property_id,
+            input_features=features,
+            predicted_value=success_probability,
+            confidence_score=prediction_data["confidence_score"],
+            prediction_date=datetime.utcnow()
+        )
+        self.db.add(prediction_db)
+        
+        # Create deal outcome prediction record
+        deal_outcome_db = DealOutcomePredictionDB(
+            id=uuid.uuid4(),
+            prediction_id=prediction_db.id,
+            created_at=datetime.utcnow(),
+            property_id=request.property_id,
+            deal_type=request.deal_type,
+            offer_amount=request.offer_amount,
+            estimated_repair_cost=request.estimated_repair_cost,
+            success_probability=success_probability,
+            expected_profit=expected_profit,
+            expected_roi=expected_roi,
+            time_to_completion=time_to_completion,
+            risk_level=risk_level,
+            risk_factors=self._identify_deal_risk_factors(features),
+            mitigation_strategies=self._suggest_mitigation_strategies(risk_level, features),
+            market_conditions=self._get_market_conditions(request.market_context),
+            comparable_deals=self._find_comparable_deals(request)
+        )
+        self.db.add(deal_outcome_db)
+        return deal_outcome_db
+    
     def forecast_portfolio_performance(self, request: PortfolioForecastRequest) -> PortfolioForecastResponse:
         """Forecast portfolio performance over time."""
         try:
@@ -214,50 +241,67 @@ class PredictiveAnalyticsService:
             
             # Prepare features for prediction
             features = self._prepare_portfolio_features(portfolio)
+            prediction_data = self._make_prediction(model, features, PredictionTypeEnum.PORTFOLIO_PERFORMANCE)
+            
+            # Simulate every holding across correlated market paths
+            assumptions = SimulationAssumptions()
+            holdings = self._load_simulation_holdings(portfolio)
+            simulation = simulate_portfolio(
+                holdings, request.forecast_horizon_months, paths=request.simulation_paths,
+                seed=request.random_seed, assumptions=assumptions
+            )
+            summary = simulation.summary()
+            value_bands = summary["percentile_bands"]["portfolio_value"]
+            cash_flow_bands = summary["percentile_bands"]["cumulative_cash_flow"]
             
-            # Generate monthly forecasts
+            # Monthly median projections with their percentile bands
             monthly_projections = []
             current_date = datetime.utcnow()
             
-            for month in range(request.forecast_horizon_months):
-                forecast_date = current_date + timedelta(days=30 * month)
-                month_features = features.copy()
-                month_features["forecast_month"] = month
-                month_features["forecast_date"] = forecast_date.timestamp()
-                
-                prediction_data = self._make_prediction(model, month_features, PredictionTypeEnum.PORTFOLIO_PERFORMANCE)
-                
+            for month in range(1, request.forecast_horizon_months + 1):
+                forecast_date = current_date + timedelta(days=30 * (month - 1))
                 monthly_projections.append({
-                    "month": month + 1,
+                    "month": month,
                     "date": forecast_date.isoformat(),
-                    "projected_value": prediction_data["predicted_value"],
+                    "projected_value": value_bands[50][month],
+                    "value_percentiles": {str(p): band[month] for p, band in value_bands.items()},
+                    "cumulative_cash_flow": cash_flow_bands[50][month],
                     "confidence": prediction_data["confidence_score"]
                 })
             
             # Calculate aggregate projections
-            final_projection = monthly_projections[-1]
-            projected_value = final_projection["projected_value"]
-            projected_appreciation = ((projected_value - portfolio.total_value) / portfolio.total_value) * 100
-            projected_cash_flow = self._project_cash_flow(portfolio, request.forecast_horizon_months)
+            projected_value = summary["expected_value"]
+            base_value = simulation.initial_value or portfolio.total_value
+            projected_appreciation = ((projected_value - base_value) / base_value) * 100
+            projected_cash_flow = summary["expected_cash_flow"]
             projected_roi = self._calculate_projected_roi(portfolio, projected_value, projected_cash_flow)
             
             # Scenario analysis
             scenarios = {}
             if request.scenario_analysis:
-                scenarios = self._generate_portfolio_scenarios(portfolio, features, request.forecast_horizon_months)
+                scenarios = self._generate_portfolio_scenarios(
+                    portfolio, features, request.forecast_horizon_months, simulation
+                )
             
             # Risk metrics
-            risk_metrics = self._calculate_portfolio_risk_metrics(portfolio, monthly_projections)
+            risk_metrics = self._calculate_portfolio_risk_metrics(portfolio, monthly_projections, simulation)
+            simulation_settings = {
+                "paths": simulation.paths,
+                "seed": simulation.seed,
+                "properties": len(holdings),
+                "assumptions": assumptions_dict(assumptions)
+            }
             
             # Create prediction record
             prediction_db = PredictionDB(
+                id=uuid.uuid4(),
                 model_id=model.id,
                 prediction_type=PredictionTypeEnum.PORTFOLIO_PERFORMANCE,
                 target_entity_type="portfolio",
                 target_entity_id=request.portfolio_id,
                 input_features=features,
                 predicted_value=projected_value,
-                confidence_score=np.mean([p["confidence"] for p in monthly_projections]),
+                confidence_score=prediction_data["confidence_score"],
                 prediction_horizon=request.forecast_horizon_months * 30,
                 prediction_date=datetime.utcnow(),
                 expiry_date=datetime.utcnow() + timedelta(days=request.forecast_horizon_months * 30)
@@ -267,7 +311,9 @@ class PredictiveAnalyticsService:
             
             # Create portfolio forecast record
             forecast_db = PortfolioForecastDB(
+                id=uuid.uuid4(),
                 prediction_id=prediction_db.id,
+                created_at=datetime.utcnow(),
                 portfolio_id=request.portfolio_id,
                 forecast_start_date=datetime.utcnow(),
                 forecast_end_date=datetime.utcnow() + timedelta(days=request.forecast_horizon_months * 30),
@@ -282,7 +328,9 @@ class PredictiveAnalyticsService:
                 most_likely_scenario=scenarios.get("most_likely"),
                 value_at_risk=risk_metrics.get("value_at_risk"),
                 expected_shortfall=risk_metrics.get("expected_shortfall"),
-                volatility_estimate=risk_metrics.get("volatility")
+                volatility_estimate=risk_metrics.get("volatility"),
+                property_contributions=simulation.property_contributions(),
+                simulation_settings=simulation_settings
             )
             self.db.add(forecast_db)
             self.db.commit()
@@ -305,7 +353,9 @@ class PredictiveAnalyticsService:
                 most_likely_scenario=scenarios.get("most_likely"),
                 value_at_risk=risk_metrics.get("value_at_risk"),
                 expected_shortfall=risk_metrics.get("expected_shortfall"),
-                volatility_estimate=risk_metrics.get("volatility")
+                volatility_estimate=risk_metrics.get("volatility"),
+                property_contributions=forecast_db.property_contributions,
+                simulation_settings=simulation_settings
             )
             
         except Exception as e:
@@ -324,84 +374,111 @@ class PredictiveAnalyticsService:
             # Make prediction
             prediction_data = self._make_prediction(model, features, PredictionTypeEnum.RISK_ASSESSMENT)
             
-            # Calculate risk scores
-            overall_risk_score = prediction_data["predicted_value"]
-            risk_level = self._determine_risk_level(overall_risk_score)
-            
-            # Calculate category-specific risk scores
-            risk_scores = self._calculate_category_risk_scores(features)
-            
-            # Identify risks and mitigation strategies
-            identified_risks = self._identify_risks(features, overall_risk_score)
-            mitigation_strategies = self._suggest_risk_mitigation(identified_risks, request.target_type)
-            
-            # Stress testing and scenario analysis
-            stress_test_results = {}
-            scenario_analysis = {}
+            risk_assessment_db = self._stage_risk_assessment(model, request, features, prediction_data)
+            self.db.flush()
+            response = RiskAssessmentResponse.model_validate(risk_assessment_db)
+            self.db.commit()
+            return response
             
-            if request.include_stress_testing:
-                stress_test_results = self._perform_stress_testing(features, request.target_type)
+        except Exception as e:
+            logger.error(f"Error assessing risk: {str(e)}")
+            raise
+    
+    def assess_risk_batch(self, requests: List[RiskAssessmentRequest]) -> List[RiskAssessmentResponse]:
+        """Assess many targets with one model lookup, one query per target type and one predict call."""
+        try:
+            if not requests:
+                return []
             
-            if request.include_scenario_analysis:
-                scenario_analysis = self._perform_risk_scenario_analysis(features, request.target_type)
+            model = self._get_or_create_model("risk_assessment", "random_forest")
+            targets = self._load_risk_targets(requests)
+            holdings = self._load_risk_holdings(requests, targets)
+            features_list = [self._prepare_risk_assessment_features(request, targets) for request in requests]
+            predictions = self._make_predictions(model, features_list, PredictionTypeEnum.RISK_ASSESSMENT)
             
-            # Create prediction record
-            prediction_db = PredictionDB(
-                model_id=model.id,
-                prediction_type=PredictionTypeEnum.RISK_ASSESSMENT,
-                target_entity_type=request.target_type,
-                target_entity_id=request.target_id,
-                input_features=features,
-                predicted_value=overall_risk_score,
-                confidence_score=prediction_data["confidence_score"],
-                prediction_date=datetime.utcnow()
-            )
-            self.db.add(prediction_db)
+            records = [
+                self._stage_risk_assessment(model, request, features, prediction_data, holdings)
+                for request, features, prediction_data in zip(requests, features_list, predictions)
+            ]
             self.db.flush()
-            
-            # Create risk assessment record
-            risk_assessment_db = RiskAssessmentDB(
-                prediction_id=prediction_db.id,
-                target_type=request.target_type,
-                target_id=request.target_id,
-                overall_risk_score=overall_risk_score,
-                risk_level=risk_level,
-                market_risk_score=risk_scores.get("market_risk"),
-                liquidity_risk_score=risk_scores.get("liquidity_risk"),
-                credit_risk_score=risk_scores.get("credit_risk"),
-                operational_risk_score=risk_scores.get("operational_risk"),
-                regulatory_risk_score=risk_scores.get("regulatory_risk"),
-                identified_risks=identified_risks,
-                risk_mitigation_strategies=mitigation_strategies,
-                stress_test_results=stress_test_results,
-                scenario_analysis=scenario_analysis
-            )
-            self.db.add(risk_assessment_db)
+            responses = [RiskAssessmentResponse.model_validate(record) for record in records]
             self.db.commit()
-            
-            return RiskAssessmentResponse(
-                id=risk_assessment_db.id,
-                prediction_id=prediction_db.id,
-                created_at=risk_assessment_db.created_at,
-                target_type=request.target_type,
-                target_id=request.target_id,
-                overall_risk_score=overall_risk_score,
-                risk_level=risk_level,
-                market_risk_score=risk_scores.get("market_risk"),
-                liquidity_risk_score=risk_scores.get("liquidity_risk"),
-                credit_risk_score=risk_scores.get("credit_risk"),
-                operational_risk_score=risk_scores.get("operational_risk"),
-                regulatory_risk_score=risk_scores.get("regulatory_risk"),
-                identified_risks=identified_risks,
-                risk_mitigation_strategies=mitigation_strategies,
-                stress_test_results=stress_test_results,
-                scenario_analysis=scenario_analysis
-            )
+            return responses
             
         except Exception as e:
-            logger.error(f"Error assessing risk: {str(e)}")
+            logger.error(f"Error assessing risk batch: {str(e)}")
+            self.db.rollback()
             raise
     
+    def _stage_risk_assessment(self, model: PredictiveModelDB, request: RiskAssessmentRequest,
+                               features: Dict[str, Any], prediction_data: Dict[str, Any],
+                               portfolio_holdings: Optional[Dict[Any, pd.DataFrame]] = None) -> RiskAssessmentDB:
+        """Add the prediction records for one risk assessment to the session without flushing.
+        
+        portfolio_holdings optionally holds prefetched simulation holdings keyed by
+        portfolio id, as loaded by _load_risk_holdings.
+        """
+        # Calculate risk scores
+        overall_risk_score = prediction_data["predicted_value"]
+        risk_level = self._determine_risk_level(overall_risk_score)
+        
+        # Calculate category-specific risk scores
+        risk_scores = self._calculate_category_risk_scores(features)
+        
+        # Identify risks and mitigation strategies
+        identified_risks = self._identify_risks(features, overall_risk_score)
+        mitigation_strategies = self._suggest_risk_mitigation(identified_risks, request.target_type)
+        
+        # Stress testing and scenario analysis share one 12-month simulation
+        stress_test_results = {}
+        scenario_analysis = {}
+        
+        if request.include_stress_testing or request.include_scenario_analysis:
+            holdings = self._risk_holdings(request, features, portfolio_holdings)
+            simulation = simulate_portfolio(holdings, 12, paths=RISK_SIMULATION_PATHS, seed=RISK_SIMULATION_SEED)
+            
+            if request.include_stress_testing:
+                stress_test_results = self._perform_stress_testing(features, request.target_type, holdings, simulation)
+            
+            if request.include_scenario_analysis:
+                scenario_analysis = self._perform_risk_scenario_analysis(features, request.target_type, simulation)
+        
+        # Create prediction record
+        prediction_db = PredictionDB(
+            id=uuid.uuid4(),
+            model_id=model.id,
+            prediction_type=PredictionTypeEnum.RISK_ASSESSMENT,
+            target_entity_type=request.target_type,
+            target_entity_id=request.target_id,
+            input_features=features,
+            predicted_value=overall_risk_score,
+            confidence_score=prediction_data["confidence_score"],
+            prediction_date=datetime.utcnow()
+        )
+        self.db.add(prediction_db)
+        
+        # Create risk assessment record
+        risk_assessment_db = RiskAssessmentDB(
+            id=uuid.uuid4(),
+            prediction_id=prediction_db.id,
+            created_at=datetime.utcnow(),
+            target_type=request.target_type,
+            target_id=request.target_id,
+            overall_risk_score=overall_risk_score,
+            risk_level=risk_level,
+            market_risk_score=risk_scores.get("market_risk"),
+            liquidity_risk_score=risk_scores.get("liquidity_risk"),
+            credit_risk_score=risk_scores.get("credit_risk"),
+            operational_risk_score=risk_scores.get("operational_risk"),
+            regulatory_risk_score=risk_scores.get("regulatory_risk"),
+            identified_risks=identified_risks,
+            risk_mitigation_strategies=mitigation_strategies,
+            stress_test_results=stress_test_results,
+            scenario_analysis=scenario_analysis
+        )
+        self.db.add(risk_assessment_db)
+        return risk_assessment_db
+    
     def _get_or_create_model(self, model_name: str, model_type: str) -> PredictiveModelDB:
         """Get existing model or create a new one."""
         # Check cache first
@@ -523,45 +600,49 @@ class PredictiveAnalyticsService:
     
     def _make_prediction(self, model: PredictiveModelDB, features: Dict[str, Any], prediction_type: PredictionTypeEnum) -> Dict[str, Any]:
         """Make a prediction using the specified model."""
+        return self._make_predictions(model, [features], prediction_type)[0]
+    
+    def _make_predictions(self, model: PredictiveModelDB, features_list: List[Dict[str, Any]],
+                          prediction_type: PredictionTypeEnum) -> List[Dict[str, Any]]:
+        """Predict a batch of feature dicts with one scaler transform and one predict call."""
         try:
-            # Load the trained model
-            if model.model_path and Path(model.model_path).exists():
-                model_data = joblib.load(model.model_path)
-                ml_model = model_data['model']
-                scaler = model_data['scaler']
-                feature_names = model_data['features']
-            else:
+            # Loaded estimators stay warm in the registry between calls
+            loaded = self.model_registry.get(model)
+            if loaded is None:
                 # Use a simple heuristic-based prediction if no trained model exists
-                return self._make_heuristic_prediction(features, prediction_type)
+                return [self._make_heuristic_prediction(features, prediction_type) for features in features_list]
             
-            # Prepare feature vector
-            feature_vector = []
-            for feature_name in feature_names:
-                feature_vector.append(features.get(feature_name, 0))
+            # Prepare feature matrix
+            feature_matrix = np.array(
+                [[features.get(feature_name, 0) for feature_name in loaded.features] for features in features_list],
+                dtype=float
+            )
             
             # Scale features
-            feature_vector_scaled = scaler.transform([feature_vector])
+            feature_matrix_scaled = loaded.scaler.transform(feature_matrix)
             
-            # Make prediction
-            prediction = ml_model.predict(feature_vector_scaled)[0]
+            # Make predictions
+            predictions = loaded.model.predict(feature_matrix_scaled)
             
-            # Calculate confidence score
-            if hasattr(ml_model, 'predict_proba'):
-                probabilities = ml_model.predict_proba(feature_vector_scaled)[0]
-                confidence_score = max(probabilities)
+            # Calculate confidence scores
+            if hasattr(loaded.model, 'predict_proba'):
+                confidence_scores = loaded.model.predict_proba(feature_matrix_scaled).max(axis=1)
             else:
                 # For regression models, use a simple confidence metric
-                confidence_score = min(0.95, max(0.5, 1.0 - abs(prediction) / 1000000))
+                confidence_scores = np.clip(1.0 - np.abs(predictions) / 1000000, 0.5, 0.95)
             
-            return {
-                "predicted_value": float(prediction),
-                "confidence_score": float(confidence_score)
-            }
+            return [
+                {
+                    "predicted_value": float(prediction),
+                    "confidence_score": float(confidence_score)
+                }
+                for prediction, confidence_score in zip(predictions, confidence_scores)
+            ]
             
         except Exception as e:
             logger.error(f"Error making prediction: {str(e)}")
             # Fallback to heuristic prediction
-            return self._make_heuristic_prediction(features, prediction_type)
+            return [self._make_heuristic_prediction(features, prediction_type) for features in features_list]
     
     def _make_heuristic_prediction(self, features: Dict[str, Any], prediction_type: PredictionTypeEnum) -> Dict[str, Any]:
         """Make a heuristic-based prediction when ML model is not available."""
@@ -664,15 +745,23 @@ class PredictiveAnalyticsService:
         
         return features
     
-    def _prepare_risk_assessment_features(self, request: RiskAssessmentRequest) -> Dict[str, Any]:
-        """Prepare features for risk assessment."""
+    def _prepare_risk_assessment_features(self, request: RiskAssessmentRequest,
+                                          targets: Optional[Dict[Tuple[str, Any], Any]] = None) -> Dict[str, Any]:
+        """Prepare features for risk assessment.
+        
+        targets optionally holds prefetched properties/portfolios keyed by
+        (target_type, target_id), as loaded by _load_risk_targets.
+        """
         features = {
             "target_type": request.target_type,
             "assessment_date": datetime.utcnow().timestamp(),
         }
         
         if request.target_type == "property":
-            property_obj = self.db.query(PropertyDB).filter(PropertyDB.id == request.target_id).first()
+            if targets is not None:
+                property_obj = targets.get(("property", request.target_id))
+            else:
+                property_obj = self.db.query(PropertyDB).filter(PropertyDB.id == request.target_id).first()
             if property_obj:
                 features.update({
                     "property_value": property_obj.current_value or 0,
@@ -682,7 +771,10 @@ class PredictiveAnalyticsService:
                     "crime_score": property_obj.crime_score or 50
                 })
         elif request.target_type == "portfolio":
-            portfolio = self.db.query(PortfolioDB).filter(PortfolioDB.id == request.target_id).first()
+            if targets is not None:
+                portfolio = targets.get(("portfolio", request.target_id))
+            else:
+                portfolio = self.db.query(PortfolioDB).filter(PortfolioDB.id == request.target_id).first()
             if portfolio:
                 features.update(self._prepare_portfolio_features(portfolio))
         
@@ -695,6 +787,16 @@ class PredictiveAnalyticsService:
         
         return features
     
+    def _load_risk_targets(self, requests: List[RiskAssessmentRequest]) -> Dict[Tuple[str, Any], Any]:
+        """Fetch every property and portfolio a batch refers to, one query per type."""
+        targets = {}
+        for target_type, db_model in (("property", PropertyDB), ("portfolio", PortfolioDB)):
+            ids = {request.target_id for request in requests if request.target_type == target_type}
+            if ids:
+                for obj in self.db.query(db_model).filter(db_model.id.in_(ids)).all():
+                    targets[(target_type, obj.id)] = obj
+        return targets
+    
     # Helper methods for interpretation and calculation
     def _interpret_market_trend(self, predicted_value: float) -> MarketTrendDirectionEnum:
         """Interpret market trend prediction."""
@@ -848,30 +950,52 @@ class PredictiveAnalyticsService:
             return (total_return / portfolio.total_value) * 100
         return 0
     
-    def _generate_portfolio_scenarios(self, portfolio: PortfolioDB, features: Dict[str, Any], months: int) -> Dict[str, Any]:
-        """Generate portfolio scenarios."""
-        base_value = portfolio.total_value
+    def _generate_portfolio_scenarios(self, portfolio: PortfolioDB, features: Dict[str, Any], months: int,
+                                      simulation: Optional[PortfolioSimulation] = None) -> Dict[str, Any]:
+        """Generate portfolio scenarios from the simulated value distribution."""
+        if simulation is None:
+            simulation = simulate_portfolio(self._load_simulation_holdings(portfolio), months)
+        
+        terminal = simulation.portfolio_values[:, -1]
+        best, most_likely, worst = np.percentile(terminal, [90, 50, 10])
         
         return {
             "best_case": {
-                "projected_value": base_value * 1.2,
+                "projected_value": float(best),
+                "percentile": 90,
                 "probability": 0.1,
                 "assumptions": ["Strong market growth", "All properties perform well"]
             },
             "worst_case": {
-                "projected_value": base_value * 0.8,
+                "projected_value": float(worst),
+                "percentile": 10,
                 "probability": 0.1,
                 "assumptions": ["Market downturn", "High vacancy rates"]
             },
             "most_likely": {
-                "projected_value": base_value * 1.05,
+                "projected_value": float(most_likely),
+                "percentile": 50,
                 "probability": 0.8,
                 "assumptions": ["Moderate market growth", "Normal performance"]
             }
         }
     
-    def _calculate_portfolio_risk_metrics(self, portfolio: PortfolioDB, projections: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Calculate portfolio risk metrics."""
+    def _calculate_portfolio_risk_metrics(self, portfolio: PortfolioDB, projections: List[Dict[str, Any]],
+                                          simulation: Optional[PortfolioSimulation] = None) -> Dict[str, Any]:
+        """Calculate portfolio risk metrics.
+        
+        With a simulation, VaR and expected shortfall are horizon losses at 95%
+        confidence and volatility is annualized; otherwise they are derived
+        from the projected values.
+        """
+        if simulation is not None:
+            var = simulation.value_at_risk()
+            return {
+                "value_at_risk": var["value_at_risk"],
+                "expected_shortfall": var["conditional_value_at_risk"],
+                "volatility": simulation.volatility()
+            }
+        
         values = [p["projected_value"] for p in projections]
         
         return {
@@ -934,34 +1058,75 @@ class PredictiveAnalyticsService:
         
         return strategies
     
-    def _perform_stress_testing(self, features: Dict[str, Any], target_type: str) -> Dict[str, Any]:
-        """Perform stress testing."""
+    def _perform_stress_testing(self, features: Dict[str, Any], target_type: str,
+                                holdings: Optional[pd.DataFrame] = None,
+                                simulation: Optional[PortfolioSimulation] = None) -> Dict[str, Any]:
+        """Apply instantaneous market shocks to every holding of the target."""
+        if holdings is None:
+            holdings = self._feature_holdings(features)
+        return stress_test(holdings, simulation=simulation)
+    
+    def _perform_risk_scenario_analysis(self, features: Dict[str, Any], target_type: str,
+                                        simulation: Optional[PortfolioSimulation] = None) -> Dict[str, Any]:
+        """Estimate downturn probabilities and impacts from a 12-month simulation."""
+        if simulation is None:
+            simulation = simulate_portfolio(self._feature_holdings(features), 12, paths=RISK_SIMULATION_PATHS,
+                                            seed=RISK_SIMULATION_SEED)
+        return downturn_scenarios(simulation)
+    
+    def _load_simulation_holdings(self, portfolio: PortfolioDB) -> pd.DataFrame:
+        """Simulation inputs for a portfolio's holdings, or its totals when it has none recorded."""
+        return self._simulation_holdings(portfolio, self.db.query(PortfolioPropertyDB).filter(
+            PortfolioPropertyDB.portfolio_id == portfolio.id
+        ).all())
+    
+    def _simulation_holdings(self, portfolio: PortfolioDB, records: List[PortfolioPropertyDB]) -> pd.DataFrame:
+        holdings = holdings_frame(records)
+        if holdings.empty:
+            holdings = holdings_frame([{
+                "current_value": portfolio.total_value,
+                "current_debt": portfolio.total_debt,
+                "monthly_rent": portfolio.monthly_cash_flow
+            }])
+        return holdings
+    
+    def _risk_holdings(self, request: RiskAssessmentRequest, features: Dict[str, Any],
+                       portfolio_holdings: Optional[Dict[Any, pd.DataFrame]] = None) -> pd.DataFrame:
+        """Holdings behind a risk assessment target."""
+        if request.target_type == "portfolio":
+            if portfolio_holdings is not None:
+                if request.target_id in portfolio_holdings:
+                    return portfolio_holdings[request.target_id]
+            else:
+                portfolio = self.db.query(PortfolioDB).filter(PortfolioDB.id == request.target_id).first()
+                if portfolio:
+                    return self._load_simulation_holdings(portfolio)
+        return self._feature_holdings(features)
+    
+    def _load_risk_holdings(self, requests: List[RiskAssessmentRequest],
+                            targets: Dict[Tuple[str, Any], Any]) -> Dict[Any, pd.DataFrame]:
+        """Simulation holdings of every portfolio a batch simulates, in one query."""
+        portfolios = {
+            request.target_id: targets[("portfolio", request.target_id)]
+            for request in requests
+            if request.target_type == "portfolio" and ("portfolio", request.target_id) in targets
+            and (request.include_stress_testing or request.include_scenario_analysis)
+        }
+        if not portfolios:
+            return {}
+        records = {portfolio_id: [] for portfolio_id in portfolios}
+        for record in self.db.query(PortfolioPropertyDB).filter(
+            PortfolioPropertyDB.portfolio_id.in_(list(portfolios))
+        ).all():
+            records[record.portfolio_id].append(record)
         return {
-            "market_crash_scenario": {
-                "value_decline": -30,
-                "probability": 0.05,
-                "impact": "Severe"
-            },
-            "interest_rate_shock": {
-                "rate_increase": 3.0,
-                "impact_on_value": -15,
-                "probability": 0.15
-            }
+            portfolio_id: self._simulation_holdings(portfolio, records[portfolio_id])
+            for portfolio_id, portfolio in portfolios.items()
         }
     
-    def _perform_risk_scenario_analysis(self, features: Dict[str, Any], target_type: str) -> Dict[str, Any]:
-        """Perform risk scenario analysis."""
-        return {
-            "economic_recession": {
-                "probability": 0.2,
-                "impact_severity": "High",
-                "value_impact": -25,
-                "duration_months": 18
-            },
-            "local_market_downturn": {
-                "probability": 0.3,
-                "impact_severity": "Medium",
-                "value_impact": -15,
-                "duration_months": 12
-            }
-        }
\ No newline at end of file
+    def _feature_holdings(self, features: Dict[str, Any]) -> pd.DataFrame:
+        """A single stand-in holding built from assessment features."""
+        return holdings_frame([{
+            "current_value": features.get("property_value") or features.get("total_value") or 0.0,
+            "monthly_rent": features.get("monthly_cash_flow") or 0.0
+        }])
@@ -0,0 +1,197 @@
+"""
+Quantile Sketch
+Mergeable streaming quantile summaries for benchmark metrics.
+
+A merging t-digest: values are buffered and periodically folded into a sorted
+list of (mean, weight) centroids. Centroids are binned with the k1 scale
+function, so they stay small near the tails and the summary holds about
+`compression` centroids however many values it has seen. Until it reaches
+that size every value is kept as its own centroid and quantiles are exact.
+Two sketches merge by folding one's centroids into the other, so partial
+sketches built by separate workers combine without the raw values, and a
+sketch serializes to a small dict for storage.
+"""
+import logging
+from typing import Any, Dict, Iterable, Optional, Sequence, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMPRESSION = 200
+
+
+class QuantileSketch:
+    """Merging t-digest over a stream of floats"""
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        if compression < 10:
+            raise ValueError("compression must be at least 10")
+        self.compression = int(compression)
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+        self._buffer = []
+        self._buffered = 0
+
+    @classmethod
+    def from_values(cls, values: Iterable[float], compression: int = DEFAULT_COMPRESSION) -> "QuantileSketch":
+        sketch = cls(compression)
+        sketch.update(values)
+        return sketch
+
+    @classmethod
+    def merged(cls, sketches: Iterable["QuantileSketch"],
+               compression: int = DEFAULT_COMPRESSION) -> "QuantileSketch":
+        """One sketch summarizing every value seen by the given sketches"""
+        result = cls(compression)
+        for sketch in sketches:
+            result.merge(sketch)
+        return result
+
+    @property
+    def count(self) -> float:
+        self._flush()
+        return float(self.weights.sum())
+
+    @property
+    def mean(self) -> float:
+        """Exact mean of the values seen; centroid means are weight-preserving"""
+        count = self.count
+        return float((self.means * self.weights).sum() / count) if count else 0.0
+
+    def __len__(self) -> int:
+        return int(round(self.count))
+
+    def update(self, values: Iterable[float]) -> "QuantileSketch":
+        """Add values; NaN and infinite values are ignored"""
+        values = np.asarray(values if isinstance(values, np.ndarray) else list(values), dtype=float).ravel()
+        values = values[np.isfinite(values)]
+        if len(values):
+            self._buffer.append((values, np.ones(len(values))))
+            self._buffered += len(values)
+            if self._buffered >= 5 * self.compression:
+                self._flush()
+        return self
+
+    def add(self, value: float) -> "QuantileSketch":
+        return self.update([value])
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fold another sketch's centroids into this one"""
+        other._flush()
+        if len(other.means):
+            self._buffer.append((other.means, other.weights))
+            self._buffered += len(other.means)
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._flush()
+        return self
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        means = np.concatenate([self.means] + [m for m, _ in self._buffer])
+        weights = np.concatenate([self.weights] + [w for _, w in self._buffer])
+        self.min = min(self.min, float(means.min()))
+        self.max = max(self.max, float(means.max()))
+        self._buffer = []
+        self._buffered = 0
+
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        if len(means) > self.compression:
+            # Bin centroids by the integer part of their k1 scale value
+            total = weights.sum()
+            q = (np.cumsum(weights) - weights / 2) / total
+            k = np.floor(self.compression / np.pi * np.arcsin(np.clip(2 * q - 1, -1.0, 1.0)))
+            starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+            merged_weights = np.add.reduceat(weights, starts)
+            means = np.add.reduceat(means * weights, starts) / merged_weights
+            weights = merged_weights
+        self.means, self.weights = means, weights
+
+    def quantile(self, q: Union[float, Sequence[float]]) -> Union[float, np.ndarray]:
+        """Value at quantile q in [0, 1], interpolated linearly between order statistics
+
+        With every value still its own centroid this equals numpy's default
+        ("linear") percentile. An empty sketch returns 0.0.
+        """
+        self._flush()
+        scalar = np.ndim(q) == 0
+        q = np.clip(np.asarray(q, dtype=float), 0.0, 1.0)
+        if not len(self.means):
+            return 0.0 if scalar else np.zeros(q.shape)
+
+        # A centroid of weight w covers ranks c .. c + w - 1; place its mean at their center
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights + (self.weights - 1) / 2
+        ranks, values = centers, self.means
+        if centers[0] > 0:
+            ranks, values = np.r_[0.0, ranks], np.r_[self.min, values]
+        if centers[-1] < total - 1:
+            ranks, values = np.r_[ranks, total - 1], np.r_[values, self.max]
+        result = np.interp(q * (total - 1), ranks, values)
+        return float(result) if scalar else result
+
+    def percentile(self, percentile: float) -> float:
+        return self.quantile(percentile / 100)
+
+    def rank(self, value: float) -> float:
+        """Fraction of values less than or equal to value
+
+        Single-value centroids count as point masses, so this is exact while the
+        sketch is below its compression. A merged centroid's weight is spread
+        evenly between the midpoints to its neighbours.
+        """
+        self._flush()
+        if not len(self.means):
+            return 0.0
+        if value >= self.max:
+            return 1.0
+        if value < self.min:
+            return 0.0
+
+        midpoints = (self.means[1:] + self.means[:-1]) / 2
+        lower = np.r_[self.min, midpoints]
+        upper = np.r_[midpoints, self.max]
+        spread = (self.weights > 1) & (upper > lower)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            share = np.where(spread, np.clip((value - lower) / (upper - lower), 0.0, 1.0),
+                             (self.means <= value).astype(float))
+        return float((share * self.weights).sum() / self.weights.sum())
+
+    def percentile_rank(self, value: float) -> float:
+        """Percent of values less than or equal to value"""
+        return self.rank(value) * 100
+
+    def summary(self, percentiles: Sequence[float] = (10, 25, 50, 75, 90)) -> Dict[str, float]:
+        """Count, extremes and the requested percentiles, keyed like "p50" """
+        count = self.count
+        result = {"count": count, "min": self.min if count else 0.0, "max": self.max if count else 0.0}
+        values = self.quantile(np.asarray(percentiles, dtype=float) / 100)
+        for percentile, value in zip(percentiles, np.atleast_1d(values)):
+            result[f"p{percentile:g}"] = float(value)
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        self._flush()
+        return {
+            "compression": self.compression,
+            "min": float(self.min) if len(self.means) else None,
+            "max": float(self.max) if len(self.means) else None,
+            "means": self.means.tolist(),
+            "weights": self.weights.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "QuantileSketch":
+        data = data or {}
+        sketch = cls(data.get("compression", DEFAULT_COMPRESSION))
+        sketch.means = np.asarray(data.get("means", []), dtype=float)
+        sketch.weights = np.asarray(data.get("weights", []), dtype=float)
+        if len(sketch.means):
+            sketch.min = float(data["min"]) if data.get("min") is not None else float(sketch.means[0])
+            sketch.max = float(data["max"]) if data.get("max") is not None else float(sketch.means[-1])
+        return sketch
@@ -0,0 +1,419 @@
+"""
+Rebalancing Optimizer for the Real Estate Empire platform.
+
+Picks an action for every held asset (hold, sell or refinance) and every
+candidate deal (acquire or pass) to maximize the change in annual return.
+A plan must stay within a capital budget and must not push any city, state or
+property type above a share of portfolio value. The metrics of each option are
+computed once as arrays. The selection is solved as a mixed-integer program by
+HiGHS through scipy, and any plan can be re-scored incrementally from the
+cached option arrays without touching the holdings again.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import Bounds, LinearConstraint, milp
+from scipy.sparse import csr_matrix
+
+logger = logging.getLogger(__name__)
+
+ACTION_SELL = "sell"
+ACTION_REFINANCE = "refinance"
+ACTION_ACQUIRE = "acquire"
+ACTIONS = [ACTION_SELL, ACTION_REFINANCE, ACTION_ACQUIRE]
+
+ASSET_COLUMNS = [
+    "portfolio_property_id", "property_id", "address", "city", "state", "property_type",
+    "current_value", "current_debt", "annual_cash_flow", "expected_appreciation"
+]
+DEAL_COLUMNS = [
+    "deal_id", "address", "city", "state", "property_type", "price", "capital_required",
+    "annual_cash_flow", "expected_appreciation"
+]
+CONCENTRATION_DIMENSIONS = ["city", "state", "property_type"]
+UNKNOWN_CATEGORY = "Unknown"
+
+# Up to this many options the exact MILP is fast; above it the rounded LP is used
+EXACT_OPTION_LIMIT = 500
+
+
+@dataclass
+class RebalancingAssumptions:
+    """Market assumptions used to price each action."""
+    cash_yield: float = 0.04  # annual return on idle capital
+    selling_cost_rate: float = 0.06
+    debt_rate: float = 0.07  # rate assumed on existing debt
+    refinance_rate: float = 0.065
+    refinance_ltv: float = 0.75
+    refinance_cost_rate: float = 0.02
+    loan_term_years: int = 30
+    appreciation_rate: float = 0.03  # used where no expected appreciation is given
+
+
+@dataclass
+class RebalancingAction:
+    """One selected action with its effect on capital, return and value."""
+    action: str
+    asset_id: Any  # portfolio_property_id for holdings, deal_id for deals
+    property_id: Optional[Any]
+    address: Optional[str]
+    capital_change: float  # capital consumed; negative when capital is released
+    annual_return_change: float
+    value_change: float
+
+
+@dataclass
+class RebalancingPlan:
+    """Selected actions and the portfolio they lead to."""
+    actions: List[RebalancingAction]
+    capital_used: float
+    cash_remaining: float
+    annual_return_change: float
+    value_before: float
+    value_after: float
+    concentration_before: Dict[str, float]
+    concentration_after: Dict[str, float]
+    status: str
+    solve_seconds: float
+    option_indices: List[int] = field(default_factory=list)
+
+
+def annual_debt_service(principal: Any, rate: float, years: int) -> np.ndarray:
+    """Annual payment of a fully amortizing loan"""
+    principal = np.asarray(principal, dtype=float)
+    monthly_rate, months = rate / 12, years * 12
+    if monthly_rate == 0:
+        return principal / years
+    return principal * monthly_rate / (1 - (1 + monthly_rate) ** -months) * 12
+
+
+def _frame(data: Any, columns: List[str]) -> pd.DataFrame:
+    frame = pd.DataFrame(data if data is not None else [], columns=None).reindex(columns=columns)
+    for column in CONCENTRATION_DIMENSIONS:
+        frame[column] = frame[column].where(frame[column].notna(), UNKNOWN_CATEGORY).astype(str)
+    return frame.reset_index(drop=True)
+
+
+def _numeric(frame: pd.DataFrame, column: str, fill: float = 0.0) -> np.ndarray:
+    return pd.to_numeric(frame[column], errors="coerce").fillna(fill).to_numpy(dtype=float)
+
+
+class RebalancingOptimizer:
+    """Capital- and concentration-constrained selection of sell/refinance/acquire actions.
+
+    assets uses ASSET_COLUMNS and deals uses DEAL_COLUMNS; expected_appreciation is a
+    fraction per year. Option metrics are cached on construction, so solve() can be
+    re-run with other budgets or caps, and evaluate() scores any plan in O(plan size).
+    """
+
+    def __init__(self, assets: Any, deals: Any = None, assumptions: Optional[RebalancingAssumptions] = None):
+        self.assumptions = assumptions or RebalancingAssumptions()
+        self.assets = _frame(assets, ASSET_COLUMNS)
+        self.deals = _frame(deals, DEAL_COLUMNS)
+        self._build_options()
+
+    def _build_options(self):
+        a = self.assumptions
+        value = _numeric(self.assets, "current_value")
+        debt = _numeric(self.assets, "current_debt")
+        cash_flow = _numeric(self.assets, "annual_cash_flow")
+        appreciation = _numeric(self.assets, "expected_appreciation", a.appreciation_rate)
+
+        # Sell: release net proceeds, give up the asset's cash flow and appreciation
+        proceeds = value * (1 - a.selling_cost_rate) - debt
+        sell_gain = proceeds * a.cash_yield - cash_flow - value * appreciation
+
+        # Refinance: new loan at the target LTV, cash out plus the change in debt service
+        new_loan = value * a.refinance_ltv
+        cash_out = new_loan * (1 - a.refinance_cost_rate) - debt
+        refinance_gain = (annual_debt_service(debt, a.debt_rate, a.loan_term_years) -
+                          annual_debt_service(new_loan, a.refinance_rate, a.loan_term_years) +
+                          cash_out * a.cash_yield)
+        # Only refinancings that pay or release capital are worth considering
+        refinance_rows = np.flatnonzero((refinance_gain > 0) | (cash_out > 0))
+
+        price = _numeric(self.deals, "price")
+        capital_required = np.where(self.deals["capital_required"].notna(),
+                                    _numeric(self.deals, "capital_required"), price)
+        acquire_gain = (_numeric(self.deals, "annual_cash_flow") +
+                        price * _numeric(self.deals, "expected_appreciation", a.appreciation_rate) -
+                        capital_required * a.cash_yield)
+
+        n_assets, n_deals = len(self.assets), len(self.deals)
+        asset_rows = np.arange(n_assets)
+        self.option_action = np.concatenate([
+            np.full(n_assets, 0), np.full(len(refinance_rows), 1), np.full(n_deals, 2)
+        ]).astype(np.int8)
+        self.option_row = np.concatenate([asset_rows, refinance_rows, np.arange(n_deals)]).astype(np.int64)
+        self.option_gain = np.concatenate([sell_gain, refinance_gain[refinance_rows], acquire_gain])
+        self.option_capital = np.concatenate([-proceeds, -cash_out[refinance_rows], capital_required])
+        self.option_value = np.concatenate([-value, np.zeros(len(refinance_rows)), price])
+
+        # Category codes per dimension over holdings and deals together
+        self.categories: Dict[str, np.ndarray] = {}
+        self.option_category: Dict[str, np.ndarray] = {}
+        self.base_category_value: Dict[str, np.ndarray] = {}
+        for dimension in CONCENTRATION_DIMENSIONS:
+            codes, vocabulary = pd.factorize(pd.concat([self.assets[dimension], self.deals[dimension]]))
+            asset_codes, deal_codes = codes[:n_assets], codes[n_assets:]
+            self.categories[dimension] = np.asarray(vocabulary, dtype=object)
+            self.option_category[dimension] = np.concatenate([asset_codes, asset_codes[refinance_rows], deal_codes])
+            self.base_category_value[dimension] = np.bincount(asset_codes, weights=value, minlength=len(vocabulary))
+        self.base_value = float(value.sum())
+
+    @property
+    def n_options(self) -> int:
+        return len(self.option_gain)
+
+    def max_shares(self, category_value: Dict[str, np.ndarray], total_value: float) -> Dict[str, float]:
+        """Largest value share per dimension, ignoring holdings with an unknown category"""
+        shares = {}
+        for dimension, values in category_value.items():
+            known = self.categories[dimension] != UNKNOWN_CATEGORY
+            shares[dimension] = float(values[known].max(initial=0.0) / total_value) if total_value > 0 else 0.0
+        return shares
+
+    def evaluate(self, option_indices: Sequence[int]) -> Dict[str, Any]:
+        """Capital, return, value and concentration of a plan, from the cached option arrays"""
+        selected = np.asarray(option_indices, dtype=np.int64)
+        total_value = self.base_value + float(self.option_value[selected].sum())
+        category_value = {}
+        for dimension, base in self.base_category_value.items():
+            values = base.copy()
+            np.add.at(values, self.option_category[dimension][selected], self.option_value[selected])
+            category_value[dimension] = values
+        return {
+            "capital_used": float(self.option_capital[selected].sum()),
+            "annual_return_change": float(self.option_gain[selected].sum()),
+            "value_after": total_value,
+            "max_shares": self.max_shares(category_value, total_value)
+        }
+
+    def solve(self, cash_available: float = 0.0, max_concentration: Optional[float] = 0.4,
+              exact: Optional[bool] = None, time_limit: float = 30.0,
+              mip_rel_gap: float = 1e-4) -> RebalancingPlan:
+        """Best plan under the capital budget and concentration cap.
+
+        A category already above the cap may not exceed it by more dollars than it does
+        today; every other category must end at or below the cap. Small books are solved
+        as an exact MILP; above EXACT_OPTION_LIMIT options the LP relaxation is solved
+        and rounded instead: a basic LP solution has at most one fractional option per
+        binding constraint, so little is lost. Pass exact to force either path.
+        """
+        start = time.perf_counter()
+        n = self.n_options
+        if exact is None:
+            exact = n <= EXACT_OPTION_LIMIT
+        if n == 0:
+            return self._plan(np.empty(0, dtype=np.int64), cash_available, "no options", start)
+
+        # Work in units of a typical option value so the solver sees well-scaled coefficients
+        scale = float(np.abs(self.option_value).mean()) or 1.0
+        value = self.option_value / scale
+        base_value = self.base_value / scale
+
+        # Variables: one per option, then the final portfolio value T
+        rows, cols, data, lower, upper = [], [], [], [], []
+
+        def add_row(columns: np.ndarray, coefficients: np.ndarray, lb: float, ub: float):
+            row = len(lower)
+            rows.extend([row] * len(columns))
+            cols.extend(columns.tolist())
+            data.extend(coefficients.tolist())
+            lower.append(lb)
+            upper.append(ub)
+
+        options = np.arange(n)
+        add_row(options, self.option_capital / scale, -np.inf, cash_available / scale)
+
+        # At most one action per held asset
+        holding = self.option_action < 2
+        for _, group in pd.Series(options[holding]).groupby(self.option_row[holding]):
+            if len(group) > 1:
+                add_row(group.to_numpy(), np.ones(len(group)), -np.inf, 1.0)
+
+        cap_rows = len(lower)
+        if max_concentration is not None:
+            moves_value = np.flatnonzero(value != 0)
+            add_row(np.append(moves_value, n), np.append(-value[moves_value], 1.0), base_value, base_value)
+            cap_rows = len(lower)
+            allowance = self._allowance(max_concentration)
+            for dimension in CONCENTRATION_DIMENSIONS:
+                codes = self.option_category[dimension]
+                for code, category in enumerate(self.categories[dimension]):
+                    if category == UNKNOWN_CATEGORY:
+                        continue
+                    members = moves_value[codes[moves_value] == code]
+                    current = self.base_category_value[dimension][code] / scale
+                    add_row(np.append(members, n), np.append(value[members], -max_concentration),
+                            -np.inf, allowance[dimension][code] / scale - current)
+
+        matrix = csr_matrix((data, (rows, cols)), shape=(len(lower), n + 1))
+        upper = np.array(upper)
+        # Rows that rounding can push over: the budget and the caps
+        tightenable = np.arange(len(upper)) >= cap_rows
+        tightenable[0] = True
+
+        def run(integral: bool, margin: float = 0.0):
+            return milp(
+                c=np.append(-self.option_gain / scale, 0.0),
+                constraints=LinearConstraint(matrix, lower, np.where(tightenable, upper - margin, upper)),
+                integrality=np.append(np.full(n, 1 if integral else 0), 0),
+                bounds=Bounds(np.zeros(n + 1), np.append(np.ones(n), np.inf)),
+                options={"time_limit": time_limit, "mip_rel_gap": mip_rel_gap}
+            )
+
+        if exact:
+            result = run(integral=True)
+            if result.x is None:
+                logger.warning(f"Rebalancing solve found no plan: {result.message}")
+                return self._plan(np.empty(0, dtype=np.int64), cash_available, result.message, start)
+            return self._plan(np.flatnonzero(result.x[:n] > 0.5), cash_available, result.message, start)
+
+        # When rounding cannot be repaired, re-solve with the budget and caps tightened by
+        # a growing fraction of a typical option so the rounded plan has room to spare
+        weights = None
+        for attempt in range(4):
+            result = run(integral=False, margin=0.25 * (2 ** attempt - 1))
+            if result.x is None:
+                break
+            weights = result.x[:n]
+            selected = self._round(weights, cash_available, max_concentration)
+            if selected is not None:
+                return self._plan(selected, cash_available, result.message, start)
+        if weights is None:
+            logger.warning(f"Rebalancing solve found no plan: {result.message}")
+            return self._plan(np.empty(0, dtype=np.int64), cash_available, result.message, start)
+        selected = self._round(weights, cash_available, max_concentration, incremental=True)
+        return self._plan(selected, cash_available, "greedy completion", start)
+
+    def _allowance(self, max_concentration: float) -> Dict[str, np.ndarray]:
+        """Value each category may hold above the cap: its current excess, or nothing"""
+        return {
+            dimension: np.maximum(values - max_concentration * self.base_value, 0.0)
+            for dimension, values in self.base_category_value.items()
+        }
+
+    def _round(self, weights: np.ndarray, cash_available: float, max_concentration: Optional[float],
+               incremental: bool = False) -> Optional[np.ndarray]:
+        """Integral plan from LP weights, or None when rounding leaves a violation it cannot repair.
+
+        The options the LP fully selected are taken together, and any violation left by
+        dropping the fractional ones is repaired one toggle at a time. With incremental=True
+        they are instead added one by one, capital-releasing ones first, which is always
+        feasible but more conservative. Either way the remaining options are then added in
+        order of weight, then gain, sweeping until nothing more fits.
+        """
+        capital_tolerance = 1e-6
+        share_tolerance = 1e-9 * max(self.base_value, 1.0)
+        weights = np.round(weights, 9)
+        chosen = np.flatnonzero(weights >= 1.0)
+        chosen = chosen[np.argsort(self.option_capital[chosen], kind="stable")]
+        rest = np.flatnonzero((weights < 1.0) & ((weights > 0) | (self.option_gain > 0)))
+        rest = rest[np.lexsort((-self.option_gain[rest], -weights[rest]))]
+
+        allowance = self._allowance(max_concentration) if max_concentration is not None else None
+        known = {dimension: self.categories[dimension] != UNKNOWN_CATEGORY for dimension in self.categories}
+        taken = np.zeros(self.n_options, dtype=bool)
+        asset_taken = np.zeros(len(self.assets), dtype=bool)
+        state = {"capital": 0.0, "value": self.base_value,
+                 "categories": {d: base.copy() for d, base in self.base_category_value.items()}}
+
+        def apply(options: np.ndarray, sign: float = 1.0):
+            taken[options] = sign > 0
+            holdings = options[self.option_action[options] < 2]
+            asset_taken[self.option_row[holdings]] = sign > 0
+            state["capital"] += sign * float(self.option_capital[options].sum())
+            state["value"] += sign * float(self.option_value[options].sum())
+            for dimension, current in state["categories"].items():
+                np.add.at(current, self.option_category[dimension][options], sign * self.option_value[options])
+
+        def toggle_violation(options: np.ndarray, signs: np.ndarray) -> np.ndarray:
+            """Dollars over budget and caps after toggling each option on its own (+1 add, -1 remove)"""
+            excess = np.maximum(state["capital"] + signs * self.option_capital[options] - cash_available, 0.0)
+            if allowance is None:
+                return excess
+            delta = signs * self.option_value[options]
+            for dimension, current in state["categories"].items():
+                slack = current - max_concentration * state["value"] - allowance[dimension]
+                # The total moves every category's limit; the option's own category moves too
+                after = slack[None, :] - max_concentration * delta[:, None]
+                after[np.arange(len(options)), self.option_category[dimension][options]] += delta
+                excess = excess + np.maximum(after[:, known[dimension]], 0.0).sum(axis=1)
+            return excess
+
+        def fits(option: int) -> bool:
+            if self.option_action[option] < 2 and asset_taken[self.option_row[option]]:
+                return False
+            tolerance = capital_tolerance if allowance is None else share_tolerance
+            return toggle_violation(np.array([option]), np.ones(1))[0] <= tolerance
+
+        if incremental:
+            groups = (chosen, rest)
+        else:
+            apply(chosen)
+            candidates = np.concatenate([chosen, rest])
+            is_deal = self.option_action[candidates] == 2
+            current = float(toggle_violation(np.zeros(1, dtype=np.int64), np.zeros(1))[0])
+            while current > share_tolerance:
+                available = is_deal.copy()
+                available[~is_deal] = ~asset_taken[self.option_row[candidates[~is_deal]]]
+                moves = candidates[taken[candidates] | available]
+                signs = np.where(taken[moves], -1.0, 1.0)
+                violations = toggle_violation(moves, signs)
+                helpful = violations < current - share_tolerance
+                if not helpful.any():
+                    return None
+                # Take the move that removes the most violation per dollar of return given up
+                cost = np.maximum(-signs[helpful] * self.option_gain[moves[helpful]], 0.0) + 1.0
+                best = int(np.argmax((current - violations[helpful]) / cost))
+                apply(moves[helpful][[best]], signs[helpful][best])
+                current = float(violations[helpful][best])
+            groups = (rest,)
+
+        for order in groups:
+            changed = True
+            while changed:
+                changed = False
+                for option in order:
+                    if not taken[option] and fits(option):
+                        apply(np.array([option]))
+                        changed = True
+                order = order[~taken[order]]
+        return np.flatnonzero(taken)
+
+    def _plan(self, selected: np.ndarray, cash_available: float, status: str, start: float) -> RebalancingPlan:
+        before = self.max_shares(self.base_category_value, self.base_value)
+        evaluation = self.evaluate(selected)
+        actions = []
+        for option in selected[np.argsort(-self.option_gain[selected], kind="stable")]:
+            action = ACTIONS[self.option_action[option]]
+            source = self.deals if action == ACTION_ACQUIRE else self.assets
+            record = source.iloc[self.option_row[option]]
+            actions.append(RebalancingAction(
+                action=action,
+                asset_id=record["deal_id"] if action == ACTION_ACQUIRE else record["portfolio_property_id"],
+                property_id=None if action == ACTION_ACQUIRE else record["property_id"],
+                address=record["address"] if pd.notna(record["address"]) else None,
+                capital_change=float(self.option_capital[option]),
+                annual_return_change=float(self.option_gain[option]),
+                value_change=float(self.option_value[option])
+            ))
+        return RebalancingPlan(
+            actions=actions,
+            capital_used=evaluation["capital_used"],
+            cash_remaining=cash_available - evaluation["capital_used"],
+            annual_return_change=evaluation["annual_return_change"],
+            value_before=self.base_value,
+            value_after=evaluation["value_after"],
+            concentration_before=before,
+            concentration_after=evaluation["max_shares"],
+            status=status,
+            solve_seconds=time.perf_counter() - start,
+            option_indices=selected.tolist()
+        )
@@ -0,0 +1,198 @@
+"""
+Spatial Index
+Grid-bucketed point layers for neighborhood scoring.
+
+Points (schools, amenities, crime incidents) are bucketed once into fixed
+lat/lng cells and stored sorted by cell, so a radius or bounding-box query
+only touches the cells it overlaps. Queries are vectorized over many centers
+at once: candidate cells are resolved with one searchsorted, candidate points
+are expanded without Python loops, and exact distances use a numpy haversine.
+Each layer also keeps per-cell category counts and value sums for callers that
+aggregate by cell instead of by radius.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_MILES = 3958.7613
+MILES_PER_DEGREE_LAT = 69.0
+DEFAULT_CELL_DEGREES = 0.01  # about 0.7 miles of latitude
+
+# Cell (row, col) pairs are packed into one int64 key
+_KEY_OFFSET = 1 << 24
+_KEY_STRIDE = 1 << 25
+
+
+def haversine_miles(lat1: Any, lng1: Any, lat2: Any, lng2: Any) -> np.ndarray:
+    """Great-circle distance in miles; arguments broadcast like numpy arrays"""
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def points_in_polygon(lats: Any, lngs: Any, polygon: Sequence[Sequence[float]]) -> np.ndarray:
+    """Ray-casting test of many points against one polygon of [lat, lng] vertices"""
+    y = np.asarray(lats, dtype=float)
+    x = np.asarray(lngs, dtype=float)
+    vertices = np.asarray(polygon, dtype=float)
+    inside = np.zeros(y.shape, dtype=bool)
+    if len(vertices) < 3:
+        return inside
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for (lat_i, lng_i), (lat_j, lng_j) in zip(vertices, np.roll(vertices, 1, axis=0)):
+            crosses = (lat_i > y) != (lat_j > y)
+            x_cross = (lng_j - lng_i) * (y - lat_i) / (lat_j - lat_i) + lng_i
+            inside ^= crosses & (x < x_cross)
+    return inside
+
+
+def cell_keys(lats: Any, lngs: Any, cell_degrees: float = DEFAULT_CELL_DEGREES) -> np.ndarray:
+    """Packed grid cell key of each point"""
+    rows = np.floor(np.asarray(lats, dtype=float) / cell_degrees).astype(np.int64)
+    cols = np.floor(np.asarray(lngs, dtype=float) / cell_degrees).astype(np.int64)
+    return (rows + _KEY_OFFSET) * _KEY_STRIDE + (cols + _KEY_OFFSET)
+
+
+def cell_centers(keys: Any, cell_degrees: float = DEFAULT_CELL_DEGREES) -> Tuple[np.ndarray, np.ndarray]:
+    """(lats, lngs) of the centers of the given cells"""
+    rows, cols = np.divmod(np.asarray(keys, dtype=np.int64), _KEY_STRIDE)
+    return (rows - _KEY_OFFSET + 0.5) * cell_degrees, (cols - _KEY_OFFSET + 0.5) * cell_degrees
+
+
+def cells_in_bbox(south: float, north: float, west: float, east: float,
+                  cell_degrees: float = DEFAULT_CELL_DEGREES) -> np.ndarray:
+    """Keys of every cell overlapping a bounding box, in ascending order"""
+    rows = np.arange(np.floor(south / cell_degrees), np.floor(north / cell_degrees) + 1, dtype=np.int64)
+    cols = np.arange(np.floor(west / cell_degrees), np.floor(east / cell_degrees) + 1, dtype=np.int64)
+    return ((rows[:, None] + _KEY_OFFSET) * _KEY_STRIDE + (cols[None, :] + _KEY_OFFSET)).ravel()
+
+
+def _expand_ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenate arange(start, start + count) for every pair without a Python loop"""
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return offsets + np.arange(total)
+
+
+class PointLayer:
+    """Points bucketed into grid cells with per-cell category counts and value sums"""
+
+    def __init__(self, lats: Any, lngs: Any, categories: Any = None, values: Optional[Dict[str, Any]] = None,
+                 items: Optional[Sequence[Any]] = None, n_categories: Optional[int] = None,
+                 cell_degrees: float = DEFAULT_CELL_DEGREES):
+        lats = np.asarray(lats, dtype=float)
+        lngs = np.asarray(lngs, dtype=float)
+        self.cell_degrees = cell_degrees
+        self.items = list(items) if items is not None else None
+
+        keys = self.cell_keys(lats, lngs)
+        self.order = np.argsort(keys, kind="stable")
+        keys = keys[self.order]
+
+        self.lats = lats[self.order]
+        self.lngs = lngs[self.order]
+        categories = np.zeros(len(lats), dtype=np.int64) if categories is None else np.asarray(categories, dtype=np.int64)
+        self.categories = categories[self.order]
+        self.n_categories = n_categories or (int(self.categories.max()) + 1 if len(self.categories) else 1)
+        self.values = {name: np.asarray(column, dtype=float)[self.order] for name, column in (values or {}).items()}
+
+        self.keys, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+        self.cell_start = starts.astype(np.int64)
+        self.cell_count = counts.astype(np.int64)
+
+        # Pre-aggregated per-cell totals
+        cell_of_point = np.repeat(np.arange(len(self.keys)), self.cell_count)
+        self.cell_category_counts = np.zeros((len(self.keys), self.n_categories), dtype=np.int64)
+        np.add.at(self.cell_category_counts, (cell_of_point, self.categories), 1)
+        self.cell_sums = {
+            name: np.bincount(cell_of_point, weights=column, minlength=len(self.keys))
+            for name, column in self.values.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    def cell_keys(self, lats: Any, lngs: Any) -> np.ndarray:
+        return cell_keys(lats, lngs, self.cell_degrees)
+
+    def original_index(self, positions: np.ndarray) -> np.ndarray:
+        """Map sorted positions returned by queries back to input order"""
+        return self.order[positions]
+
+    def get_items(self, positions: np.ndarray) -> List[Any]:
+        return [self.items[i] for i in self.original_index(positions)] if self.items is not None else []
+
+    def within_bboxes(self, south: Any, north: Any, west: Any, east: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """(query index, point position) for every point in the cells overlapping each box"""
+        south, north, west, east = (np.atleast_1d(np.asarray(v, dtype=float)) for v in (south, north, west, east))
+        if len(self) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        r0 = np.floor(south / self.cell_degrees).astype(np.int64)
+        r1 = np.floor(north / self.cell_degrees).astype(np.int64)
+        c0 = np.floor(west / self.cell_degrees).astype(np.int64)
+        c1 = np.floor(east / self.cell_degrees).astype(np.int64)
+        n_rows, n_cols = r1 - r0 + 1, c1 - c0 + 1
+        cells_per_query = n_rows * n_cols
+
+        query = np.repeat(np.arange(len(south)), cells_per_query)
+        local = _expand_ranges(np.zeros(len(south), dtype=np.int64), cells_per_query)
+        rows = r0[query] + local // n_cols[query]
+        cols = c0[query] + local % n_cols[query]
+        keys = (rows + _KEY_OFFSET) * _KEY_STRIDE + (cols + _KEY_OFFSET)
+
+        cell = np.searchsorted(self.keys, keys)
+        found = cell < len(self.keys)
+        found[found] = self.keys[cell[found]] == keys[found]
+        cell, query = cell[found], query[found]
+
+        counts = self.cell_count[cell]
+        positions = _expand_ranges(self.cell_start[cell], counts)
+        return np.repeat(query, counts), positions
+
+    def within_radius(self, lats: Any, lngs: Any, radius_miles: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(center index, point position, distance) for every point within radius of each center"""
+        lats = np.atleast_1d(np.asarray(lats, dtype=float))
+        lngs = np.atleast_1d(np.asarray(lngs, dtype=float))
+        lat_span = radius_miles / MILES_PER_DEGREE_LAT
+        lng_span = radius_miles / (MILES_PER_DEGREE_LAT * np.maximum(np.cos(np.radians(lats)), 0.01))
+
+        query, positions = self.within_bboxes(lats - lat_span, lats + lat_span, lngs - lng_span, lngs + lng_span)
+        distances = haversine_miles(lats[query], lngs[query], self.lats[positions], self.lngs[positions])
+        keep = distances <= radius_miles
+        return query[keep], positions[keep], distances[keep]
+
+    def within_polygon(self, polygon: Sequence[Sequence[float]]) -> np.ndarray:
+        """Positions of points inside a polygon of [lat, lng] vertices"""
+        vertices = np.asarray(polygon, dtype=float)
+        if len(vertices) < 3:
+            return np.empty(0, dtype=np.int64)
+        _, positions = self.within_bboxes(vertices[:, 0].min(), vertices[:, 0].max(),
+                                          vertices[:, 1].min(), vertices[:, 1].max())
+        return positions[points_in_polygon(self.lats[positions], self.lngs[positions], vertices)]
+
+
+class SpatialIndex:
+    """Named point layers sharing one cell size"""
+
+    def __init__(self, cell_degrees: float = DEFAULT_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.layers: Dict[str, PointLayer] = {}
+
+    def add_layer(self, name: str, lats: Any, lngs: Any, **kwargs) -> PointLayer:
+        layer = PointLayer(lats, lngs, cell_degrees=self.cell_degrees, **kwargs)
+        self.layers[name] = layer
+        logger.info(f"Indexed {len(layer)} {name} points into {len(layer.keys)} cells")
+        return layer
+
+    def get(self, name: str) -> Optional[PointLayer]:
+        return self.layers.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.layers
@@ -42,6 +42,68 @@ class TrainingResult:
     learning_points: List[str]
     timestamp: datetime
 
+def evaluate_agent_decision(decision: Dict[str, Any], expected: Dict[str, Any], difficulty: float) -> float:
+    """Evaluate how well the agent performed"""
+    
+    score = 0.0
+    max_score = 100.0
+    
+    # Check key decision alignment
+    if "should_pursue" in expected and "action" in decision:
+        expected_action = "pursue" if expected["should_pursue"] else "pass"
+        actual_action = decision.get("action", "unknown")
+        
+        if (expected_action == "pursue" and actual_action in ["buy", "pursue", "negotiate"]) or \
+           (expected_action == "pass" and actual_action in ["pass", "reject"]):
+            score += 40.0
+    
+    # Check price accuracy
+    if "max_offer" in expected and "offer_price" in decision:
+        expected_price = expected["max_offer"]
+        actual_price = decision["offer_price"]
+        price_diff = abs(expected_price - actual_price) / expected_price
+        price_score = max(0, 30.0 * (1 - price_diff))
+        score += price_score
+    
+    # Check confidence calibration
+    if "confidence" in expected and "confidence" in decision:
+        expected_conf = expected["confidence"] / 100.0
+        actual_conf = decision["confidence"]
+        conf_diff = abs(expected_conf - actual_conf)
+        conf_score = max(0, 20.0 * (1 - conf_diff))
+        score += conf_score
+    
+    # Adjust for difficulty
+    adjusted_score = score * (1 + difficulty * 0.2)  # Bonus for harder scenarios
+    
+    return min(100.0, adjusted_score)
+
+def generate_learning_points(decision: Dict[str, Any], expected: Dict[str, Any], score: float) -> List[str]:
+    """Generate learning points for the agent"""
+    
+    points = []
+    
+    if score < 50:
+        points.append("Decision accuracy needs improvement")
+        
+    if "offer_price" in decision and "max_offer" in expected:
+        if decision["offer_price"] > expected["max_offer"] * 1.1:
+            points.append("Offer price too high - consider market value more carefully")
+        elif decision["offer_price"] < expected["max_offer"] * 0.9:
+            points.append("Offer price too low - may miss good opportunities")
+    
+    if score > 80:
+        points.append("Excellent decision-making - maintain this approach")
+    elif score > 60:
+        points.append("Good decision with room for refinement")
+    
+    return points
+
+def evaluate_scenario(decision: Dict[str, Any], expected: Dict[str, Any], difficulty: float):
+    """Score a decision and derive its learning points (picklable, for process pools)"""
+    score = evaluate_agent_decision(decision, expected, difficulty)
+    return score, generate_learning_points(decision, expected, score)
+
 class AgentTrainer:
     """Train and evaluate real estate AI agents using simulations"""
     
@@ -58,12 +120,18 @@ class AgentTrainer:
         self.agent_performances: Dict[str, AgentPerformance] = {}
         self.training_history: List[TrainingResult] = []
         
-    def create_training_scenario(self, scenario_type: str, difficulty: float = 0.5) -> TrainingScenario:
-        """Create a training scenario for agents"""
+    def create_training_scenario(self, scenario_type: str, difficulty: float = 0.5,
+                                 rng: Optional[np.random.Generator] = None) -> TrainingScenario:
+        """Create a training scenario for agents
+        
+        Pass a per-scenario rng (see training_executor.scenario_rng) to make the
+        scenario reproducible independently of other scenarios.
+        """
+        rng = rng if rng is not None else self.market_simulator.rng
         
         # Generate a deal based on scenario type
         if scenario_type == "deal_analysis":
-            deal = self.market_simulator.generate_deal_scenario()
+            deal = self.market_simulator.generate_deal_scenario(rng=rng)
             expected_outcome = self._calculate_expected_deal_outcome(deal)
             learning_objectives = [
                 "Accurate property valuation",
@@ -73,10 +141,10 @@ class AgentTrainer:
             ]
             
         elif scenario_type == "negotiation":
-            deal = self.market_simulator.generate_deal_scenario()
+            deal = self.market_simulator.generate_deal_scenario(rng=rng)
             # Make it a negotiation scenario by adjusting seller motivation
-            deal.seller_motivation = np.random.uniform(0.3, 0.9)
-            expected_outcome = self._calculate_negotiation_outcome(deal)
+            deal.seller_motivation = float(rng.uniform(0.3, 0.9))
+            expected_outcome = self._calculate_negotiation_outcome(deal, rng)
             learning_objectives = [
                 "Negotiation strategy selection",
                 "Counter-offer analysis",
@@ -85,8 +153,8 @@ class AgentTrainer:
             ]
             
         elif scenario_type == "portfolio_management":
-            deal = self.market_simulator.generate_deal_scenario()
-            expected_outcome = self._calculate_portfolio_impact(deal)
+            deal = self.market_simulator.generate_deal_scenario(rng=rng)
+            expected_outcome = self._calculate_portfolio_impact(deal, rng)
             learning_objectives = [
                 "Portfolio diversification",
                 "Risk management",
@@ -97,7 +165,7 @@ class AgentTrainer:
             raise ValueError(f"Unknown scenario type: {scenario_type}")
         
         scenario = TrainingScenario(
-            scenario_id=f"TRAIN_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{np.random.randint(1000, 9999)}",
+            scenario_id=f"TRAIN_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{rng.integers(1000, 10000)}",
             scenario_type=scenario_type,
             deal=deal,
             expected_outcome=expected_outcome,
@@ -125,7 +193,8 @@ class AgentTrainer:
             "confidence": analysis.confidence_score
         }
     
-    def _calculate_negotiation_outcome(self, deal: SimulatedDeal) -> Dict[str, Any]:
+    def _calculate_negotiation_outcome(self, deal: SimulatedDeal,
+                                       rng: Optional[np.random.Generator] = None) -> Dict[str, Any]:
         """Calculate expected outcome for negotiation scenario"""
         
         # Negotiation success depends on seller motivation and market conditions
@@ -141,6 +210,7 @@ class AgentTrainer:
         elif deal.market_condition.inventory_level == "high":
             market_discount = 0.03
         
+        rng = rng if rng is not None else self.market_simulator.rng
         total_discount = base_discount + motivation_discount + market_discount
         final_price = deal.asking_price * (1 - total_discount)
         
@@ -148,13 +218,15 @@ class AgentTrainer:
             "negotiation_success": True,
             "final_price": final_price,
             "discount_achieved": total_discount,
-            "negotiation_rounds": np.random.randint(2, 6),
+            "negotiation_rounds": int(rng.integers(2, 6)),
             "seller_satisfaction": max(0.3, deal.seller_motivation),
-            "time_to_close": np.random.randint(30, 60)
+            "time_to_close": int(rng.integers(30, 60))
         }
     
-    def _calculate_portfolio_impact(self, deal: SimulatedDeal) -> Dict[str, Any]:
+    def _calculate_portfolio_impact(self, deal: SimulatedDeal,
+                                    rng: Optional[np.random.Generator] = None) -> Dict[str, Any]:
         """Calculate expected portfolio impact"""
+        rng = rng if rng is not None else self.market_simulator.rng
         
         # Simplified portfolio analysis
         property_data = deal.property_data.copy()
@@ -164,17 +236,28 @@ class AgentTrainer:
         
         return {
             "portfolio_fit": analysis.investment_metrics.investment_score > 70,
-            "diversification_benefit": np.random.uniform(0.1, 0.8),
+            "diversification_benefit": float(rng.uniform(0.1, 0.8)),
             "cash_flow_impact": analysis.investment_metrics.monthly_cash_flow,
             "risk_contribution": analysis.investment_metrics.risk_level,
-            "strategic_alignment": np.random.uniform(0.5, 1.0)
+            "strategic_alignment": float(rng.uniform(0.5, 1.0))
         }
     
     async def train_agent(self, agent, scenario: TrainingScenario) -> TrainingResult:
         """Train an agent on a specific scenario"""
         
-        # Present scenario to agent
-        scenario_data = {
+        # Get agent's decision
+        decision = await self.get_agent_decision(agent, scenario)
+        
+        # Evaluate performance
+        performance_score, learning_points = evaluate_scenario(
+            decision, scenario.expected_outcome, scenario.difficulty_level
+        )
+        
+        return self.record_result(agent, scenario, decision, performance_score, learning_points)
+    
+    def scenario_payload(self, scenario: TrainingScenario) -> Dict[str, Any]:
+        """Scenario data as presented to an agent"""
+        return {
             "deal": {
                 "property": scenario.deal.property_data,
                 "asking_price": scenario.deal.asking_price,
@@ -186,27 +269,22 @@ class AgentTrainer:
             "scenario_type": scenario.scenario_type,
             "learning_objectives": scenario.learning_objectives
         }
+    
+    async def get_agent_decision(self, agent, scenario: TrainingScenario) -> Dict[str, Any]:
+        """Present a scenario to an agent and return its decision"""
+        scenario_data = self.scenario_payload(scenario)
         
-        # Get agent's decision
         if hasattr(agent, 'analyze_deal'):
-            decision = await agent.analyze_deal(scenario_data)
+            return await agent.analyze_deal(scenario_data)
         elif hasattr(agent, 'make_decision'):
-            decision = await agent.make_decision(scenario_data)
+            return await agent.make_decision(scenario_data)
         else:
             # Fallback for agents without specific methods
-            decision = {"action": "analyze", "confidence": 0.5}
-        
-        # Evaluate performance
-        performance_score = self._evaluate_agent_decision(
-            decision, scenario.expected_outcome, scenario.difficulty_level
-        )
-        
-        # Generate learning points
-        learning_points = self._generate_learning_points(
-            decision, scenario.expected_outcome, performance_score
-        )
-        
-        # Create training result
+            return {"action": "analyze", "confidence": 0.5}
+    
+    def record_result(self, agent, scenario: TrainingScenario, decision: Dict[str, Any],
+                      performance_score: float, learning_points: List[str]) -> TrainingResult:
+        """Create a TrainingResult and add it to the performance tracking and history"""
         result = TrainingResult(
             scenario_id=scenario.scenario_id,
             agent_id=getattr(agent, 'agent_id', 'unknown'),
@@ -227,60 +305,11 @@ class AgentTrainer:
     
     def _evaluate_agent_decision(self, decision: Dict[str, Any], expected: Dict[str, Any], difficulty: float) -> float:
         """Evaluate how well the agent performed"""
-        
-        score = 0.0
-        max_score = 100.0
-        
-        # Check key decision alignment
-        if "should_pursue" in expected and "action" in decision:
-            expected_action = "pursue" if expected["should_pursue"] else "pass"
-            actual_action = decision.get("action", "unknown")
-            
-            if (expected_action == "pursue" and actual_action in ["buy", "pursue", "negotiate"]) or \
-               (expected_action == "pass" and actual_action in ["pass", "reject"]):
-                score += 40.0
-        
-        # Check price accuracy
-        if "max_offer" in expected and "offer_price" in decision:
-            expected_price = expected["max_offer"]
-            actual_price = decision["offer_price"]
-            price_diff = abs(expected_price - actual_price) / expected_price
-            price_score = max(0, 30.0 * (1 - price_diff))
-            score += price_score
-        
-        # Check confidence calibration
-        if "confidence" in expected and "confidence" in decision:
-            expected_conf = expected["confidence"] / 100.0
-            actual_conf = decision["confidence"]
-            conf_diff = abs(expected_conf - actual_conf)
-            conf_score = max(0, 20.0 * (1 - conf_diff))
-            score += conf_score
-        
-        # Adjust for difficulty
-        adjusted_score = score * (1 + difficulty * 0.2)  # Bonus for harder scenarios
-        
-        return min(100.0, adjusted_score)
+        return evaluate_agent_decision(decision, expected, difficulty)
     
     def _generate_learning_points(self, decision: Dict[str, Any], expected: Dict[str, Any], score: float) -> List[str]:
         """Generate learning points for the agent"""
-        
-        points = []
-        
-        if score < 50:
-            points.append("Decision accuracy needs improvement")
-            
-        if "offer_price" in decision and "max_offer" in expected:
-            if decision["offer_price"] > expected["max_offer"] * 1.1:
-                points.append("Offer price too high - consider market value more carefully")
-            elif decision["offer_price"] < expected["max_offer"] * 0.9:
-                points.append("Offer price too low - may miss good opportunities")
-        
-        if score > 80:
-            points.append("Excellent decision-making - maintain this approach")
-        elif score > 60:
-            points.append("Good decision with room for refinement")
-        
-        return points
+        return generate_learning_points(decision, expected, score)
     
     async def get_ai_training_enhancement(self, training_result: TrainingResult) -> Dict[str, Any]:
         """Get AI-powered training enhancement suggestions"""
@@ -338,27 +367,41 @@ class AgentTrainer:
         # Update running averages
         perf.confidence_score = (perf.confidence_score * 0.9) + (result.performance_score / 100.0 * 0.1)
     
-    async def run_training_session(self, agent, num_scenarios: int = 10, scenario_types: List[str] = None) -> Dict[str, Any]:
-        """Run a complete training session for an agent"""
+    async def run_training_session(self, agent, num_scenarios: int = 10, scenario_types: List[str] = None,
+                                   max_concurrency: int = 8, seed: Optional[int] = None,
+                                   results_path: Optional[str] = None,
+                                   evaluation_executor=None) -> Dict[str, Any]:
+        """Run a complete training session for an agent
+        
+        Scenarios run concurrently (up to max_concurrency) via TrainingExecutor;
+        the same seed replays the same scenarios. Results are streamed to
+        results_path (JSONL) when given.
+        """
+        from .training_executor import TrainingExecutor, TrainingResultStore, LearningCurveTracker
         
         if scenario_types is None:
             scenario_types = ["deal_analysis", "negotiation", "portfolio_management"]
         
-        results = []
+        store = TrainingResultStore(results_path) if results_path else None
+        executor = TrainingExecutor(
+            self, max_concurrency=max_concurrency, seed=seed,
+            result_store=store, evaluation_executor=evaluation_executor,
+            learning_curve=LearningCurveTracker()
+        )
         
-        for i in range(num_scenarios):
-            # Vary difficulty over time
-            difficulty = min(1.0, 0.2 + (i / num_scenarios) * 0.8)
-            
-            # Choose scenario type
-            scenario_type = np.random.choice(scenario_types)
-            
-            # Create and run scenario
-            scenario = self.create_training_scenario(scenario_type, difficulty)
-            result = await self.train_agent(agent, scenario)
-            results.append(result)
-            
-            print(f"Scenario {i+1}/{num_scenarios}: {scenario_type} - Score: {result.performance_score:.1f}")
+        # Vary difficulty over time
+        difficulties = [min(1.0, 0.2 + (i / num_scenarios) * 0.8) for i in range(num_scenarios)]
+        specs = executor.plan(scenario_types, difficulties, choose_types=True)
+        
+        def report(spec, scenario, result):
+            print(f"Scenario {spec.index + 1}/{num_scenarios}: {spec.scenario_type} - "
+                  f"Score: {result.performance_score:.1f}")
+        
+        try:
+            results = await executor.run(agent, specs, on_result=report)
+        finally:
+            if store:
+                store.close()
         
         # Calculate session summary
         avg_score = np.mean([r.performance_score for r in results])
@@ -370,9 +413,11 @@ class AgentTrainer:
                 "average_score": avg_score,
                 "improvement": improvement,
                 "best_score": max(r.performance_score for r in results),
-                "worst_score": min(r.performance_score for r in results)
+                "worst_score": min(r.performance_score for r in results),
+                "seed": executor.seed
             },
             "results": results,
+            "learning_curve": executor.learning_curve.summary(),
             "agent_performance": self.agent_performances.get(getattr(agent, 'agent_id', 'unknown'))
         }
     
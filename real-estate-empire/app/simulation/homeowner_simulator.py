@@ -1,13 +1,17 @@
 import random
 import json
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, AsyncIterator, Tuple
+from dataclasses import dataclass, asdict, is_dataclass
 from datetime import datetime
 import asyncio
 import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from services.gemini_service import GeminiService
+from services.llm_rate_limiter import RequestBudget, estimate_tokens
+
+# Expected completion size for a generated conversation, used for token budgeting
+EXPECTED_CONVERSATION_TOKENS = 1200
 
 @dataclass
 class HomeownerProfile:
@@ -39,16 +43,32 @@ class ConversationContext:
 class HomeownerConversationSimulator:
     """Generates realistic homeowner conversations using Google Gemini"""
     
-    def __init__(self, api_key: Optional[str] = None):
-        try:
-            self.gemini_service = GeminiService()
+    def __init__(self, api_key: Optional[str] = None, llm_client: Any = None):
+        """
+        Args:
+            llm_client: Optional object with a synchronous generate_content(prompt)
+                returning a response with .text (defaults to the Gemini model);
+                either way calls go through GeminiService and the LLM gateway
+        """
+        self.llm_client = llm_client
+        if llm_client is not None:
+            self.gemini_service = GeminiService(model=llm_client)
             self.use_mock = False
-            print("✅ Gemini service initialized successfully")
-        except Exception as e:
-            print(f"⚠️ Warning: Could not initialize Gemini service: {e}")
-            print("Using mock responses instead.")
-            self.use_mock = True
-            self.gemini_service = None
+        else:
+            try:
+                self.gemini_service = GeminiService()
+                self.llm_client = self.gemini_service.model
+                self.use_mock = False
+                print("✅ Gemini service initialized successfully")
+            except Exception as e:
+                print(f"⚠️ Warning: Could not initialize Gemini service: {e}")
+                print("Using mock responses instead.")
+                self.use_mock = True
+                self.gemini_service = None
+        
+        # Optional RPM/TPM budget shared by all calls from this simulator; a batch
+        # given its own limits uses a budget scoped to that batch instead
+        self.request_budget: Optional[RequestBudget] = None
         
         self._initialize_personality_templates()
     
@@ -90,8 +110,13 @@ class HomeownerConversationSimulator:
             "I'm not ready to show the house yet"
         ]
     
-    def generate_homeowner_profile(self, property_data: Dict[str, Any]) -> HomeownerProfile:
-        """Generate a realistic homeowner profile"""
+    def generate_homeowner_profile(self, property_data: Dict[str, Any],
+                                   rng: Optional[random.Random] = None) -> HomeownerProfile:
+        """Generate a realistic homeowner profile
+        
+        Draws come from rng when given (for reproducible corpora), else the global random module.
+        """
+        rng = rng or random
         
         # Determine profile based on property characteristics
         property_value = property_data.get('asking_price', 300000)
@@ -108,11 +133,11 @@ class HomeownerConversationSimulator:
         
         # Family status based on bedrooms
         if bedrooms <= 2:
-            family_status = random.choice(["single", "married"])
+            family_status = rng.choice(["single", "married"])
         elif bedrooms <= 4:
-            family_status = random.choice(["married", "family"])
+            family_status = rng.choice(["married", "family"])
         else:
-            family_status = random.choice(["family", "empty_nest"])
+            family_status = rng.choice(["family", "empty_nest"])
         
         # Generate other characteristics
         motivations = ["urgent", "exploring", "reluctant", "motivated"]
@@ -124,25 +149,29 @@ class HomeownerConversationSimulator:
         ]
         
         return HomeownerProfile(
-            name=random.choice(["John", "Mary", "David", "Sarah", "Michael", "Lisa", "Robert", "Jennifer"]),
-            age=random.randint(25, 75),
+            name=rng.choice(["John", "Mary", "David", "Sarah", "Michael", "Lisa", "Robert", "Jennifer"]),
+            age=rng.randint(25, 75),
             income_level=income_level,
             family_status=family_status,
-            motivation=random.choice(motivations),
-            personality=random.choice(personalities),
+            motivation=rng.choice(motivations),
+            personality=rng.choice(personalities),
             property_type=property_data.get('property_type', 'single_family'),
             location=location,
-            years_owned=random.randint(1, 30),
-            mortgage_status=random.choice(["paid_off", "low_balance", "high_balance"]),
-            reason_for_selling=random.choice(reasons),
-            price_expectations=random.choice(["realistic", "high", "flexible"]),
-            timeline=random.choice(["immediate", "flexible", "long_term"])
+            years_owned=rng.randint(1, 30),
+            mortgage_status=rng.choice(["paid_off", "low_balance", "high_balance"]),
+            reason_for_selling=rng.choice(reasons),
+            price_expectations=rng.choice(["realistic", "high", "flexible"]),
+            timeline=rng.choice(["immediate", "flexible", "long_term"])
         )
     
     async def generate_conversation_scenario(self, 
                                            homeowner_profile: HomeownerProfile,
-                                           context: ConversationContext) -> Dict[str, Any]:
-        """Generate a realistic conversation scenario using Gemini"""
+                                           context: ConversationContext,
+                                           request_budget: Optional[RequestBudget] = None) -> Dict[str, Any]:
+        """Generate a realistic conversation scenario using Gemini
+        
+        request_budget overrides the simulator's shared budget for this call.
+        """
         
         if self.use_mock:
             return self._generate_mock_conversation(homeowner_profile, context)
@@ -151,7 +180,7 @@ class HomeownerConversationSimulator:
         prompt = self._create_conversation_prompt(homeowner_profile, context)
         
         try:
-            response = await self._call_gemini_async(prompt)
+            response = await self._call_gemini_async(prompt, request_budget or self.request_budget)
             conversation_data = self._parse_gemini_response(response)
             
             return {
@@ -225,22 +254,30 @@ class HomeownerConversationSimulator:
         
         return prompt
     
-    async def _call_gemini_async(self, prompt: str) -> str:
-        """Call Gemini API asynchronously"""
+    async def _call_gemini_async(self, prompt: str, request_budget: Optional[RequestBudget] = None) -> str:
+        """Call Gemini through GeminiService without blocking the event loop
+        
+        The service routes the call through the shared LLM gateway (Gemini rate
+        limit and usage metrics); conversations are sampled, so they bypass the
+        response cache like the service's other conversation prompts. When a
+        request budget is given, the call first waits for a request slot and its
+        estimated tokens.
+        """
+        if not self.gemini_service:
+            raise Exception("Gemini API call failed: Gemini service not available")
+        
+        estimated = estimate_tokens(prompt) + EXPECTED_CONVERSATION_TOKENS
+        if request_budget:
+            await request_budget.acquire(estimated)
+        
         try:
-            if self.gemini_service:
-                # Use the conversation response method from our service
-                context = {
-                    'conversation_history': [],
-                    'current_topic': 'homeowner_simulation',
-                    'agent_message': prompt
-                }
-                response = await self.gemini_service.generate_conversation_response(context)
-                return response.content
-            else:
-                raise Exception("Gemini service not available")
+            content = await self.gemini_service.agenerate(prompt, cacheable=False)
         except Exception as e:
             raise Exception(f"Gemini API call failed: {e}")
+        
+        if request_budget:
+            request_budget.settle(estimated, estimate_tokens(prompt) + estimate_tokens(content))
+        return content
     
     def _parse_gemini_response(self, response: str) -> Dict[str, Any]:
         """Parse Gemini's JSON response"""
@@ -385,39 +422,145 @@ class HomeownerConversationSimulator:
             }
         }
     
+    def _plan_conversation(self, property_data_list: List[Dict[str, Any]],
+                           scenario_types: List[str],
+                           rng: Optional[random.Random] = None) -> Tuple[HomeownerProfile, ConversationContext]:
+        """Pick a property and scenario and build the profile and context for one conversation"""
+        rng = rng or random
+        property_data = rng.choice(property_data_list)
+        scenario_type = rng.choice(scenario_types)
+        
+        profile = self.generate_homeowner_profile(property_data, rng)
+        context = ConversationContext(
+            scenario_type=scenario_type,
+            property_details=property_data,
+            market_conditions={"trend": "stable", "inventory": "normal"},
+            previous_interactions=[],
+            agent_goal="Schedule property evaluation" if scenario_type == "cold_call" else "Move to next step",
+            difficulty_level=rng.uniform(0.3, 0.9)
+        )
+        return profile, context
+    
+    async def iter_conversation_batch(self,
+                                      property_data_list: List[Dict[str, Any]],
+                                      scenario_types: List[str],
+                                      count: int = 10,
+                                      max_concurrency: int = 8,
+                                      requests_per_minute: Optional[float] = None,
+                                      tokens_per_minute: Optional[float] = None,
+                                      rng: Optional[random.Random] = None
+                                      ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """Generate conversations concurrently, yielding (index, scenario) as each finishes
+        
+        At most max_concurrency LLM calls are in flight, and calls wait for the
+        optional requests/tokens per minute budget, which applies to this batch
+        only; without limits the simulator's shared request_budget is used. Only
+        max_concurrency scenarios are pending at a time, so memory stays flat for
+        large counts. Conversations are planned in index order from rng (the global
+        random module by default), so a seeded rng gives a reproducible plan.
+        """
+        budget = self.request_budget
+        if requests_per_minute or tokens_per_minute:
+            budget = RequestBudget(requests_per_minute, tokens_per_minute)
+        
+        async def generate(index: int, profile: HomeownerProfile, context: ConversationContext):
+            scenario = await self.generate_conversation_scenario(profile, context, budget)
+            return index, scenario
+        
+        pending = set()
+        next_index = 0
+        try:
+            while next_index < count or pending:
+                while next_index < count and len(pending) < max_concurrency:
+                    profile, context = self._plan_conversation(property_data_list, scenario_types, rng)
+                    pending.add(asyncio.create_task(generate(next_index, profile, context)))
+                    next_index += 1
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+    
     async def generate_conversation_batch(self, 
                                         property_data_list: List[Dict[str, Any]], 
                                         scenario_types: List[str],
-                                        count: int = 10) -> List[Dict[str, Any]]:
-        """Generate a batch of conversation scenarios"""
-        
-        conversations = []
-        
-        for i in range(count):
-            # Select random property and scenario
-            property_data = random.choice(property_data_list)
-            scenario_type = random.choice(scenario_types)
-            
-            # Generate homeowner profile
-            profile = self.generate_homeowner_profile(property_data)
-            
-            # Create context
-            context = ConversationContext(
-                scenario_type=scenario_type,
-                property_details=property_data,
-                market_conditions={"trend": "stable", "inventory": "normal"},
-                previous_interactions=[],
-                agent_goal="Schedule property evaluation" if scenario_type == "cold_call" else "Move to next step",
-                difficulty_level=random.uniform(0.3, 0.9)
-            )
-            
-            # Generate conversation
-            conversation_scenario = await self.generate_conversation_scenario(profile, context)
-            conversations.append(conversation_scenario)
-            
-            print(f"Generated conversation {i+1}/{count}: {profile.personality} homeowner, {scenario_type} scenario")
+                                        count: int = 10,
+                                        max_concurrency: int = 8,
+                                        requests_per_minute: Optional[float] = None,
+                                        tokens_per_minute: Optional[float] = None,
+                                        output_path: Optional[str] = None,
+                                        corpus_writer=None,
+                                        return_results: bool = True,
+                                        rng: Optional[random.Random] = None) -> List[Dict[str, Any]]:
+        """Generate a batch of conversation scenarios
+        
+        Conversations are generated concurrently (see iter_conversation_batch) and
+        returned in generation order. If output_path is given, each conversation is
+        also appended to that JSONL file as soon as it completes; with corpus_writer
+        (a ScenarioCorpusWriter) it is added to a replayable scenario corpus. Pass
+        return_results=False when streaming to a sink so finished conversations are
+        not held in memory; an empty list is returned.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * count if return_results else []
+        completed = 0
+        output_file = open(output_path, "a", encoding="utf-8") if output_path else None
         
-        return conversations
+        try:
+            async for index, scenario in self.iter_conversation_batch(
+                property_data_list, scenario_types, count,
+                max_concurrency=max_concurrency,
+                requests_per_minute=requests_per_minute,
+                tokens_per_minute=tokens_per_minute,
+                rng=rng
+            ):
+                completed += 1
+                if return_results:
+                    results[index] = scenario
+                if output_file or corpus_writer:
+                    line = self.scenario_to_json(scenario, index)
+                    if output_file:
+                        output_file.write(line + "\n")
+                        output_file.flush()
+                    if corpus_writer:
+                        corpus_writer.add_conversation(line)
+                
+                profile = scenario["homeowner_profile"]
+                print(f"Generated conversation {completed}/{count}: {profile.personality} homeowner, "
+                      f"{scenario['context'].scenario_type} scenario")
+        finally:
+            if output_file:
+                output_file.close()
+        
+        return [scenario for scenario in results if scenario is not None]
+    
+    @staticmethod
+    def scenario_to_json(scenario: Dict[str, Any], index: Optional[int] = None) -> str:
+        """Serialize a conversation scenario (dataclasses included) as one JSON line"""
+        record = {
+            key: asdict(value) if is_dataclass(value) else value
+            for key, value in scenario.items()
+        }
+        if index is not None:
+            record["index"] = index
+        return json.dumps(record, default=str)
+    
+    @staticmethod
+    def scenario_from_record(record: Dict[str, Any]) -> Dict[str, Any]:
+        """Rebuild a conversation scenario from a record written by scenario_to_json"""
+        scenario = dict(record)
+        scenario.pop("index", None)
+        scenario["homeowner_profile"] = HomeownerProfile(**record["homeowner_profile"])
+        scenario["context"] = ConversationContext(**record["context"])
+        return scenario
+    
+    def replay_conversations(self, corpus, worker_index: int = 0, num_workers: int = 1,
+                             limit: Optional[int] = None):
+        """Replay stored conversation scenarios from a ScenarioCorpus instead of generating them"""
+        for count, record in enumerate(corpus.iter_conversations(worker_index, num_workers)):
+            if limit is not None and count >= limit:
+                return
+            yield self.scenario_from_record(record)
     
     def analyze_conversation_quality(self, conversation_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze the quality and realism of generated conversations"""
@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+TRENDS = ["bull", "bear", "stable"]
+SEASONS = ["spring", "summer", "fall", "winter"]
+
+# Daily trend transitions: 5% chance to switch, split evenly between the other regimes
+DEFAULT_TREND_TRANSITIONS = np.array([
+    [0.950, 0.025, 0.025],
+    [0.025, 0.950, 0.025],
+    [0.025, 0.025, 0.950],
+])
+
+# Daily price momentum drift per season, used when a seasonal schedule is requested
+DEFAULT_SEASONAL_SCHEDULE: Dict[str, float] = {
+    "spring": 0.002,
+    "summer": 0.001,
+    "fall": -0.001,
+    "winter": -0.002,
+}
+
+# Daily shock sizes (same as MarketSimulator._evolve_market_condition)
+RATE_STEP_STD = 0.01
+MOMENTUM_STEP_STD = 0.05
+VOLATILITY_STEP_STD = 0.02
+
+PATH_RECORD_DTYPE = np.dtype([
+    ("path", np.int32),
+    ("day", np.int32),
+    ("trend", "U6"),
+    ("interest_rate", np.float64),
+    ("price_momentum", np.float64),
+    ("volatility", np.float64),
+    ("inventory_level", "U6"),
+    ("season", "U6"),
+])
+
+
+def season_for_month(month: int) -> str:
+    """Meteorological season for a calendar month"""
+    if month in (3, 4, 5):
+        return "spring"
+    if month in (6, 7, 8):
+        return "summer"
+    if month in (9, 10, 11):
+        return "fall"
+    return "winter"
+
+
+@dataclass
+class MarketPaths:
+    """M simulated market paths over D days, stored as (M, D) arrays"""
+    trend: np.ndarray  # int8 codes into TRENDS
+    interest_rate: np.ndarray
+    price_momentum: np.ndarray
+    volatility: np.ndarray
+    season: np.ndarray  # (D,) int8 codes into SEASONS
+    inventory_level: str
+
+    @property
+    def num_paths(self) -> int:
+        return self.interest_rate.shape[0]
+
+    @property
+    def num_days(self) -> int:
+        return self.interest_rate.shape[1]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long-format DataFrame with one row per (path, day)"""
+        m, d = self.num_paths, self.num_days
+        return pd.DataFrame({
+            "path": np.repeat(np.arange(m, dtype=np.int32), d),
+            "day": np.tile(np.arange(d, dtype=np.int32), m),
+            "trend": pd.Categorical.from_codes(self.trend.ravel(), TRENDS),
+            "interest_rate": self.interest_rate.ravel(),
+            "price_momentum": self.price_momentum.ravel(),
+            "volatility": self.volatility.ravel(),
+            "inventory_level": self.inventory_level,
+            "season": pd.Categorical.from_codes(np.tile(self.season, m), SEASONS),
+        })
+
+    def to_records(self) -> np.ndarray:
+        """Structured array with PATH_RECORD_DTYPE, one record per (path, day)"""
+        m, d = self.num_paths, self.num_days
+        records = np.empty(m * d, dtype=PATH_RECORD_DTYPE)
+        records["path"] = np.repeat(np.arange(m), d)
+        records["day"] = np.tile(np.arange(d), m)
+        records["trend"] = np.array(TRENDS)[self.trend.ravel()]
+        records["interest_rate"] = self.interest_rate.ravel()
+        records["price_momentum"] = self.price_momentum.ravel()
+        records["volatility"] = self.volatility.ravel()
+        records["inventory_level"] = self.inventory_level
+        records["season"] = np.array(SEASONS)[np.tile(self.season, m)]
+        return records
+
+    def trend_shares(self) -> Dict[str, np.ndarray]:
+        """Per-day share of paths in each trend regime"""
+        return {trend: (self.trend == code).mean(axis=0) for code, trend in enumerate(TRENDS)}
+
+    def percentile_bands(self, field: str, percentiles: List[float] = (5, 25, 50, 75, 95)) -> Dict[str, np.ndarray]:
+        """Per-day percentiles of a field across paths"""
+        values = np.percentile(getattr(self, field), percentiles, axis=0)
+        return {f"p{int(p)}": row for p, row in zip(percentiles, values)}
+
+
+def simulate_market_paths(
+    rng: np.random.Generator,
+    num_paths: int,
+    num_days: int,
+    initial_trend: str = "stable",
+    initial_interest_rate: float = 5.5,
+    initial_momentum: float = 0.0,
+    initial_volatility: float = 0.3,
+    inventory_level: str = "normal",
+    initial_season: str = "spring",
+    trend_transitions: Optional[np.ndarray] = None,
+    seasonal_schedule: Optional[Dict[str, float]] = None,
+    start_date: Optional[date] = None,
+) -> MarketPaths:
+    """Simulate independent market paths, vectorized across paths.
+
+    Each day applies the same rules as MarketSimulator._evolve_market_condition:
+    a Markov step of the trend regime and clipped random walks for interest
+    rate, price momentum and volatility. All shocks are drawn up front, so the
+    only Python loop is over days.
+
+    Args:
+        rng: Random generator (seed it for reproducible paths)
+        num_paths: Number of independent paths (M)
+        num_days: Days per path (D)
+        trend_transitions: 3x3 row-stochastic matrix over TRENDS
+        seasonal_schedule: Optional daily momentum drift per season; when given,
+            the season follows the calendar from start_date (default today)
+        start_date: First simulated day for the seasonal calendar
+
+    Returns:
+        MarketPaths with (M, D) arrays
+    """
+    transitions = DEFAULT_TREND_TRANSITIONS if trend_transitions is None else np.asarray(trend_transitions)
+    cumulative = np.cumsum(transitions, axis=1)
+    cumulative[:, -1] = 1.0
+
+    # Season per day and the momentum drift it implies
+    if seasonal_schedule is not None:
+        start = start_date or datetime.now().date()
+        days = pd.date_range(start, periods=num_days, freq="D")
+        season = np.array([SEASONS.index(season_for_month(month)) for month in days.month], dtype=np.int8)
+        drift = np.array([seasonal_schedule.get(SEASONS[code], 0.0) for code in season])
+    else:
+        season = np.full(num_days, SEASONS.index(initial_season), dtype=np.int8)
+        drift = np.zeros(num_days)
+
+    trend_draws = rng.random((num_days, num_paths))
+    rate_shocks = rng.normal(0, RATE_STEP_STD, size=(num_days, num_paths))
+    momentum_shocks = rng.normal(0, MOMENTUM_STEP_STD, size=(num_days, num_paths))
+    volatility_shocks = rng.normal(0, VOLATILITY_STEP_STD, size=(num_days, num_paths))
+
+    trend = np.empty((num_days, num_paths), dtype=np.int8)
+    interest_rate = np.empty((num_days, num_paths))
+    momentum = np.empty((num_days, num_paths))
+    volatility = np.empty((num_days, num_paths))
+
+    current_trend = np.full(num_paths, TRENDS.index(initial_trend), dtype=np.int8)
+    current_rate = np.full(num_paths, float(initial_interest_rate))
+    current_momentum = np.full(num_paths, float(initial_momentum))
+    current_volatility = np.full(num_paths, float(initial_volatility))
+
+    for day in range(num_days):
+        # Markov step: first state whose cumulative probability exceeds the draw
+        current_trend = (trend_draws[day][:, None] >= cumulative[current_trend]).sum(axis=1).astype(np.int8)
+        current_rate = np.clip(current_rate + rate_shocks[day], 2.0, 10.0)
+        current_momentum = np.clip(current_momentum + momentum_shocks[day] + drift[day], -1.0, 1.0)
+        current_volatility = np.clip(current_volatility + volatility_shocks[day], 0.1, 1.0)
+
+        trend[day] = current_trend
+        interest_rate[day] = current_rate
+        momentum[day] = current_momentum
+        volatility[day] = current_volatility
+
+    return MarketPaths(
+        trend=trend.T.copy(),
+        interest_rate=interest_rate.T.copy(),
+        price_momentum=momentum.T.copy(),
+        volatility=volatility.T.copy(),
+        season=season,
+        inventory_level=inventory_level,
+    )
@@ -1,11 +1,14 @@
-import random
 import numpy as np
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Any, Optional
+from dataclasses import dataclass, asdict
+import pandas as pd
 from ..services.market_data_service import MarketDataService
 from ..services.gemini_service import GeminiService
 from ..models.market_data import PropertyRecord
+from .scenario_sampler import PropertyReservoir, get_property_reservoir
+from .market_paths import MarketPaths, simulate_market_paths, TRENDS, SEASONS
+from .scenario_corpus import ScenarioCorpus, ScenarioCorpusWriter
 
 @dataclass
 class MarketCondition:
@@ -17,6 +20,9 @@ class MarketCondition:
     volatility: float  # 0.0 to 1.0
     season: str  # "spring", "summer", "fall", "winter"
 
+# Market condition fields stored with each scenario row, so replayed deals are self-contained
+CONDITION_COLUMNS = ["trend", "interest_rate", "inventory_level", "price_momentum", "volatility", "season"]
+
 @dataclass
 class SimulatedDeal:
     """A simulated real estate deal"""
@@ -33,8 +39,11 @@ class SimulatedDeal:
 class MarketSimulator:
     """Simulates realistic real estate market conditions and deals"""
     
-    def __init__(self, market_service: MarketDataService):
+    def __init__(self, market_service: MarketDataService, seed: Optional[int] = None,
+                 reservoir: Optional[PropertyReservoir] = None):
         self.market_service = market_service
+        self.rng = np.random.default_rng(seed)
+        self._reservoir = reservoir
         try:
             self.gemini_service = GeminiService()
             print("✅ Gemini service integrated into market simulator")
@@ -51,174 +60,210 @@ class MarketSimulator:
         trends = ["bull", "bear", "stable"]
         trend_weights = [0.3, 0.2, 0.5]  # Stable markets more common
         
-        trend = np.random.choice(trends, p=trend_weights)
+        trend = self.rng.choice(trends, p=trend_weights)
         
         # Interest rates typically 3-8%
         base_rate = 5.5
-        rate_variation = np.random.normal(0, 1.5)
+        rate_variation = self.rng.normal(0, 1.5)
         interest_rate = max(2.0, min(10.0, base_rate + rate_variation))
         
         # Inventory levels
         inventory_levels = ["low", "normal", "high"]
         inventory_weights = [0.25, 0.5, 0.25]
-        inventory = np.random.choice(inventory_levels, p=inventory_weights)
+        inventory = self.rng.choice(inventory_levels, p=inventory_weights)
         
         # Price momentum based on trend
         if trend == "bull":
-            price_momentum = np.random.uniform(0.2, 0.8)
+            price_momentum = self.rng.uniform(0.2, 0.8)
         elif trend == "bear":
-            price_momentum = np.random.uniform(-0.8, -0.2)
+            price_momentum = self.rng.uniform(-0.8, -0.2)
         else:
-            price_momentum = np.random.uniform(-0.3, 0.3)
+            price_momentum = self.rng.uniform(-0.3, 0.3)
         
         # Volatility
-        volatility = np.random.uniform(0.1, 0.6)
+        volatility = self.rng.uniform(0.1, 0.6)
         
         # Season
         seasons = ["spring", "summer", "fall", "winter"]
-        season = np.random.choice(seasons)
+        season = self.rng.choice(seasons)
         
         return MarketCondition(
-            trend=trend,
-            interest_rate=interest_rate,
-            inventory_level=inventory,
-            price_momentum=price_momentum,
-            volatility=volatility,
-            season=season
+            trend=str(trend),
+            interest_rate=float(interest_rate),
+            inventory_level=str(inventory),
+            price_momentum=float(price_momentum),
+            volatility=float(volatility),
+            season=str(season)
         )
     
-    def generate_deal_scenario(self, target_city: str = None, target_state: str = None) -> SimulatedDeal:
+    @property
+    def reservoir(self) -> PropertyReservoir:
+        """Property reservoir used for sampling, loaded once per market database"""
+        if self._reservoir is None:
+            self._reservoir = get_property_reservoir(self.market_service.db_path)
+        return self._reservoir
+    
+    def generate_deal_scenario(self, target_city: str = None, target_state: str = None,
+                               rng: Optional[np.random.Generator] = None) -> SimulatedDeal:
         """Generate a realistic deal scenario from market data"""
+        frame = self.generate_scenario_frame(1, [target_city] if target_city else None, target_state, rng=rng)
         
-        # Get a random property from our dataset
-        import sqlite3
-        import pandas as pd
-        
-        conn = sqlite3.connect(self.market_service.db_path)
-        
-        # Build query based on targets
-        conditions = ["price IS NOT NULL", "house_size IS NOT NULL"]
-        params = []
-        
-        if target_city:
-            conditions.append("LOWER(city) = LOWER(?)")
-            params.append(target_city)
-        
-        if target_state:
-            conditions.append("LOWER(state) = LOWER(?)")
-            params.append(target_state)
-        
-        query = f"""
-        SELECT * FROM properties 
-        WHERE {' AND '.join(conditions)}
-        ORDER BY RANDOM() 
-        LIMIT 1
-        """
-        
-        df = pd.read_sql_query(query, conn, params=params)
-        conn.close()
-        
-        if df.empty:
+        if frame.empty:
             raise ValueError("No properties found for simulation")
         
-        property_row = df.iloc[0]
-        
-        # Create property data
-        property_data = {
-            'city': property_row['city'],
-            'state': property_row['state'],
-            'bedrooms': property_row['bed'],
-            'bathrooms': property_row['bath'],
-            'house_size': property_row['house_size'],
-            'acre_lot': property_row.get('acre_lot', 0),
-            'zip_code': property_row.get('zip_code')
-        }
-        
-        # Base market value from our data
-        base_value = property_row['price']
-        
-        # Apply market conditions to value
-        market_multiplier = 1.0 + (self.current_condition.price_momentum * 0.1)
-        market_value = base_value * market_multiplier
-        
-        # Generate asking price with seller psychology
-        seller_motivation = np.random.uniform(0.2, 1.0)
-        
-        if seller_motivation > 0.8:  # Highly motivated
-            asking_multiplier = np.random.uniform(0.95, 1.05)
-        elif seller_motivation > 0.5:  # Moderately motivated
-            asking_multiplier = np.random.uniform(1.0, 1.15)
-        else:  # Not very motivated
-            asking_multiplier = np.random.uniform(1.1, 1.3)
-        
-        asking_price = market_value * asking_multiplier
-        
-        # Days on market based on conditions
-        if self.current_condition.inventory_level == "low":
-            days_on_market = np.random.randint(1, 30)
-        elif self.current_condition.inventory_level == "normal":
-            days_on_market = np.random.randint(15, 90)
-        else:  # high inventory
-            days_on_market = np.random.randint(60, 180)
-        
-        # Competition level
-        if self.current_condition.trend == "bull":
-            competition_level = np.random.uniform(0.6, 1.0)
-        elif self.current_condition.trend == "bear":
-            competition_level = np.random.uniform(0.1, 0.4)
-        else:
-            competition_level = np.random.uniform(0.3, 0.7)
-        
-        deal = SimulatedDeal(
-            property_id=f"SIM_{random.randint(100000, 999999)}",
-            property_data=property_data,
-            market_value=market_value,
-            asking_price=asking_price,
-            seller_motivation=seller_motivation,
-            days_on_market=days_on_market,
-            competition_level=competition_level,
-            market_condition=self.current_condition,
-            created_at=datetime.now()
-        )
-        
+        deal = self._deals_from_frame(frame)[0]
         self.active_deals.append(deal)
         return deal
     
+    def generate_scenario_frame(self, count: int, cities: List[str] = None,
+                                target_state: str = None,
+                                rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
+        """Generate deal scenarios as a DataFrame in one vectorized draw
+        
+        Uses the simulator's seeded generator (or rng, e.g. a per-scenario generator),
+        so the same seed reproduces the same scenarios. Draws for cities without
+        data are dropped.
+        """
+        rng = rng if rng is not None else self.rng
+        condition = self.current_condition
+        positions = self.reservoir.sample_positions(count, rng, cities=cities, state=target_state)
+        frame = self.reservoir.rows(positions)
+        n = len(frame)
+        
+        # Apply market conditions to value
+        market_multiplier = 1.0 + (condition.price_momentum * 0.1)
+        frame['market_value'] = frame['price'] * market_multiplier
+        
+        # Asking price with seller psychology
+        seller_motivation = rng.uniform(0.2, 1.0, size=n)
+        low = np.select([seller_motivation > 0.8, seller_motivation > 0.5], [0.95, 1.0], default=1.1)
+        high = np.select([seller_motivation > 0.8, seller_motivation > 0.5], [1.05, 1.15], default=1.3)
+        asking_multiplier = rng.uniform(low, high)
+        frame['seller_motivation'] = seller_motivation
+        frame['asking_price'] = frame['market_value'] * asking_multiplier
+        
+        # Days on market based on inventory
+        dom_range = {"low": (1, 30), "normal": (15, 90)}.get(condition.inventory_level, (60, 180))
+        frame['days_on_market'] = rng.integers(dom_range[0], dom_range[1], size=n)
+        
+        # Competition level based on trend
+        competition_range = {"bull": (0.6, 1.0), "bear": (0.1, 0.4)}.get(condition.trend, (0.3, 0.7))
+        frame['competition_level'] = rng.uniform(competition_range[0], competition_range[1], size=n)
+        
+        frame['property_id'] = [f"SIM_{i}" for i in rng.integers(100000, 1000000, size=n)]
+        for column, value in asdict(condition).items():
+            frame[column] = value
+        return frame
+    
+    def _deals_from_frame(self, frame: pd.DataFrame) -> List[SimulatedDeal]:
+        """Convert scenario rows into SimulatedDeal objects"""
+        created_at = datetime.now()
+        has_condition = all(column in frame.columns for column in CONDITION_COLUMNS)
+        current = self.current_condition
+        conditions: Dict[tuple, MarketCondition] = {
+            tuple(getattr(current, column) for column in CONDITION_COLUMNS): current
+        }
+        deals = []
+        for row in frame.itertuples(index=False):
+            condition = self.current_condition
+            if has_condition:
+                key = tuple(getattr(row, column) for column in CONDITION_COLUMNS)
+                condition = conditions.get(key)
+                if condition is None:
+                    condition = conditions[key] = MarketCondition(
+                        trend=str(row.trend),
+                        interest_rate=float(row.interest_rate),
+                        inventory_level=str(row.inventory_level),
+                        price_momentum=float(row.price_momentum),
+                        volatility=float(row.volatility),
+                        season=str(row.season)
+                    )
+            property_data = {
+                'city': row.city,
+                'state': row.state,
+                'bedrooms': row.bed,
+                'bathrooms': row.bath,
+                'house_size': row.house_size,
+                'acre_lot': row.acre_lot,
+                'zip_code': row.zip_code
+            }
+            deals.append(SimulatedDeal(
+                property_id=row.property_id,
+                property_data=property_data,
+                market_value=float(row.market_value),
+                asking_price=float(row.asking_price),
+                seller_motivation=float(row.seller_motivation),
+                days_on_market=int(row.days_on_market),
+                competition_level=float(row.competition_level),
+                market_condition=condition,
+                created_at=created_at
+            ))
+        return deals
+    
     def simulate_market_cycle(self, days: int = 365) -> List[MarketCondition]:
         """Simulate market conditions over time"""
-        conditions = []
-        current_date = datetime.now()
-        
-        for day in range(days):
-            # Evolve market conditions
-            self.current_condition = self._evolve_market_condition(self.current_condition)
-            conditions.append(self.current_condition)
-            current_date += timedelta(days=1)
-        
+        paths = self.simulate_market_paths(num_paths=1, num_days=days)
+        conditions = [
+            MarketCondition(
+                trend=TRENDS[paths.trend[0, day]],
+                interest_rate=float(paths.interest_rate[0, day]),
+                inventory_level=paths.inventory_level,
+                price_momentum=float(paths.price_momentum[0, day]),
+                volatility=float(paths.volatility[0, day]),
+                season=SEASONS[paths.season[day]]
+            )
+            for day in range(days)
+        ]
+        
+        if conditions:
+            self.current_condition = conditions[-1]
         return conditions
     
+    def simulate_market_paths(self, num_paths: int = 1000, num_days: int = 365,
+                              seasonal_schedule: Optional[Dict[str, float]] = None,
+                              start_date=None) -> MarketPaths:
+        """Simulate many independent market paths starting from the current condition
+        
+        Returns (paths x days) arrays; use MarketPaths.to_frame() or to_records()
+        to hand them to downstream analyzers. Does not change current_condition.
+        """
+        condition = self.current_condition
+        return simulate_market_paths(
+            self.rng,
+            num_paths=num_paths,
+            num_days=num_days,
+            initial_trend=condition.trend,
+            initial_interest_rate=condition.interest_rate,
+            initial_momentum=condition.price_momentum,
+            initial_volatility=condition.volatility,
+            inventory_level=condition.inventory_level,
+            initial_season=condition.season,
+            seasonal_schedule=seasonal_schedule,
+            start_date=start_date
+        )
+    
     def _evolve_market_condition(self, current: MarketCondition) -> MarketCondition:
         """Evolve market conditions over time"""
         
         # Trend persistence with some randomness
         trend_change_prob = 0.05  # 5% chance to change trend each day
         
-        if np.random.random() < trend_change_prob:
+        if self.rng.random() < trend_change_prob:
             trends = ["bull", "bear", "stable"]
-            new_trend = np.random.choice([t for t in trends if t != current.trend])
+            new_trend = str(self.rng.choice([t for t in trends if t != current.trend]))
         else:
             new_trend = current.trend
         
         # Interest rate changes (more gradual)
-        rate_change = np.random.normal(0, 0.01)  # Small daily changes
+        rate_change = self.rng.normal(0, 0.01)  # Small daily changes
         new_rate = max(2.0, min(10.0, current.interest_rate + rate_change))
         
         # Price momentum evolution
-        momentum_change = np.random.normal(0, 0.05)
+        momentum_change = self.rng.normal(0, 0.05)
         new_momentum = max(-1.0, min(1.0, current.price_momentum + momentum_change))
         
         # Volatility changes
-        volatility_change = np.random.normal(0, 0.02)
+        volatility_change = self.rng.normal(0, 0.02)
         new_volatility = max(0.1, min(1.0, current.volatility + volatility_change))
         
         return MarketCondition(
@@ -278,19 +323,46 @@ class MarketSimulator:
         except Exception as e:
             return {"error": f"AI analysis failed: {e}"}
     
-    def generate_batch_scenarios(self, count: int, cities: List[str] = None) -> List[SimulatedDeal]:
+    def generate_batch_scenarios(self, count: int, cities: List[str] = None,
+                                 rng: Optional[np.random.Generator] = None) -> List[SimulatedDeal]:
         """Generate multiple deal scenarios for training"""
-        scenarios = []
+        scenarios = self._deals_from_frame(self.generate_scenario_frame(count, cities, rng=rng))
+        self.active_deals.extend(scenarios)
+        return scenarios
+    
+    def export_scenario_corpus(self, writer: ScenarioCorpusWriter, count: int, cities: List[str] = None,
+                               target_state: str = None, batch_size: int = 100000,
+                               evolve_daily: bool = False) -> int:
+        """Generate deal scenarios once and write them to a scenario corpus
         
-        for _ in range(count):
-            city = np.random.choice(cities) if cities else None
-            try:
-                deal = self.generate_deal_scenario(target_city=city)
-                scenarios.append(deal)
-            except ValueError:
-                continue  # Skip if no properties found
+        Scenarios are generated in batches of batch_size rows (one market condition
+        per batch, advanced a day between batches when evolve_daily is set).
         
-        return scenarios
+        Returns:
+            Number of scenarios written
+        """
+        written = 0
+        while written < count:
+            frame = self.generate_scenario_frame(min(batch_size, count - written), cities, target_state)
+            if frame.empty:
+                break
+            writer.add_deals(frame)
+            written += len(frame)
+            if evolve_daily:
+                self.current_condition = self._evolve_market_condition(self.current_condition)
+        return written
+    
+    def replay_scenarios(self, corpus: ScenarioCorpus, worker_index: int = 0, num_workers: int = 1,
+                         limit: Optional[int] = None) -> Iterator[SimulatedDeal]:
+        """Replay stored deal scenarios (this worker's shards) instead of sampling new ones"""
+        remaining = limit
+        for frame in corpus.iter_deal_frames(worker_index, num_workers):
+            if remaining is not None:
+                frame = frame.iloc[:remaining]
+                remaining -= len(frame)
+            yield from self._deals_from_frame(frame)
+            if remaining is not None and remaining <= 0:
+                return
     
     def close_deal(self, deal_id: str, outcome: Dict[str, Any]):
         """Record deal outcome and move to history"""
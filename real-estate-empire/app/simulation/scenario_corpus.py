@@ -0,0 +1,253 @@
+import gzip
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+CORPUS_FORMAT = "scenario-corpus"
+CORPUS_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+DEFAULT_SHARD_SIZE = 50000
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _pyarrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def shards_for_worker(shards: List[Dict[str, Any]], worker_index: int = 0, num_workers: int = 1) -> List[Dict[str, Any]]:
+    """Round-robin shard assignment, so each worker replays a disjoint slice"""
+    if not 0 <= worker_index < num_workers:
+        raise ValueError(f"worker_index must be in [0, {num_workers})")
+    return shards[worker_index::num_workers]
+
+
+class ScenarioCorpusWriter:
+    """Writes a versioned, compressed scenario corpus.
+
+    Deal scenarios are stored columnar (compressed Arrow IPC when pyarrow is
+    installed, compressed .npz otherwise) and conversations as gzipped JSONL,
+    both split into shards of at most shard_size rows. close() writes
+    manifest.json with row counts and checksums for every shard.
+    """
+
+    def __init__(self, directory: Union[str, Path], name: str = "scenarios", seed: Optional[int] = None,
+                 shard_size: int = DEFAULT_SHARD_SIZE, compression: Optional[str] = "zstd",
+                 metadata: Optional[Dict[str, Any]] = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if (self.directory / MANIFEST_NAME).exists():
+            raise FileExistsError(f"Scenario corpus already exists at {self.directory}")
+
+        self.name = name
+        self.seed = seed
+        self.shard_size = shard_size
+        self.compression = compression
+        self.metadata = metadata or {}
+        self.deal_format = "arrow" if _pyarrow_available() else "npz"
+
+        self._deal_buffer: List[pd.DataFrame] = []
+        self._deal_buffer_rows = 0
+        self._deal_shards: List[Dict[str, Any]] = []
+        self._deal_columns: Optional[List[str]] = None
+
+        self._conversation_file = None
+        self._conversation_rows = 0
+        self._conversation_shards: List[Dict[str, Any]] = []
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._close_conversation_shard()
+
+    def add_deals(self, frame: pd.DataFrame):
+        """Buffer deal rows, writing full shards as they fill"""
+        if frame.empty:
+            return
+        if self._deal_columns is None:
+            self._deal_columns = list(frame.columns)
+        self._deal_buffer.append(frame[self._deal_columns])
+        self._deal_buffer_rows += len(frame)
+        while self._deal_buffer_rows >= self.shard_size:
+            pending = pd.concat(self._deal_buffer, ignore_index=True)
+            self._write_deal_shard(pending.iloc[:self.shard_size])
+            rest = pending.iloc[self.shard_size:]
+            self._deal_buffer = [rest] if len(rest) else []
+            self._deal_buffer_rows = len(rest)
+
+    def _write_deal_shard(self, frame: pd.DataFrame):
+        index = len(self._deal_shards)
+        frame = frame.reset_index(drop=True)
+        if self.deal_format == "arrow":
+            import pyarrow as pa
+
+            path = self.directory / f"deals-{index:05d}.arrow"
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            options = pa.ipc.IpcWriteOptions(compression=self.compression)
+            with pa.OSFile(str(path), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                    writer.write_table(table)
+        else:
+            path = self.directory / f"deals-{index:05d}.npz"
+            arrays = {
+                column: frame[column].to_numpy() if frame[column].dtype.kind in "biuf"
+                else frame[column].astype(str).to_numpy(dtype=str)
+                for column in frame.columns
+            }
+            np.savez_compressed(path, **arrays)
+        self._deal_shards.append({"file": path.name, "rows": len(frame), "sha256": _sha256(path)})
+
+    def add_conversation(self, record: Union[str, Dict[str, Any]]):
+        """Append one conversation record (a dict or an already serialized JSON line)"""
+        if self._conversation_file is None:
+            index = len(self._conversation_shards)
+            path = self.directory / f"conversations-{index:05d}.jsonl.gz"
+            self._conversation_file = gzip.open(path, "wt", encoding="utf-8")
+            self._conversation_shards.append({"file": path.name, "rows": 0, "sha256": None})
+        line = record if isinstance(record, str) else json.dumps(record, default=str)
+        self._conversation_file.write(line.rstrip("\n") + "\n")
+        self._conversation_rows += 1
+        self._conversation_shards[-1]["rows"] += 1
+        if self._conversation_rows >= self.shard_size:
+            self._close_conversation_shard()
+
+    def _close_conversation_shard(self):
+        if self._conversation_file is not None:
+            self._conversation_file.close()
+            self._conversation_file = None
+            self._conversation_rows = 0
+            shard = self._conversation_shards[-1]
+            shard["sha256"] = _sha256(self.directory / shard["file"])
+
+    def close(self) -> Dict[str, Any]:
+        """Flush remaining rows and write the manifest"""
+        if self._closed:
+            return self.manifest()
+        if self._deal_buffer_rows:
+            self._write_deal_shard(pd.concat(self._deal_buffer, ignore_index=True))
+            self._deal_buffer, self._deal_buffer_rows = [], 0
+        self._close_conversation_shard()
+
+        manifest = self.manifest()
+        with open(self.directory / MANIFEST_NAME, "w") as f:
+            json.dump(manifest, f, indent=2)
+        self._closed = True
+        return manifest
+
+    def manifest(self) -> Dict[str, Any]:
+        shards = self._deal_shards + self._conversation_shards
+        corpus_id = hashlib.sha256("".join(s["sha256"] or "" for s in shards).encode()).hexdigest()[:16]
+        return {
+            "format": CORPUS_FORMAT,
+            "version": CORPUS_VERSION,
+            "name": self.name,
+            "corpus_id": corpus_id,
+            "created_at": datetime.now().isoformat(),
+            "seed": self.seed,
+            "metadata": self.metadata,
+            "deals": {
+                "format": self.deal_format,
+                "compression": self.compression if self.deal_format == "arrow" else "deflate",
+                "columns": self._deal_columns or [],
+                "rows": sum(s["rows"] for s in self._deal_shards),
+                "shards": self._deal_shards
+            },
+            "conversations": {
+                "format": "jsonl.gz",
+                "rows": sum(s["rows"] for s in self._conversation_shards),
+                "shards": self._conversation_shards
+            }
+        }
+
+
+class ScenarioCorpus:
+    """Read-only view of a corpus written by ScenarioCorpusWriter"""
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        with open(self.directory / MANIFEST_NAME) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != CORPUS_FORMAT:
+            raise ValueError(f"{self.directory} is not a scenario corpus")
+        if self.manifest.get("version", 0) > CORPUS_VERSION:
+            raise ValueError(
+                f"Scenario corpus version {self.manifest['version']} is newer than supported ({CORPUS_VERSION})"
+            )
+
+    @classmethod
+    def open(cls, directory: Union[str, Path]) -> "ScenarioCorpus":
+        return cls(directory)
+
+    @property
+    def corpus_id(self) -> str:
+        return self.manifest["corpus_id"]
+
+    @property
+    def seed(self) -> Optional[int]:
+        return self.manifest.get("seed")
+
+    @property
+    def num_deals(self) -> int:
+        return self.manifest["deals"]["rows"]
+
+    @property
+    def num_conversations(self) -> int:
+        return self.manifest["conversations"]["rows"]
+
+    def verify(self) -> bool:
+        """Check every shard against its recorded checksum"""
+        shards = self.manifest["deals"]["shards"] + self.manifest["conversations"]["shards"]
+        return all(_sha256(self.directory / shard["file"]) == shard["sha256"] for shard in shards)
+
+    def _read_deal_shard(self, shard: Dict[str, Any]) -> pd.DataFrame:
+        path = self.directory / shard["file"]
+        if self.manifest["deals"]["format"] == "arrow":
+            try:
+                import pyarrow as pa
+            except ImportError:
+                raise ImportError("Reading this scenario corpus requires the pyarrow package")
+            # Memory-mapped read; uncompressed shards are zero-copy
+            with pa.memory_map(str(path), "r") as source:
+                return pa.ipc.open_file(source).read_all().to_pandas()
+        with np.load(path, allow_pickle=False) as arrays:
+            return pd.DataFrame({column: arrays[column] for column in self.manifest["deals"]["columns"]})
+
+    def iter_deal_frames(self, worker_index: int = 0, num_workers: int = 1) -> Iterator[pd.DataFrame]:
+        """Deal scenarios, one DataFrame per shard assigned to this worker"""
+        for shard in shards_for_worker(self.manifest["deals"]["shards"], worker_index, num_workers):
+            yield self._read_deal_shard(shard)
+
+    def read_deals(self, worker_index: int = 0, num_workers: int = 1) -> pd.DataFrame:
+        """All deal scenarios assigned to this worker as one DataFrame"""
+        frames = list(self.iter_deal_frames(worker_index, num_workers))
+        if not frames:
+            return pd.DataFrame(columns=self.manifest["deals"]["columns"])
+        return pd.concat(frames, ignore_index=True)
+
+    def iter_conversations(self, worker_index: int = 0, num_workers: int = 1) -> Iterator[Dict[str, Any]]:
+        """Conversation records from the shards assigned to this worker"""
+        for shard in shards_for_worker(self.manifest["conversations"]["shards"], worker_index, num_workers):
+            with gzip.open(self.directory / shard["file"], "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
@@ -0,0 +1,164 @@
+import json
+import os
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Columns kept in the reservoir, in the layout used for the .npy cache
+NUMERIC_COLUMNS = ["price", "house_size", "bed", "bath", "acre_lot"]
+TEXT_COLUMNS = ["city", "state", "zip_code"]
+
+
+class PropertyReservoir:
+    """Compact in-memory (or memory-mapped) copy of the simulation property table.
+
+    Valid rows (price and house_size present) are loaded once into column arrays,
+    with row positions indexed by city, state and (city, state) so N scenarios
+    can be drawn in one vectorized call instead of one ORDER BY RANDOM() query each.
+    """
+
+    def __init__(self, numeric: Dict[str, np.ndarray], text: Dict[str, np.ndarray]):
+        self.numeric = numeric
+        self.text = text
+        self.size = len(numeric["price"])
+
+        city_keys = pd.Series(text["city"]).str.lower()
+        state_keys = pd.Series(text["state"]).str.lower()
+        self._by_city = self._group_positions(city_keys)
+        self._by_state = self._group_positions(state_keys)
+        self._by_city_state = self._group_positions(city_keys + "|" + state_keys)
+
+    @staticmethod
+    def _group_positions(keys: pd.Series) -> Dict[str, np.ndarray]:
+        return {
+            key: np.asarray(positions, dtype=np.int64)
+            for key, positions in keys.groupby(keys, sort=False).indices.items()
+        }
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "PropertyReservoir":
+        """Build a reservoir from a properties DataFrame"""
+        df = df[df["price"].notna() & df["house_size"].notna()].reset_index(drop=True)
+        numeric = {
+            column: pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64)
+            if column in df else np.zeros(len(df))
+            for column in NUMERIC_COLUMNS
+        }
+        text = {
+            column: df[column].astype(object).where(df[column].notna(), None).to_numpy(dtype=object)
+            if column in df else np.full(len(df), None, dtype=object)
+            for column in TEXT_COLUMNS
+        }
+        # Cities/states are compared case-insensitively; keep the original spelling for output
+        text["city"] = np.array([str(v) if v is not None else "" for v in text["city"]], dtype=object)
+        text["state"] = np.array([str(v) if v is not None else "" for v in text["state"]], dtype=object)
+        return cls(numeric, text)
+
+    @classmethod
+    def from_sqlite(cls, db_path: str) -> "PropertyReservoir":
+        """Load all valid rows of the properties table in a single query"""
+        conn = sqlite3.connect(db_path)
+        try:
+            available = {row[1] for row in conn.execute("PRAGMA table_info(properties)")}
+            columns = [c for c in NUMERIC_COLUMNS + TEXT_COLUMNS if c in available]
+            df = pd.read_sql_query(
+                f"SELECT {', '.join(columns)} FROM properties "
+                "WHERE price IS NOT NULL AND house_size IS NOT NULL",
+                conn
+            )
+        finally:
+            conn.close()
+        return cls.from_frame(df)
+
+    def save(self, directory: str):
+        """Write the reservoir as .npy files so later runs can memory-map it"""
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        for column, values in self.numeric.items():
+            np.save(path / f"{column}.npy", values)
+        # Text columns are stored as category codes plus a JSON list of categories
+        for column, values in self.text.items():
+            codes, categories = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+            np.save(path / f"{column}.codes.npy", codes.astype(np.int32))
+            with open(path / f"{column}.categories.json", "w") as f:
+                json.dump([str(c) for c in categories], f)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "PropertyReservoir":
+        """Load a reservoir written by save(); numeric columns are memory-mapped"""
+        path = Path(directory)
+        mmap_mode = "r" if mmap else None
+        numeric = {column: np.load(path / f"{column}.npy", mmap_mode=mmap_mode) for column in NUMERIC_COLUMNS}
+        text = {}
+        for column in TEXT_COLUMNS:
+            codes = np.load(path / f"{column}.codes.npy")
+            with open(path / f"{column}.categories.json") as f:
+                categories = np.array(json.load(f) + [None], dtype=object)
+            # Code -1 (missing) maps to the trailing None
+            text[column] = categories[codes]
+        return cls(numeric, text)
+
+    def candidate_positions(self, city: Optional[str] = None, state: Optional[str] = None) -> np.ndarray:
+        """Row positions matching an optional city and/or state (case-insensitive)"""
+        empty = np.empty(0, dtype=np.int64)
+        if city and state:
+            return self._by_city_state.get(f"{city.lower()}|{state.lower()}", empty)
+        if city:
+            return self._by_city.get(city.lower(), empty)
+        if state:
+            return self._by_state.get(state.lower(), empty)
+        return np.arange(self.size, dtype=np.int64)
+
+    def sample_positions(
+        self,
+        count: int,
+        rng: np.random.Generator,
+        cities: Optional[Sequence[Optional[str]]] = None,
+        state: Optional[str] = None
+    ) -> np.ndarray:
+        """Draw row positions (with replacement).
+
+        When cities are given each draw first picks a city uniformly, like the
+        old per-scenario loop; draws that land on a city with no data are dropped.
+        """
+        if not cities:
+            candidates = self.candidate_positions(state=state)
+            if len(candidates) == 0:
+                return np.empty(0, dtype=np.int64)
+            return candidates[rng.integers(0, len(candidates), size=count)]
+
+        city_choice = rng.integers(0, len(cities), size=count)
+        positions = np.full(count, -1, dtype=np.int64)
+        for city_index, city in enumerate(cities):
+            mask = city_choice == city_index
+            draws = int(mask.sum())
+            candidates = self.candidate_positions(city=city, state=state)
+            if draws and len(candidates):
+                positions[mask] = candidates[rng.integers(0, len(candidates), size=draws)]
+        return positions[positions >= 0]
+
+    def rows(self, positions: np.ndarray) -> pd.DataFrame:
+        """Materialize sampled rows as a DataFrame"""
+        data = {column: values[positions] for column, values in self.text.items()}
+        data.update({column: np.asarray(values[positions]) for column, values in self.numeric.items()})
+        return pd.DataFrame(data)
+
+
+_reservoirs: Dict[Tuple[str, float], PropertyReservoir] = {}
+_reservoirs_lock = threading.Lock()
+
+
+def get_property_reservoir(db_path: str) -> PropertyReservoir:
+    """Shared reservoir for a market database, reloaded if the file changes"""
+    key = (os.path.abspath(db_path), os.path.getmtime(db_path))
+    with _reservoirs_lock:
+        reservoir = _reservoirs.get(key)
+        if reservoir is None:
+            for stale in [k for k in _reservoirs if k[0] == key[0]]:
+                del _reservoirs[stale]
+            reservoir = PropertyReservoir.from_sqlite(db_path)
+            _reservoirs[key] = reservoir
+        return reservoir
@@ -5,6 +5,7 @@ from ..services.market_data_service import MarketDataService
 from ..services.property_valuation_service import PropertyValuationService
 from ..services.investment_analyzer_service import InvestmentAnalyzerService
 from .market_simulator import MarketSimulator
+from .market_paths import DEFAULT_SEASONAL_SCHEDULE
 from .agent_trainer import AgentTrainer
 # from ..agents.portfolio_agent import PortfolioAgent
 # from ..agents.contract_agent import ContractAgent
@@ -18,6 +19,10 @@ investment_service = InvestmentAnalyzerService(market_service, valuation_service
 market_simulator = MarketSimulator(market_service)
 agent_trainer = AgentTrainer(market_simulator, investment_service)
 
+# Largest paths x days grid simulated per request; each path-day holds several
+# float arrays, so this keeps a request to a few hundred megabytes
+MAX_PATH_DAYS = 5_000_000
+
 # Global simulation state
 simulation_state = {
     "active_simulations": {},
@@ -222,6 +227,59 @@ async def simulate_market_cycle(days: int = 365):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/simulate-market-paths")
+async def simulate_market_paths(paths: int = 1000, days: int = 365, seasonal: bool = False):
+    """Simulate many independent market paths and summarize them per day"""
+    try:
+        if paths < 1 or paths > 100000:
+            raise HTTPException(status_code=400, detail="Paths must be between 1 and 100000")
+        if days < 1 or days > 3650:  # Max 10 years
+            raise HTTPException(status_code=400, detail="Days must be between 1 and 3650")
+        if paths * days > MAX_PATH_DAYS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Paths x days must not exceed {MAX_PATH_DAYS}; reduce paths or days"
+            )
+        
+        # The simulation is CPU-bound; keep it off the event loop
+        return await asyncio.to_thread(_summarize_market_paths, paths, days, seasonal)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _summarize_market_paths(paths: int, days: int, seasonal: bool) -> Dict[str, Any]:
+    market_paths = market_simulator.simulate_market_paths(
+        num_paths=paths,
+        num_days=days,
+        seasonal_schedule=DEFAULT_SEASONAL_SCHEDULE if seasonal else None
+    )
+    
+    # Sample days for response (don't return all days)
+    sample_size = min(50, days)
+    sample_indices = [int(i * days / sample_size) for i in range(sample_size)]
+    momentum_bands = market_paths.percentile_bands("price_momentum")
+    rate_bands = market_paths.percentile_bands("interest_rate")
+    trend_shares = market_paths.trend_shares()
+    
+    return {
+        "simulation_paths": paths,
+        "simulation_days": days,
+        "sampled_days": [
+            {
+                "day": idx,
+                "price_momentum": {band: round(float(values[idx]), 3) for band, values in momentum_bands.items()},
+                "interest_rate": {band: round(float(values[idx]), 2) for band, values in rate_bands.items()},
+                "trend_share": {trend: round(float(values[idx]), 3) for trend, values in trend_shares.items()}
+            }
+            for idx in sample_indices
+        ],
+        "summary": {
+            "final_avg_interest_rate": round(float(market_paths.interest_rate[:, -1].mean()), 2),
+            "final_avg_price_momentum": round(float(market_paths.price_momentum[:, -1].mean()), 3)
+        }
+    }
+
 @router.get("/active-deals")
 async def get_active_deals():
     """Get all active simulated deals"""
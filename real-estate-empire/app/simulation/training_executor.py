@@ -0,0 +1,278 @@
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import Executor
+from dataclasses import dataclass, asdict, is_dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .agent_trainer import AgentTrainer, TrainingScenario, TrainingResult, evaluate_scenario
+
+
+def scenario_rng(root_seed: int, index: int, stream: int = 0) -> np.random.Generator:
+    """Independent generator for scenario `index` of a run seeded with root_seed.
+
+    Derived with SeedSequence spawn keys, so a scenario's contents depend only on
+    (root_seed, index) and not on how many scenarios ran before it or in what order.
+    Other streams give further independent generators for the same index.
+    """
+    return np.random.default_rng(np.random.SeedSequence(root_seed, spawn_key=(index, stream)))
+
+
+@dataclass
+class ScenarioSpec:
+    """One planned training scenario"""
+    index: int
+    scenario_type: str
+    difficulty: float
+    phase: str = "training"
+
+
+class TrainingResultStore:
+    """Append-only JSONL store for training results
+
+    Each completed scenario is written (and flushed) as one line as soon as it
+    finishes, so long curricula never hold every result in memory to save them.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = None
+
+    def append(self, record: Dict[str, Any]):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(record, default=_json_default) + "\n")
+        self._file.flush()
+
+    def append_result(self, spec: ScenarioSpec, result: TrainingResult, seed: Optional[int] = None, **extra):
+        record = {
+            "index": spec.index,
+            "phase": spec.phase,
+            "scenario_type": spec.scenario_type,
+            "difficulty": spec.difficulty,
+            "seed": seed,
+            **asdict(result),
+            **extra
+        }
+        self.append(record)
+
+    def read(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over stored records"""
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _json_default(obj):
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if is_dataclass(obj):
+        return asdict(obj)
+    return str(obj)
+
+
+class LearningCurveTracker:
+    """Learning curve statistics maintained incrementally as scores arrive
+
+    Plateau and breakthrough rules match TrainingFramework._detect_learning_plateau
+    and _identify_breakthroughs, but each new score is O(window) instead of
+    rescanning the whole curve.
+    """
+
+    def __init__(self, plateau_window: int = 10, plateau_min_points: int = 20,
+                 plateau_std: float = 5.0, plateau_ceiling: float = 80.0,
+                 breakthrough_window: int = 5, breakthrough_jump: float = 15.0):
+        self.plateau_window = plateau_window
+        self.plateau_min_points = plateau_min_points
+        self.plateau_std = plateau_std
+        self.plateau_ceiling = plateau_ceiling
+        self.breakthrough_window = breakthrough_window
+        self.breakthrough_jump = breakthrough_jump
+
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.best = None
+        self.first_score = None
+        self.last_score = None
+        self.early_scores: List[float] = []
+        self.recent = deque(maxlen=max(plateau_window, breakthrough_window))
+        self.breakthroughs: List[Dict[str, Any]] = []
+
+    def add(self, score: float, timestamp: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """Add a score; returns the breakthrough record if this score is one"""
+        score = float(score)
+        breakthrough = None
+        if len(self.recent) >= self.breakthrough_window:
+            previous_avg = float(np.mean(list(self.recent)[-self.breakthrough_window:]))
+            if score > previous_avg + self.breakthrough_jump:
+                breakthrough = {
+                    "iteration": self.count,
+                    "score_jump": score - previous_avg,
+                    "timestamp": (timestamp or datetime.now()).isoformat()
+                }
+                self.breakthroughs.append(breakthrough)
+
+        # Welford running mean/variance
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (score - self.mean)
+
+        self.best = score if self.best is None else max(self.best, score)
+        if self.first_score is None:
+            self.first_score = score
+        self.last_score = score
+        if len(self.early_scores) < self.plateau_window:
+            self.early_scores.append(score)
+        self.recent.append(score)
+        return breakthrough
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self._m2 / self.count)) if self.count else 0.0
+
+    @property
+    def recent_scores(self) -> List[float]:
+        return list(self.recent)[-self.plateau_window:]
+
+    @property
+    def plateau(self) -> bool:
+        """True when recent scores are flat and still below the ceiling"""
+        if self.count < self.plateau_min_points:
+            return False
+        recent = self.recent_scores
+        return float(np.std(recent)) < self.plateau_std and float(np.mean(recent)) < self.plateau_ceiling
+
+    @property
+    def improvement_rate(self) -> float:
+        """Mean of the latest window minus mean of the first window"""
+        if self.count <= self.plateau_window:
+            return 0.0
+        return float(np.mean(self.recent_scores) - np.mean(self.early_scores))
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "points": self.count,
+            "average_score": self.mean,
+            "std": self.std,
+            "best_score": self.best,
+            "improvement": (self.last_score - self.first_score) if self.count > 1 else 0,
+            "improvement_rate": self.improvement_rate,
+            "plateau_detected": self.plateau,
+            "breakthroughs": list(self.breakthroughs)
+        }
+
+
+ScenarioFactory = Callable[[ScenarioSpec, np.random.Generator], Union[TrainingScenario, Awaitable[TrainingScenario]]]
+ResultCallback = Callable[[ScenarioSpec, TrainingScenario, TrainingResult], Optional[Awaitable[None]]]
+
+
+class TrainingExecutor:
+    """Runs independent training scenarios concurrently with per-scenario seeds
+
+    Agent decisions (typically LLM-bound) run as asyncio tasks, at most
+    max_concurrency at a time. Decision scoring runs on evaluation_executor when
+    one is given (e.g. a ProcessPoolExecutor for expensive evaluation). Every
+    scenario gets its own generator from (seed, index), so the same seed replays
+    the same scenarios whatever the concurrency. Results stream to the optional
+    append-only store and learning curve tracker as they complete.
+    """
+
+    def __init__(self, trainer: AgentTrainer, max_concurrency: int = 8, seed: Optional[int] = None,
+                 result_store: Optional[TrainingResultStore] = None,
+                 evaluation_executor: Optional[Executor] = None,
+                 learning_curve: Optional[LearningCurveTracker] = None):
+        self.trainer = trainer
+        self.max_concurrency = max(1, max_concurrency)
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy % (2 ** 63))
+        self.result_store = result_store
+        self.evaluation_executor = evaluation_executor
+        self.learning_curve = learning_curve
+        self._next_index = 0
+
+    def plan(self, scenario_types: Sequence[str], difficulties: Sequence[float],
+             phase: str = "training", choose_types: bool = False) -> List[ScenarioSpec]:
+        """Plan one scenario per difficulty.
+
+        With choose_types the type of each scenario is drawn from scenario_types using
+        the run seed; otherwise scenario_types is used as given (one per difficulty).
+        """
+        start = self._next_index
+        count = len(difficulties)
+        if choose_types:
+            rng = scenario_rng(self.seed, start, stream=1)
+            types = [scenario_types[i] for i in rng.integers(0, len(scenario_types), size=count)]
+        else:
+            types = list(scenario_types)
+        self._next_index += count
+        return [
+            ScenarioSpec(index=start + i, scenario_type=types[i], difficulty=float(difficulties[i]), phase=phase)
+            for i in range(count)
+        ]
+
+    async def run(self, agent, specs: Sequence[ScenarioSpec],
+                  scenario_factory: Optional[ScenarioFactory] = None,
+                  on_result: Optional[ResultCallback] = None) -> List[TrainingResult]:
+        """Run the planned scenarios and return their results in plan order"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_running_loop()
+        results: Dict[int, TrainingResult] = {}
+
+        async def run_one(spec: ScenarioSpec):
+            async with semaphore:
+                rng = scenario_rng(self.seed, spec.index)
+                if scenario_factory is None:
+                    scenario = self.trainer.create_training_scenario(spec.scenario_type, spec.difficulty, rng=rng)
+                else:
+                    scenario = scenario_factory(spec, rng)
+                    if asyncio.iscoroutine(scenario):
+                        scenario = await scenario
+
+                started = time.perf_counter()
+                decision = await self.trainer.get_agent_decision(agent, scenario)
+                decision_time = time.perf_counter() - started
+
+                if self.evaluation_executor is not None:
+                    score, learning_points = await loop.run_in_executor(
+                        self.evaluation_executor, evaluate_scenario,
+                        decision, scenario.expected_outcome, scenario.difficulty_level
+                    )
+                else:
+                    score, learning_points = evaluate_scenario(
+                        decision, scenario.expected_outcome, scenario.difficulty_level
+                    )
+
+                result = self.trainer.record_result(agent, scenario, decision, score, learning_points)
+                result.decision_time = decision_time
+                results[spec.index] = result
+
+                if self.learning_curve is not None:
+                    self.learning_curve.add(result.performance_score, result.timestamp)
+                if self.result_store is not None:
+                    self.result_store.append_result(spec, result, seed=self.seed, decision_time=decision_time)
+                if on_result is not None:
+                    callback = on_result(spec, scenario, result)
+                    if asyncio.iscoroutine(callback):
+                        await callback
+
+        await asyncio.gather(*(run_one(spec) for spec in specs))
+        return [results[spec.index] for spec in specs]
@@ -1,5 +1,6 @@
 import asyncio
 import json
+import random
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 import numpy as np
@@ -7,6 +8,7 @@ from dataclasses import dataclass
 
 from ..simulation.homeowner_simulator import HomeownerConversationSimulator, HomeownerProfile, ConversationContext
 from ..simulation.market_simulator import MarketSimulator
+from ..simulation.scenario_corpus import ScenarioCorpus, ScenarioCorpusWriter
 
 @dataclass
 class ConversationTrainingResult:
@@ -63,8 +65,16 @@ class ConversationTrainer:
                                          agent,
                                          num_conversations: int = 10,
                                          scenario_types: List[str] = None,
-                                         difficulty_progression: bool = True) -> Dict[str, Any]:
-        """Train an agent on realistic homeowner conversations"""
+                                         difficulty_progression: bool = True,
+                                         corpus: Optional[ScenarioCorpus] = None,
+                                         worker_index: int = 0,
+                                         num_workers: int = 1) -> Dict[str, Any]:
+        """Train an agent on realistic homeowner conversations
+        
+        With a corpus, the stored conversations (this worker's shards, at most
+        num_conversations) are replayed instead of generated, so evaluations run
+        on identical inputs.
+        """
         
         if scenario_types is None:
             scenario_types = ["cold_call", "follow_up", "objection_handling", "negotiation"]
@@ -75,24 +85,31 @@ class ConversationTrainer:
         
         training_results = []
         
-        for i in range(num_conversations):
-            # Progressive difficulty
-            if difficulty_progression:
-                difficulty = 0.3 + (i / num_conversations) * 0.6
-            else:
-                difficulty = np.random.uniform(0.4, 0.8)
-            
-            # Select scenario type
-            scenario_type = np.random.choice(scenario_types)
-            
-            print(f"   Conversation {i+1}/{num_conversations}: {scenario_type} (difficulty: {difficulty:.2f})")
-            
-            # Generate conversation scenario
-            result = await self._run_conversation_training(agent, scenario_type, difficulty)
-            training_results.append(result)
-            
-            # Brief pause between conversations
-            await asyncio.sleep(0.1)
+        if corpus is not None:
+            print(f"   Replaying corpus {corpus.corpus_id} (worker {worker_index + 1}/{num_workers})")
+            for scenario in self.homeowner_simulator.replay_conversations(
+                corpus, worker_index, num_workers, limit=num_conversations
+            ):
+                training_results.append(await self._train_on_scenario(agent, scenario))
+        else:
+            for i in range(num_conversations):
+                # Progressive difficulty
+                if difficulty_progression:
+                    difficulty = 0.3 + (i / num_conversations) * 0.6
+                else:
+                    difficulty = np.random.uniform(0.4, 0.8)
+                
+                # Select scenario type
+                scenario_type = np.random.choice(scenario_types)
+                
+                print(f"   Conversation {i+1}/{num_conversations}: {scenario_type} (difficulty: {difficulty:.2f})")
+                
+                # Generate conversation scenario
+                result = await self._run_conversation_training(agent, scenario_type, difficulty)
+                training_results.append(result)
+                
+                # Brief pause between conversations
+                await asyncio.sleep(0.1)
         
         # Analyze overall performance
         session_analysis = self._analyze_training_session(agent.agent_id, training_results)
@@ -149,6 +166,13 @@ class ConversationTrainer:
             homeowner_profile, context
         )
         
+        return await self._train_on_scenario(agent, conversation_scenario)
+    
+    async def _train_on_scenario(self, agent, conversation_scenario: Dict[str, Any]) -> ConversationTrainingResult:
+        """Evaluate an agent on a generated or replayed conversation scenario"""
+        homeowner_profile = conversation_scenario["homeowner_profile"]
+        scenario_type = conversation_scenario["context"].scenario_type
+        
         # Have agent respond to each homeowner message
         agent_responses = await self._simulate_agent_responses(agent, conversation_scenario)
         
@@ -179,6 +203,47 @@ class ConversationTrainer:
             timestamp=datetime.now()
         )
     
+    async def build_conversation_corpus(self,
+                                        directory: str,
+                                        num_conversations: int = 100,
+                                        scenario_types: List[str] = None,
+                                        seed: Optional[int] = None,
+                                        max_concurrency: int = 8,
+                                        shard_size: int = 10000) -> ScenarioCorpus:
+        """Generate deals and conversations once and store them as a replayable corpus
+        
+        seed drives both the deal frame and conversation planning (property, scenario
+        and homeowner profile draws), so the same seed plans the same corpus.
+        """
+        if scenario_types is None:
+            scenario_types = ["cold_call", "follow_up", "objection_handling", "negotiation"]
+        
+        rng = np.random.default_rng(seed)
+        with ScenarioCorpusWriter(directory, name="conversations", seed=seed, shard_size=shard_size,
+                                  metadata={"scenario_types": scenario_types}) as writer:
+            frame = self.market_simulator.generate_scenario_frame(num_conversations, rng=rng)
+            writer.add_deals(frame)
+            planner = random.Random(int(rng.integers(2**63)))
+            deals = self.market_simulator._deals_from_frame(frame)
+            property_data_list = [
+                {
+                    "asking_price": deal.asking_price,
+                    "city": deal.property_data["city"],
+                    "state": deal.property_data["state"],
+                    "bedrooms": deal.property_data["bedrooms"],
+                    "bathrooms": deal.property_data["bathrooms"],
+                    "house_size": deal.property_data["house_size"],
+                    "property_type": "single_family"
+                }
+                for deal in deals
+            ]
+            await self.homeowner_simulator.generate_conversation_batch(
+                property_data_list, scenario_types, count=num_conversations,
+                max_concurrency=max_concurrency, corpus_writer=writer, return_results=False,
+                rng=planner
+            )
+        return ScenarioCorpus(directory)
+    
     def _get_scenario_goal(self, scenario_type: str) -> str:
         """Get the goal for different scenario types"""
         goals = {
@@ -5,10 +5,14 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Callable
 from dataclasses import dataclass, asdict
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from ..simulation.market_simulator import MarketSimulator
 from ..simulation.agent_trainer import AgentTrainer, TrainingScenario, TrainingResult
+from ..simulation.training_executor import (
+    TrainingExecutor, TrainingResultStore, LearningCurveTracker, ScenarioSpec
+)
 from ..services.market_data_service import MarketDataService
 from ..services.investment_analyzer_service import InvestmentAnalyzerService
 
@@ -27,6 +31,9 @@ class TrainingConfig:
     max_training_iterations: int = 1000
     save_checkpoints: bool = True
     checkpoint_interval: int = 50
+    max_concurrency: int = 8  # scenarios evaluated concurrently within a phase
+    seed: Optional[int] = None  # root seed; the same seed replays the same scenarios
+    evaluation_workers: int = 0  # >0 scores decisions in a process pool
 
 @dataclass
 class LearningCurve:
@@ -64,6 +71,7 @@ class TrainingFramework:
         self.training_sessions: Dict[str, Dict] = {}
         self.agent_profiles: Dict[str, AgentProfile] = {}
         self.learning_curves: Dict[str, List[LearningCurve]] = {}
+        self.learning_trackers: Dict[str, LearningCurveTracker] = {}
         self.training_data_path = Path("training_data")
         self.training_data_path.mkdir(exist_ok=True)
     
@@ -89,6 +97,7 @@ class TrainingFramework:
         
         self.agent_profiles[agent_id] = profile
         self.learning_curves[agent_id] = []
+        self.learning_trackers[agent_id] = LearningCurveTracker()
         
         return TrainingAgent(agent_id, agent_type, self)
     
@@ -110,25 +119,32 @@ class TrainingFramework:
         
         self.training_sessions[session_id] = session_data
         
+        # Results stream to an append-only JSONL file as scenarios complete
+        store = TrainingResultStore(self.training_data_path / f"{session_id}.results.jsonl")
+        process_pool = ProcessPoolExecutor(config.evaluation_workers) if config.evaluation_workers > 0 else None
+        executor = self._create_executor(config, store, process_pool)
+        session_data["seed"] = executor.seed
+        session_data["results_path"] = str(store.path)
+        
         try:
             # Phase 1: Foundation Training
             logger.info("Phase 1: Foundation Training")
-            foundation_results = await self._run_foundation_training(agent, config)
+            foundation_results = await self._run_foundation_training(agent, config, executor)
             session_data["results"].extend(foundation_results)
             
             # Phase 2: Specialized Training
             logger.info("Phase 2: Specialized Training")
-            specialized_results = await self._run_specialized_training(agent, config)
+            specialized_results = await self._run_specialized_training(agent, config, executor)
             session_data["results"].extend(specialized_results)
             
             # Phase 3: Advanced Scenarios
             logger.info("Phase 3: Advanced Scenarios")
-            advanced_results = await self._run_advanced_training(agent, config)
+            advanced_results = await self._run_advanced_training(agent, config, executor)
             session_data["results"].extend(advanced_results)
             
             # Phase 4: Performance Evaluation
             logger.info("Phase 4: Performance Evaluation")
-            evaluation_results = await self._run_performance_evaluation(agent, config)
+            evaluation_results = await self._run_performance_evaluation(agent, config, executor)
             
             # Update agent profile
             await self._update_agent_profile(agent, session_data["results"])
@@ -156,73 +172,91 @@ class TrainingFramework:
             session_data["status"] = "failed"
             session_data["error"] = str(e)
             raise
+        finally:
+            store.close()
+            if process_pool:
+                process_pool.shutdown()
+    
+    def _create_executor(self, config: TrainingConfig, store: Optional[TrainingResultStore] = None,
+                         evaluation_executor=None) -> TrainingExecutor:
+        """Scenario executor for one training program"""
+        return TrainingExecutor(
+            self.agent_trainer,
+            max_concurrency=config.max_concurrency,
+            seed=config.seed,
+            result_store=store,
+            evaluation_executor=evaluation_executor
+        )
+    
+    def _feedback_callback(self, agent: 'TrainingAgent', phase: str, first_index: int):
+        """on_result callback giving feedback and recording the learning curve"""
+        async def on_result(spec: ScenarioSpec, scenario: TrainingScenario, result: TrainingResult):
+            await agent.receive_feedback(self._generate_feedback(result))
+            self._record_learning_point(agent, result, spec.index - first_index, phase, spec.difficulty)
+        return on_result
     
-    async def _run_foundation_training(self, agent: 'TrainingAgent', config: TrainingConfig) -> List[TrainingResult]:
+    async def _run_foundation_training(self, agent: 'TrainingAgent', config: TrainingConfig,
+                                       executor: Optional[TrainingExecutor] = None) -> List[TrainingResult]:
         """Run foundation training phase"""
-        results = []
+        executor = executor or self._create_executor(config)
         
         # Basic deal analysis scenarios
-        for i in range(20):
-            difficulty = 0.2 + (i / 20) * 0.3  # 0.2 to 0.5
-            scenario = self.agent_trainer.create_training_scenario("deal_analysis", difficulty)
-            result = await self._train_with_feedback(agent, scenario)
-            results.append(result)
-            
-            # Track learning curve
-            self._record_learning_point(agent, result, i, "foundation")
+        difficulties = [0.2 + (i / 20) * 0.3 for i in range(20)]  # 0.2 to 0.5
+        specs = executor.plan(["deal_analysis"] * 20, difficulties, phase="foundation")
         
-        return results
+        return await executor.run(
+            agent, specs, on_result=self._feedback_callback(agent, "foundation", specs[0].index)
+        )
     
-    async def _run_specialized_training(self, agent: 'TrainingAgent', config: TrainingConfig) -> List[TrainingResult]:
+    async def _run_specialized_training(self, agent: 'TrainingAgent', config: TrainingConfig,
+                                        executor: Optional[TrainingExecutor] = None) -> List[TrainingResult]:
         """Run specialized training based on agent type"""
-        results = []
+        executor = executor or self._create_executor(config)
         
         scenario_types = config.scenario_types or ["deal_analysis", "negotiation", "portfolio_management"]
         
+        types, difficulties = [], []
         for scenario_type in scenario_types:
             for i in range(15):
-                difficulty = 0.4 + (i / 15) * 0.4  # 0.4 to 0.8
-                scenario = self.agent_trainer.create_training_scenario(scenario_type, difficulty)
-                result = await self._train_with_feedback(agent, scenario)
-                results.append(result)
-                
-                # Track learning curve
-                self._record_learning_point(agent, result, len(results), "specialized")
-        
-        return results
+                types.append(scenario_type)
+                difficulties.append(0.4 + (i / 15) * 0.4)  # 0.4 to 0.8
+        specs = executor.plan(types, difficulties, phase="specialized")
+        
+        return await executor.run(
+            agent, specs, on_result=self._feedback_callback(agent, "specialized", specs[0].index)
+        )
     
-    async def _run_advanced_training(self, agent: 'TrainingAgent', config: TrainingConfig) -> List[TrainingResult]:
+    async def _run_advanced_training(self, agent: 'TrainingAgent', config: TrainingConfig,
+                                     executor: Optional[TrainingExecutor] = None) -> List[TrainingResult]:
         """Run advanced training with complex scenarios"""
-        results = []
+        executor = executor or self._create_executor(config)
         
-        # Multi-step scenarios
-        for i in range(10):
-            difficulty = 0.7 + (i / 10) * 0.3  # 0.7 to 1.0
-            
-            # Create complex scenario with multiple properties
-            scenario = await self._create_complex_scenario(difficulty)
-            result = await self._train_with_feedback(agent, scenario)
-            results.append(result)
-            
-            # Track learning curve
-            self._record_learning_point(agent, result, len(results), "advanced")
+        # Multi-step scenarios with multiple properties
+        difficulties = [0.7 + (i / 10) * 0.3 for i in range(10)]  # 0.7 to 1.0
+        specs = executor.plan(["portfolio_optimization"] * 10, difficulties, phase="advanced")
         
-        return results
+        return await executor.run(
+            agent, specs,
+            scenario_factory=lambda spec, rng: self._create_complex_scenario(spec.difficulty, rng),
+            on_result=self._feedback_callback(agent, "advanced", specs[0].index)
+        )
     
-    async def _create_complex_scenario(self, difficulty: float) -> TrainingScenario:
+    async def _create_complex_scenario(self, difficulty: float,
+                                       rng: Optional[np.random.Generator] = None) -> TrainingScenario:
         """Create complex multi-property scenario"""
+        rng = rng if rng is not None else self.market_simulator.rng
         
         # Generate multiple deals for portfolio decision
-        deals = self.market_simulator.generate_batch_scenarios(3, ["Miami", "Orlando", "Tampa"])
+        deals = self.market_simulator.generate_batch_scenarios(3, ["Miami", "Orlando", "Tampa"], rng=rng)
         
         # Create complex scenario
         scenario_data = {
             "scenario_type": "portfolio_optimization",
             "deals": deals,
             "budget_constraint": 1000000,
-            "risk_tolerance": np.random.uniform(0.3, 0.8),
-            "time_constraint": np.random.randint(30, 90),
-            "market_outlook": np.random.choice(["bullish", "bearish", "neutral"])
+            "risk_tolerance": rng.uniform(0.3, 0.8),
+            "time_constraint": rng.integers(30, 90),
+            "market_outlook": rng.choice(["bullish", "bearish", "neutral"])
         }
         
         # Calculate expected outcome
@@ -234,7 +268,7 @@ class TrainingFramework:
         }
         
         return TrainingScenario(
-            scenario_id=f"COMPLEX_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            scenario_id=f"COMPLEX_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{rng.integers(1000, 10000)}",
             scenario_type="portfolio_optimization",
             deal=deals[0],  # Primary deal
             expected_outcome=expected_outcome,
@@ -296,7 +330,8 @@ class TrainingFramework:
         
         return feedback
     
-    def _record_learning_point(self, agent: 'TrainingAgent', result: TrainingResult, iteration: int, phase: str):
+    def _record_learning_point(self, agent: 'TrainingAgent', result: TrainingResult, iteration: int, phase: str,
+                               difficulty: float = 0.5):
         """Record a point on the learning curve"""
         
         learning_point = LearningCurve(
@@ -304,15 +339,19 @@ class TrainingFramework:
             timestamp=result.timestamp,
             performance_score=result.performance_score,
             scenario_type=phase,
-            difficulty=0.5,  # Would get from scenario
+            difficulty=difficulty,
             decision_time=getattr(result, 'decision_time', 0.0),
             confidence=result.decision.get('confidence', 0.5),
             learning_rate=0.1  # Would calculate based on improvement
         )
         
         self.learning_curves[agent.agent_id].append(learning_point)
+        self.learning_trackers.setdefault(agent.agent_id, LearningCurveTracker()).add(
+            result.performance_score, result.timestamp
+        )
     
-    async def _run_performance_evaluation(self, agent: 'TrainingAgent', config: TrainingConfig) -> Dict[str, Any]:
+    async def _run_performance_evaluation(self, agent: 'TrainingAgent', config: TrainingConfig,
+                                          executor: Optional[TrainingExecutor] = None) -> Dict[str, Any]:
         """Run comprehensive performance evaluation"""
         
         evaluation_results = {
@@ -325,17 +364,15 @@ class TrainingFramework:
             "recommendations": []
         }
         
-        # Test on standardized scenarios
-        test_scenarios = []
+        # Test on standardized scenarios (no feedback, not part of the learning curve)
+        executor = executor or self._create_executor(config)
+        types, difficulties = [], []
         for scenario_type in ["deal_analysis", "negotiation", "portfolio_management"]:
             for difficulty in [0.3, 0.6, 0.9]:
-                scenario = self.agent_trainer.create_training_scenario(scenario_type, difficulty)
-                test_scenarios.append(scenario)
-        
-        test_results = []
-        for scenario in test_scenarios:
-            result = await self.agent_trainer.train_agent(agent, scenario)
-            test_results.append(result)
+                types.append(scenario_type)
+                difficulties.append(difficulty)
+        specs = executor.plan(types, difficulties, phase="evaluation")
+        test_results = await executor.run(agent, specs)
         
         # Calculate metrics
         scores = [r.performance_score for r in test_results]
@@ -350,10 +387,9 @@ class TrainingFramework:
                 evaluation_results["category_scores"][scenario_type] = np.mean(category_scores)
         
         # Learning curve analysis
-        if len(self.learning_curves[agent.agent_id]) > 10:
-            recent_scores = [lp.performance_score for lp in self.learning_curves[agent.agent_id][-10:]]
-            early_scores = [lp.performance_score for lp in self.learning_curves[agent.agent_id][:10]]
-            evaluation_results["improvement_rate"] = np.mean(recent_scores) - np.mean(early_scores)
+        tracker = self.learning_trackers.get(agent.agent_id)
+        if tracker is not None:
+            evaluation_results["improvement_rate"] = tracker.improvement_rate
         
         return evaluation_results
     
@@ -399,6 +435,7 @@ class TrainingFramework:
         results = session_data["results"]
         profile = self.agent_profiles[agent.agent_id]
         learning_curve = self.learning_curves[agent.agent_id]
+        tracker = self.learning_trackers.get(agent.agent_id)
         
         # Performance summary
         scores = [r.performance_score for r in results]
@@ -416,8 +453,8 @@ class TrainingFramework:
             "total_scenarios": len(results),
             "training_duration": str(session_data.get("end_time", datetime.now()) - session_data["start_time"]),
             "learning_velocity": profile.learning_velocity,
-            "plateau_detection": self._detect_learning_plateau(learning_curve),
-            "breakthrough_moments": self._identify_breakthroughs(learning_curve)
+            "plateau_detection": tracker.plateau if tracker else self._detect_learning_plateau(learning_curve),
+            "breakthrough_moments": list(tracker.breakthroughs) if tracker else self._identify_breakthroughs(learning_curve)
         }
         
         # Recommendations
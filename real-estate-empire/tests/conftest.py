@@ -0,0 +1,105 @@
+"""
+Shared test configuration
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.lead import PropertyLeadDB
+from app.models.property import PropertyDB
+from app.models.neighborhood_analysis import (
+    Amenity, AmenityTypeEnum, CrimeIncident, CrimeTypeEnum, School, SchoolTypeEnum
+)
+from app.services import geocoding_service
+
+
+@pytest.fixture(autouse=True)
+def in_memory_geocode_cache(monkeypatch):
+    """Services built during a test share a throwaway geocode cache instead of a file"""
+    monkeypatch.setenv("GEOCODER_CACHE_PATH", ":memory:")
+    monkeypatch.setattr(geocoding_service, "_shared_service", None)
+
+
+@pytest.fixture
+def sqlite_session():
+    """Factory for sessions on a fresh in-memory SQLite database holding only the given models' tables"""
+    sessions = []
+
+    def make(*models):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine, tables=[model.__table__ for model in models])
+        session = sessionmaker(bind=engine)()
+        sessions.append(session)
+        return session
+
+    yield make
+    for session in sessions:
+        session.close()
+
+
+def random_neighborhood_datasets(seed=7, n_schools=300, n_amenities=2000, n_incidents=5000, spread=0.15):
+    """Schools, amenities and crime incidents scattered around lower Manhattan
+
+    Every 11th school has no rating and every 7th incident no severity, so
+    scoring paths see missing values too.
+    """
+    rng = np.random.default_rng(seed)
+    school_types = list(SchoolTypeEnum)
+    amenity_types = list(AmenityTypeEnum)
+    crime_types = list(CrimeTypeEnum)
+
+    def points(n):
+        return 40.7 + rng.uniform(-spread, spread, n), -74.0 + rng.uniform(-spread, spread, n)
+
+    lats, lngs = points(n_schools)
+    schools = [School(name=f"School {i}", school_type=school_types[i % len(school_types)], address="x",
+                      latitude=lats[i], longitude=lngs[i], rating=None if i % 11 == 0 else float(rng.uniform(3, 10)))
+               for i in range(n_schools)]
+    lats, lngs = points(n_amenities)
+    amenities = [Amenity(name=f"Amenity {i}", amenity_type=amenity_types[i % len(amenity_types)],
+                         latitude=lats[i], longitude=lngs[i]) for i in range(n_amenities)]
+    lats, lngs = points(n_incidents)
+    incidents = [CrimeIncident(incident_date=datetime.now() - timedelta(days=int(rng.integers(1, 600))),
+                               latitude=lats[i], longitude=lngs[i], crime_type=crime_types[i % len(crime_types)],
+                               crime_description="incident", severity=int(rng.integers(1, 6)) if i % 7 else None)
+                 for i in range(n_incidents)]
+    return schools, amenities, incidents
+
+
+@pytest.fixture
+def make_neighborhood_datasets():
+    """Factory for random schools, amenities and incidents; the same arguments give the same data"""
+    return random_neighborhood_datasets
+
+
+def transient_lead(year_built=None, **lead_fields):
+    """Build a transient lead with an attached property"""
+    property_record = PropertyDB(
+        id=uuid.uuid4(),
+        address="123 Main St",
+        city="Austin",
+        state="TX",
+        zip_code="78701",
+        property_type="single_family",
+        year_built=year_built
+    )
+    lead = PropertyLeadDB(
+        id=uuid.uuid4(),
+        property_id=property_record.id,
+        source="other",
+        **lead_fields
+    )
+    lead.property = property_record
+    return lead
+
+
+@pytest.fixture
+def make_lead():
+    """Factory for transient leads, each with its own Austin single-family property"""
+    return transient_lead
@@ -0,0 +1,112 @@
+"""
+Tests for the token-budgeted agent context builder
+"""
+
+from datetime import datetime
+
+from app.core.agent_state import AgentType, Deal, StateManager
+from app.core.context_builder import AgentContextBuilder
+from app.services.llm_rate_limiter import estimate_tokens
+
+
+def add_messages(state, count, start=0, priority=1):
+    for i in range(start, start + count):
+        StateManager.add_agent_message(state, AgentType.SCOUT, f"Scout update number {i} " + "x" * 80,
+                                       priority=priority)
+
+
+def add_deals(state, count, start=0):
+    for i in range(start, start + count):
+        StateManager.add_deal(state, Deal(
+            property_address=f"{i} Main St", city="Austin", state="TX", zip_code="78701",
+            listing_price=200000 + i * 1000
+        ))
+
+
+def test_only_new_messages_are_shown_each_turn():
+    """Test an agent sees messages since its last turn; older ones are summarized"""
+    builder = AgentContextBuilder()
+    state = StateManager.create_initial_state()
+    add_messages(state, 3)
+
+    first = builder.build(state, "analyst")
+    assert "Scout update number 2" in first
+    assert "Earlier activity" not in first
+
+    add_messages(state, 2, start=3)
+    second = builder.build(state, "analyst")
+    assert "Scout update number 4" in second
+    assert "Scout update number 1 " not in second
+    assert "Earlier activity: 3 messages (scout 3)" in second
+
+    # Cursors are per agent
+    assert "Scout update number 0" in builder.build(state, "supervisor")
+
+
+def test_context_stays_within_budget_as_history_grows():
+    builder = AgentContextBuilder(token_budget=400)
+    state = StateManager.create_initial_state()
+    sizes = []
+
+    for turn in range(20):
+        add_messages(state, 50, start=turn * 50, priority=4 if turn % 5 == 0 else 1)
+        add_deals(state, 20, start=turn * 20)
+        context = builder.build(state, "supervisor")
+        sizes.append(estimate_tokens(context))
+
+    assert max(sizes) <= 400 + 60
+    assert "more new messages not shown" in context
+    assert "more changed deals not shown" in context
+    assert "Deal pipeline: 400 deals (discovered 400)" in context
+    assert "Earlier activity: 950 messages" in context
+
+
+def test_deal_fragments_are_cached_per_version():
+    """Test unchanged deals reuse their fragment and updated deals are re-rendered"""
+    builder = AgentContextBuilder()
+    state = StateManager.create_initial_state()
+    add_deals(state, 2)
+    deal = state["current_deals"][0]
+
+    fragment = builder.deal_fragment(deal)
+    assert builder.deal_fragment(dict(deal)) is fragment
+    assert "0 Main St, Austin, TX 78701" in fragment
+    assert "list $200,000" in fragment
+
+    builder.build(state, "analyst")
+    assert "New or updated deals" not in builder.build(state, "analyst")
+
+    deal.update({"arv_estimate": 310000, "last_updated": datetime(2030, 1, 1).isoformat()})
+    context = builder.build(state, "analyst")
+    assert "ARV $310,000" in context
+    assert "1 Main St" not in context
+
+
+def test_replaced_history_resets_cursor():
+    builder = AgentContextBuilder()
+    state = StateManager.create_initial_state()
+    add_messages(state, 5)
+    builder.build(state, "scout")
+
+    state["agent_messages"] = []
+    add_messages(state, 1, start=100)
+    context = builder.build(state, "scout")
+    assert "Scout update number 100" in context
+    assert "Earlier activity" not in context
+
+
+def test_deals_cut_by_the_budget_are_shown_on_later_turns():
+    """Test only rendered deals are marked seen, so truncated ones come back next turn"""
+    builder = AgentContextBuilder(token_budget=60)
+    state = StateManager.create_initial_state()
+    add_deals(state, 20)
+
+    shown = set()
+    for _ in range(20):
+        context = builder.build(state, "analyst")
+        shown.update(line.split(",")[0][2:] for line in context.splitlines() if line.startswith("- "))
+        if "New or updated deals" not in context:
+            break
+
+    assert shown == {f"{i} Main St" for i in range(20)}
+    assert context == "Deal pipeline: 20 deals (discovered 20)"
@@ -412,6 +412,72 @@ class TestBulkExport:
         assert response.status_code == 404
         assert "No properties found" in response.json()["detail"]
 
+class TestStreamingBulkExport:
+    """Test filter-based streaming bulk export"""
+    
+    def test_stream_csv_by_filter(self, created_property_with_analysis):
+        """Test streaming CSV export selected by filters"""
+        response = client.get(
+            "/api/v1/export/bulk/stream",
+            params={"city": created_property_with_analysis["city"], "batch_size": 1}
+        )
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        
+        rows = list(csv.DictReader(io.StringIO(response.content.decode('utf-8'))))
+        assert len(rows) >= 1
+        assert all(row["city"] == created_property_with_analysis["city"] for row in rows)
+        assert "latest_analysis_type" in rows[0]
+    
+    def test_stream_ndjson_gzip(self, created_property_with_analysis):
+        """Test gzip-compressed NDJSON export"""
+        import gzip
+        
+        response = client.get(
+            "/api/v1/export/bulk/stream",
+            params={
+                "format": "ndjson",
+                "gzip": True,
+                "zip_code": created_property_with_analysis["zip_code"],
+                "include_analysis": False
+            }
+        )
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/gzip"
+        assert ".ndjson.gz" in response.headers["content-disposition"]
+        
+        lines = gzip.decompress(response.content).decode('utf-8').splitlines()
+        records = [json.loads(line) for line in lines]
+        assert created_property_with_analysis["address"] in [r["address"] for r in records]
+        assert "arv_estimate" not in records[0]
+    
+    def test_stream_parquet(self, created_property_with_analysis):
+        """Test Parquet export"""
+        pq = pytest.importorskip("pyarrow.parquet")
+        
+        response = client.get(
+            "/api/v1/export/bulk/stream",
+            params={"format": "parquet", "state": created_property_with_analysis["state"]}
+        )
+        
+        assert response.status_code == 200
+        table = pq.read_table(io.BytesIO(response.content))
+        assert created_property_with_analysis["address"] in table.column("address").to_pylist()
+    
+    def test_stream_no_matches(self):
+        """Test streaming export with no matching properties returns only the header"""
+        response = client.get(
+            "/api/v1/export/bulk/stream",
+            params={"city": "No Such City"}
+        )
+        
+        assert response.status_code == 200
+        rows = list(csv.reader(io.StringIO(response.content.decode('utf-8'))))
+        assert len(rows) == 1
+        assert rows[0][0] == "property_id"
+
 class TestExportValidation:
     """Test export validation and error handling"""
     
@@ -426,7 +426,35 @@ class TestDealAlertService:
         # Should have alerts for both rules and subscriptions
         alert_types = set(alert.alert_type for alert in new_alerts)
         assert len(alert_types) > 0
-    
+
+    def test_process_listing_change(self, alert_service):
+        """Test listing changes only raise alerts for their own kind of change"""
+        change_data = {"address": "123 Main St", "price": 300000, "score": 85, "change_type": "price_drop"}
+
+        alert_service.process_listing_change(change_data)
+        assert alert_service.alert_queue == []
+
+        price_watch = AlertSubscription(
+            user_id=uuid.uuid4(), name="Price Watch", criteria={"max_price": 400000},
+            alert_types=[AlertTypeEnum.PRICE_DROP], channels=[AlertChannelEnum.SMS]
+        )
+        subscriptions = alert_service.check_subscriptions_for_deal(change_data) + [price_watch]
+        with patch.object(alert_service, "check_subscriptions_for_deal", return_value=subscriptions):
+            alert_service.process_listing_change(change_data)
+
+        [price_drop] = alert_service.alert_queue
+        assert price_drop.alert_type == AlertTypeEnum.PRICE_DROP
+        assert price_drop.priority == AlertPriorityEnum.HIGH
+        assert price_drop.user_id == price_watch.user_id
+        assert price_drop.title == "Subscription Alert: Price Watch"
+        assert price_drop.channels == [AlertChannelEnum.SMS]
+        alert_service.alert_queue.clear()
+
+        alert_service.process_listing_change(dict(change_data, change_type="new"))
+        assert {alert.alert_type for alert in alert_service.alert_queue} == {
+            AlertTypeEnum.HIGH_SCORE, AlertTypeEnum.NEW_DEAL, AlertTypeEnum.CRITERIA_MATCH
+        }
+
     def test_get_user_alerts(self, alert_service, sample_user_id):
         """Test getting user alerts"""
         alerts = alert_service.get_user_alerts(sample_user_id, limit=10)
@@ -0,0 +1,175 @@
+"""
+Tests for the columnar diversification engine
+"""
+
+import math
+import time
+import uuid
+from datetime import datetime
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import event
+
+from app.models.portfolio import PortfolioDB, PortfolioPropertyDB
+from app.models.property import PropertyDB
+from app.services.diversification_engine import DiversificationEngine, concentration
+from app.services.portfolio_optimization_service import PortfolioOptimizationService
+from app.services.portfolio_performance_service import PortfolioPerformanceService
+
+CITIES = [("Austin", "TX"), ("Dallas", "TX"), ("Denver", "CO"), ("Miami", "FL")]
+TYPES = ["single_family", "condo", "multi_family"]
+
+
+@pytest.fixture
+def db(sqlite_session):
+    return sqlite_session(PropertyDB, PortfolioDB, PortfolioPropertyDB)
+
+
+@pytest.fixture
+def optimization_service(db):
+    with patch("app.services.portfolio_optimization_service.MarketDataService"):
+        return PortfolioOptimizationService(db)
+
+
+def add_portfolio(db, holdings):
+    portfolio = PortfolioDB(id=uuid.uuid4(), name="Portfolio")
+    db.add(portfolio)
+    for i, (city, state, property_type, value, invested, rent) in enumerate(holdings):
+        prop = PropertyDB(id=uuid.uuid4(), address=f"{i} Main St", city=city, state=state, zip_code="00000",
+                          property_type=property_type)
+        db.add_all([prop, PortfolioPropertyDB(
+            id=uuid.uuid4(), portfolio_id=portfolio.id, property_id=prop.id, acquisition_date=datetime(2022, 1, 1),
+            acquisition_price=invested, total_investment=invested, current_value=value, monthly_rent=rent
+        )])
+    db.commit()
+    return portfolio.id
+
+
+def random_holdings(rng, n):
+    holdings = []
+    for _ in range(n):
+        city, state = CITIES[rng.integers(0, len(CITIES))]
+        invested = float(rng.uniform(80000, 900000))
+        value = None if rng.random() < 0.2 else invested * float(rng.uniform(0.9, 1.3))
+        holdings.append((city, state, TYPES[rng.integers(0, len(TYPES))], value, invested, float(rng.uniform(0, 4000))))
+    return holdings
+
+
+def test_concentration_measures():
+    result = concentration([[1, 1, 1, 1], [3, 1, 0, 0], [0, 0, 0, 0]])
+    assert result["hhi"].tolist() == pytest.approx([0.25, 0.625, 1.0])
+    assert result["entropy"].tolist() == pytest.approx([math.log(4), -(0.75 * math.log(0.75) + 0.25 * math.log(0.25)), 0])
+    assert result["normalized_entropy"][0] == pytest.approx(1.0)
+    assert result["effective_count"].tolist() == pytest.approx([4.0, 1.6, 0.0])
+    assert result["score"].tolist() == pytest.approx([75.0, 25.0, 0.0])
+
+
+def test_analysis_matches_value_weighted_shares(db, optimization_service):
+    portfolio_id = add_portfolio(db, [
+        ("Austin", "TX", "single_family", 300000.0, 250000.0, 2000.0),
+        ("Austin", "TX", "condo", None, 150000.0, 1200.0),
+        ("Denver", "CO", "condo", 600000.0, 500000.0, 0.0)
+    ])
+    analysis = optimization_service.analyze_diversification(portfolio_id)
+
+    geographic = analysis.geographic_diversity
+    assert geographic["city_distribution"] == {"Austin": 450000.0, "Denver": 600000.0}
+    assert geographic["city_concentration"] == pytest.approx(600000 / 1050000)
+    assert geographic["score"] == pytest.approx((1 - 600000 / 1050000) * 100)
+    assert analysis.property_type_diversity["hhi"] == pytest.approx((300 / 1050) ** 2 + (750 / 1050) ** 2)
+    assert analysis.price_range_diversity["range_distribution"] == {
+        "under_100k": 0.0, "100k_250k": 150000.0, "250k_500k": 300000.0, "500k_1m": 600000.0, "over_1m": 0.0
+    }
+    assert analysis.income_source_diversity["source_distribution"] == {
+        "rental_income": 38400.0, "appreciation": 150000.0
+    }
+    expected = (geographic["score"] * 0.3 + analysis.property_type_diversity["score"] * 0.25 +
+                analysis.price_range_diversity["score"] * 0.25 + analysis.income_source_diversity["score"] * 0.2)
+    assert analysis.overall_score == pytest.approx(expected)
+
+    counts = PortfolioPerformanceService(db)._analyze_geographic_diversity(portfolio_id)
+    assert counts["cities"] == [{"name": "Austin", "count": 2}, {"name": "Denver", "count": 1}]
+    assert counts["diversity_score"] == pytest.approx(2 / 3 * 50 + 2 / 3 * 50)
+    assert counts["concentration_score"] == pytest.approx(100 / 3)
+
+
+def test_batch_analysis_uses_one_query_and_matches_single(db, optimization_service):
+    rng = np.random.default_rng(5)
+    portfolio_ids = [add_portfolio(db, random_holdings(rng, int(rng.integers(1, 8)))) for _ in range(40)]
+    service = optimization_service
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    batch = service.analyze_diversification_batch(portfolio_ids + [uuid.uuid4()])
+    assert len(statements) == 1
+    assert len(batch) == 41
+
+    for portfolio_id in portfolio_ids[:5]:
+        single = service.analyze_diversification(portfolio_id)
+        assert batch[portfolio_id].overall_score == pytest.approx(single.overall_score)
+        assert batch[portfolio_id].geographic_diversity["city_distribution"] == \
+            pytest.approx(single.geographic_diversity["city_distribution"])
+        assert batch[portfolio_id].property_type_diversity["hhi"] == pytest.approx(single.property_type_diversity["hhi"])
+    assert batch[portfolio_ids[-1]].portfolio_id == portfolio_ids[-1]
+
+
+def test_what_if_matches_rebuilt_engine(db, optimization_service):
+    rng = np.random.default_rng(9)
+    portfolio_id = add_portfolio(db, random_holdings(rng, 12))
+    engine = DiversificationEngine.from_db(db, [portfolio_id])
+    candidates = pd.DataFrame([
+        {"property_id": uuid.uuid4(), "city": city, "state": state, "property_type": property_type,
+         "current_value": value, "total_investment": invested, "monthly_rent": rent}
+        for city, state, property_type, value, invested, rent in
+        random_holdings(rng, 300) + [("Boise", "ID", "townhouse", 2000000.0, 1500000.0, 9000.0)]
+    ])
+
+    start = time.perf_counter()
+    additions = engine.evaluate_additions(portfolio_id, candidates)
+    assert time.perf_counter() - start < 0.5
+
+    holdings = engine.holdings.copy()
+    removed = holdings["property_id"].iloc[3]
+    for i in (0, 17, len(candidates) - 1):
+        rebuilt = DiversificationEngine(pd.concat([holdings, candidates.iloc[[i]].assign(portfolio_id=portfolio_id)]))
+        assert additions["overall_score"].iloc[i] == pytest.approx(rebuilt.metrics()["overall_score"].iloc[0])
+
+    removals = engine.evaluate_removals(portfolio_id)
+    rebuilt = DiversificationEngine(holdings[holdings["property_id"] != removed])
+    assert removals.loc[removed, "overall_score"] == pytest.approx(rebuilt.metrics()["overall_score"].iloc[0])
+
+    combined = engine.what_if(portfolio_id, add=candidates.iloc[:2], remove=[removed])
+    rebuilt = DiversificationEngine(pd.concat([holdings[holdings["property_id"] != removed],
+                                               candidates.iloc[:2].assign(portfolio_id=portfolio_id)]))
+    assert combined["overall_score"] == pytest.approx(rebuilt.metrics()["overall_score"].iloc[0])
+
+    summary = optimization_service.evaluate_diversification_changes(
+        portfolio_id, candidates.iloc[:2].to_dict("records"), [removed], engine=engine
+    )
+    assert summary["combined_score"] == pytest.approx(combined["overall_score"])
+    assert len(summary["candidate_scores"]) == 2 and summary["removal_scores"][0]["property_id"] == removed
+
+
+def test_unknown_categories_dilute_shares_without_forming_a_bucket():
+    portfolio_id = uuid.uuid4()
+    holdings = pd.DataFrame([
+        {"portfolio_id": portfolio_id, "property_id": uuid.uuid4(), "city": city, "state": "TX",
+         "property_type": "condo", "current_value": value, "total_investment": value, "monthly_rent": 1000.0}
+        for city, value in (("Austin", 300000.0), ("Dallas", 100000.0), (None, 600000.0))
+    ])
+    engine = DiversificationEngine(holdings)
+    geographic = engine.analysis(portfolio_id)["geographic"]
+    assert geographic["city_distribution"] == {"Austin": 300000.0, "Dallas": 100000.0}
+    assert geographic["city_concentration"] == pytest.approx(0.3)
+    assert geographic["total"] == pytest.approx(1000000.0)
+
+    vocabulary = {d: list(categories) for d, categories in engine.categories.items()}
+    candidates = holdings.drop(columns="portfolio_id").assign(city=["Boise", "Reno", None], property_id=None)
+    additions = engine.evaluate_additions(portfolio_id, candidates)
+    assert engine.categories == vocabulary
+    assert additions["city_max_share"].tolist() == pytest.approx([0.3 / 1.3, 0.3 / 1.1, 0.3 / 1.6])
+    assert engine.what_if(portfolio_id, add=candidates.iloc[:1])["city_max_share"] == pytest.approx(0.3 / 1.3)
+    assert engine.categories == vocabulary
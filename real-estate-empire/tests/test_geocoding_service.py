@@ -0,0 +1,151 @@
+"""
+Tests for the geocoding cache, offline gazetteer and batch lookups
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from geopy.exc import GeocoderUnavailable
+
+from app.services import geocoding_service
+from app.services.geocoding_service import (
+    FAILURE_TTL_SECONDS, NOT_FOUND_TTL_SECONDS, GeocodeCache, Gazetteer, GeocodingService, normalize_address,
+    parse_locality
+)
+
+
+class FakeRemote:
+    """Remote geocoder that records calls and concurrency"""
+
+    def __init__(self, delay=0.0, fail=()):
+        self.calls = []
+        self.delay = delay
+        self.fail = set(fail)
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def geocode(self, query):
+        with self._lock:
+            self.calls.append(query)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        if query in self.fail:
+            raise GeocoderUnavailable("offline")
+        if query.startswith("Nowhere"):
+            return None
+        return SimpleNamespace(latitude=10.0 + len(self.calls), longitude=-20.0)
+
+
+def test_normalize_address_and_locality():
+    assert normalize_address("123 Main Street,  Austin, Texas 78701") == "123 main st, austin, texas 78701"
+    assert normalize_address("123 MAIN ST., Austin, TX") == normalize_address("123 main street, austin, tx")
+    assert normalize_address("North Las Vegas, NV") == "north las vegas, nv"
+
+    assert parse_locality(normalize_address("123 Main St, Austin, Texas 78701-1234")) == ("austin", "tx", "78701")
+    assert parse_locality(normalize_address("1 Market St, Saint Louis, MO")) == ("st louis", "mo", None)
+    assert parse_locality(normalize_address("Mock Address 1, City, State")) == (None, None, None)
+
+
+def test_gazetteer_resolves_zip_before_city(tmp_path):
+    path = tmp_path / "zcta.txt"
+    path.write_text("GEOID\tALAND\tINTPTLAT\tINTPTLONG        \n78701\t1\t30.2706\t-97.7420\n")
+    gazetteer = Gazetteer()
+    assert gazetteer.load_file(str(path)) == 1
+
+    by_zip = gazetteer.lookup(normalize_address("100 Congress Ave, Austin, TX 78701"))
+    assert (by_zip.source, by_zip.latitude) == ("zip", 30.2706)
+    by_city = gazetteer.lookup(normalize_address("100 Congress Ave, Austin, TX 78704"))
+    assert (by_city.source, by_city.latitude, by_city.longitude) == ("city", 30.2672, -97.7431)
+    assert gazetteer.lookup(normalize_address("1 Unknown Rd, Smallville, KS")) is None
+
+
+def test_remote_results_persist_across_instances(tmp_path):
+    path = str(tmp_path / "geocode.db")
+    remote = FakeRemote()
+    service = GeocodingService(cache=GeocodeCache(path))
+
+    first = service.geocode("12 Elm Street, Smallville, KS", remote=remote)
+    assert first.source == "remote"
+    assert service.geocode("12 elm st, smallville, ks", remote=remote).source == "cache"
+    assert len(remote.calls) == 1
+
+    reopened = GeocodingService(cache=GeocodeCache(path))
+    cached = reopened.geocode("12 Elm St., Smallville, KS", remote=remote)
+    assert (cached.source, cached.latitude) == ("cache", first.latitude)
+    assert len(remote.calls) == 1
+
+    # Offline hits never touch the network or the cache
+    assert reopened.geocode("1 Main St, Denver, CO", remote=remote).source == "city"
+    assert len(remote.calls) == 1 and reopened.cache.size() == 1
+
+
+def test_batch_dedupes_and_bounds_remote_concurrency(tmp_path):
+    remote = FakeRemote(delay=0.02, fail={"7 Oak St, Failtown, KS"})
+    service = GeocodingService(cache=GeocodeCache(str(tmp_path / "geocode.db")), max_concurrency=3)
+    misses = [f"{i} Oak St, Smallville, KS" for i in range(12)]
+    addresses = misses + ["1 Main St, Austin, TX", misses[0].upper(), "Nowhere", "7 Oak St, Failtown, KS"]
+
+    results = service.geocode_batch(addresses, remote=remote)
+
+    assert len(results) == len(addresses)
+    assert len(remote.calls) == 14
+    assert remote.peak <= 3
+    assert results[12].source == "city"
+    assert results[13].latitude == results[0].latitude
+    assert results[14] is None and results[15] is None
+    assert service.stats.remote_failures == 1 and service.stats.not_found == 2
+
+    again = service.geocode_batch(addresses, remote=remote)
+    assert len(remote.calls) == 14  # the two unresolved addresses are remembered as misses
+    assert service.stats.negative_hits == 2
+    assert [r.source for r in again[:12]] == ["cache"] * 12
+    assert service.geocode_batch(misses) == again[:12]
+
+
+def test_remote_misses_expire_by_reason():
+    now = [1000.0]
+    remote = FakeRemote(fail={"7 Oak St, Failtown, KS"})
+    service = GeocodingService(cache=GeocodeCache(":memory:", clock=lambda: now[0]))
+    addresses = ["Nowhere", "7 Oak St, Failtown, KS"]
+
+    assert service.geocode_batch(addresses, remote=remote) == [None, None]
+    service.geocode_batch(addresses, remote=remote)
+    assert len(remote.calls) == 2
+
+    # A geocoder error is retried sooner than an address with no match
+    now[0] += FAILURE_TTL_SECONDS
+    service.geocode_batch(addresses, remote=remote)
+    assert remote.calls[2:] == ["7 Oak St, Failtown, KS"]
+
+    remote.fail.clear()
+    now[0] += NOT_FOUND_TTL_SECONDS
+    results = service.geocode_batch(addresses, remote=remote)
+    assert remote.calls[3:] == addresses
+    assert results[0] is None and results[1].source == "remote"
+    # A resolved address drops its miss
+    assert service.cache.get_misses([normalize_address(a) for a in addresses]) == ["nowhere"]
+
+
+def test_default_cache_lives_outside_the_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(geocoding_service.tempfile, "gettempdir", lambda: str(tmp_path / "tmp"))
+    monkeypatch.delenv("GEOCODER_CACHE_PATH", raising=False)
+    monkeypatch.setattr(geocoding_service, "_shared_service", None)
+
+    service = geocoding_service.get_geocoding_service()
+
+    assert service.cache.path == str(tmp_path / "tmp" / "real-estate-empire" / "geocode_cache.db")
+    assert not (tmp_path / "geocode_cache.db").exists()
+    service.cache.close()
+
+
+def test_missing_remote_keeps_lookups_offline():
+    service = GeocodingService()
+    assert service.geocode("Mock Address 1, City, State") is None
+    assert service.geocode("350 5th Ave, New York, NY").latitude == pytest.approx(40.7128)
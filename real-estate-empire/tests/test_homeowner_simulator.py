@@ -0,0 +1,216 @@
+"""
+Tests for concurrent, rate-limited homeowner conversation generation
+"""
+
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.llm_gateway import LLMGateway
+from app.simulation import homeowner_simulator
+from app.simulation.homeowner_simulator import GeminiService, HomeownerConversationSimulator
+from app.services.llm_rate_limiter import TokenBucket, RequestBudget, estimate_tokens
+
+
+CONVERSATION_JSON = json.dumps({
+    "conversation": [
+        {"speaker": "agent", "message": "Hi, is this the owner of 123 Main St?"},
+        {"speaker": "homeowner", "message": "Yes, who is asking?"}
+    ],
+    "outcome": "interested",
+    "key_objections": [],
+    "conversation_quality": 0.8
+})
+
+
+class FakeLLM:
+    """Synchronous stand-in for the Gemini model that records concurrency"""
+
+    def __init__(self, delay=0.02, fail=False, total_tokens=None):
+        self.delay = delay
+        self.fail = fail
+        self.total_tokens = total_tokens
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("quota exceeded")
+            usage = SimpleNamespace(total_token_count=self.total_tokens) if self.total_tokens else None
+            return SimpleNamespace(text=CONVERSATION_JSON, usage_metadata=usage)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+PROPERTIES = [
+    {"address": "123 Main St", "city": "Austin", "state": "TX", "asking_price": 250000},
+    {"address": "9 Oak Ave", "city": "Miami", "state": "FL", "asking_price": 410000},
+]
+
+
+class FakeClock:
+    """Manual clock whose sleep advances time instead of waiting"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.mark.asyncio
+async def test_batch_respects_max_concurrency():
+    """Test at most max_concurrency LLM calls are in flight"""
+    llm = FakeLLM(delay=0.05)
+    simulator = HomeownerConversationSimulator(llm_client=llm)
+
+    results = await simulator.generate_conversation_batch(
+        PROPERTIES, ["cold_call", "follow_up"], count=12, max_concurrency=3
+    )
+
+    assert len(results) == 12
+    assert llm.calls == 12
+    assert 1 < llm.max_in_flight <= 3
+    assert all(r["conversation"]["outcome"] == "interested" for r in results)
+
+
+@pytest.mark.asyncio
+async def test_calls_go_through_the_llm_gateway():
+    """Test conversation calls are routed through GeminiService and metered by the shared gateway"""
+    llm = FakeLLM(delay=0)
+    simulator = HomeownerConversationSimulator(llm_client=llm)
+    gateway = LLMGateway(lambda *args: None)
+    simulator.gemini_service = GeminiService(model=llm, gateway=gateway)
+
+    await simulator.generate_conversation_batch(PROPERTIES, ["cold_call"], count=3)
+
+    metrics = gateway.get_metrics(GeminiService.GATEWAY_AGENT)
+    assert llm.calls == 3
+    assert metrics["requests"] == metrics["provider_calls"] == 3
+
+
+@pytest.mark.asyncio
+async def test_batch_streams_jsonl(tmp_path):
+    """Test each conversation is written to the JSONL output as it completes"""
+    output = tmp_path / "conversations.jsonl"
+    simulator = HomeownerConversationSimulator(llm_client=FakeLLM(delay=0))
+
+    results = await simulator.generate_conversation_batch(
+        PROPERTIES, ["cold_call"], count=5, output_path=str(output)
+    )
+
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert len(lines) == len(results) == 5
+    assert sorted(line["index"] for line in lines) == list(range(5))
+    assert lines[0]["homeowner_profile"]["personality"] in simulator.personality_templates
+    assert lines[0]["context"]["scenario_type"] == "cold_call"
+
+
+@pytest.mark.asyncio
+async def test_llm_errors_fall_back_to_mock():
+    """Test a failing LLM call yields a mock conversation instead of failing the batch"""
+    simulator = HomeownerConversationSimulator(llm_client=FakeLLM(delay=0, fail=True))
+
+    results = await simulator.generate_conversation_batch(PROPERTIES, ["cold_call"], count=3)
+
+    assert len(results) == 3
+    assert all(r["conversation"]["conversation"] for r in results)
+
+
+@pytest.mark.asyncio
+async def test_batch_request_budget_is_scoped_to_the_call(monkeypatch):
+    """Test requests/tokens per minute limits create a budget for that batch only"""
+    budgets = []
+
+    class RecordingBudget(RequestBudget):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.settled = 0
+            budgets.append(self)
+
+        def settle(self, estimated, actual):
+            self.settled += 1
+            super().settle(estimated, actual)
+
+    monkeypatch.setattr(homeowner_simulator, "RequestBudget", RecordingBudget)
+    simulator = HomeownerConversationSimulator(llm_client=FakeLLM(delay=0, total_tokens=900))
+
+    await simulator.generate_conversation_batch(
+        PROPERTIES, ["cold_call"], count=2, requests_per_minute=600, tokens_per_minute=1000000
+    )
+    await simulator.generate_conversation_batch(PROPERTIES, ["cold_call"], count=2)
+
+    assert simulator.request_budget is None
+    assert len(budgets) == 1 and budgets[0].settled == 2
+    assert budgets[0].tokens.available < 1000000
+
+
+@pytest.mark.asyncio
+async def test_streamed_batch_can_skip_returning_results(tmp_path):
+    """Test streaming to a file without returning results still writes every conversation"""
+    output = tmp_path / "conversations.jsonl"
+    simulator = HomeownerConversationSimulator(llm_client=FakeLLM(delay=0))
+
+    results = await simulator.generate_conversation_batch(
+        PROPERTIES, ["cold_call"], count=4, output_path=str(output), return_results=False
+    )
+
+    assert results == []
+    assert len(output.read_text().splitlines()) == 4
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_for_refill():
+    """Test the bucket sleeps for exactly the time needed to refill"""
+    clock = FakeClock()
+    bucket = TokenBucket.per_minute(60, clock=clock, sleep=clock.sleep)
+
+    await bucket.acquire(60)
+    await bucket.acquire(30)
+
+    assert clock.sleeps == [pytest.approx(30.0)]
+    assert bucket.available == pytest.approx(0.0)
+
+
+@pytest.mark.asyncio
+async def test_request_budget_limits_rpm_and_settles_tokens():
+    """Test RPM pacing and charging actual token usage against the estimate"""
+    clock = FakeClock()
+    budget = RequestBudget(requests_per_minute=2, tokens_per_minute=1000, clock=clock, sleep=clock.sleep)
+
+    for _ in range(3):
+        await budget.acquire(100)
+    assert clock.now == pytest.approx(30.0)
+
+    budget.settle(100, 700)
+    assert budget.tokens.available == pytest.approx(1000 - 100 - 600)
+
+    # Overspending leaves a debt that later callers wait out
+    budget.settle(100, 1500)
+    assert budget.tokens.available == pytest.approx(-1100)
+    started = clock.now
+    await budget.tokens.acquire(100)
+    assert clock.now - started == pytest.approx(1200 / (1000 / 60))
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("x" * 400) == 100
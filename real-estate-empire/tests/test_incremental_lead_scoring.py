@@ -0,0 +1,209 @@
+"""
+Unit tests for incremental lead re-scoring
+
+Tests change tracking through SQLAlchemy session events and that only the
+changed component scores are recomputed.
+"""
+
+import pytest
+import uuid
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.lead import PropertyLeadDB, CommunicationDB
+from app.models.property import PropertyDB
+from app.models.lead_scoring import (
+    LeadScoreHistoryDB, LeadScoreDailyRollupDB, LeadScoreFactorRollupDB
+)
+from app.services.incremental_lead_scoring import (
+    IncrementalLeadScorer, LeadChangeTracker, LeadComponentCache
+)
+from app.services.lead_scoring_service import LeadScoringService
+
+
+def make_property(**fields):
+    return PropertyDB(
+        id=uuid.uuid4(),
+        address="123 Main St",
+        city="Austin",
+        state="TX",
+        zip_code="78701",
+        property_type="single_family",
+        **fields
+    )
+
+
+class TestIncrementalLeadScoring:
+    """Test cases for LeadChangeTracker and IncrementalLeadScorer"""
+
+    @pytest.fixture
+    def tracker(self):
+        return LeadChangeTracker()
+
+    @pytest.fixture
+    def session_factory(self, tracker):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine, tables=[
+            PropertyDB.__table__, PropertyLeadDB.__table__, CommunicationDB.__table__,
+            LeadScoreHistoryDB.__table__, LeadScoreDailyRollupDB.__table__, LeadScoreFactorRollupDB.__table__
+        ])
+        factory = sessionmaker(bind=engine)
+        tracker.install(factory)
+        yield factory
+        tracker.uninstall(factory)
+
+    @pytest.fixture
+    def scorer_factory(self, tracker):
+        cache = LeadComponentCache()
+        return lambda db: IncrementalLeadScorer(db, tracker=tracker, cache=cache)
+
+    @pytest.fixture
+    def lead_ids(self, session_factory):
+        db = session_factory()
+        ids = []
+        for year_built, fields in [
+            (1960, dict(asking_price=200000, mortgage_balance=150000)),
+            (1995, dict(repair_needed=True, estimated_repair_cost=30000, contact_attempts=2)),
+            (2010, dict(behind_on_payments=True, motivation_factors=["divorce"]))
+        ]:
+            property_record = make_property(year_built=year_built)
+            lead = PropertyLeadDB(id=uuid.uuid4(), property_id=property_record.id, source="other", **fields)
+            db.add_all([property_record, lead])
+            ids.append(lead.id)
+        db.commit()
+        db.close()
+        return ids
+
+    def assert_scores_current(self, db):
+        service = LeadScoringService(db)
+        for lead in db.query(PropertyLeadDB).all():
+            assert lead.lead_score == pytest.approx(round(service.score_lead(lead).overall_score, 2))
+
+    def test_new_leads_are_scored(self, session_factory, scorer_factory, tracker, lead_ids):
+        """Test committed new leads are tracked and fully scored"""
+        assert tracker.has_pending()
+        db = session_factory()
+
+        summary = scorer_factory(db).rescore_pending()
+
+        assert summary["leads_scored"] == 3
+        assert summary["components_reused"] == 0
+        assert not tracker.has_pending()
+        self.assert_scores_current(db)
+        db.close()
+
+    def test_only_changed_component_recomputed(self, session_factory, scorer_factory, lead_ids):
+        """Test a contact_attempts change recomputes only the owner component"""
+        db = session_factory()
+        scorer_factory(db).rescore_pending()
+
+        lead = db.get(PropertyLeadDB, lead_ids[1])
+        lead.contact_attempts = 9
+        db.commit()
+
+        summary = scorer_factory(db).rescore_pending()
+
+        assert summary["leads_scored"] == 1
+        assert summary["components_recomputed"] == 1
+        assert summary["components_reused"] == 3
+        self.assert_scores_current(db)
+        db.close()
+
+    def test_property_change_rescores_its_leads(self, session_factory, scorer_factory, lead_ids):
+        """Test a year_built change on a property re-scores the property component of its lead"""
+        db = session_factory()
+        scorer_factory(db).rescore_pending()
+
+        lead = db.get(PropertyLeadDB, lead_ids[2])
+        lead.property.year_built = 1900
+        db.commit()
+
+        summary = scorer_factory(db).rescore_pending()
+
+        assert summary["leads_scored"] == 1
+        assert summary["components_recomputed"] == 1
+        self.assert_scores_current(db)
+        db.close()
+
+    def test_untracked_changes_are_ignored(self, session_factory, scorer_factory, tracker, lead_ids):
+        """Test rolled back changes and non-scoring fields are not tracked"""
+        db = session_factory()
+        scorer_factory(db).rescore_pending()
+
+        lead = db.get(PropertyLeadDB, lead_ids[0])
+        lead.owner_name = "Jane Doe"
+        db.commit()
+        lead.asking_price = 1
+        db.flush()
+        db.rollback()
+
+        assert not tracker.has_pending()
+        db.close()
+
+    def test_bulk_statements_are_tracked(self, session_factory, scorer_factory, tracker, lead_ids):
+        """Test bulk inserts by id are tracked per lead and criteria updates force a full re-score"""
+        db = session_factory()
+        scorer_factory(db).rescore_pending()
+
+        property_record = make_property(year_built=1980)
+        db.add(property_record)
+        db.flush()
+        new_id = uuid.uuid4()
+        db.execute(insert(PropertyLeadDB), [
+            {"id": new_id, "property_id": property_record.id, "source": "other", "asking_price": 100000}
+        ])
+        db.commit()
+
+        changes = tracker.drain()
+        assert list(changes.leads) == [new_id]
+        assert not changes.full_rescore
+        tracker.restore(changes)
+        assert scorer_factory(db).rescore_pending()["leads_scored"] == 1
+
+        db.execute(update(PropertyLeadDB).where(PropertyLeadDB.source == "other").values(owner_name="x"))
+        db.commit()
+        assert not tracker.has_pending()
+
+        db.execute(update(PropertyLeadDB).where(PropertyLeadDB.source == "other").values(contact_attempts=6))
+        db.commit()
+        summary = scorer_factory(db).rescore_pending()
+
+        assert summary["mode"] == "full"
+        assert summary["leads_scored"] == 4
+        self.assert_scores_current(db)
+        db.close()
+
+    def test_deleted_leads_are_skipped(self, session_factory, scorer_factory, tracker, lead_ids):
+        """Test a lead updated then deleted is not re-scored"""
+        db = session_factory()
+        scorer_factory(db).rescore_pending()
+
+        lead = db.get(PropertyLeadDB, lead_ids[0])
+        lead.contact_attempts = 3
+        db.commit()
+        db.delete(lead)
+        db.commit()
+
+        summary = scorer_factory(db).rescore_pending()
+
+        assert summary["leads_scored"] == 0
+        db.close()
+
+    def test_evicted_components_are_recomputed(self, session_factory, tracker, lead_ids):
+        """Test the component cache stays bounded and evicted leads are scored from scratch"""
+        cache = LeadComponentCache(max_entries=2)
+        db = session_factory()
+        IncrementalLeadScorer(db, tracker=tracker, cache=cache).rescore_pending()
+        assert len(cache) == 2
+
+        for lead_id in lead_ids:
+            db.get(PropertyLeadDB, lead_id).contact_attempts = 7
+        db.commit()
+        summary = IncrementalLeadScorer(db, tracker=tracker, cache=cache).rescore_pending()
+
+        # The two cached leads recompute only the owner component, the evicted one all four
+        assert summary["components_recomputed"] == 2 + 4
+        assert len(cache) == 2
+        self.assert_scores_current(db)
+        db.close()
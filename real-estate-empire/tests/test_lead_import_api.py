@@ -397,4 +397,95 @@ class TestLeadImportAPI:
         assert mock_service.import_leads.call_count == 2
         calls = mock_service.import_leads.call_args_list
         assert calls[0][1]["skip_duplicates"] == True
-        assert calls[1][1]["skip_duplicates"] == False
\ No newline at end of file
+        assert calls[1][1]["skip_duplicates"] == False
+    
+    @patch('app.api.routers.lead_import.SessionLocal')
+    @patch('app.api.routers.lead_import.LeadImportService')
+    def test_import_job_reports_progress(self, mock_service_class, mock_session_local, sample_csv_content, sample_import_result):
+        """Test background import job lifecycle."""
+        from app.services.lead_import_service import ImportProgress
+        
+        def fake_import(**kwargs):
+            progress = ImportProgress(
+                import_id=kwargs["import_id"],
+                status=ImportStatusEnum.COMPLETED,
+                rows_processed=2,
+                last_committed_row=3
+            )
+            kwargs["progress_callback"](progress)
+            return sample_import_result
+        
+        mock_service = Mock()
+        mock_service.import_leads_chunked.side_effect = fake_import
+        mock_service_class.return_value = mock_service
+        
+        request_data = {
+            "csv_content": sample_csv_content,
+            "column_mapping": {"address": "Address", "city": "City", "state": "State", "zip_code": "ZIP"},
+            "chunk_size": 500
+        }
+        
+        response = client.post("/api/lead-import/jobs", json=request_data)
+        assert response.status_code == 202
+        import_id = response.json()["import_id"]
+        
+        # TestClient runs background tasks before returning
+        status_response = client.get(f"/api/lead-import/jobs/{import_id}")
+        assert status_response.status_code == 200
+        data = status_response.json()
+        assert data["status"] == "completed"
+        assert data["rows_processed"] == 2
+        assert data["last_committed_row"] == 3
+        assert "rows_per_second" in data
+        assert data["result"]["successful_imports"] == 2
+        
+        call_kwargs = mock_service.import_leads_chunked.call_args[1]
+        assert call_kwargs["chunk_size"] == 500
+        assert call_kwargs["resume_from_row"] == 0
+        mock_session_local.return_value.close.assert_called_once()
+    
+    def test_import_job_not_found(self):
+        """Test progress lookup for unknown job."""
+        response = client.get("/api/lead-import/jobs/does-not-exist")
+        assert response.status_code == 404
+    
+    def test_import_job_invalid_mapping(self, sample_csv_content):
+        """Test background import with unknown mapping fields."""
+        request_data = {
+            "csv_content": sample_csv_content,
+            "column_mapping": {"not_a_field": "Address"}
+        }
+        
+        response = client.post("/api/lead-import/jobs", json=request_data)
+        assert response.status_code == 400
+    
+    def test_import_job_file_rejects_out_of_range_chunk_size(self, sample_csv_content):
+        """Test the file upload job applies the same chunk_size bounds as the JSON job."""
+        for chunk_size in ("0", "50001"):
+            response = client.post(
+                "/api/lead-import/jobs/file",
+                files={"file": ("test.csv", BytesIO(sample_csv_content.encode()), "text/csv")},
+                data={"column_mapping": json.dumps({"address": "Address"}), "chunk_size": chunk_size}
+            )
+            assert response.status_code == 422
+    
+    def test_finished_import_jobs_are_evicted(self):
+        """Test finished jobs expire after their TTL and are capped in number."""
+        from app.api.routers import lead_import
+        
+        lead_import.import_jobs.clear()
+        now = 1_000_000.0
+        lead_import.import_jobs["running"] = {"progress": {}, "result": None, "finished_at": None}
+        lead_import.import_jobs["expired"] = {
+            "progress": {}, "result": None, "finished_at": now - lead_import.FINISHED_JOB_TTL_SECONDS - 1
+        }
+        for i in range(lead_import.MAX_FINISHED_JOBS + 5):
+            lead_import.import_jobs[f"done-{i}"] = {"progress": {}, "result": None, "finished_at": now - 100 + i * 0.01}
+        
+        lead_import._evict_finished_jobs(now)
+        
+        assert "running" in lead_import.import_jobs
+        assert "expired" not in lead_import.import_jobs
+        assert all(f"done-{i}" not in lead_import.import_jobs for i in range(5))
+        assert len(lead_import.import_jobs) == lead_import.MAX_FINISHED_JOBS + 1
+        lead_import.import_jobs.clear()
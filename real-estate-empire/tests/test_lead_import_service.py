@@ -395,4 +395,144 @@ class TestLeadImportService:
         assert import_service._get_mapped_value(row, "Column2") == "Value2"
         assert import_service._get_mapped_value(row, "Column3") is None
         assert import_service._get_mapped_value(row, "NonExistent") is None
-        assert import_service._get_mapped_value(row, None) is None
\ No newline at end of file
+        assert import_service._get_mapped_value(row, None) is None
+
+class TestChunkedLeadImport:
+    """Test cases for the chunked, set-based import path."""
+    
+    @pytest.fixture
+    def db_session(self):
+        """In-memory SQLite session with the property and lead tables."""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from app.core.database import Base
+        
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine, tables=[PropertyDB.__table__, PropertyLeadDB.__table__])
+        session = sessionmaker(bind=engine)()
+        yield session
+        session.close()
+    
+    @pytest.fixture
+    def column_mapping(self):
+        """Column mapping for generated CSV content."""
+        return ColumnMapping(
+            address="Address",
+            city="City",
+            state="State",
+            zip_code="ZIP",
+            owner_name="Owner Name",
+            owner_email="Email"
+        )
+    
+    @staticmethod
+    def _csv(count, offset=0):
+        rows = [
+            f"{i} Main St,Anytown,CA,{10000 + i % 7},Owner {i},owner{i}@example.com"
+            for i in range(offset, offset + count)
+        ]
+        return "Address,City,State,ZIP,Owner Name,Email\n" + "\n".join(rows)
+    
+    def test_chunked_import_creates_rows_and_reports_progress(self, db_session, column_mapping):
+        """Test that every chunk is committed and reported."""
+        progress_updates = []
+        service = LeadImportService(db_session)
+        
+        result = service.import_leads_chunked(
+            self._csv(25), column_mapping, chunk_size=10,
+            progress_callback=lambda progress: progress_updates.append(progress.to_dict())
+        )
+        
+        assert result.status == ImportStatusEnum.COMPLETED
+        assert result.total_rows == 25
+        assert result.successful_imports == 25
+        assert len(result.created_properties) == 25
+        assert db_session.query(PropertyLeadDB).count() == 25
+        
+        chunk_updates = [update for update in progress_updates if update["status"] == "in_progress"]
+        assert [update["rows_processed"] for update in chunk_updates] == [10, 20, 25]
+        assert progress_updates[-1]["last_committed_row"] == 26
+        assert progress_updates[-1]["rows_per_second"] >= 0
+    
+    def test_chunked_import_uses_set_based_queries(self, db_session, column_mapping):
+        """Test that duplicate resolution issues one query per table per chunk."""
+        service = LeadImportService(db_session)
+        service.import_leads_chunked(self._csv(20), column_mapping, chunk_size=10)
+        
+        with patch.object(db_session, "query", wraps=db_session.query) as query_spy:
+            result = service.import_leads_chunked(self._csv(20), column_mapping, chunk_size=10)
+        
+        assert result.duplicates_found == 20
+        assert result.successful_imports == 0
+        assert query_spy.call_count == 4  # properties + leads, for each of two chunks
+    
+    def test_chunked_import_matches_normalized_addresses(self, db_session, column_mapping):
+        """Test that formatting differences in addresses are treated as the same property."""
+        service = LeadImportService(db_session)
+        service.import_leads_chunked(self._csv(1), column_mapping)
+        
+        variant = "Address,City,State,ZIP,Owner Name,Email\n0  main st.,ANYTOWN,ca,10000,Other,other@example.com"
+        result = service.import_leads_chunked(variant, column_mapping)
+        
+        assert result.successful_imports == 1
+        assert result.created_properties == []
+        assert db_session.query(PropertyDB).count() == 1
+    
+    def test_chunked_import_duplicates_within_file(self, db_session, column_mapping):
+        """Test that a lead repeated in the same file is only imported once."""
+        csv_content = self._csv(3) + "\n1 Main St,Anytown,CA,10001,Owner 1,owner1@example.com"
+        
+        result = LeadImportService(db_session).import_leads_chunked(csv_content, column_mapping, chunk_size=2)
+        
+        assert result.successful_imports == 3
+        assert result.duplicates_found == 1
+    
+    def test_chunked_import_resumes_after_committed_row(self, db_session, column_mapping):
+        """Test resuming skips rows that were already committed."""
+        service = LeadImportService(db_session)
+        
+        result = service.import_leads_chunked(self._csv(10), column_mapping, resume_from_row=6)
+        
+        assert result.total_rows == 5
+        assert result.successful_imports == 5
+    
+    def test_chunked_import_stops_on_database_error(self, db_session, column_mapping):
+        """Test a failing chunk is rolled back and earlier chunks stay committed."""
+        service = LeadImportService(db_session)
+        original_execute = db_session.execute
+        inserts = {"count": 0}
+        
+        def failing_execute(statement, *args, **kwargs):
+            if getattr(statement, "is_insert", False):
+                inserts["count"] += 1
+                if inserts["count"] > 2:  # properties + leads of the first chunk succeed
+                    raise RuntimeError("database unavailable")
+            return original_execute(statement, *args, **kwargs)
+        
+        with patch.object(db_session, "execute", side_effect=failing_execute):
+            result = service.import_leads_chunked(self._csv(20), column_mapping, chunk_size=10)
+        
+        assert result.status == ImportStatusEnum.PARTIAL
+        assert result.successful_imports == 10
+        assert "database unavailable" in result.errors[-1]["error"]
+        assert result.errors[-1]["row"] == 12
+        assert db_session.query(PropertyLeadDB).count() == 10
+    
+    def test_chunked_import_empty_csv(self, db_session, column_mapping):
+        """Test chunked import with header only."""
+        result = LeadImportService(db_session).import_leads_chunked(
+            "Address,City,State,ZIP\n", column_mapping
+        )
+        
+        assert result.status == ImportStatusEnum.FAILED
+        assert "No data rows found" in result.errors[0]["error"]
+    
+    def test_address_key_normalization(self):
+        """Test normalized address keys."""
+        service = LeadImportService(Mock(spec=Session))
+        
+        assert service._address_key({
+            "address": "123  Main St.", "city": "Anytown", "state": "CA", "zip_code": "12345"
+        }) == service._address_key({
+            "address": "123 main st", "city": "ANYTOWN", "state": "ca", "zip_code": "12345"
+        })
@@ -0,0 +1,192 @@
+"""
+Unit tests for lead score history and the daily analytics rollup
+"""
+
+import pytest
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.lead import PropertyLeadDB
+from app.models.property import PropertyDB
+from app.models.lead_scoring import (
+    DealPotentialEnum, LeadScoreHistoryDB, LeadScoreDailyRollupDB, LeadScoreFactorRollupDB
+)
+from app.services.lead_score_history_service import LeadScoreHistoryService
+from app.services.lead_scoring_engine import LeadScoringEngine
+from app.services.lead_scoring_service import LeadScoringService
+
+
+class TestLeadScoreHistoryService:
+    """Test cases for LeadScoreHistoryService"""
+
+    @pytest.fixture
+    def engine(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine, tables=[
+            PropertyDB.__table__, PropertyLeadDB.__table__,
+            LeadScoreHistoryDB.__table__, LeadScoreDailyRollupDB.__table__, LeadScoreFactorRollupDB.__table__
+        ])
+        return engine
+
+    @pytest.fixture
+    def db_session(self, engine):
+        session = sessionmaker(bind=engine)()
+        yield session
+        session.close()
+
+    @pytest.fixture
+    def leads(self, db_session, make_lead):
+        leads = [
+            make_lead(behind_on_payments=True, motivation_factors=["divorce"], asking_price=200000,
+                      mortgage_balance=195000),
+            make_lead(repair_needed=True, estimated_repair_cost=60000, year_built=1950),
+            make_lead(motivation_factors=["Divorce", "tired_landlord"]),
+            make_lead()
+        ]
+        for lead in leads:
+            db_session.add_all([lead.property, lead])
+        db_session.commit()
+        return leads
+
+    def test_record_scores_updates_rollup(self, db_session, leads):
+        """Test recorded LeadScore objects are appended and rolled up per day"""
+        scoring_service = LeadScoringService(db_session)
+        lead_scores = [scoring_service.score_lead(lead) for lead in leads]
+        yesterday = datetime.now() - timedelta(days=1)
+        lead_scores[0].scored_at = yesterday
+
+        written = LeadScoreHistoryService(db_session).record_scores(lead_scores)
+        db_session.commit()
+
+        assert written == 4
+        assert db_session.query(LeadScoreHistoryDB).count() == 4
+        rollups = {row.bucket_date: row for row in db_session.query(LeadScoreDailyRollupDB).all()}
+        assert rollups[yesterday.date()].scored_count == 1
+        assert rollups[datetime.now().date()].scored_count == 3
+        assert rollups[datetime.now().date()].score_sum == pytest.approx(
+            sum(score.overall_score for score in lead_scores[1:])
+        )
+
+    def test_analytics_match_scores(self, db_session, leads):
+        """Test analytics read from the rollup agree with the underlying scores"""
+        scoring_service = LeadScoringService(db_session)
+        lead_scores = [scoring_service.score_lead(lead) for lead in leads]
+        history = LeadScoreHistoryService(db_session)
+        history.record_scores(lead_scores)
+        history.record_scores(lead_scores[:1])
+        db_session.commit()
+
+        analytics = scoring_service.get_scoring_analytics()
+
+        recorded = lead_scores + lead_scores[:1]
+        assert analytics.total_leads_scored == 5
+        assert analytics.average_score == pytest.approx(sum(s.overall_score for s in recorded) / 5)
+        for potential in DealPotentialEnum:
+            expected = sum(1 for s in recorded if s.deal_potential == potential.value)
+            assert analytics.score_distribution[potential] == expected
+
+        top = analytics.top_motivation_factors[0]
+        assert top["factor"] == "divorce"
+        assert top["count"] == 3
+
+    def test_analytics_respect_period(self, db_session, leads):
+        """Test buckets outside the requested period are excluded"""
+        scoring_service = LeadScoringService(db_session)
+        old_score = scoring_service.score_lead(leads[0])
+        old_score.scored_at = datetime.now() - timedelta(days=60)
+        LeadScoreHistoryService(db_session).record_scores([old_score])
+        db_session.commit()
+
+        assert scoring_service.get_scoring_analytics().total_leads_scored == 0
+        analytics = scoring_service.get_scoring_analytics(period_start=datetime.now() - timedelta(days=90))
+        assert analytics.total_leads_scored == 1
+
+    def test_conversion_rates(self, db_session, leads):
+        """Test conversions are attributed to the deal potential of the latest score"""
+        scoring_service = LeadScoringService(db_session)
+        lead_scores = [scoring_service.score_lead(lead) for lead in leads]
+        history = LeadScoreHistoryService(db_session)
+        history.record_scores(lead_scores)
+
+        assert history.record_conversion(leads[0].id)
+        assert not history.record_conversion(uuid.uuid4())
+        db_session.commit()
+
+        analytics = scoring_service.get_scoring_analytics()
+        potential = DealPotentialEnum(lead_scores[0].deal_potential)
+        same_potential = sum(1 for s in lead_scores if s.deal_potential == potential.value)
+        assert analytics.conversion_rates[potential] == pytest.approx(1 / same_potential)
+
+    def test_conversion_rates_count_distinct_leads(self, db_session, leads):
+        """Test re-scoring a lead moves it between buckets instead of inflating the denominator"""
+        scoring_service = LeadScoringService(db_session)
+        history = LeadScoreHistoryService(db_session)
+        first = scoring_service.score_lead(leads[0])
+        first.scored_at = datetime.now() - timedelta(days=2)
+        history.record_scores([first])
+        for hours in (3, 2, 1):
+            rescore = scoring_service.score_lead(leads[0])
+            rescore.scored_at = datetime.now() - timedelta(hours=hours)
+            history.record_scores([rescore])
+        # A backfilled score older than the latest leaves the lead where it is
+        backfill = scoring_service.score_lead(leads[0])
+        backfill.scored_at = datetime.now() - timedelta(days=5)
+        history.record_scores([backfill])
+
+        assert history.record_conversion(leads[0].id)
+        db_session.commit()
+
+        rollups = db_session.query(LeadScoreDailyRollupDB).all()
+        prefix = DealPotentialEnum(rescore.deal_potential).name.lower()
+        assert sum(getattr(row, f"{prefix}_leads") for row in rollups) == 1
+        assert sum(row.scored_count for row in rollups) == 5
+        analytics = scoring_service.get_scoring_analytics(period_start=datetime.now() - timedelta(days=10))
+        assert analytics.conversion_rates[DealPotentialEnum(rescore.deal_potential)] == pytest.approx(1.0)
+
+    def test_conversions_move_with_rescored_leads(self, db_session, leads):
+        """Test a conversion follows its lead into the bucket of a newer score and is counted once"""
+        scoring_service = LeadScoringService(db_session)
+        history = LeadScoreHistoryService(db_session)
+        lead_scores = [scoring_service.score_lead(lead) for lead in leads]
+        first = lead_scores[0]
+        first.scored_at = datetime.now() - timedelta(days=2)
+        history.record_scores([first])
+        assert history.record_conversion(leads[0].id)
+        assert history.record_conversion(leads[0].id)
+
+        # Re-score the converted lead into a different deal potential
+        rescore = next(s for s in lead_scores[1:] if s.deal_potential != first.deal_potential)
+        rescore.lead_id = leads[0].id
+        history.record_scores([rescore])
+        db_session.commit()
+
+        rollups = db_session.query(LeadScoreDailyRollupDB).all()
+        for potential, expected in [(first.deal_potential, 0), (rescore.deal_potential, 1)]:
+            prefix = DealPotentialEnum(potential).name.lower()
+            assert sum(getattr(row, f"{prefix}_leads") for row in rollups) == expected
+            assert sum(getattr(row, f"{prefix}_converted") for row in rollups) == expected
+        analytics = scoring_service.get_scoring_analytics(period_start=datetime.now() - timedelta(days=10))
+        assert analytics.conversion_rates == {DealPotentialEnum(rescore.deal_potential): 1.0}
+
+    def test_engine_records_history(self, db_session, leads, engine):
+        """Test batch persistence appends history and analytics read a single rollup row"""
+        summary = LeadScoringEngine(db_session).rescore_all_leads(batch_size=2)
+        assert summary["leads_scored"] == 4
+        assert db_session.query(LeadScoreHistoryDB).count() == 4
+
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        analytics = LeadScoringService(db_session).get_scoring_analytics()
+
+        assert analytics.total_leads_scored == 4
+        assert not any("lead_score_history" in statement for statement in statements)
+
+    def test_analytics_without_database(self):
+        """Test analytics fall back to empty values without a session"""
+        analytics = LeadScoringService().get_scoring_analytics()
+
+        assert analytics.total_leads_scored == 0
+        assert all(potential in analytics.score_distribution for potential in DealPotentialEnum)
@@ -0,0 +1,183 @@
+"""
+Unit tests for the vectorized Lead Scoring Engine
+
+Checks that batch scores match LeadScoringService.score_lead lead-for-lead,
+that invalid leads are reported as batch errors, and that scores are
+persisted in bulk.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.lead import PropertyLeadDB
+from app.models.property import PropertyDB
+from app.models.lead_scoring import (
+    LeadScoreHistoryDB, LeadScoreDailyRollupDB, LeadScoreFactorRollupDB
+)
+from app.services.lead_scoring_engine import LeadScoringEngine, ScheduledLeadRescoreJob
+from app.services.lead_scoring_service import LeadScoringService
+
+
+LEAD_VARIANTS = [
+    dict(),
+    dict(year_built=1960, asking_price=200000, mortgage_balance=150000),
+    dict(year_built=1990, repair_needed=True, estimated_repair_cost=15000, asking_price=180000),
+    dict(year_built=2015, repair_needed=True, estimated_repair_cost=35000, contact_attempts=7),
+    dict(repair_needed=True, estimated_repair_cost=80000, asking_price=90000, mortgage_balance=85000),
+    dict(behind_on_payments=True, motivation_factors=["Divorce", "job_relocation", "not a factor"]),
+    dict(motivation_factors=["financial_distress", "inherited_property"], asking_price=300000,
+         mortgage_balance=50000, monthly_payment=1500),
+    dict(asking_price=100000, mortgage_balance=95000, behind_on_payments=True, repair_needed=True)
+]
+
+
+class TestLeadScoringEngine:
+    """Test cases for LeadScoringEngine"""
+
+    @pytest.fixture
+    def scoring_service(self):
+        return LeadScoringService()
+
+    @pytest.fixture
+    def engine(self, scoring_service):
+        return LeadScoringEngine(scoring_service=scoring_service)
+
+    @pytest.fixture
+    def leads(self, make_lead):
+        return [make_lead(**variant) for variant in LEAD_VARIANTS]
+
+    def test_batch_scores_match_single_lead_scoring(self, engine, scoring_service, leads):
+        """Test vectorized scores equal score_lead for every lead"""
+        result = engine.score_leads_batch(leads)
+
+        assert result.total_leads == len(leads)
+        assert result.successful_scores == len(leads)
+        assert result.failed_scores == 0
+
+        for lead, batch_score in zip(leads, result.scores):
+            expected = scoring_service.score_lead(lead)
+            assert batch_score.lead_id == expected.lead_id
+            assert batch_score.property_id == expected.property_id
+            for field in ("motivation_score", "property_score", "market_score", "financial_score",
+                          "owner_score", "overall_score", "confidence_score",
+                          "estimated_close_probability"):
+                assert getattr(batch_score, field) == pytest.approx(getattr(expected, field)), field
+            assert batch_score.estimated_profit_potential == pytest.approx(expected.estimated_profit_potential)
+            assert batch_score.deal_potential == expected.deal_potential
+            assert batch_score.priority_level == expected.priority_level
+            assert batch_score.recommended_actions == expected.recommended_actions
+            assert len(batch_score.motivation_indicators) == len(expected.motivation_indicators)
+
+    def test_service_batch_uses_engine(self, scoring_service, leads):
+        """Test LeadScoringService.score_leads_batch returns engine results"""
+        result = scoring_service.score_leads_batch(leads)
+
+        assert result.successful_scores == len(leads)
+        assert [score.lead_id for score in result.scores] == [lead.id for lead in leads]
+
+    def test_invalid_leads_reported_as_errors(self, engine, scoring_service, make_lead):
+        """Test rows that fail model validation are reported like score_lead failures"""
+        invalid = make_lead(asking_price=100000, mortgage_balance=-50000)
+        valid = make_lead(asking_price=100000, mortgage_balance=50000)
+
+        with pytest.raises(Exception):
+            scoring_service.score_lead(invalid)
+
+        result = engine.score_leads_batch([invalid, valid])
+
+        assert result.successful_scores == 1
+        assert result.failed_scores == 1
+        assert result.errors[0]["lead_id"] == str(invalid.id)
+        assert [score.lead_id for score in result.scores] == [valid.id]
+
+    def test_top_n_and_min_score(self, engine, leads):
+        """Test only the requested rows are materialized, best first"""
+        features, _ = engine.build_feature_frame(leads)
+        scores = engine.score_frame(features)
+
+        result = engine.score_leads_batch(leads, top_n=3)
+        top_scores = [score.overall_score for score in result.scores]
+        assert len(top_scores) == 3
+        assert top_scores == sorted(scores["overall_score"], reverse=True)[:3]
+
+        threshold = float(scores["overall_score"].median())
+        result = engine.score_leads_batch(leads, min_score=threshold)
+        assert all(score.overall_score >= threshold for score in result.scores)
+
+    def test_empty_batch(self, engine):
+        """Test scoring no leads"""
+        result = engine.score_leads_batch([])
+
+        assert result.total_leads == 0
+        assert result.scores == []
+
+
+class TestLeadRescoring:
+    """Test cases for bulk persistence and scheduled re-scoring"""
+
+    @pytest.fixture
+    def session_factory(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine, tables=[
+            PropertyDB.__table__, PropertyLeadDB.__table__,
+            LeadScoreHistoryDB.__table__, LeadScoreDailyRollupDB.__table__, LeadScoreFactorRollupDB.__table__
+        ])
+        return sessionmaker(bind=engine)
+
+    @pytest.fixture
+    def stored_leads(self, session_factory, make_lead):
+        db = session_factory()
+        leads = [make_lead(**variant) for variant in LEAD_VARIANTS * 3]
+        for lead in leads:
+            db.add(lead.property)
+            db.add(lead)
+        db.commit()
+        db.close()
+        return leads
+
+    def test_rescore_all_leads_persists_scores(self, session_factory, stored_leads):
+        """Test every lead is scored across batches and matches score_lead"""
+        db = session_factory()
+        progress = []
+
+        summary = LeadScoringEngine(db).rescore_all_leads(batch_size=5, progress_callback=progress.append)
+
+        assert summary["leads_scored"] == len(stored_leads)
+        assert summary["leads_failed"] == 0
+        assert summary["batches"] == 5
+        assert len(progress) == 5
+
+        service = LeadScoringService(db)
+        for lead in db.query(PropertyLeadDB).all():
+            assert lead.lead_score == pytest.approx(round(service.score_lead(lead).overall_score, 2))
+        db.close()
+
+    def test_load_feature_frame_matches_object_frame(self, session_factory, stored_leads):
+        """Test the column query yields the same scores as ORM objects"""
+        db = session_factory()
+        engine = LeadScoringEngine(db)
+        criteria = [PropertyLeadDB.contact_attempts == 0]
+
+        loaded = engine.score_frame(engine.load_feature_frame(criteria))
+        leads = db.query(PropertyLeadDB).filter(*criteria).order_by(PropertyLeadDB.id).all()
+        features, _ = engine.build_feature_frame(leads)
+        built = engine.score_frame(features)
+
+        assert len(loaded) == len(leads) > 0
+        assert list(loaded["overall_score"]) == pytest.approx(list(built["overall_score"]))
+        db.close()
+
+    def test_scheduled_job_run_once(self, session_factory, stored_leads):
+        """Test the scheduled job re-scores with its own session"""
+        job = ScheduledLeadRescoreJob(session_factory, batch_size=10)
+
+        summary = job.run_once()
+
+        assert summary["leads_scored"] == len(stored_leads)
+        assert job.last_run is summary
+
+        db = session_factory()
+        assert db.query(PropertyLeadDB).filter(PropertyLeadDB.lead_score.is_(None)).count() == 0
+        db.close()
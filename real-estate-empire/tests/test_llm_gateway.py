@@ -0,0 +1,225 @@
+"""
+Tests for the LLM gateway (rate limits, coalescing, failover, metrics)
+"""
+
+import asyncio
+from dataclasses import replace
+from types import SimpleNamespace
+
+import pytest
+
+from langchain_core.messages import AIMessage
+
+from app.core.llm_config import AgentLLMConfigs, LLMManager, LLMModel, MODEL_COST_PER_1K_TOKENS
+from app.core.llm_gateway import LLMGateway
+
+
+class MockProvider:
+    """Local provider: per-model delay and failures, records every call"""
+
+    def __init__(self, delays=None, failing=(), tokens=500):
+        self.delays = delays or {}
+        self.failing = set(failing)
+        self.tokens = tokens
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, agent_name, model, config, prompt):
+        self.calls.append((agent_name, model.value, prompt))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(model, 0))
+            if model in self.failing:
+                raise RuntimeError(f"{model.value} unavailable")
+            return SimpleNamespace(content=f"{model.value}: {prompt}",
+                                   usage_metadata={"total_tokens": self.tokens})
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def config():
+    return replace(AgentLLMConfigs.SCOUT_AGENT, timeout_seconds=0.05, cost_per_1k_tokens=0.02)
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_prompts_are_coalesced(config):
+    """Test identical in-flight prompts share one provider call"""
+    provider = MockProvider(delays={config.model: 0.01})
+    gateway = LLMGateway(provider)
+
+    responses = await asyncio.gather(*(gateway.invoke("scout", config, "find deals") for _ in range(5)))
+    other = await gateway.invoke("scout", config, "find other deals")
+
+    assert len(provider.calls) == 2
+    assert {r.content for r in responses} == {"gpt-4-turbo-preview: find deals"}
+    assert other.content.endswith("find other deals")
+    metrics = gateway.get_metrics("scout")
+    assert metrics["requests"] == 6
+    assert metrics["coalesced"] == 4
+    assert metrics["provider_calls"] == 2
+    assert metrics["total_tokens"] == 1000
+    assert metrics["cost"] == pytest.approx(0.02)
+
+
+@pytest.mark.asyncio
+async def test_timeout_fails_over_to_backup_model(config):
+    provider = MockProvider(delays={config.model: 1.0})
+    gateway = LLMGateway(provider)
+
+    response = await gateway.invoke("scout", config, "find deals")
+
+    assert response.content.startswith(LLMModel.CLAUDE_3_SONNET.value)
+    metrics = gateway.get_metrics("scout")
+    assert metrics["timeouts"] == 1
+    assert metrics["fallbacks"] == 1
+    assert metrics["failures"] == 0
+
+
+@pytest.mark.asyncio
+async def test_backup_calls_are_costed_at_the_backup_rate(config):
+    """Test a failover is charged at the backup model's own rate"""
+    provider = MockProvider(failing={config.model})
+    gateway = LLMGateway(provider, model_costs={LLMModel.CLAUDE_3_SONNET.value: 0.003})
+
+    await gateway.invoke("scout", config, "find deals")
+    await gateway.invoke("scout", replace(config, backup_model=LLMModel.CLAUDE_3_HAIKU), "find more deals")
+
+    # Only the successful Sonnet call is charged; Haiku has no listed rate
+    assert gateway.get_metrics("scout")["cost"] == pytest.approx(0.5 * 0.003)
+
+
+@pytest.mark.asyncio
+async def test_error_without_backup_is_raised(config):
+    provider = MockProvider(failing={config.model})
+    gateway = LLMGateway(provider)
+
+    with pytest.raises(RuntimeError):
+        await gateway.invoke("scout", replace(config, backup_model=None), "find deals")
+    assert gateway.get_metrics("scout")["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_limited_per_model(config):
+    provider = MockProvider(delays={config.model: 0.01})
+    gateway = LLMGateway(provider, max_concurrency=2)
+
+    await asyncio.gather(*(gateway.invoke("scout", config, f"prompt {i}") for i in range(6)))
+
+    assert len(provider.calls) == 6
+    assert provider.max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_requests_per_minute_are_enforced(config):
+    """Test calls beyond the model's RPM wait for the bucket to refill"""
+    now = [0.0]
+    waits = []
+
+    async def fake_sleep(seconds):
+        waits.append(seconds)
+        now[0] += seconds
+
+    gateway = LLMGateway(MockProvider(), clock=lambda: now[0], sleep=fake_sleep)
+    limited = replace(config, rate_limit_rpm=2)
+
+    for i in range(3):
+        await gateway.invoke("scout", limited, f"prompt {i}")
+
+    assert waits == [pytest.approx(30.0)]
+
+
+@pytest.mark.asyncio
+async def test_llm_manager_routes_through_gateway(config):
+    """Test LLMManager calls go through the shared gateway with per-agent metrics"""
+    manager = LLMManager()
+    provider = MockProvider()
+    manager.gateway = LLMGateway(provider)
+
+    text = await manager.invoke_with_fallback("analyst", "analyze 123 Main St", use_cache=False)
+
+    assert text == f"{AgentLLMConfigs.ANALYST_AGENT.model.value}: analyze 123 Main St"
+    assert provider.calls == [("analyst", AgentLLMConfigs.ANALYST_AGENT.model.value, "analyze 123 Main St")]
+    assert manager.get_usage_metrics()["analyst"]["requests"] == 1
+
+
+@pytest.mark.asyncio
+async def test_agent_langchain_model_routes_through_gateway(config):
+    """Test the LangChain model agents use sends calls, with bound kwargs, through the gateway"""
+    manager = LLMManager()
+    received = []
+
+    class FakeChat:
+        async def ainvoke(self, messages, stop=None, **kwargs):
+            received.append((messages, kwargs))
+            return AIMessage(content="call the comps tool", usage_metadata={
+                "input_tokens": 300, "output_tokens": 100, "total_tokens": 400
+            })
+
+    manager.llm_instances["negotiator"] = FakeChat()
+    manager.gateway = LLMGateway(manager._call_model, model_costs=MODEL_COST_PER_1K_TOKENS)
+
+    llm = manager.get_gateway_llm("negotiator").bind(functions=[{"name": "comps", "parameters": {}}])
+    message = await llm.ainvoke("draft an offer")
+
+    assert message.content == "call the comps tool"
+    assert received[0][1] == {"functions": [{"name": "comps", "parameters": {}}]}
+    metrics = manager.get_usage_metrics("negotiator")
+    assert metrics["requests"] == 1 and metrics["provider_calls"] == 1
+    assert metrics["total_tokens"] == 400
+    assert metrics["cost"] == pytest.approx(0.4 * AgentLLMConfigs.NEGOTIATOR_AGENT.cost_per_1k_tokens)
+
+
+@pytest.mark.asyncio
+async def test_gemini_service_calls_share_the_gateway(tmp_path):
+    """Test Gemini analyses are coalesced, cached and metered by the gateway; conversations only metered"""
+    from app.services.gemini_service import GeminiService
+    from app.services.llm_response_cache import LLMResponseCache
+
+    class FakeGemini:
+        def __init__(self):
+            self.calls = []
+
+        def generate_content(self, prompt, **kwargs):
+            self.calls.append((prompt, kwargs))
+            return SimpleNamespace(text=f"analysis of {prompt}", usage_metadata=None)
+
+    model = FakeGemini()
+    gateway = LLMGateway(MockProvider())
+    service = GeminiService(response_cache=LLMResponseCache(str(tmp_path / "cache.db")), model=model,
+                            gateway=gateway)
+
+    texts = await asyncio.gather(*(service.agenerate("123 Main St") for _ in range(4)))
+    assert set(texts) == {"analysis of 123 Main St"}
+    assert await service.agenerate("123 Main St") == "analysis of 123 Main St"
+    await service.agenerate("hello", cacheable=False)
+    await service.agenerate("hello", cacheable=False)
+
+    assert model.calls == [("123 Main St", {"generation_config": {"temperature": 0.0}}),
+                           ("hello", {}), ("hello", {})]
+    metrics = gateway.get_metrics(GeminiService.GATEWAY_AGENT)
+    assert metrics["provider_calls"] == 3
+    assert metrics["coalesced"] == 3
+    assert service.get_cache_stats()["hits"] == 1
+
+
+def test_agent_langchain_model_serves_sync_calls(config):
+    """Test sync invoke on an agent's model reaches its provider model, with bound kwargs"""
+    manager = LLMManager()
+    received = []
+
+    class FakeChat:
+        def invoke(self, messages, stop=None, **kwargs):
+            received.append((messages, stop, kwargs))
+            return AIMessage(content="comps look fine")
+
+    manager.llm_instances["analyst"] = FakeChat()
+    llm = manager.get_gateway_llm("analyst").bind(functions=[{"name": "comps", "parameters": {}}])
+
+    message = llm.invoke("value 123 Main St", stop=["\n\n"])
+
+    assert message.content == "comps look fine"
+    assert received[0][0][0].content == "value 123 Main St"
+    assert received[0][1:] == (["\n\n"], {"functions": [{"name": "comps", "parameters": {}}]})
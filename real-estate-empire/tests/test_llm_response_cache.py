@@ -0,0 +1,208 @@
+"""
+Tests for the content-addressed LLM response cache
+"""
+
+import asyncio
+import dataclasses
+import tempfile
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.llm_config import LLMManager, AgentLLMConfigs
+from app.services.llm_response_cache import LLMResponseCache, response_cache_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = LLMResponseCache(path=str(tmp_path / "cache.db"), ttl_seconds=60, clock=clock)
+    yield cache
+    cache.close()
+
+
+def test_key_covers_model_temperature_system_and_prompt():
+    """Test any change to the request produces a different key"""
+    base = response_cache_key("gpt-4", 0.1, "system", "prompt")
+    assert base == response_cache_key("gpt-4", 0.1, "system", "prompt")
+    assert base != response_cache_key("gpt-3.5-turbo", 0.1, "system", "prompt")
+    assert base != response_cache_key("gpt-4", 0.2, "system", "prompt")
+    assert base != response_cache_key("gpt-4", 0.1, "other system", "prompt")
+    assert base != response_cache_key("gpt-4", 0.1, "system", "other prompt")
+
+
+def test_hit_counts_saved_tokens_and_cost(cache):
+    """Test a repeated deterministic prompt is served from the cache"""
+    calls = []
+
+    def generate():
+        calls.append(1)
+        return SimpleNamespace(text="analysis", usage_metadata=SimpleNamespace(total_token_count=1500))
+
+    first = cache.get_or_generate("gemini", 0.0, None, "analyze 123 Main St", generate, cost_per_1k_tokens=0.01)
+    second = cache.get_or_generate("gemini", 0.0, None, "analyze 123 Main St", generate, cost_per_1k_tokens=0.01)
+
+    assert first == second == "analysis"
+    assert len(calls) == 1
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+    assert cache.stats.saved_tokens == 1500
+    assert cache.stats.saved_cost == pytest.approx(0.015)
+    assert cache.stats.hit_rate == pytest.approx(0.5)
+
+
+def test_sampled_temperatures_bypass_cache(cache):
+    """Test only zero-temperature prompts are cached"""
+    calls = []
+
+    def generate():
+        calls.append(1)
+        return "reply"
+
+    for temperature in (0.7, 0.7, 0.1, 0.1, None, None):
+        cache.get_or_generate("gpt-4", temperature, "system", "hello", generate)
+    assert len(calls) == 6
+    assert cache.size() == 0
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    """Test expired entries are treated as misses and purged"""
+    cache.get_or_generate("gpt-4", 0.0, None, "prompt", lambda: "old")
+    clock.now += 61
+
+    assert cache.get_or_generate("gpt-4", 0.0, None, "prompt", lambda: "new") == "new"
+    assert cache.stats.hits == 0
+
+    clock.now += 61
+    assert cache.purge_expired() == 1
+    assert cache.size() == 0
+
+
+def test_entries_persist_across_instances(tmp_path, clock):
+    """Test the disk store survives reopening"""
+    path = str(tmp_path / "cache.db")
+    first = LLMResponseCache(path=path, clock=clock)
+    first.get_or_generate("gpt-4", 0.0, "system", "prompt", lambda: "stored")
+    first.close()
+
+    second = LLMResponseCache(path=path, clock=clock)
+    assert second.get_or_generate("gpt-4", 0.0, "system", "prompt", lambda: "fresh") == "stored"
+    second.close()
+
+
+def test_default_path_is_outside_working_directory(tmp_path, monkeypatch):
+    """Test the cache file is not created in the current working directory"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path / "tmp"))
+
+    cache = LLMResponseCache()
+    cache.close()
+
+    assert list(tmp_path.iterdir()) == [tmp_path / "tmp"]
+    assert (tmp_path / "tmp" / "real-estate-empire" / "llm_response_cache.db").exists()
+
+
+@pytest.mark.asyncio
+async def test_async_lookups_run_off_the_event_loop(cache):
+    """Test SQLite reads and writes for async callers happen in worker threads"""
+    loop_thread = threading.get_ident()
+    threads = []
+    original_get, original_set = cache.get, cache.set
+
+    def get(*args):
+        threads.append(threading.get_ident())
+        return original_get(*args)
+
+    def set(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return original_set(*args, **kwargs)
+
+    cache.get, cache.set = get, set
+
+    async def generate():
+        return "answer"
+
+    results = await asyncio.gather(*[
+        cache.aget_or_generate("gpt-4", 0.0, None, "prompt", generate) for _ in range(2)
+    ])
+
+    assert results == ["answer", "answer"]
+    assert threads and loop_thread not in threads
+    assert cache.stats.hits + cache.stats.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_llm_manager_caches_deterministic_agents(cache, monkeypatch):
+    """Test invoke_with_fallback caches a zero-temperature agent but not the negotiator"""
+    manager = LLMManager()
+    manager.response_cache = cache
+    get_config = manager.get_config
+
+    def zero_temperature_contract(agent_name):
+        config = get_config(agent_name)
+        return dataclasses.replace(config, temperature=0.0) if agent_name == "contract" else config
+
+    monkeypatch.setattr(manager, "get_config", zero_temperature_contract)
+    calls = []
+
+    class FakeChat:
+        async def ainvoke(self, prompt):
+            calls.append(prompt)
+            return SimpleNamespace(content=f"answer to {prompt}", usage_metadata={"total_tokens": 800})
+
+    manager.llm_instances["contract"] = FakeChat()
+    manager.llm_instances["negotiator"] = FakeChat()
+
+    for _ in range(3):
+        assert await manager.invoke_with_fallback("contract", "draft") == "answer to draft"
+    for _ in range(2):
+        await manager.invoke_with_fallback("negotiator", "offer")
+
+    assert calls == ["draft", "offer", "offer"]
+    stats = manager.get_cache_stats()
+    assert stats["hits"] == 2
+    assert stats["saved_tokens"] == 1600
+    assert stats["saved_cost"] == pytest.approx(1.6 * AgentLLMConfigs.CONTRACT_AGENT.cost_per_1k_tokens)
+
+
+@pytest.mark.asyncio
+async def test_gemini_analyses_do_not_block_the_event_loop(cache):
+    """Test GeminiService's async analyses reach the cache and the model from worker threads"""
+    from app.core.llm_gateway import LLMGateway
+    from app.services.gemini_service import GeminiService
+
+    loop_thread = threading.get_ident()
+    threads = []
+    original_get = cache.get
+
+    def get(*args):
+        threads.append(threading.get_ident())
+        return original_get(*args)
+
+    class FakeGemini:
+        def generate_content(self, prompt, **kwargs):
+            threads.append(threading.get_ident())
+            return SimpleNamespace(text="solid rental", usage_metadata=None)
+
+    cache.get = get
+    service = GeminiService(response_cache=cache, model=FakeGemini(), gateway=LLMGateway(None))
+
+    first = await service.analyze_property({"address": "123 Main St"})
+    second = await service.analyze_property({"address": "123 Main St"})
+
+    assert first.content == second.content == "solid rental"
+    assert len(threads) == 3 and loop_thread not in threads
+    assert cache.stats.hits == 1
@@ -0,0 +1,191 @@
+"""
+Tests for market simulator scenario sampling and market path simulation
+"""
+
+import sqlite3
+from datetime import date
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import Mock
+
+from app.simulation.market_simulator import MarketSimulator, SimulatedDeal
+from app.simulation.market_paths import simulate_market_paths, SEASONS, TRENDS
+from app.simulation.scenario_sampler import PropertyReservoir, get_property_reservoir
+
+
+@pytest.fixture
+def properties_frame():
+    rng = np.random.default_rng(0)
+    n = 600
+    cities = np.array(["Miami", "Orlando", "Tampa", "Austin"])
+    states = np.array(["Florida", "Florida", "Florida", "Texas"])
+    city_index = rng.integers(0, 4, size=n)
+    df = pd.DataFrame({
+        "city": cities[city_index],
+        "state": states[city_index],
+        "price": rng.uniform(100000, 900000, size=n),
+        "house_size": rng.uniform(800, 4000, size=n),
+        "bed": rng.integers(1, 6, size=n).astype(float),
+        "bath": rng.integers(1, 4, size=n).astype(float),
+        "acre_lot": rng.uniform(0.05, 1.0, size=n),
+        "zip_code": rng.integers(10000, 99999, size=n).astype(float)
+    })
+    # Rows without price or size are never sampled
+    df.loc[:49, "price"] = np.nan
+    df.loc[50:59, "house_size"] = np.nan
+    return df
+
+
+@pytest.fixture
+def reservoir(properties_frame):
+    return PropertyReservoir.from_frame(properties_frame)
+
+
+def make_simulator(reservoir, seed=42):
+    market_service = Mock()
+    market_service.db_path = "unused.db"
+    return MarketSimulator(market_service, seed=seed, reservoir=reservoir)
+
+
+class TestPropertyReservoir:
+    """Test cases for PropertyReservoir"""
+
+    def test_only_valid_rows_are_loaded(self, reservoir):
+        assert reservoir.size == 540
+        assert not np.isnan(reservoir.numeric["price"]).any()
+
+    def test_candidates_are_case_insensitive(self, reservoir):
+        miami = reservoir.candidate_positions(city="MIAMI", state="florida")
+        assert len(miami) > 0
+        assert set(reservoir.text["city"][miami]) == {"Miami"}
+        assert len(reservoir.candidate_positions(state="Texas")) == len(reservoir.candidate_positions(city="austin"))
+        assert len(reservoir.candidate_positions(city="Nowhere")) == 0
+
+    def test_sampling_respects_cities(self, reservoir):
+        rng = np.random.default_rng(1)
+        positions = reservoir.sample_positions(1000, rng, cities=["Miami", "Nowhere"])
+
+        assert 0 < len(positions) < 1000
+        assert set(reservoir.text["city"][positions]) == {"Miami"}
+
+    def test_save_and_memory_mapped_load(self, reservoir, tmp_path):
+        reservoir.save(str(tmp_path))
+        loaded = PropertyReservoir.load(str(tmp_path))
+
+        assert isinstance(loaded.numeric["price"], np.memmap)
+        np.testing.assert_array_equal(loaded.numeric["price"], reservoir.numeric["price"])
+        assert list(loaded.text["city"]) == list(reservoir.text["city"])
+        np.testing.assert_array_equal(
+            loaded.candidate_positions(city="Tampa"), reservoir.candidate_positions(city="Tampa")
+        )
+
+    def test_shared_reservoir_from_sqlite(self, properties_frame, tmp_path):
+        db_path = str(tmp_path / "market.db")
+        conn = sqlite3.connect(db_path)
+        properties_frame.to_sql("properties", conn, index=False)
+        conn.close()
+
+        first = get_property_reservoir(db_path)
+        assert first.size == 540
+        assert get_property_reservoir(db_path) is first
+
+
+class TestScenarioGeneration:
+    """Test cases for vectorized MarketSimulator scenario generation"""
+
+    def test_same_seed_same_scenarios(self, reservoir):
+        first = make_simulator(reservoir, seed=7).generate_scenario_frame(500, ["Miami", "Tampa"])
+        second = make_simulator(reservoir, seed=7).generate_scenario_frame(500, ["Miami", "Tampa"])
+        other = make_simulator(reservoir, seed=8).generate_scenario_frame(500, ["Miami", "Tampa"])
+
+        pd.testing.assert_frame_equal(first, second)
+        assert not first["asking_price"].equals(other["asking_price"])
+
+    def test_scenario_values_follow_market_rules(self, reservoir):
+        simulator = make_simulator(reservoir)
+        frame = simulator.generate_scenario_frame(5000)
+        condition = simulator.current_condition
+
+        np.testing.assert_allclose(
+            frame["market_value"], frame["price"] * (1.0 + condition.price_momentum * 0.1)
+        )
+        ratio = frame["asking_price"] / frame["market_value"]
+        high_motivation = frame["seller_motivation"] > 0.8
+        low_motivation = frame["seller_motivation"] <= 0.5
+        assert ratio[high_motivation].between(0.95, 1.05).all()
+        assert ratio[low_motivation].between(1.1, 1.3).all()
+        assert frame["seller_motivation"].between(0.2, 1.0).all()
+        assert frame["competition_level"].between(0.1, 1.0).all()
+
+    def test_generate_deal_scenario(self, reservoir):
+        simulator = make_simulator(reservoir)
+        deal = simulator.generate_deal_scenario("orlando", "Florida")
+
+        assert isinstance(deal, SimulatedDeal)
+        assert deal.property_data["city"] == "Orlando"
+        assert deal.property_id.startswith("SIM_")
+        assert simulator.active_deals == [deal]
+
+        with pytest.raises(ValueError):
+            simulator.generate_deal_scenario("Nowhere")
+
+    def test_generate_batch_scenarios(self, reservoir):
+        simulator = make_simulator(reservoir)
+        deals = simulator.generate_batch_scenarios(200, ["Miami", "Austin"])
+
+        assert len(deals) == 200
+        assert {deal.property_data["city"] for deal in deals} == {"Miami", "Austin"}
+        assert len(simulator.active_deals) == 200
+
+
+class TestMarketPaths:
+    """Test cases for vectorized market path simulation"""
+
+    def test_shapes_and_bounds(self):
+        paths = simulate_market_paths(np.random.default_rng(3), num_paths=2000, num_days=120)
+
+        assert paths.interest_rate.shape == (2000, 120)
+        assert paths.interest_rate.min() >= 2.0 and paths.interest_rate.max() <= 10.0
+        assert paths.price_momentum.min() >= -1.0 and paths.price_momentum.max() <= 1.0
+        assert paths.volatility.min() >= 0.1 and paths.volatility.max() <= 1.0
+        assert set(np.unique(paths.season)) == {SEASONS.index("spring")}
+
+    def test_trend_regime_switch_rate(self):
+        paths = simulate_market_paths(np.random.default_rng(4), num_paths=5000, num_days=100)
+
+        switches = (np.diff(paths.trend, axis=1) != 0).mean()
+        assert switches == pytest.approx(0.05, abs=0.005)
+
+    def test_seasonal_schedule(self):
+        paths = simulate_market_paths(
+            np.random.default_rng(5), num_paths=4000, num_days=90,
+            seasonal_schedule={"summer": 0.01}, start_date=date(2024, 6, 1)
+        )
+
+        assert set(SEASONS[code] for code in paths.season) == {"summer"}
+        assert paths.price_momentum[:, -1].mean() > 0.5
+
+    def test_frame_and_records(self):
+        paths = simulate_market_paths(np.random.default_rng(6), num_paths=3, num_days=4)
+        frame = paths.to_frame()
+        records = paths.to_records()
+
+        assert len(frame) == len(records) == 12
+        assert list(frame["path"][:5]) == [0, 0, 0, 0, 1]
+        np.testing.assert_allclose(records["interest_rate"], paths.interest_rate.ravel())
+        assert set(records["trend"]) <= set(TRENDS)
+
+    def test_simulator_paths_are_seeded(self, reservoir):
+        first = make_simulator(reservoir, seed=11).simulate_market_paths(num_paths=50, num_days=30)
+        second = make_simulator(reservoir, seed=11).simulate_market_paths(num_paths=50, num_days=30)
+
+        np.testing.assert_array_equal(first.price_momentum, second.price_momentum)
+
+    def test_simulate_market_cycle(self, reservoir):
+        simulator = make_simulator(reservoir)
+        conditions = simulator.simulate_market_cycle(30)
+
+        assert len(conditions) == 30
+        assert simulator.current_condition is conditions[-1]
+        assert all(2.0 <= condition.interest_rate <= 10.0 for condition in conditions)
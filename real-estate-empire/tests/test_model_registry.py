@@ -0,0 +1,181 @@
+"""
+Tests for the predictive model registry and batch predictions
+"""
+
+import os
+import uuid
+from datetime import datetime
+from unittest.mock import patch
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+from sqlalchemy import event
+
+from app.models.portfolio import PortfolioDB, PortfolioPropertyDB
+from app.models.predictive_analytics import (
+    PredictiveModelDB, PredictionDB, DealOutcomePredictionDB, RiskAssessmentDB, PredictionTypeEnum,
+    DealOutcomePredictionRequest, RiskAssessmentRequest
+)
+from app.models.property import PropertyDB
+from app.services.model_registry import ModelRegistry
+from app.services.predictive_analytics_service import PredictiveAnalyticsService
+
+FEATURES = ["offer_amount", "estimated_repair_cost", "profit_margin"]
+
+
+def dump_model(path, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(200, len(FEATURES))) * [50000, 10000, 0.1] + [250000, 30000, 0.15]
+    y = (X[:, 2] > 0.15).astype(int)
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=10, random_state=seed).fit(scaler.transform(X), y)
+    joblib.dump({"model": model, "scaler": scaler, "features": FEATURES}, path)
+    return path
+
+
+def model_row(path, version="1.0", name="deal_outcome", model_type="random_forest_classifier"):
+    return PredictiveModelDB(id=uuid.uuid4(), name=name, model_type=model_type,
+                             prediction_type=PredictionTypeEnum.DEAL_OUTCOME, version=version,
+                             is_active=True, model_path=str(path))
+
+
+def test_registry_keeps_models_warm_and_reloads_on_change(tmp_path):
+    registry = ModelRegistry()
+    row = model_row(dump_model(tmp_path / "deal.joblib"))
+
+    with patch("app.services.model_registry.joblib.load", wraps=joblib.load) as load:
+        first = registry.get(row)
+        assert registry.get(row) is first
+        assert load.call_count == 1
+
+        row.version = "1.1"
+        assert registry.get(row) is not first
+        assert load.call_count == 2
+
+        # Retraining in place is picked up through the file's mtime
+        dump_model(row.model_path, seed=1)
+        os.utime(row.model_path, (1, 1))
+        registry.get(row)
+        assert load.call_count == 3
+
+    assert registry.get_stats()["reloads"] == 2
+    assert registry.get(model_row(tmp_path / "missing.joblib")) is None
+    assert registry.get(model_row(None)) is None
+
+
+def test_registry_evicts_least_recently_used_over_budget(tmp_path):
+    rows = [model_row(dump_model(tmp_path / f"m{i}.joblib", seed=i)) for i in range(3)]
+    size = max(os.path.getsize(row.model_path) for row in rows)
+    registry = ModelRegistry(max_bytes=2 * size)
+
+    registry.get(rows[0])
+    registry.get(rows[1])
+    registry.get(rows[0])
+    registry.get(rows[2])
+
+    assert rows[0].id in registry and rows[2].id in registry
+    assert rows[1].id not in registry
+    assert registry.stats.evictions == 1
+    assert registry.total_bytes <= registry.max_bytes
+
+    # A single model larger than the budget is still served
+    tiny = ModelRegistry(max_bytes=1)
+    assert tiny.get(rows[0]) is not None and len(tiny) == 1
+
+
+@pytest.fixture
+def db(sqlite_session):
+    return sqlite_session(
+        PropertyDB, PortfolioDB, PortfolioPropertyDB, PredictiveModelDB,
+        PredictionDB, DealOutcomePredictionDB, RiskAssessmentDB
+    )
+
+
+@pytest.fixture
+def service(db, tmp_path):
+    with patch("app.services.predictive_analytics_service.MarketDataService"):
+        service = PredictiveAnalyticsService(db)
+    service.model_registry = ModelRegistry()
+    row = model_row(dump_model(tmp_path / "deal.joblib"))
+    db.add(row)
+    db.commit()
+    return service
+
+
+def deal_request(i):
+    return DealOutcomePredictionRequest(
+        deal_type="flip", offer_amount=200000.0 + 10000 * i, estimated_repair_cost=20000.0 + 5000 * i,
+        property_features={"arv": 320000.0 + 4000 * i, "bedrooms": 3}
+    )
+
+
+def test_batch_deal_predictions_use_one_predict_call(service, db):
+    requests = [deal_request(i) for i in range(8)]
+    with patch.object(service, "_prepare_deal_outcome_features",
+                      side_effect=lambda r: {"offer_amount": r.offer_amount,
+                                             "estimated_repair_cost": r.estimated_repair_cost,
+                                             "profit_margin": (r.property_features["arv"] - r.offer_amount) / r.offer_amount}):
+        singles = [service.predict_deal_outcome(request) for request in requests]
+
+        model = service.model_registry.get(service._get_or_create_model("deal_outcome", "random_forest_classifier"))
+        with patch.object(model.model, "predict", wraps=model.model.predict) as predict, \
+             patch.object(model.scaler, "transform", wraps=model.scaler.transform) as transform:
+            batch = service.predict_deal_outcomes_batch(requests)
+
+    assert predict.call_count == 1 and transform.call_count == 1
+    assert [r.success_probability for r in batch] == pytest.approx([r.success_probability for r in singles])
+    assert len({r.prediction_id for r in batch}) == 8
+    assert db.query(DealOutcomePredictionDB).count() == 16
+    assert service.model_registry.get_stats()["misses"] == 1
+    assert service.predict_deal_outcomes_batch([]) == []
+
+
+def test_assess_risk_batch_prefetches_targets_into_one_predict(service, db):
+    properties = [PropertyDB(id=uuid.uuid4(), address=f"{i} Main St", city="Austin", state="TX", zip_code="78701",
+                             current_value=250000.0, year_built=1990 + i) for i in range(3)]
+    db.add_all(properties)
+    db.commit()
+    requests = [RiskAssessmentRequest(target_type="property", target_id=p.id, include_stress_testing=False,
+                                      include_scenario_analysis=False) for p in properties]
+
+    with patch.object(service, "_make_predictions",
+                      return_value=[{"predicted_value": 20.0 * (i + 1), "confidence_score": 0.8} for i in range(3)]) \
+            as make_predictions:
+        results = service.assess_risk_batch(requests)
+
+    make_predictions.assert_called_once()
+    features = make_predictions.call_args.args[1]
+    assert [f["property_age"] for f in features] == [
+        service._prepare_risk_assessment_features(r)["property_age"] for r in requests]
+    assert [r.target_id for r in results] == [p.id for p in properties]
+    assert [r.overall_risk_score for r in results] == [20.0, 40.0, 60.0]
+    assert db.query(RiskAssessmentDB).count() == 3
+
+
+def test_assess_risk_batch_loads_portfolio_holdings_once_and_is_seeded(service, db):
+    portfolios = [PortfolioDB(id=uuid.uuid4(), name=f"Book {i}", total_value=600000.0, total_debt=300000.0,
+                              monthly_cash_flow=2000.0) for i in range(3)]
+    db.add_all(portfolios)
+    for portfolio in portfolios[:2]:
+        for value in (250000.0, 350000.0):
+            db.add(PortfolioPropertyDB(id=uuid.uuid4(), portfolio_id=portfolio.id, property_id=uuid.uuid4(),
+                                       acquisition_date=datetime(2022, 1, 1), acquisition_price=value,
+                                       total_investment=value, current_value=value, monthly_rent=value / 150))
+    db.commit()
+    requests = [RiskAssessmentRequest(target_type="portfolio", target_id=p.id) for p in portfolios]
+
+    statements = []
+    record = lambda *args: statements.append(args[2])
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    results = service.assess_risk_batch(requests)
+    event.remove(db.get_bind(), "before_cursor_execute", record)
+
+    holding_reads = [s for s in statements if s.lstrip().upper().startswith("SELECT") and "portfolio_properties" in s]
+    assert len(holding_reads) == 1
+    # The same holdings simulate to the same outlook, in a batch or on their own
+    single = service.assess_risk(requests[0])
+    assert results[0].scenario_analysis == single.scenario_analysis
+    assert results[0].stress_test_results == single.stress_test_results
@@ -0,0 +1,117 @@
+"""
+Tests for the precomputed neighborhood score grid and grid-backed search
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.neighborhood_analysis import (
+    AmenityTypeEnum, CrimeIncident, CrimeTypeEnum, MarketTrend, NeighborhoodScoreCellDB, NeighborhoodSearchCriteria,
+    TrendDirectionEnum
+)
+from app.services.neighborhood_analysis_service import NeighborhoodAnalysisService
+from app.services.spatial_index import haversine_miles
+
+BOUNDS = (40.60, 40.80, -74.10, -73.90)
+
+
+DATASET_ARGS = dict(seed=11, n_schools=200, n_amenities=1500, n_incidents=3000, spread=0.12)
+
+
+def rising_trend():
+    now = datetime.now()
+    return [MarketTrend(period_start=now - timedelta(days=30), period_end=now, median_price=350000,
+                        average_price=380000, price_change_percent=3.0, price_trend=TrendDirectionEnum.RISING,
+                        sales_count=20, volume_change_percent=1.0, volume_trend=TrendDirectionEnum.STABLE)]
+
+
+@pytest.fixture
+def service(make_neighborhood_datasets):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[NeighborhoodScoreCellDB.__table__])
+    db = sessionmaker(bind=engine)()
+    service = NeighborhoodAnalysisService(db)
+    service.build_spatial_index(*make_neighborhood_datasets(**DATASET_ARGS))
+    yield service
+    db.close()
+
+
+def test_grid_matches_index_scores_and_skips_unchanged_cells(service):
+    stats = service.refresh_neighborhood_grid("nyc", BOUNDS, trends=rising_trend())
+    total = service.db.query(NeighborhoodScoreCellDB).count()
+    assert stats["cells_written"] == stats["cells_evaluated"] == total >= 400
+
+    cell = service.db.query(NeighborhoodScoreCellDB).order_by(NeighborhoodScoreCellDB.overall_score.desc()).first()
+    expected = service.score_location(cell.center_lat, cell.center_lng, trends=rising_trend())
+    assert cell.overall_score == pytest.approx(expected.overall_score, abs=1e-3)
+    assert cell.safety_score == pytest.approx(expected.safety_score, abs=1e-3)
+    assert cell.median_price == 350000
+
+    again = service.refresh_neighborhood_grid("nyc", BOUNDS, trends=rising_trend())
+    assert again["cells_written"] == 0 and again["cells_unchanged"] == total
+
+
+def test_incremental_refresh_only_touches_cells_near_changes(service, make_neighborhood_datasets):
+    service.refresh_neighborhood_grid("nyc", BOUNDS)
+    schools, amenities, incidents = make_neighborhood_datasets(**DATASET_ARGS)
+    hotspot = (40.70, -74.00)
+    incidents += [CrimeIncident(incident_date=datetime.now() - timedelta(days=5), latitude=hotspot[0],
+                                longitude=hotspot[1], crime_type=CrimeTypeEnum.VIOLENT,
+                                crime_description="new", severity=5) for _ in range(10)]
+    service.build_spatial_index(schools, amenities, incidents)
+    before = {row.cell_key: row.safety_score for row in service.db.query(NeighborhoodScoreCellDB)}
+
+    stats = service.refresh_neighborhood_grid("nyc", BOUNDS, changed_locations=[hotspot])
+
+    assert 0 < stats["cells_written"] <= stats["cells_evaluated"] < len(before) / 10
+    changed = [row for row in service.db.query(NeighborhoodScoreCellDB) if row.safety_score != before[row.cell_key]]
+    assert changed
+    assert all(haversine_miles(row.center_lat, row.center_lng, *hotspot) <= 1.0 for row in changed)
+    assert service.refresh_neighborhood_grid("nyc", BOUNDS, changed_locations=[])["cells_evaluated"] == 0
+
+
+def test_search_is_a_filtered_sorted_range_query(service):
+    service.refresh_neighborhood_grid("nyc", BOUNDS, trends=rising_trend())
+    criteria = NeighborhoodSearchCriteria(center_lat=40.70, center_lng=-74.00, radius_miles=3.0,
+                                          min_overall_score=50.0, min_safety_score=20.0,
+                                          required_amenities=[AmenityTypeEnum.GROCERY, AmenityTypeEnum.PARK])
+
+    start = time.perf_counter()
+    result = service.search_neighborhoods(criteria)
+    elapsed = time.perf_counter() - start
+
+    scores = result.grid_scores
+    assert result.total_found == len(scores) > 0
+    assert elapsed < 0.1
+    assert [s.overall_score for s in scores] == sorted((s.overall_score for s in scores), reverse=True)
+    assert all(s.overall_score >= 50 and s.safety_score >= 20 for s in scores)
+    assert all(haversine_miles(s.center_lat, s.center_lng, 40.70, -74.00) <= 3.0 for s in scores)
+
+    grocery_and_park = (1 << list(AmenityTypeEnum).index(AmenityTypeEnum.GROCERY)) | \
+        (1 << list(AmenityTypeEnum).index(AmenityTypeEnum.PARK))
+    masks = {row.cell_key: row.amenity_types_mask for row in service.db.query(NeighborhoodScoreCellDB)}
+    assert all(masks[s.cell_key] & grocery_and_park == grocery_and_park for s in scores)
+
+    assert len(service.search_neighborhoods(criteria, limit=3).grid_scores) == min(3, len(scores))
+    assert service.search_neighborhoods(NeighborhoodSearchCriteria(max_median_price=300000)).total_found == 0
+
+
+def test_markets_sharing_cells_keep_separate_rows_and_unpriced_cells_pass_price_filter(service):
+    service.refresh_neighborhood_grid("nyc", BOUNDS, trends=rising_trend())
+    # An overlapping market with no sales data
+    overlap = (40.68, 40.72, -74.02, -73.98)
+    stats = service.refresh_neighborhood_grid("downtown", overlap)
+
+    rows = service.db.query(NeighborhoodScoreCellDB)
+    downtown = {row.cell_key for row in rows.filter(NeighborhoodScoreCellDB.market == "downtown")}
+    nyc = {row.cell_key for row in rows.filter(NeighborhoodScoreCellDB.market == "nyc")}
+    assert stats["cells_written"] == len(downtown) > 0 and downtown <= nyc
+    assert all(row.median_price == 350000 for row in rows.filter(NeighborhoodScoreCellDB.market == "nyc"))
+
+    result = service.search_neighborhoods(NeighborhoodSearchCriteria(max_median_price=300000))
+    assert {s.cell_key for s in result.grid_scores} == downtown
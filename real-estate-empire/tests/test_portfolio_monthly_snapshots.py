@@ -0,0 +1,127 @@
+"""
+Tests for the materialized monthly portfolio series and its rolling risk metrics
+"""
+
+import uuid
+from datetime import datetime, date
+from statistics import stdev
+
+import pytest
+
+from app.models.portfolio import PortfolioDB, PortfolioMonthlySnapshotDB
+from app.services.portfolio_performance_service import PortfolioPerformanceService
+
+VALUES = [1000000, 1050000, 980000, 1100000, 900000, 750000, 800000, 1200000, 1150000, 1300000, 1250000, 1400000,
+          1380000, 1450000]
+
+
+@pytest.fixture
+def db(sqlite_session):
+    return sqlite_session(PortfolioDB, PortfolioMonthlySnapshotDB)
+
+
+def performance(value, cash_flow=24000.0):
+    return {
+        "total_properties": 4, "total_value": value, "total_equity": value * 0.4, "total_debt": value * 0.6,
+        "total_income": 60000.0, "total_expenses": 60000.0 - cash_flow, "net_cash_flow": cash_flow,
+        "average_cap_rate": 6.5, "average_coc_return": 9.0, "average_roi": 12.0, "portfolio_roi": 11.0
+    }
+
+
+def record_months(service, portfolio_id, values):
+    for i, value in enumerate(values):
+        service._record_monthly_snapshot(portfolio_id, performance(value),
+                                         as_of=datetime(2023 + i // 12, i % 12 + 1, 15))
+        service.db.commit()
+
+
+def expected_risk(values):
+    """The per-request statistics the snapshot columns replace."""
+    returns = [(b - a) / a for a, b in zip(values, values[1:])]
+    peak, drawdown = values[0], 0.0
+    for value in values:
+        peak = max(peak, value)
+        drawdown = max(drawdown, (peak - value) / peak)
+    return stdev(returns) * 100, drawdown * 100
+
+
+def test_snapshots_are_upserted_monthly_with_trailing_window_metrics(db):
+    portfolio_id = uuid.uuid4()
+    db.add(PortfolioDB(id=portfolio_id, name="Alpha"))
+    service = PortfolioPerformanceService(db)
+
+    record_months(service, portfolio_id, VALUES)
+    # A second update in the same month replaces that month's row
+    service._record_monthly_snapshot(portfolio_id, performance(VALUES[-1]), as_of=datetime(2024, 2, 28))
+    db.commit()
+
+    series = service.get_monthly_series(portfolio_id, months=24)
+    assert len(series) == len(VALUES)
+    assert series[0].month == date(2023, 1, 1) and series[-1].month == date(2024, 2, 1)
+    assert series[-1].net_cash_flow == pytest.approx(2000.0)
+
+    volatility, drawdown = expected_risk(VALUES[-12:])
+    assert series[-1].volatility == pytest.approx(volatility)
+    assert series[-1].max_drawdown == pytest.approx(drawdown)
+    assert series[-1].appreciation == VALUES[-1] - VALUES[-2]
+    assert series[-1].monthly_return == pytest.approx((VALUES[-1] / VALUES[-2] - 1) * 100)
+    assert series[-1].value_trend > 0
+
+    assert [s.month for s in service.get_monthly_series(portfolio_id)] == [s.month for s in series[-12:]]
+
+
+def test_rebuild_matches_incremental_updates_and_feeds_analytics(db):
+    portfolio_id = uuid.uuid4()
+    db.add(PortfolioDB(id=portfolio_id, name="Alpha"))
+    service = PortfolioPerformanceService(db)
+    record_months(service, portfolio_id, VALUES)
+
+    incremental = [value for s in service.get_monthly_series(portfolio_id, 24)
+               for value in (s.volatility, s.max_drawdown, s.sharpe_ratio)]
+    assert service.rebuild_monthly_snapshots(portfolio_id) == len(VALUES)
+    rebuilt = [value for s in service.get_monthly_series(portfolio_id, 24)
+               for value in (s.volatility, s.max_drawdown, s.sharpe_ratio)]
+    assert rebuilt == pytest.approx(incremental)
+
+    series = service.get_monthly_series(portfolio_id)
+    assert service._calculate_volatility(portfolio_id, series) == series[-1].volatility
+    assert service._calculate_max_drawdown(portfolio_id) == series[-1].max_drawdown
+    trend = service._get_value_trend(portfolio_id, series)
+    assert [point["total_value"] for point in trend] == VALUES[-12:]
+    assert service._get_cash_flow_trend(portfolio_id)[-1]["month"] == "2024-02"
+    assert service._calculate_volatility(uuid.uuid4()) == 0.0
+
+
+def test_total_return_is_periodic_and_history_reports_it(db):
+    portfolio_id = uuid.uuid4()
+    db.add(PortfolioDB(id=portfolio_id, name="Alpha"))
+    service = PortfolioPerformanceService(db)
+    record_months(service, portfolio_id, VALUES[:3])
+
+    series = service.get_monthly_series(portfolio_id)
+    # Value change plus the month's cash flow over the previous month's value
+    assert series[1].total_return == pytest.approx((VALUES[1] - VALUES[0] + 2000.0) / VALUES[0] * 100)
+    history = service._get_historical_performance(portfolio_id, datetime(2023, 1, 1), datetime(2023, 3, 31))
+    assert [point["total_return"] for point in history] == [s.total_return for s in series]
+    assert history[2]["total_return"] != series[2].portfolio_roi
+
+
+def test_missing_months_break_rolling_windows(db):
+    portfolio_id = uuid.uuid4()
+    db.add(PortfolioDB(id=portfolio_id, name="Alpha"))
+    service = PortfolioPerformanceService(db)
+    # Jan-Mar 2023, then nothing until Nov 2023
+    for month, value in [(1, 1000000), (2, 1100000), (3, 1000000), (11, 500000), (12, 520000)]:
+        service._record_monthly_snapshot(portfolio_id, performance(value), as_of=datetime(2023, month, 15))
+        db.commit()
+
+    series = service.get_monthly_series(portfolio_id)
+    november, december = series[3], series[4]
+    # No return is measured across the gap, so the 50% fall is not a one-month move
+    assert november.monthly_return == 0.0 and november.appreciation == 0.0
+    assert december.monthly_return == pytest.approx(4.0)
+    # The trailing 12 calendar months still include January's peak
+    assert december.max_drawdown == pytest.approx(100 * (1100000 - 500000) / 1100000)
+    assert service.rebuild_monthly_snapshots(portfolio_id) == 5
+    assert [s.monthly_return for s in service.get_monthly_series(portfolio_id)] == \
+        pytest.approx([s.monthly_return for s in series])
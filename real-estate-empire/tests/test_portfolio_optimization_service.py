@@ -87,7 +87,7 @@ class TestPortfolioOptimizationService:
     def test_detect_underperforming_assets_empty_portfolio(self, optimization_service, sample_portfolio_id, mock_db):
         """Test detecting underperforming assets with empty portfolio."""
         # Setup
-        mock_db.query.return_value.filter.return_value.all.return_value = []
+        optimization_service.performance_service.calculate_property_performances.return_value = []
         
         # Execute
         result = optimization_service.detect_underperforming_assets(sample_portfolio_id)
@@ -98,36 +98,29 @@ class TestPortfolioOptimizationService:
     def test_detect_underperforming_assets_with_properties(self, optimization_service, sample_portfolio_id, 
                                                          sample_portfolio_properties, mock_db):
         """Test detecting underperforming assets with properties."""
-        # Setup
-        mock_db.query.return_value.filter.return_value.all.return_value = sample_portfolio_properties
-        
-        # Mock performance calculations - need to return one at a time
-        def mock_performance_calc(prop_id, start_date, end_date):
-            if prop_id == sample_portfolio_properties[0].id:
-                return {
-                    'cap_rate': 5.0,  # Below average
-                    'coc_return': 6.0,  # Below average
-                    'roi': 10.0,
-                    'annual_cash_flow': 14400,
-                    'current_value': 250000,
-                    'portfolio_property': sample_portfolio_properties[0]
-                }
-            else:
-                return {
-                    'cap_rate': 2.0,  # Very low
-                    'coc_return': 2.0,  # Very low
-                    'roi': -3.0,  # Negative
-                    'annual_cash_flow': 3600,
-                    'current_value': 160000,
-                    'portfolio_property': sample_portfolio_properties[1]
-                }
-        
-        optimization_service.performance_service.calculate_property_performance.side_effect = mock_performance_calc
-        
-        # Mock property queries
-        mock_property = Mock()
-        mock_property.address = "123 Test St"
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_property
+        # Setup - performance for every property comes back from one batched call
+        optimization_service.performance_service.calculate_property_performances.return_value = [
+            {
+                'portfolio_property_id': sample_portfolio_properties[0].id,
+                'property_id': sample_portfolio_properties[0].property_id,
+                'property_address': "123 Test St",
+                'cap_rate': 5.0,  # Below average
+                'coc_return': 6.0,  # Below average
+                'roi': 10.0,
+                'annual_cash_flow': 14400,
+                'current_value': 250000
+            },
+            {
+                'portfolio_property_id': sample_portfolio_properties[1].id,
+                'property_id': sample_portfolio_properties[1].property_id,
+                'property_address': "456 Test Ave",
+                'cap_rate': 2.0,  # Very low
+                'coc_return': 2.0,  # Very low
+                'roi': -3.0,  # Negative
+                'annual_cash_flow': 3600,
+                'current_value': 160000
+            }
+        ]
         
         # Execute
         result = optimization_service.detect_underperforming_assets(sample_portfolio_id)
@@ -413,7 +406,7 @@ class TestPortfolioOptimizationService:
     def test_error_handling_detect_underperforming_assets(self, optimization_service, sample_portfolio_id, mock_db):
         """Test error handling in detect_underperforming_assets."""
         # Setup to raise an exception
-        mock_db.query.side_effect = Exception("Database error")
+        optimization_service.performance_service.calculate_property_performances.side_effect = Exception("Database error")
         
         # Execute and assert
         with pytest.raises(Exception, match="Database error"):
@@ -6,9 +6,11 @@ import pytest
 import uuid
 from datetime import datetime, timedelta
 from unittest.mock import Mock, patch
+import pandas as pd
 from sqlalchemy.orm import Session
 
 from app.services.portfolio_performance_service import PortfolioPerformanceService
+from app.services.portfolio_performance_engine import FRAME_COLUMNS
 from app.models.portfolio import (
     PortfolioDB, PortfolioPropertyDB, PropertyPerformanceDB, PortfolioPerformanceDB
 )
@@ -126,48 +128,62 @@ class TestPortfolioPerformanceService:
         with pytest.raises(ValueError, match="Portfolio property .* not found"):
             service.calculate_property_performance(uuid.uuid4(), period_start, period_end)
     
+    def property_frame(self, portfolio_properties, records_by_property=None):
+        """Rows in the shape of the engine's single grouped query."""
+        records_by_property = records_by_property or {}
+        rows = []
+        for prop in portfolio_properties:
+            records = records_by_property.get(prop.id, [])
+            rows.append({
+                "portfolio_property_id": prop.id, "portfolio_id": prop.portfolio_id,
+                "property_id": prop.property_id, "acquisition_date": prop.acquisition_date,
+                "acquisition_price": prop.acquisition_price, "total_investment": prop.total_investment,
+                "current_value": prop.current_value, "current_debt": prop.current_debt,
+                "monthly_cash_flow": prop.monthly_cash_flow,
+                "total_income": sum(r.total_income for r in records) if records else None,
+                "total_expenses": sum(r.total_expenses for r in records) if records else None,
+                "occupancy_rate": records[0].occupancy_rate if records else None,
+                "record_count": len(records), "matched_property_id": None
+            })
+        return pd.DataFrame(rows, columns=FRAME_COLUMNS)
+    
     def test_calculate_portfolio_performance(self, service, mock_db, sample_portfolio_property, sample_performance_records):
         """Test calculating portfolio-level performance."""
         # Create sample portfolio
         portfolio = PortfolioDB(
-            id=uuid.uuid4(),
+            id=sample_portfolio_property.portfolio_id,
             name="Test Portfolio",
             total_properties=1
         )
         
         # Setup mocks
         mock_db.query.return_value.filter.return_value.first.return_value = portfolio
-        mock_db.query.return_value.filter.return_value.all.return_value = [sample_portfolio_property]
+        frame = self.property_frame(
+            [sample_portfolio_property], {sample_portfolio_property.id: sample_performance_records}
+        )
         
-        # Mock the property performance calculation
-        with patch.object(service, 'calculate_property_performance') as mock_calc:
-            mock_calc.return_value = {
-                "current_value": 250000.0,
-                "total_investment": 220000.0,
-                "current_equity": 100000.0,
-                "total_income": 2000.0,
-                "total_expenses": 1400.0,
-                "annual_cash_flow": 7200.0,
-                "cap_rate": 2.88,
-                "coc_return": 10.29,
-                "roi": 13.64
-            }
-            
+        # All properties and their performance totals come from one query
+        with patch('app.services.portfolio_performance_service.load_property_frame', return_value=frame) as mock_load:
             # Test
             period_start = datetime.now() - timedelta(days=30)
             period_end = datetime.now()
             result = service.calculate_portfolio_performance(portfolio.id, period_start, period_end)
-            
-            # Assertions
-            assert result["portfolio_id"] == portfolio.id
-            assert result["total_properties"] == 1
-            assert result["total_value"] == 250000.0
-            assert result["total_investment"] == 220000.0
-            assert result["total_equity"] == 100000.0
-            assert result["net_cash_flow"] == 600.0
-            assert result["average_cap_rate"] == 2.88
-            assert result["average_coc_return"] == 10.29
-            assert result["average_roi"] == 13.64
+            mock_load.assert_called_once()
+        
+        # 600/month net cash flow annualized over a 30-day period
+        annual_cash_flow = 600.0 * 12 / (30 / 30.44)
+        
+        # Assertions
+        assert result["portfolio_id"] == portfolio.id
+        assert result["total_properties"] == 1
+        assert result["total_value"] == 250000.0
+        assert result["total_investment"] == 220000.0
+        assert result["total_equity"] == 100000.0
+        assert result["net_cash_flow"] == 600.0
+        assert result["average_cap_rate"] == pytest.approx(annual_cash_flow / 250000.0 * 100)
+        assert result["average_coc_return"] == pytest.approx(annual_cash_flow / 70000.0 * 100)
+        assert result["average_roi"] == pytest.approx(30000.0 / 220000.0 * 100)
+        assert result["property_performances"][0]["occupancy_rate"] == 100.0
     
     def test_calculate_portfolio_performance_no_properties(self, service, mock_db):
         """Test calculating portfolio performance with no properties."""
@@ -180,12 +196,13 @@ class TestPortfolioPerformanceService:
         
         # Setup mocks
         mock_db.query.return_value.filter.return_value.first.return_value = portfolio
-        mock_db.query.return_value.filter.return_value.all.return_value = []
         
         # Test
         period_start = datetime.now() - timedelta(days=30)
         period_end = datetime.now()
-        result = service.calculate_portfolio_performance(portfolio.id, period_start, period_end)
+        with patch('app.services.portfolio_performance_service.load_property_frame',
+                   return_value=self.property_frame([])):
+            result = service.calculate_portfolio_performance(portfolio.id, period_start, period_end)
         
         # Assertions
         assert result["portfolio_id"] == portfolio.id
@@ -237,10 +254,12 @@ class TestPortfolioPerformanceService:
             }
             
             # Test
-            result = service.update_portfolio_metrics(portfolio.id)
+            with patch.object(service, '_record_monthly_snapshot') as mock_snapshot:
+                result = service.update_portfolio_metrics(portfolio.id)
             
             # Assertions
             assert result is True
+            mock_snapshot.assert_called_once_with(portfolio.id, mock_calc.return_value)
             assert portfolio.total_properties == 1
             assert portfolio.total_value == 250000.0
             assert portfolio.total_equity == 100000.0
@@ -417,8 +436,11 @@ class TestPortfolioPerformanceService:
                      patch.object(service, '_calculate_volatility') as mock_volatility, \
                      patch.object(service, '_calculate_max_drawdown') as mock_drawdown, \
                      patch.object(service, '_analyze_geographic_diversity') as mock_geo, \
-                     patch.object(service, '_analyze_property_type_diversity') as mock_type:
+                     patch.object(service, '_analyze_property_type_diversity') as mock_type, \
+                     patch.object(service, '_diversification_engine') as mock_engine, \
+                     patch.object(service, 'get_monthly_series') as mock_series:
                     
+                    mock_series.return_value = []
                     mock_cash_trend.return_value = []
                     mock_value_trend.return_value = []
                     mock_benchmarks.return_value = []
@@ -432,6 +454,9 @@ class TestPortfolioPerformanceService:
                     
                     # Assertions
                     assert result.portfolio_id == portfolio_id
+                    mock_engine.assert_called_once_with(portfolio_id)
+                    mock_geo.assert_called_once_with(portfolio_id, mock_engine.return_value)
+                    mock_type.assert_called_once_with(portfolio_id, mock_engine.return_value)
                     assert result.total_return_ytd == 15.0
                     assert result.total_return_inception == 15.0
                     assert isinstance(result.cash_flow_trend, list)
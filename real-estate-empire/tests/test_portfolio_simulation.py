@@ -0,0 +1,150 @@
+"""
+Tests for the vectorized Monte Carlo portfolio simulation
+"""
+
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from unittest.mock import patch
+
+from app.core.database import Base
+from app.models.portfolio import PortfolioDB, PortfolioPropertyDB
+from app.models.predictive_analytics import (
+    PredictiveModelDB, PredictionDB, PortfolioForecastDB, PortfolioForecastRequest
+)
+from app.models.property import PropertyDB
+from app.services.model_registry import ModelRegistry
+from app.services.portfolio_simulation import (
+    simulate_portfolio, stress_test, downturn_scenarios
+)
+from app.services.predictive_analytics_service import PredictiveAnalyticsService
+
+
+def sample_holdings(n=40, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "property_id": [uuid.uuid4() for _ in range(n)],
+        "value": rng.uniform(150000, 600000, n),
+        "debt": rng.uniform(0, 300000, n),
+        "monthly_rent": rng.uniform(1200, 4000, n),
+        "monthly_expenses": rng.uniform(600, 2000, n),
+        "appreciation_rate": [None] * (n - 1) + [5.0]
+    })
+
+
+def test_simulation_is_seeded_and_unbiased():
+    holdings = sample_holdings()
+    first = simulate_portfolio(holdings, 36, paths=4000, seed=7)
+    again = simulate_portfolio(holdings, 36, paths=4000, seed=7)
+    other = simulate_portfolio(holdings, 36, paths=4000, seed=8)
+
+    assert np.array_equal(first.portfolio_values, again.portfolio_values)
+    assert not np.array_equal(first.portfolio_values, other.portfolio_values)
+    assert first.portfolio_values.shape == (4000, 37)
+    assert first.portfolio_values[:, 0] == pytest.approx(holdings["value"].sum())
+
+    # Expected value follows each property's appreciation at the horizon and midway
+    rates = np.where(holdings["appreciation_rate"].isna(), 0.035, holdings["appreciation_rate"].fillna(0) / 100)
+    for month in (18, 36):
+        expected = (holdings["value"] * (1 + rates) ** (month / 12)).sum()
+        assert first.portfolio_values[:, month].mean() == pytest.approx(expected, rel=0.01)
+
+    # Rents grow and vacancy reverts to its mean, so cash flow tracks the base net rent
+    base = (holdings["monthly_rent"] - holdings["monthly_expenses"]).sum() * 36
+    assert first.cumulative_cash_flow[:, -1].mean() == pytest.approx(base, rel=0.1)
+
+
+def test_risk_summary_bands_and_contributions():
+    simulation = simulate_portfolio(sample_holdings(), 60, paths=5000, seed=1)
+    summary = simulation.summary()
+
+    bands = summary["percentile_bands"]["portfolio_value"]
+    assert all(np.all(np.diff([bands[p][m] for p in (5, 25, 50, 75, 95)]) >= 0) for m in range(61))
+    assert summary["conditional_value_at_risk"] >= summary["value_at_risk"]
+    assert summary["volatility"] == pytest.approx(
+        np.sqrt(0.08 ** 2 + 0.04 ** 2 + 2 * 0.3 * 0.08 * 0.04), rel=0.2)
+
+    contributions = simulation.property_contributions()
+    assert len(contributions) == 40
+    assert sum(c["tail_contribution"] for c in contributions) == pytest.approx(summary["conditional_value_at_risk"])
+    assert sum(c["expected_pnl"] for c in contributions) == pytest.approx(summary["expected_pnl"])
+    assert sum(c["tail_share"] for c in contributions) == pytest.approx(1.0)
+
+
+def test_stress_test_and_downturns():
+    holdings = pd.DataFrame({
+        "property_id": ["a", "b"], "value": [200000.0, 300000.0], "debt": [150000.0, 100000.0],
+        "monthly_rent": [2000.0, 2500.0], "monthly_expenses": [1900.0, 1000.0], "appreciation_rate": [None, None]
+    })
+    simulation = simulate_portfolio(holdings, 12, paths=2000, seed=3)
+    results = stress_test(holdings, simulation=simulation)
+
+    crash = results["market_crash_scenario"]
+    assert crash["value_decline"] == pytest.approx(-30.0)
+    assert crash["properties_underwater"] == 1
+    assert crash["negative_cash_flow_properties"] == 1
+    assert crash["impact"] == "Severe"
+    assert 0 <= crash["probability"] < results["interest_rate_shock"]["probability"] <= 1
+
+    rates = results["interest_rate_shock"]
+    assert rates["value_decline"] == pytest.approx((np.exp(-4.0 * 0.03) - 1) * 100)
+    assert rates["annual_cash_flow_change"] == 0.0
+
+    downturns = downturn_scenarios(simulation)
+    assert downturns["economic_recession"]["probability"] <= downturns["local_market_downturn"]["probability"]
+    assert downturns["economic_recession"]["value_impact"] <= -10
+
+
+def test_forecast_portfolio_performance_simulates_holdings(tmp_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        PropertyDB.__table__, PortfolioDB.__table__, PortfolioPropertyDB.__table__, PredictiveModelDB.__table__,
+        PredictionDB.__table__, PortfolioForecastDB.__table__
+    ])
+    db = sessionmaker(bind=engine)()
+    portfolio = PortfolioDB(id=uuid.uuid4(), name="Alpha", total_value=500000.0, monthly_cash_flow=1600.0,
+                            created_at=datetime(2024, 1, 1))
+    db.add(portfolio)
+    for value, rent in ((200000.0, 2000.0), (300000.0, 2600.0)):
+        db.add(PortfolioPropertyDB(id=uuid.uuid4(), portfolio_id=portfolio.id, property_id=uuid.uuid4(),
+                                   acquisition_date=datetime(2023, 1, 1), acquisition_price=value,
+                                   total_investment=value, current_value=value, monthly_rent=rent,
+                                   monthly_expenses=rent - 800.0))
+    db.commit()
+
+    with patch("app.services.predictive_analytics_service.MarketDataService"):
+        service = PredictiveAnalyticsService(db)
+    service.model_registry = ModelRegistry()
+    request = PortfolioForecastRequest(portfolio_id=portfolio.id, forecast_horizon_months=24,
+                                       simulation_paths=3000, random_seed=11)
+
+    result = service.forecast_portfolio_performance(request)
+    repeat = service.forecast_portfolio_performance(request)
+
+    assert result.projected_value == repeat.projected_value
+    assert len(result.monthly_projections) == 24
+    assert result.worst_case_scenario["projected_value"] < result.most_likely_scenario["projected_value"] \
+        < result.best_case_scenario["projected_value"]
+    assert result.expected_shortfall >= result.value_at_risk
+    assert len(result.property_contributions) == 2
+    assert result.simulation_settings["properties"] == 2 and result.simulation_settings["seed"] == 11
+    assert result.projected_cash_flow == pytest.approx(1600.0 * 24, rel=0.1)
+    assert db.query(PortfolioForecastDB).count() == 2
+    db.close()
+
+
+def test_forecast_request_bounds_the_simulation_size():
+    portfolio_id = uuid.uuid4()
+    assert PortfolioForecastRequest(portfolio_id=portfolio_id, forecast_horizon_months=120).simulation_paths == 10000
+    with pytest.raises(ValidationError):
+        PortfolioForecastRequest(portfolio_id=portfolio_id, forecast_horizon_months=10 ** 6)
+    with pytest.raises(ValidationError):
+        PortfolioForecastRequest(portfolio_id=portfolio_id, forecast_horizon_months=0)
+    with pytest.raises(ValidationError):
+        PortfolioForecastRequest(portfolio_id=portfolio_id, forecast_horizon_months=60, simulation_paths=50000)
@@ -174,6 +174,8 @@ class TestPredictiveAnalyticsService:
         )
         
         mock_db.query.return_value.filter.return_value.first.return_value = sample_portfolio
+        # No holdings recorded: the simulation runs on the portfolio totals
+        mock_db.query.return_value.filter.return_value.all.return_value = []
         
         mock_model = Mock(spec=PredictiveModelDB)
         mock_model.id = uuid.uuid4()
@@ -544,6 +546,7 @@ class TestPredictiveAnalyticsService:
     def test_generate_portfolio_scenarios(self, service, sample_portfolio):
         """Test portfolio scenario generation."""
         features = {"market_conditions": 0.6}
+        service.db.query.return_value.filter.return_value.all.return_value = []
         
         result = service._generate_portfolio_scenarios(sample_portfolio, features, 12)
         
@@ -0,0 +1,245 @@
+"""
+Tests for the mergeable quantile sketch and the streaming benchmark sketches
+"""
+
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import event
+
+from app.models.portfolio import (
+    MetricSketchDB, PortfolioDB, PortfolioMonthlySnapshotDB, PortfolioPerformanceDB, PortfolioPropertyDB,
+    PropertyPerformanceDB
+)
+from app.models.property import PropertyDB
+from app.services.performance_benchmarking_service import PerformanceBenchmarkingService
+from app.services.portfolio_management_service import PortfolioManagementService
+from app.services.portfolio_performance_service import PortfolioPerformanceService
+from app.services.quantile_sketch import QuantileSketch
+
+MARKETS = ["Austin", "Dallas", "Denver"]
+
+
+def test_small_sketches_are_exact():
+    values = [9.0, 2.0, 7.0, 1.0, 5.0, 5.0, 3.0]
+    sketch = QuantileSketch.from_values(values)
+    quantiles = np.linspace(0, 1, 21)
+    assert sketch.quantile(quantiles) == pytest.approx(np.quantile(values, quantiles))
+    assert [sketch.rank(v) for v in (0.5, 5.0, 6.0, 9.0)] == pytest.approx([0, 5 / 7, 5 / 7, 1])
+    assert sketch.mean == pytest.approx(np.mean(values))
+    assert QuantileSketch().quantile(0.5) == 0.0 and QuantileSketch().rank(1.0) == 0.0
+
+    restored = QuantileSketch.from_dict(sketch.to_dict())
+    assert restored.quantile(0.3) == sketch.quantile(0.3) and restored.count == 7
+
+
+def test_large_merged_sketches_stay_small_and_accurate():
+    rng = np.random.default_rng(3)
+    values = rng.lognormal(2.0, 0.6, 400000)
+    whole = QuantileSketch.from_values(values)
+    # Workers sketch their own shards; the merge never sees raw values
+    merged = QuantileSketch.merged(QuantileSketch.from_values(part) for part in np.array_split(values, 7))
+    streamed = QuantileSketch()
+    for value in values[:20000]:
+        streamed.add(value)
+
+    quantiles = np.array([0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99])
+    for sketch, sample in ((whole, values), (merged, values), (streamed, values[:20000])):
+        assert len(sketch.means) <= sketch.compression + 1
+        assert sketch.count == len(sample)
+        assert sketch.quantile(quantiles) == pytest.approx(np.quantile(sample, quantiles), rel=0.01)
+        exact_ranks = [np.mean(sample <= v) for v in np.quantile(sample, quantiles)]
+        assert [sketch.rank(v) for v in np.quantile(sample, quantiles)] == pytest.approx(exact_ranks, abs=1e-3)
+    assert merged.min == values.min() and merged.max == values.max()
+    assert merged.mean == pytest.approx(values.mean())
+
+
+@pytest.fixture
+def db(sqlite_session):
+    return sqlite_session(
+        PropertyDB, PortfolioDB, PortfolioPropertyDB, PropertyPerformanceDB,
+        MetricSketchDB, PortfolioMonthlySnapshotDB, PortfolioPerformanceDB
+    )
+
+
+def add_records(db, rng, n_properties, records_per_property):
+    portfolio = PortfolioDB(id=uuid.uuid4(), name="Book", investment_strategy="buy_and_hold",
+                            average_cap_rate=float(rng.uniform(4, 9)))
+    db.add(portfolio)
+    records = []
+    for i in range(n_properties):
+        prop = PropertyDB(id=uuid.uuid4(), address=f"{i} Main St", city=MARKETS[i % 3], state="TX",
+                          zip_code="00000", property_type="single_family" if i % 2 else "condo")
+        holding = PortfolioPropertyDB(id=uuid.uuid4(), portfolio_id=portfolio.id, property_id=prop.id,
+                                      acquisition_date=datetime(2021, 1, 1), acquisition_price=200000.0,
+                                      total_investment=200000.0)
+        db.add_all([prop, holding])
+        for month in range(records_per_property):
+            start = datetime(2024, 1, 1) + timedelta(days=30 * month)
+            income = float(rng.uniform(1500, 3000))
+            expenses = float(rng.uniform(500, 1500))
+            records.append(PropertyPerformanceDB(
+                id=uuid.uuid4(), portfolio_property_id=holding.id, period_start=start,
+                period_end=start + timedelta(days=30), period_type="monthly", total_income=income,
+                total_expenses=expenses, net_cash_flow=income - expenses,
+                cap_rate=float(rng.normal(6 + i % 3, 1.0)), occupancy_rate=float(rng.uniform(80, 100))
+            ))
+    db.add_all(records)
+    db.commit()
+    return portfolio, records
+
+
+def test_streamed_sketches_match_a_rebuild_and_the_exact_distribution(db):
+    rng = np.random.default_rng(8)
+    service = PerformanceBenchmarkingService(db)
+    # Records land in two batches and are merged into the stored sketches
+    _, first = add_records(db, rng, 30, 12)
+    assert service.update_benchmark_sketches(first) > 0
+    _, second = add_records(db, rng, 30, 12)
+    service.update_benchmark_sketches(second)
+    streamed = {(row.group_type, row.group_key, row.metric): QuantileSketch.from_dict(row.sketch)
+                for row in db.query(MetricSketchDB)}
+
+    service.rebuild_benchmark_sketches(chunk_size=100)
+    for row in db.query(MetricSketchDB).filter(MetricSketchDB.group_type != "peer"):
+        rebuilt = QuantileSketch.from_dict(row.sketch)
+        key = (row.group_type, row.group_key, row.metric)
+        assert streamed[key].count == rebuilt.count
+        assert streamed[key].quantile([0.1, 0.5, 0.9]) == pytest.approx(rebuilt.quantile([0.1, 0.5, 0.9]), rel=0.02)
+
+    all_cap_rates = np.array([r.cap_rate for r in first + second])
+    distribution = service.get_benchmark_distribution("cap_rate", percentiles=(25, 50, 75))
+    assert distribution["count"] == len(all_cap_rates)
+    assert [distribution["p25"], distribution["p50"], distribution["p75"]] == \
+        pytest.approx(np.percentile(all_cap_rates, [25, 50, 75]), rel=0.02)
+    assert service.get_benchmark_percentile_rank("cap_rate", 7.0) == \
+        pytest.approx(np.mean(all_cap_rates <= 7.0) * 100, abs=1.0)
+    assert service.get_benchmark_distribution("cap_rate", "market", "Boise")["count"] == 0
+
+
+def test_benchmarks_read_sketches_in_constant_queries(db):
+    rng = np.random.default_rng(2)
+    service = PerformanceBenchmarkingService(db)
+    portfolio, records = add_records(db, rng, 12, 12)
+    for _ in range(30):
+        db.add(PortfolioDB(id=uuid.uuid4(), name="Peer", status="active", investment_strategy="buy_and_hold",
+                           average_cap_rate=float(rng.uniform(4, 9)), average_coc_return=float(rng.uniform(5, 12)),
+                           average_roi=float(rng.uniform(8, 16)), total_return_ytd=float(rng.uniform(5, 15))))
+    db.commit()
+    service.rebuild_benchmark_sketches()
+    portfolio_id = portfolio.id
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    performance = {"average_cap_rate": 7.0, "average_coc_return": 9.0, "average_roi": 12.0, "portfolio_roi": 10.0}
+
+    start = time.perf_counter()
+    peers = service._benchmark_against_peers(performance, portfolio_id)
+    geography = service._benchmark_against_geography(performance, portfolio_id)
+    assert time.perf_counter() - start < 0.5
+    # Portfolio and holdings lookups plus one sketch read per benchmark, whatever the book size
+    assert len(statements) == 5
+
+    assert peers["peer_group"] == "buy_and_hold" and peers["peer_count"] == 31
+    peer_cap_rates = [p.average_cap_rate for p in db.query(PortfolioDB)]
+    cap_rate = next(b for b in peers["benchmarks"] if b["metric_name"] == "cap_rate")
+    assert cap_rate["benchmark_value"] == pytest.approx(np.median(peer_cap_rates))
+    assert cap_rate["percentile_rank"] == pytest.approx(np.mean(np.array(peer_cap_rates) <= 7.0) * 100)
+
+    market_names = {b["metric_name"] for b in geography["benchmarks"]}
+    assert {"Austin_cap_rate", "Denver_cap_rate"} <= market_names
+    denver = next(b for b in geography["benchmarks"] if b["metric_name"] == "Denver_cap_rate")
+    denver_sketch = service.get_benchmark_sketch("cap_rate", "market", "Denver")
+    assert denver["benchmark_value"] == pytest.approx(denver_sketch.percentile(50))
+
+
+def test_first_update_seeds_sketches_from_history(db):
+    rng = np.random.default_rng(4)
+    service = PerformanceBenchmarkingService(db)
+    _, history = add_records(db, rng, 6, 12)
+    _, latest = add_records(db, rng, 1, 1)
+
+    service.update_benchmark_sketches(latest)
+    assert service.get_benchmark_sketch("cap_rate").count == len(history) + len(latest)
+    assert service.get_benchmark_sketch("cap_rate", "market", "Austin").count == 2 * 12 + 1
+
+
+def test_thin_market_sketches_fall_back_to_the_static_table(db):
+    rng = np.random.default_rng(6)
+    service = PerformanceBenchmarkingService(db)
+    # Dallas gets only one property with a few records
+    portfolio, records = add_records(db, rng, 2, 3)
+    service.rebuild_benchmark_sketches()
+    portfolio_id = portfolio.id
+
+    assert service.get_benchmark_sketch("cap_rate", "market", "Dallas").count == 3
+    geography = service._benchmark_against_geography({"average_cap_rate": 7.0}, portfolio_id)
+    dallas = next(b for b in geography["benchmarks"] if b["metric_name"] == "Dallas_cap_rate")
+    assert dallas["benchmark_value"] == service.geographic_benchmarks["Dallas"]["cap_rate"]
+
+
+def test_peer_sketches_merge_portfolio_metric_updates(db):
+    rng = np.random.default_rng(9)
+    service = PerformanceBenchmarkingService(db)
+    portfolio, _ = add_records(db, rng, 3, 12)
+    portfolio.status = "active"
+    db.add(PortfolioDB(id=uuid.uuid4(), name="Flips", status="active", investment_strategy="fix_and_flip",
+                       average_cap_rate=5.0))
+    db.commit()
+    service.rebuild_benchmark_sketches()
+    before = portfolio.average_cap_rate
+    flips = service.get_benchmark_sketch("cap_rate", "peer", "fix_and_flip").to_dict()
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    PortfolioPerformanceService(db).update_portfolio_metrics(portfolio.id)
+    db.refresh(portfolio)
+    # The updated metrics are merged in without scanning the other portfolios
+    assert not any("investment_strategy" in statement and "FROM portfolios" in statement
+                   and "portfolios.id = " not in statement for statement in statements)
+    merged = service.get_benchmark_sketch("cap_rate", "peer", "buy_and_hold")
+    assert merged.count == 2
+    assert sorted(merged.quantile([0.0, 1.0])) == pytest.approx(sorted([before, portfolio.average_cap_rate]))
+    assert service.get_benchmark_sketch("cap_rate", "peer", "all").count == 3
+    assert service.get_benchmark_sketch("cap_rate", "peer", "fix_and_flip").to_dict() == flips
+
+    # The batch rebuild drops the superseded value
+    service.rebuild_benchmark_sketches()
+    rebuilt = service.get_benchmark_sketch("cap_rate", "peer", "buy_and_hold")
+    assert rebuilt.count == 1 and rebuilt.percentile(50) == pytest.approx(portfolio.average_cap_rate)
+
+
+def test_removed_records_leave_the_sketches_at_the_next_rebuild(db):
+    rng = np.random.default_rng(3)
+    service = PerformanceBenchmarkingService(db)
+    _, records = add_records(db, rng, 6, 12)
+    service.rebuild_benchmark_sketches()
+    removed = records[0].portfolio_property_id
+    remaining = np.array([r.cap_rate for r in records if r.portfolio_property_id != removed])
+
+    assert PortfolioManagementService(db).remove_property_from_portfolio(removed)
+    assert service.get_benchmark_sketch("cap_rate").count == len(records)
+    service.rebuild_benchmark_sketches()
+    assert service.get_benchmark_sketch("cap_rate").count == len(remaining)
+    assert service.get_benchmark_sketch("cap_rate", "market", "Austin").count == 12
+    assert service.get_benchmark_distribution("cap_rate", percentiles=(50,))["p50"] == \
+        pytest.approx(np.median(remaining))
+
+
+def test_deleting_a_portfolio_rebuilds_the_sketches(db):
+    rng = np.random.default_rng(5)
+    service = PerformanceBenchmarkingService(db)
+    kept, kept_records = add_records(db, rng, 3, 12)
+    deleted, _ = add_records(db, rng, 3, 12)
+    for portfolio in (kept, deleted):
+        portfolio.status = "active"
+    db.commit()
+    service.rebuild_benchmark_sketches()
+    assert service.get_benchmark_sketch("cap_rate", "peer", "all").count == 2
+
+    assert PortfolioManagementService(db).delete_portfolio(deleted.id)
+    assert service.get_benchmark_sketch("cap_rate").count == len(kept_records)
+    assert service.get_benchmark_sketch("cap_rate", "peer", "all").count == 1
@@ -0,0 +1,160 @@
+"""
+Tests for the capital- and concentration-constrained rebalancing optimizer
+"""
+
+import itertools
+import time
+import uuid
+from datetime import datetime
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.models.portfolio import PortfolioDB, PortfolioPropertyDB, PropertyPerformanceDB
+from app.models.property import PropertyDB
+from app.services.portfolio_optimization_service import OptimizationActionEnum, PortfolioOptimizationService
+from app.services.rebalancing_optimizer import CONCENTRATION_DIMENSIONS, RebalancingOptimizer
+
+CITIES = ["Austin", "Dallas", "Denver", "Miami", "Tampa", "Boise"]
+TYPES = ["single_family", "condo", "multi_family"]
+
+
+def random_book(rng, n_assets, n_deals):
+    def columns(n):
+        return {"city": rng.choice(CITIES, n, p=[0.35, 0.15, 0.15, 0.15, 0.1, 0.1]),
+                "state": rng.choice(["TX", "CO", "FL", "ID"], n),
+                "property_type": rng.choice(TYPES, n),
+                "value": rng.uniform(100000, 900000, n)}
+
+    held = columns(n_assets)
+    assets = pd.DataFrame({
+        "portfolio_property_id": range(n_assets), "property_id": range(n_assets), "address": "held",
+        "city": held["city"], "state": held["state"], "property_type": held["property_type"],
+        "current_value": held["value"], "current_debt": held["value"] * rng.uniform(0, 0.8, n_assets),
+        "annual_cash_flow": held["value"] * rng.normal(0.03, 0.03, n_assets)
+    })
+    offered = columns(n_deals)
+    deals = pd.DataFrame({
+        "deal_id": range(n_deals), "address": "deal", "city": offered["city"], "state": offered["state"],
+        "property_type": offered["property_type"], "price": offered["value"],
+        "capital_required": offered["value"] * 0.25,
+        "annual_cash_flow": offered["value"] * rng.normal(0.0, 0.02, n_deals)
+    })
+    return assets, deals
+
+
+def assert_feasible(optimizer, plan, cash_available, cap):
+    assert plan.capital_used <= cash_available + 1e-6
+    owned = [i for i in plan.option_indices if optimizer.option_action[i] < 2]
+    assert len({optimizer.option_row[i] for i in owned}) == len(owned)
+    for dimension in CONCENTRATION_DIMENSIONS:
+        base = optimizer.base_category_value[dimension]
+        values = base.copy()
+        np.add.at(values, optimizer.option_category[dimension][plan.option_indices],
+                  optimizer.option_value[plan.option_indices])
+        allowance = np.maximum(base - cap * optimizer.base_value, 0.0)
+        assert np.all(values - cap * plan.value_after <= allowance + 1e-3)
+
+
+def test_small_book_matches_brute_force():
+    rng = np.random.default_rng(2)
+    assets, deals = random_book(rng, 4, 6)
+    optimizer = RebalancingOptimizer(assets, deals)
+    cash, cap = 300000.0, 0.45
+
+    def feasible(selection):
+        owned = [optimizer.option_row[i] for i in selection if optimizer.option_action[i] < 2]
+        if len(set(owned)) < len(owned):
+            return False
+        evaluation = optimizer.evaluate(selection)
+        if evaluation["capital_used"] > cash + 1e-6:
+            return False
+        for dimension in CONCENTRATION_DIMENSIONS:
+            base = optimizer.base_category_value[dimension]
+            values = base.copy()
+            np.add.at(values, optimizer.option_category[dimension][list(selection)],
+                      optimizer.option_value[list(selection)])
+            if np.any(values - cap * evaluation["value_after"] > np.maximum(base - cap * optimizer.base_value, 0) + 1e-3):
+                return False
+        return True
+
+    best = max(
+        optimizer.evaluate(list(selection))["annual_return_change"]
+        for size in range(optimizer.n_options + 1)
+        for selection in itertools.combinations(range(optimizer.n_options), size)
+        if feasible(selection)
+    )
+
+    assert optimizer.solve(cash, cap).annual_return_change == pytest.approx(best)
+    rounded = optimizer.solve(cash, cap, exact=False)
+    assert 0 < rounded.annual_return_change <= best + 1e-6
+    assert_feasible(optimizer, rounded, cash, cap)
+
+
+def test_large_book_solves_in_seconds_within_constraints():
+    rng = np.random.default_rng(4)
+    assets, deals = random_book(rng, 1000, 5000)
+
+    start = time.perf_counter()
+    optimizer = RebalancingOptimizer(assets, deals)
+    plan = optimizer.solve(cash_available=2000000.0, max_concentration=0.3)
+    assert time.perf_counter() - start < 10
+
+    assert plan.actions and plan.annual_return_change > 0
+    assert_feasible(optimizer, plan, 2000000.0, 0.3)
+    assert plan.concentration_after["city"] <= max(0.3, plan.concentration_before["city"]) + 1e-9
+
+    # A plan's totals are the sum of its cached option metrics
+    assert plan.annual_return_change == pytest.approx(sum(a.annual_return_change for a in plan.actions))
+    sold = {a.asset_id for a in plan.actions if a.action == "sell"}
+    bought = [a.asset_id for a in plan.actions if a.action == "acquire"]
+    after = (assets[~assets["portfolio_property_id"].isin(sold)]["current_value"].sum() +
+             deals.loc[bought, "price"].sum())
+    assert plan.value_after == pytest.approx(after)
+
+    # The cached options are reused for another budget without rebuilding
+    tighter = optimizer.solve(cash_available=0.0, max_concentration=0.3)
+    assert_feasible(optimizer, tighter, 0.0, 0.3)
+
+
+@pytest.fixture
+def db(sqlite_session):
+    return sqlite_session(PropertyDB, PortfolioDB, PortfolioPropertyDB, PropertyPerformanceDB)
+
+
+def test_service_recommends_selling_a_money_loser_to_fund_a_deal(db):
+    portfolio = PortfolioDB(id=uuid.uuid4(), name="Book")
+    db.add(portfolio)
+    holdings = [("Austin", 300000.0, 1500.0), ("Dallas", 250000.0, 1200.0), ("Denver", 400000.0, -900.0)]
+    for i, (city, value, monthly_cash_flow) in enumerate(holdings):
+        prop = PropertyDB(id=uuid.uuid4(), address=f"{i} Elm St", city=city, state="TX", zip_code="00000",
+                          property_type="single_family")
+        db.add_all([prop, PortfolioPropertyDB(
+            id=uuid.uuid4(), portfolio_id=portfolio.id, property_id=prop.id, acquisition_date=datetime(2020, 1, 1),
+            acquisition_price=value * 0.8, total_investment=value * 0.8, current_value=value,
+            current_debt=value * 0.5, monthly_cash_flow=monthly_cash_flow
+        )])
+    db.commit()
+    deal = {"deal_id": "deal-1", "address": "9 Oak St", "city": "Miami", "state": "FL",
+            "property_type": "condo", "price": 350000.0, "capital_required": 90000.0, "annual_cash_flow": 14000.0}
+
+    with patch("app.services.portfolio_optimization_service.MarketDataService"):
+        service = PortfolioOptimizationService(db)
+    plan = service.optimize_rebalancing(portfolio.id, [deal], cash_available=0.0, max_concentration=None)
+    actions = {(a.action, a.address) for a in plan.actions}
+    assert ("sell", "2 Elm St") in actions and ("acquire", "9 Oak St") in actions
+    assert plan.cash_remaining >= 0
+
+    recommendations = service._generate_rebalancing_recommendations(portfolio.id, [deal])
+    sells = [r for r in recommendations if r.recommendation_type == OptimizationActionEnum.SELL]
+    assert sells and all(r.portfolio_id == portfolio.id for r in recommendations)
+    assert sells[0].estimated_impact["capital_released"] > 0
+
+    load = service.performance_service.load_performance_frame
+    with patch.object(service.performance_service, "load_performance_frame", wraps=load) as loads, \
+            patch.object(service, "_generate_market_timing_recommendations", return_value=[]):
+        recommendations = service.generate_optimization_recommendations(portfolio.id, [deal])
+    assert loads.call_count == 1
+    assert any(r.recommendation_type == OptimizationActionEnum.SELL for r in recommendations)
@@ -0,0 +1,155 @@
+"""
+Tests for the replayable scenario corpus
+"""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.simulation import scenario_corpus
+from app.simulation.market_simulator import MarketSimulator
+from app.simulation.scenario_corpus import ScenarioCorpus, ScenarioCorpusWriter, shards_for_worker
+from app.simulation.scenario_sampler import PropertyReservoir
+from app.training.conversation_trainer import ConversationTrainer
+
+
+@pytest.fixture
+def simulator():
+    rng = np.random.default_rng(0)
+    n = 300
+    cities = np.array(["Miami", "Orlando", "Tampa"])
+    reservoir = PropertyReservoir.from_frame(pd.DataFrame({
+        "city": cities[rng.integers(0, 3, size=n)],
+        "state": "Florida",
+        "price": rng.uniform(100000, 900000, size=n),
+        "house_size": rng.uniform(800, 4000, size=n),
+        "bed": rng.integers(1, 6, size=n).astype(float),
+        "bath": rng.integers(1, 4, size=n).astype(float),
+        "acre_lot": rng.uniform(0.05, 1.0, size=n),
+        "zip_code": "33101",
+    }))
+    return MarketSimulator(Mock(), seed=3, reservoir=reservoir)
+
+
+@pytest.mark.parametrize("use_arrow", [True, False])
+def test_deal_shards_round_trip(tmp_path, simulator, monkeypatch, use_arrow):
+    """Test deals are split into shards and read back unchanged (Arrow and .npz formats)"""
+    monkeypatch.setattr(scenario_corpus, "_pyarrow_available", lambda: use_arrow)
+    frame = simulator.generate_scenario_frame(250)
+
+    with ScenarioCorpusWriter(tmp_path / "corpus", seed=3, shard_size=100) as writer:
+        writer.add_deals(frame.iloc[:120])
+        writer.add_deals(frame.iloc[120:])
+
+    corpus = ScenarioCorpus(tmp_path / "corpus")
+    assert corpus.manifest["deals"]["format"] == ("arrow" if use_arrow else "npz")
+    assert [s["rows"] for s in corpus.manifest["deals"]["shards"]] == [100, 100, 50]
+    assert corpus.num_deals == 250
+    assert corpus.verify()
+
+    replayed = corpus.read_deals()
+    pd.testing.assert_frame_equal(
+        replayed[["price", "asking_price", "seller_motivation"]],
+        frame[["price", "asking_price", "seller_motivation"]].reset_index(drop=True)
+    )
+    assert list(replayed["city"]) == list(frame["city"])
+
+
+def test_workers_get_disjoint_shards(tmp_path, simulator):
+    with ScenarioCorpusWriter(tmp_path / "corpus", shard_size=40) as writer:
+        simulator.export_scenario_corpus(writer, 200, batch_size=70)
+
+    corpus = ScenarioCorpus(tmp_path / "corpus")
+    parts = [corpus.read_deals(worker_index=w, num_workers=2) for w in range(2)]
+
+    assert sum(len(p) for p in parts) == 200
+    ids = pd.concat(parts)["property_id"]
+    assert sorted(ids) == sorted(corpus.read_deals()["property_id"])
+    with pytest.raises(ValueError):
+        shards_for_worker([], worker_index=2, num_workers=2)
+
+
+def test_replayed_deals_match_generated(tmp_path, simulator):
+    """Test MarketSimulator replays stored scenarios, market condition included"""
+    with ScenarioCorpusWriter(tmp_path / "corpus") as writer:
+        simulator.export_scenario_corpus(writer, 30, batch_size=10, evolve_daily=True)
+    corpus = ScenarioCorpus(tmp_path / "corpus")
+
+    first = list(simulator.replay_scenarios(corpus))
+    second = list(simulator.replay_scenarios(corpus, limit=12))
+
+    assert len(first) == 30
+    assert [d.asking_price for d in second] == [d.asking_price for d in first[:12]]
+    assert len({id(d.market_condition) for d in first}) == 3
+    assert first[0].market_condition.trend in ("bull", "bear", "stable")
+
+
+def test_corpus_id_and_version(tmp_path, simulator):
+    frame = simulator.generate_scenario_frame(20)
+    for name in ("a", "b"):
+        with ScenarioCorpusWriter(tmp_path / name) as writer:
+            writer.add_deals(frame)
+    assert ScenarioCorpus(tmp_path / "a").corpus_id == ScenarioCorpus(tmp_path / "b").corpus_id
+
+    with pytest.raises(FileExistsError):
+        ScenarioCorpusWriter(tmp_path / "a")
+
+    manifest_path = tmp_path / "a" / "manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest["version"] = scenario_corpus.CORPUS_VERSION + 1
+    manifest_path.write_text(json.dumps(manifest))
+    with pytest.raises(ValueError):
+        ScenarioCorpus(tmp_path / "a")
+
+
+@pytest.mark.asyncio
+async def test_conversation_training_replays_identical_inputs(tmp_path, simulator):
+    """Test conversations are produced once and replayed identically by ConversationTrainer"""
+    trainer = ConversationTrainer(simulator)
+    corpus = await trainer.build_conversation_corpus(str(tmp_path / "conversations"), num_conversations=6,
+                                                     seed=9, shard_size=4)
+
+    assert corpus.num_conversations == 6
+    assert corpus.num_deals == 6
+    assert len(corpus.manifest["conversations"]["shards"]) == 2
+
+    agent = SimpleNamespace(agent_id="agent_1")
+    first = await trainer.train_agent_on_conversations(agent, num_conversations=6, corpus=corpus)
+    second = await trainer.train_agent_on_conversations(agent, num_conversations=6, corpus=corpus)
+
+    def inputs(session):
+        return [
+            (r.scenario_type, r.homeowner_personality, [response["message"] for response in r.agent_responses])
+            for r in session["session_results"]
+        ]
+
+    assert len(first["session_results"]) == 6
+    assert inputs(first) == inputs(second)
+
+    worker_results = await trainer.train_agent_on_conversations(
+        agent, num_conversations=6, corpus=corpus, worker_index=1, num_workers=2
+    )
+    assert len(worker_results["session_results"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_conversation_corpus_plan_is_seeded(tmp_path, simulator):
+    """Test the same seed plans the same properties, scenarios and homeowner profiles"""
+    trainer = ConversationTrainer(simulator)
+
+    async def plan(name, seed):
+        corpus = await trainer.build_conversation_corpus(str(tmp_path / name), num_conversations=8, seed=seed)
+        return sorted(
+            (c["index"], c["context"]["scenario_type"], c["context"]["difficulty_level"],
+             json.dumps(c["context"]["property_details"], sort_keys=True),
+             json.dumps(c["homeowner_profile"], sort_keys=True))
+            for c in corpus.iter_conversations()
+        )
+
+    first = await plan("first", 4)
+    assert first == await plan("second", 4)
+    assert first != await plan("third", 5)
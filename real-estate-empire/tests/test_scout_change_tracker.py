@@ -0,0 +1,162 @@
+"""
+Tests for incremental scout scanning and listing change detection
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.agents.scout_agent import ScoutAgent, ScoutWorkflowEngine
+from app.agents.scout_change_tracker import IncrementalScanTracker, listing_key
+from app.core.agent_state import StateManager
+
+
+def listing(i, **overrides):
+    deal = {
+        "id": f"listing-{i}",
+        "address": f"{i} Oak St",
+        "city": "Austin",
+        "state": "TX",
+        "zip_code": "78701",
+        "property_type": "single_family",
+        "bedrooms": 3,
+        "listing_price": 250000 + i * 1000,
+        "estimated_value": 330000 + i * 1000,
+        "days_on_market": 20,
+        "status": "active",
+        "motivation_indicators": ["vacant"]
+    }
+    deal.update(overrides)
+    return deal
+
+
+def test_only_new_and_changed_listings_are_reported():
+    tracker = IncrementalScanTracker()
+    first = tracker.diff([listing(i) for i in range(5)])
+    assert [c.change_type for c in first] == ["new"] * 5
+    tracker.commit(first)
+
+    scan = [listing(i) for i in range(5)]
+    scan[1]["listing_price"] -= 15000
+    scan[2]["status"] = "pending"
+    scan[3]["motivation_indicators"] = ["foreclosure", "vacant"]
+    scan[4]["days_on_market"] = 45  # same DOM band: not a change
+    changes = tracker.diff(scan + [listing(9)])
+    tracker.commit(changes)
+
+    by_key = {c.key: c for c in changes}
+    assert set(by_key) == {"listing-1", "listing-2", "listing-3", "listing-9"}
+    assert by_key["listing-1"].change_type == "price_drop"
+    assert by_key["listing-1"].price_change == -15000
+    assert by_key["listing-2"].change_type == "status_change"
+    assert by_key["listing-3"].change_type == "motivation_change"
+    assert by_key["listing-9"].change_type == "new"
+
+    # Crossing a DOM threshold the scores react to is a change
+    scan[4]["days_on_market"] = 95
+    assert [c.changed_fields for c in tracker.diff([scan[4]])] == [["dom_band"]]
+
+
+def test_complete_snapshot_reports_removed_listings_and_watermark():
+    tracker = IncrementalScanTracker()
+    tracker.commit(tracker.diff([listing(1, last_updated="2030-01-01T10:00:00"), listing(2)]))
+    assert tracker.watermark == datetime(2030, 1, 1, 10, tzinfo=timezone.utc)
+
+    partial = tracker.diff([listing(1)])
+    assert partial == [] and len(tracker) == 2
+
+    full = tracker.diff([listing(1)], complete=True)
+    assert [(c.key, c.change_type) for c in full] == [("listing-2", "removed")]
+    tracker.commit(full)
+    assert len(tracker) == 1
+    assert listing_key({"address": "5 Elm St ", "city": "Austin"}) == "5 elm st|austin||"
+
+
+def test_watermark_is_utc_and_kept_without_timestamps():
+    tracker = IncrementalScanTracker()
+    eastern = timezone(timedelta(hours=-5))
+    tracker.commit(tracker.diff([listing(1, last_updated=datetime(2030, 1, 1, 10, tzinfo=eastern))]))
+    assert tracker.watermark == datetime(2030, 1, 1, 15, tzinfo=timezone.utc)
+
+    # Naive and aware timestamps compare, and a scan without timestamps keeps the watermark
+    tracker.commit(tracker.diff([listing(2, last_updated="2030-01-01T16:00:00"),
+                                 listing(3, updated_at="2030-01-01T12:00:00+00:00")]))
+    assert tracker.watermark == datetime(2030, 1, 1, 16, tzinfo=timezone.utc)
+    tracker.commit(tracker.diff([listing(4)]))
+    assert tracker.watermark == datetime(2030, 1, 1, 16, tzinfo=timezone.utc)
+
+
+def test_uncommitted_changes_are_reported_again():
+    tracker = IncrementalScanTracker()
+    assert len(tracker.diff([listing(1, last_updated="2030-01-01T10:00:00")])) == 1
+    assert tracker.watermark is None and len(tracker) == 0
+
+    retried = tracker.diff([listing(1, last_updated="2030-01-01T10:00:00")])
+    assert [c.change_type for c in retried] == ["new"]
+    tracker.commit(retried)
+    assert tracker.diff([listing(1)]) == []
+
+
+@pytest.mark.asyncio
+async def test_continuous_workflow_rescores_only_churn():
+    agent = ScoutAgent(name="TestScoutAgent")
+    agent._should_scan = Mock(return_value=True)
+    agent.deal_alert_service = Mock()
+    engine = ScoutWorkflowEngine(agent)
+    state = StateManager.create_initial_state()
+    market = [listing(i) for i in range(20)]
+
+    async def scan(listings):
+        async def result(params, state):
+            return {"raw_properties": [dict(d) for d in listings], "total_scanned": len(listings)}
+        engine._execute_multi_source_scanning = result
+        return await engine.execute_continuous_scanning_workflow(state)
+
+    first = await scan(market)
+    assert first["deals_discovered"] == 20
+    assert len(state["current_deals"]) == 20
+
+    market[3]["listing_price"] -= 20000
+    second = await scan(market)
+    assert second["deals_discovered"] == 1
+    assert second["changes_detected"]["by_type"] == {"price_drop": 1}
+    assert len(state["current_deals"]) == 20
+    assert second["deals"][0]["lead_score"]["overall_score"] > 0
+
+    third = await scan(market)
+    assert third["deals_discovered"] == 0
+
+    # A run that fails after change detection leaves the change to be reported again
+    market[5]["listing_price"] -= 10000
+    engine._update_deal_pipeline = Mock(side_effect=RuntimeError("pipeline unavailable"))
+    assert not (await scan(market))["success"]
+    del engine._update_deal_pipeline
+    retried = await scan(market)
+    assert retried["changes_detected"]["by_type"] == {"price_drop": 1}
+
+    sent = [call.args[0] for call in agent.deal_alert_service.process_listing_change.call_args_list]
+    assert [c["change_type"] for c in sent] == ["new"] * 20 + ["price_drop"] * 2
+    assert sent[-2]["price_change"] == -20000
+
+
+@pytest.mark.asyncio
+async def test_agent_scan_rescores_changed_listings():
+    agent = ScoutAgent(name="TestScoutAgent")
+    agent.agent_executor = Mock(ainvoke=AsyncMock(return_value={"output": ""}))
+    state = StateManager.create_initial_state()
+    stale = {"overall_score": 9.9}
+    market = [listing(i, lead_score=dict(stale)) for i in range(3)]
+
+    agent._parse_scanning_results = Mock(return_value=[dict(d) for d in market])
+    assert len((await agent._continuous_scan({}, state))["deals"]) == 3
+
+    market[1]["listing_price"] -= 40000
+    agent._parse_scanning_results = Mock(return_value=[dict(d) for d in market])
+    result = await agent._continuous_scan({}, state)
+
+    [changed] = result["changed_deals"]
+    expected = [dict(market[1])]
+    agent._score_lead_batch(expected, state)
+    assert changed["lead_score"] != stale
+    assert changed["lead_score"] == expected[0]["lead_score"]
@@ -0,0 +1,160 @@
+"""
+Tests for the vectorized scout scoring pipeline
+"""
+
+import numpy as np
+import pytest
+
+from app.agents.scout_agent import ScoutAgent, ScoutWorkflowEngine
+from app.agents.scout_pipeline import deal_frame, evaluation_score_columns, top_n_order
+from app.core.agent_state import StateManager
+
+
+@pytest.fixture
+def scout_agent():
+    return ScoutAgent(name="TestScoutAgent")
+
+
+@pytest.fixture
+def state():
+    state = StateManager.create_initial_state()
+    state["market_conditions"] = {"market_temperature": "hot", "inventory_level": "low", "price_change_yoy": 0.07}
+    return state
+
+
+def random_deals(n, seed=0):
+    rng = np.random.default_rng(seed)
+    indicators = ["foreclosure", "divorce", "vacant", "tax_lien", "Estate_Sale", "other"]
+    deals = []
+    for i in range(n):
+        price = float(rng.choice([0, rng.uniform(50000, 900000)], p=[0.05, 0.95]))
+        deal = {
+            "id": f"deal-{i}",
+            "address": f"{i} Main St",
+            "listing_price": price,
+            "property_type": str(rng.choice(["single_family", "condo", "multi_family", "land"])),
+            "days_on_market": int(rng.integers(0, 200)),
+            "motivation_indicators": list(rng.choice(indicators, size=rng.integers(0, 3), replace=False))
+        }
+        if rng.random() < 0.7:
+            deal["estimated_value"] = price * rng.uniform(0.9, 1.5)
+        if rng.random() < 0.6:
+            deal["estimated_repair_cost"] = price * rng.uniform(0.0, 0.35)
+        if rng.random() < 0.1:
+            del deal["days_on_market"]
+        deals.append(deal)
+    return deals
+
+
+@pytest.mark.asyncio
+async def test_batch_lead_scores_match_per_deal_scoring(scout_agent, state):
+    """Test the vectorized pass reproduces ScoutAgent._calculate_lead_score exactly"""
+    deals = random_deals(400)
+    expected = [(await scout_agent._calculate_lead_score(dict(deal), state)).dict() for deal in deals]
+
+    scout_agent._score_lead_batch(deals, state)
+
+    assert [deal["lead_score"] for deal in deals] == expected
+
+
+@pytest.mark.asyncio
+async def test_score_and_prioritize_returns_stable_top_n(scout_agent, state):
+    engine = ScoutWorkflowEngine(scout_agent)
+    deals = random_deals(300, seed=1)
+
+    ranked = await engine._score_and_prioritize_deals([dict(d) for d in deals], state)
+    top = await engine._score_and_prioritize_deals([dict(d) for d in deals], state, top_n=25)
+
+    scores = [d["lead_score"]["overall_score"] for d in ranked]
+    assert scores == sorted(scores, reverse=True)
+    assert [d["id"] for d in top] == [d["id"] for d in ranked[:25]]
+
+
+def test_top_n_order_matches_stable_sort():
+    rng = np.random.default_rng(3)
+    scores = rng.integers(0, 20, size=1000) / 2.0
+    expected = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+
+    for n in (0, 1, 7, 100, 999, 1000, 5000):
+        assert top_n_order(scores, n).tolist() == expected[:n]
+    assert top_n_order(scores).tolist() == expected
+
+
+def test_evaluation_scores_follow_workflow_rules():
+    frame = deal_frame([
+        {"listing_price": 200000, "estimated_value": 300000, "estimated_repair_cost": 20000,
+         "days_on_market": 120, "motivation_indicators": ["foreclosure", "divorce"]},
+        {"listing_price": 600000, "estimated_value": 610000, "estimated_repair_cost": 60000,
+         "days_on_market": 3},
+        {"listing_price": 0},
+    ])
+
+    columns = evaluation_score_columns(frame, market_score=6.0)
+
+    assert columns["profit_potential_score"].tolist() == [10.0, 2.0, 2.0]
+    assert columns["potential_profit"].tolist() == [80000.0, -50000.0, 0.0]
+    assert columns["feasibility_score"].tolist() == [8.0, 4.0, 6.5]
+    assert columns["seller_motivation_score"].tolist() == [10.0, 5.0, 5.0]
+    assert columns["overall_score"][0] == pytest.approx(10 * 0.35 + 8 * 0.25 + 10 * 0.25 + 6 * 0.15)
+    assert columns["confidence_level"][1] == pytest.approx(0.85)
+
+
+@pytest.mark.asyncio
+async def test_evaluation_workflow_ranks_fused_scores(scout_agent, state):
+    engine = ScoutWorkflowEngine(scout_agent)
+    deals = [dict(d, city="Austin", state="TX") for d in random_deals(50, seed=2) if d["listing_price"] > 0]
+
+    result = await engine.execute_deal_evaluation_workflow(deals, state)
+
+    assert result["success"]
+    evaluated = result["evaluated_deals"]
+    assert [d["rank"] for d in evaluated] == list(range(1, len(evaluated) + 1))
+    assert all("market_impact" in d and "motivation_analysis" in d for d in evaluated)
+    scores = [d["lead_score"]["overall_score"] for d in evaluated]
+    assert scores == sorted(scores, reverse=True)
+    assert all(len(d["comparable_properties"]) == 3 for d in evaluated)
+
+
+def qualification_view(deals):
+    return [(d["id"], d["readiness_assessment"], d["urgency_assessment"], d["qualification"]) for d in deals]
+
+
+@pytest.mark.asyncio
+async def test_fused_qualification_and_alerts_match_chained_stages(scout_agent, state):
+    engine = ScoutWorkflowEngine(scout_agent)
+    deals = await engine._score_and_prioritize_deals(random_deals(60, seed=4), state)
+    for i, deal in enumerate(deals):
+        deal["seller_motivation_score"] = deal["lead_score"]["seller_motivation"]
+        deal["profit_potential_score"] = deal["lead_score"]["profit_potential"]
+        deal["market_conditions_score"] = 9.0 if i % 3 == 0 else 6.0
+
+    fused = await engine._qualify_deals([dict(d) for d in deals], state)
+    chained = [dict(d) for d in deals]
+    for stage in (engine._apply_basic_qualification_criteria, engine._verify_contact_information,
+                  engine._research_owner_details, engine._assess_deal_readiness,
+                  engine._determine_urgency_levels, engine._categorize_qualification_levels):
+        chained = await stage(chained, state)
+    assert fused and qualification_view(fused) == qualification_view(chained)
+
+    alert_worthy, messages, notifications = await engine._dispatch_deal_alerts(fused, state)
+    worthy = await engine._identify_alert_worthy_deals(fused, state)
+    chained_messages = await engine._generate_alert_messages(
+        await engine._categorize_alert_types(worthy, state), state)
+    chained_plan = await engine._determine_notification_channels(chained_messages, state)
+    assert alert_worthy == len(worthy)
+    assert sorted((m["deal_id"], m["category"], m["priority"]) for m in messages) == \
+        sorted((m["deal_id"], m["category"], m["priority"]) for m in chained_messages)
+    assert len(notifications) == sum(len(v) for v in chained_plan.values())
+
+
+@pytest.mark.asyncio
+async def test_workflows_record_fused_steps(scout_agent, state):
+    engine = ScoutWorkflowEngine(scout_agent)
+    deals = await engine._score_and_prioritize_deals(random_deals(20, seed=6), state)
+
+    await engine.execute_lead_qualification_workflow(deals, state)
+    await engine.execute_alert_notification_workflow(deals, state)
+
+    steps = [w["steps_completed"] for w in engine.workflow_history[-2:]]
+    assert steps == [["lead_qualification", "report_generation"],
+                     ["alert_dispatch", "delivery_tracking", "escalation_handling"]]
@@ -0,0 +1,110 @@
+"""
+Tests for the grid spatial index and index-based neighborhood scoring
+"""
+
+import math
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from geopy.distance import geodesic
+
+from app.models.neighborhood_analysis import GeographicBoundary
+from app.services.neighborhood_analysis_service import NeighborhoodAnalysisService
+from app.services.spatial_index import PointLayer, haversine_miles, points_in_polygon
+
+
+def random_points(rng, n, lat=40.7, lng=-74.0, spread=0.15):
+    return lat + rng.uniform(-spread, spread, n), lng + rng.uniform(-spread, spread, n)
+
+
+@pytest.fixture
+def datasets(make_neighborhood_datasets):
+    return make_neighborhood_datasets(seed=7)
+
+
+def test_haversine_and_polygon_helpers():
+    lats = np.array([40.0, 40.7128, 34.0522])
+    lngs = np.array([-74.0, -74.0060, -118.2437])
+    expected = [geodesic((lat, lng), (40.75, -73.98)).miles for lat, lng in zip(lats, lngs)]
+    assert haversine_miles(lats, lngs, 40.75, -73.98) == pytest.approx(expected, rel=5e-3)
+
+    square = [[40.0, -74.0], [40.0, -73.0], [41.0, -73.0], [41.0, -74.0]]
+    inside = points_in_polygon([40.5, 42.0, 40.5, 40.0], [-73.5, -73.5, -72.0, -73.5], square)
+    assert inside.tolist() == [True, False, False, True]
+
+    boundary = GeographicBoundary(name="Square", boundary_type="polygon", coordinates=square, north_lat=41.0,
+                                  south_lat=40.0, east_lng=-73.0, west_lng=-74.0, center_lat=40.5, center_lng=-73.5)
+    assert [boundary.contains_point(lat, lng) for lat, lng in
+            [(40.5, -73.5), (42.0, -73.5), (40.5, -72.0), (40.0, -73.5)]] == inside.tolist()
+
+
+def test_layer_queries_match_brute_force():
+    rng = np.random.default_rng(1)
+    lats, lngs = random_points(rng, 3000)
+    layer = PointLayer(lats, lngs, categories=np.arange(3000) % 4, values={"one": np.ones(3000)})
+
+    centers = np.column_stack(random_points(rng, 20, spread=0.1))
+    center_idx, positions, distances = layer.within_radius(centers[:, 0], centers[:, 1], 1.5)
+    for c, (lat, lng) in enumerate(centers):
+        brute = np.flatnonzero(haversine_miles(lats, lngs, lat, lng) <= 1.5)
+        assert sorted(layer.original_index(positions[center_idx == c])) == brute.tolist()
+    assert np.all(distances <= 1.5)
+
+    polygon = [[40.65, -74.05], [40.65, -73.95], [40.75, -73.95]]
+    assert sorted(layer.original_index(layer.within_polygon(polygon))) == \
+        np.flatnonzero(points_in_polygon(lats, lngs, polygon)).tolist()
+
+    # Per-cell aggregates add back up to the layer
+    assert layer.cell_category_counts.sum() == 3000
+    assert layer.cell_category_counts.sum(axis=0).tolist() == [750] * 4
+    assert layer.cell_sums["one"].sum() == pytest.approx(3000)
+
+
+def test_index_scores_match_list_scoring(datasets):
+    schools, amenities, incidents = datasets
+    service = NeighborhoodAnalysisService()
+    service.build_spatial_index(schools, amenities, incidents)
+
+    lat, lng, radius = 40.71, -74.01, 1.0
+    boundary = service.detect_neighborhood_boundary("1 Main St, New York, NY", radius)
+    boundary.center_lat, boundary.center_lng = lat, lng
+    boundary.coordinates = service._create_circular_boundary(lat, lng, radius)
+
+    def near(items, miles):
+        return [item for item in items if haversine_miles(item.latitude, item.longitude, lat, lng) <= miles]
+
+    expected = service.calculate_neighborhood_score(boundary, [], near(schools, 2.0), near(amenities, radius),
+                                                    near(incidents, radius))
+    indexed = service.score_location(lat, lng, radius)
+
+    for field in ("overall_score", "school_score", "amenity_score", "safety_score", "schools_analyzed",
+                  "amenities_analyzed", "crime_incidents_analyzed"):
+        assert getattr(indexed, field) == pytest.approx(getattr(expected, field)), field
+
+    # Area lookups are served from the index
+    assert {s.id for s in service.find_schools_in_area(boundary)} == {s.id for s in near(schools, 2.0)}
+    assert service.find_amenities_in_area(boundary)[0].distance_to(lat, lng) < 0.2
+    polygon_hits = service.get_crime_data(boundary, months_back=6)
+    assert polygon_hits and all(boundary.contains_point(i.latitude, i.longitude) for i in polygon_hits)
+    assert all(i.incident_date > datetime.now() - timedelta(days=181) for i in polygon_hits)
+
+
+def test_comparing_500_neighborhoods_is_fast(datasets):
+    service = NeighborhoodAnalysisService()
+    service.build_spatial_index(*datasets)
+    rng = np.random.default_rng(3)
+    centers = list(zip(*random_points(rng, 500, spread=0.1)))
+
+    service.score_locations(centers[:10])
+    start = time.perf_counter()
+    scores = service.score_locations(centers)
+    elapsed = time.perf_counter() - start
+
+    assert len(scores) == 500
+    assert all(0 <= s.overall_score <= 100 for s in scores)
+    assert elapsed < 0.5
+
+    with pytest.raises(ValueError):
+        NeighborhoodAnalysisService().score_locations(centers)
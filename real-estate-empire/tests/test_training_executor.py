@@ -0,0 +1,183 @@
+"""
+Tests for the concurrent, seeded training executor
+"""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.simulation.agent_trainer import AgentTrainer
+from app.simulation.market_simulator import MarketSimulator
+from app.simulation.scenario_sampler import PropertyReservoir
+from app.simulation.training_executor import (
+    TrainingExecutor, TrainingResultStore, LearningCurveTracker, scenario_rng
+)
+from app.training.training_framework import TrainingFramework, TrainingConfig, LearningCurve
+
+
+@pytest.fixture
+def reservoir():
+    rng = np.random.default_rng(0)
+    n = 200
+    cities = np.array(["Miami", "Orlando", "Tampa"])
+    return PropertyReservoir.from_frame(pd.DataFrame({
+        "city": cities[rng.integers(0, 3, size=n)],
+        "state": "Florida",
+        "price": rng.uniform(100000, 900000, size=n),
+        "house_size": rng.uniform(800, 4000, size=n),
+        "bed": rng.integers(1, 6, size=n).astype(float),
+        "bath": rng.integers(1, 4, size=n).astype(float),
+        "acre_lot": rng.uniform(0.05, 1.0, size=n),
+        "zip_code": "33101",
+    }))
+
+
+@pytest.fixture
+def investment_analyzer():
+    analyzer = Mock()
+
+    def analyze(property_data):
+        score = 50 + (property_data["asking_price"] % 40)
+        return SimpleNamespace(
+            estimated_value=property_data["asking_price"] * 0.97,
+            confidence_score=70.0,
+            investment_metrics=SimpleNamespace(
+                investment_score=score, roi=8.5, risk_level="medium", monthly_cash_flow=250.0
+            )
+        )
+
+    analyzer.analyze_investment_opportunity.side_effect = analyze
+    return analyzer
+
+
+@pytest.fixture
+def trainer(reservoir, investment_analyzer):
+    simulator = MarketSimulator(Mock(), seed=1, reservoir=reservoir)
+    return AgentTrainer(simulator, investment_analyzer)
+
+
+class SlowAgent:
+    """Stateless agent that sleeps to simulate an LLM call and records concurrency"""
+
+    def __init__(self, delay=0.01):
+        self.agent_id = "slow_agent"
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def analyze_deal(self, scenario_data):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        asking_price = scenario_data["deal"]["asking_price"]
+        return {"action": "pursue", "offer_price": asking_price * 0.9, "confidence": 0.7}
+
+
+def test_scenario_rng_depends_only_on_seed_and_index():
+    assert scenario_rng(42, 3).random() == scenario_rng(42, 3).random()
+    assert scenario_rng(42, 3).random() != scenario_rng(42, 4).random()
+    assert scenario_rng(42, 3).random() != scenario_rng(43, 3).random()
+
+
+@pytest.mark.asyncio
+async def test_same_seed_replays_scenarios_at_any_concurrency(trainer):
+    """Test scenario contents depend only on the seed, not on concurrency"""
+    sequential = await trainer.run_training_session(SlowAgent(0), 12, seed=7, max_concurrency=1)
+    concurrent = await trainer.run_training_session(SlowAgent(0.005), 12, seed=7, max_concurrency=6)
+
+    def fingerprint(session):
+        return [(r.actual_outcome.get("max_offer"), r.actual_outcome.get("final_price"), r.performance_score)
+                for r in session["results"]]
+
+    assert fingerprint(sequential) == fingerprint(concurrent)
+    assert sequential["session_summary"]["seed"] == 7
+
+    other = await trainer.run_training_session(SlowAgent(0), 12, seed=8)
+    assert fingerprint(other) != fingerprint(sequential)
+
+
+@pytest.mark.asyncio
+async def test_executor_bounds_concurrency(trainer):
+    agent = SlowAgent(0.02)
+    executor = TrainingExecutor(trainer, max_concurrency=3, seed=1)
+    specs = executor.plan(["deal_analysis"] * 10, [0.5] * 10)
+
+    results = await executor.run(agent, specs)
+
+    assert len(results) == 10
+    assert agent.max_in_flight == 3
+    assert all(hasattr(r, "decision_time") for r in results)
+
+
+@pytest.mark.asyncio
+async def test_results_stream_to_append_only_store(trainer, tmp_path):
+    path = tmp_path / "results.jsonl"
+    await trainer.run_training_session(SlowAgent(0), 5, seed=3, results_path=str(path))
+    await trainer.run_training_session(SlowAgent(0), 2, seed=4, results_path=str(path))
+
+    records = list(TrainingResultStore(path).read())
+    assert len(records) == 7
+    assert [r["seed"] for r in records].count(3) == 5
+    assert sorted(r["index"] for r in records[:5]) == list(range(5))
+    assert {"performance_score", "decision", "timestamp", "scenario_type"} <= set(records[0])
+
+
+@pytest.mark.asyncio
+async def test_process_pool_evaluation_matches_inline(trainer):
+    inline = TrainingExecutor(trainer, seed=11)
+    inline_results = await inline.run(SlowAgent(0), inline.plan(["negotiation", "deal_analysis"] * 3, [0.4] * 6))
+
+    with ProcessPoolExecutor(2) as pool:
+        pooled = TrainingExecutor(trainer, seed=11, evaluation_executor=pool)
+        pooled_results = await pooled.run(SlowAgent(0), pooled.plan(["negotiation", "deal_analysis"] * 3, [0.4] * 6))
+
+    assert [r.performance_score for r in pooled_results] == [r.performance_score for r in inline_results]
+    assert [r.learning_points for r in pooled_results] == [r.learning_points for r in inline_results]
+
+
+def test_learning_curve_tracker_matches_full_recomputation():
+    """Test incremental plateau/breakthrough detection agrees with the batch rules"""
+    framework = TrainingFramework.__new__(TrainingFramework)
+    rng = np.random.default_rng(5)
+    scores = np.concatenate([rng.uniform(20, 90, 40), np.full(15, 60.0) + rng.normal(0, 1, 15)])
+    tracker = LearningCurveTracker()
+    curve = []
+
+    for i, score in enumerate(scores):
+        timestamp = datetime(2024, 1, 1)
+        tracker.add(score, timestamp)
+        curve.append(LearningCurve(i, timestamp, float(score), "training", 0.5, 0.0, 0.5, 0.1))
+        assert tracker.plateau == framework._detect_learning_plateau(curve)
+
+    expected = framework._identify_breakthroughs(curve)
+    assert [b["iteration"] for b in tracker.breakthroughs] == [b["iteration"] for b in expected]
+    assert tracker.plateau
+    assert tracker.mean == pytest.approx(scores.mean())
+    assert tracker.std == pytest.approx(scores.std())
+
+
+@pytest.mark.asyncio
+async def test_training_program_runs_phases_concurrently(trainer, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    framework = TrainingFramework(trainer.market_simulator, trainer)
+    agent = await framework.create_training_agent("analyst", "agent_1")
+
+    outcome = await framework.run_training_program(
+        agent, TrainingConfig(agent_type="analyst", max_concurrency=8, seed=21)
+    )
+
+    session = framework.training_sessions[outcome["session_id"]]
+    assert session["status"] == "completed"
+    assert len(session["results"]) == 20 + 45 + 10
+    assert len(framework.learning_curves["agent_1"]) == 75
+    assert framework.learning_trackers["agent_1"].count == 75
+    records = list(TrainingResultStore(session["results_path"]).read())
+    assert len(records) == 75 + 9
+    assert {r["phase"] for r in records} == {"foundation", "specialized", "advanced", "evaluation"}